@@ -8,6 +8,11 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     DATABASE_URL: str | None = None
     GOOGLE_API_KEY: SecretStr | None = None
+    DEBUG: bool = False
+
+    # Creates the missing tables when the app starts. Deployments that scale to zero can disable it, and run
+    # `scripts/create_tables.py` once per release instead, to keep the database out of the cold start.
+    DATABASE_CREATE_TABLES_ON_STARTUP: bool = True
 
     CHAT_SYSTEM_INSTRUCTIONS: str = (
         "## Language and Formatting\n"
@@ -59,6 +64,133 @@ class Settings(BaseSettings):
         "image/heif",
     ]
 
+    # Production server (`python -m app.server`). Unless WEB_CONCURRENCY is set, the number of workers is sized from
+    # the CPUs and memory available to the container, with WORKER_MEMORY_MB per worker.
+    HOST: str = "0.0.0.0"
+    PORT: int = 8080
+    WEB_CONCURRENCY: int | None = None
+    WORKER_MEMORY_MB: int = 512
+    # Each worker is replaced after this many requests, plus a random jitter so that they aren't all replaced at once.
+    WORKER_MAX_REQUESTS: int = 1000
+    WORKER_MAX_REQUESTS_JITTER: int = 100
+    # Long enough for a chat turn with several tool rounds to finish when the server is stopped.
+    WORKER_GRACEFUL_TIMEOUT_SECONDS: int = 120
+    WORKER_TIMEOUT_SECONDS: int = 120
+    WORKER_KEEPALIVE_SECONDS: int = 5
+
+    # Explicit caches of the Gemini API for the stable prefix of the prompts: the system instruction, the tools and
+    # the older history, in steps of LLM_PROMPT_CACHE_HISTORY_STEP messages. Prefixes under the minimum size accepted by
+    # the API for the model aren't cached.
+    LLM_PROMPT_CACHE_ENABLED: bool = True
+    LLM_PROMPT_CACHE_TTL_SECONDS: int = 600
+    LLM_PROMPT_CACHE_MIN_TOKENS: int = 1024
+    LLM_PROMPT_CACHE_MAX_ENTRIES: int = 256
+    LLM_PROMPT_CACHE_HISTORY_STEP: int = 10
+
+    # Model tiers. Messages of up to LLM_SIMPLE_MESSAGE_MAX_CHARS characters without files, the tool rounds that only
+    # called LLM_FAST_TOOLS, and retries of failed full model calls go to the fast model; the rest of the chat and the
+    # course extraction use the full model.
+    LLM_FULL_MODEL: str = "gemini-2.5-flash"
+    LLM_FAST_MODEL: str = "gemini-2.5-flash-lite"
+    LLM_FAST_TOOLS: list[str] = ["get_current_utc_time"]
+    LLM_SIMPLE_MESSAGE_MAX_CHARS: int = 280
+    # A model whose last LLM_MODEL_HEALTH_WINDOW chat calls failed more than LLM_MODEL_MAX_ERROR_RATE of the time, or
+    # took more than LLM_MODEL_LATENCY_SLO_SECONDS at the 95th percentile, is degraded: its chat calls go to the other
+    # tier for LLM_MODEL_COOLDOWN_SECONDS.
+    LLM_MODEL_HEALTH_WINDOW: int = 50
+    LLM_MODEL_HEALTH_MIN_CALLS: int = 20
+    LLM_MODEL_MAX_ERROR_RATE: float = 0.2
+    LLM_MODEL_LATENCY_SLO_SECONDS: float = 8.0
+    LLM_MODEL_COOLDOWN_SECONDS: int = 60
+
+    # Calls failing with a transient error (5xx, 408, 429) are sent up to LLM_MAX_ATTEMPTS times in all, after a
+    # jittered exponential backoff from LLM_RETRY_BASE_DELAY_SECONDS up to LLM_RETRY_MAX_DELAY_SECONDS, or the
+    # Retry-After of the error when longer. A chat turn, tool rounds included, and a course extraction fail with a 503
+    # once past their deadline, which no retry is started after.
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    LLM_CHAT_TURN_DEADLINE_SECONDS: float = 60.0
+    LLM_STRUCTURED_OUTPUT_DEADLINE_SECONDS: float = 110.0
+    # After LLM_CIRCUIT_FAILURE_THRESHOLD consecutive transient errors, calls fail at once for
+    # LLM_CIRCUIT_RESET_SECONDS, then a single call probes the API.
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    # A chat call still running past the 95th percentile latency of the last LLM_HEDGING_WINDOW calls to its model is
+    # sent a second time, and the first answer is used. Cuts the tail latency for up to 5% more tokens.
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGING_WINDOW: int = 100
+    LLM_HEDGING_MIN_CALLS: int = 20
+    # PDF and HTML documents are sent to the model as the text extracted from them when it holds their whole content
+    # and is smaller: text-based PDFs with simple fonts and no large image, which most syllabi are. Scanned documents
+    # and the others are sent as they are (`python -m benchmarks.document_text`).
+    LLM_DOCUMENT_TEXT_EXTRACTION_ENABLED: bool = True
+    # Images are sent to the model scaled down to LLM_IMAGE_MAX_SIDE pixels on their longest side, which keeps the
+    # text of a photographed timetable readable in 2x2 tiles of the model, and re-encoded to WebP without their
+    # metadata. The work is done in a pool of LLM_IMAGE_PROCESS_WORKERS processes per worker
+    # (`python -m benchmarks.image_processing`).
+    LLM_IMAGE_DOWNSCALING_ENABLED: bool = True
+    LLM_IMAGE_MAX_SIDE: int = 1536
+    LLM_IMAGE_QUALITY: int = 80
+    LLM_IMAGE_PROCESS_WORKERS: int = 2
+    # Files of LLM_FILE_UPLOAD_MIN_BYTES or more are uploaded to the file storage of the Gemini API once and referenced
+    # by the requests, and by the chat history sent with every turn, instead of being sent inline. A file is reused for
+    # LLM_FILE_UPLOAD_TTL_SECONDS, under the 48 hours the API keeps it; once it is gone, the history says so instead.
+    LLM_FILE_UPLOAD_ENABLED: bool = True
+    LLM_FILE_UPLOAD_MIN_BYTES: int = 256 * 1024
+    LLM_FILE_UPLOAD_TTL_SECONDS: int = 47 * 3600
+    LLM_FILE_UPLOAD_MAX_ENTRIES: int = 4096
+
+    # The files of a course are extracted separately, text files longer than COURSE_EXTRACTION_TEXT_PART_CHARS in parts
+    # overlapping by COURSE_EXTRACTION_TEXT_OVERLAP_CHARS, with up to COURSE_EXTRACTION_CONCURRENCY model calls at once
+    # per request. Files other than text are sent inline, so must be under 19MB each; all of them together must be
+    # under COURSE_AI_MAX_UPLOAD_BYTES.
+    COURSE_EXTRACTION_CONCURRENCY: int = 4
+    COURSE_EXTRACTION_TEXT_PART_CHARS: int = 100_000
+    COURSE_EXTRACTION_TEXT_OVERLAP_CHARS: int = 2_000
+    COURSE_AI_MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024
+
+    # Per user token buckets of the AI endpoints, refilled with RATE_LIMIT_<ROUTE>_PER_MINUTE requests per minute up to
+    # RATE_LIMIT_<ROUTE>_BURST, and a cap of RATE_LIMIT_AI_CONCURRENCY_PER_USER requests in flight per user across
+    # them. The "memory" backend counts per worker; the "database" one shares the counts between workers and instances,
+    # with a slot left by a dead worker freed after RATE_LIMIT_SLOT_LEASE_SECONDS. Unset, `app.server` picks "database"
+    # when it runs several workers, and "memory" otherwise.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str | None = None
+    RATE_LIMIT_CHAT_PER_MINUTE: float = 20
+    RATE_LIMIT_CHAT_BURST: int = 5
+    RATE_LIMIT_COURSE_AI_PER_MINUTE: float = 4
+    RATE_LIMIT_COURSE_AI_BURST: int = 2
+    RATE_LIMIT_AI_CONCURRENCY_PER_USER: int = 2
+    RATE_LIMIT_SLOT_LEASE_SECONDS: int = 300
+
+    # `GET /metrics` exports the metrics in the Prometheus text format when enabled, to requests bearing METRICS_TOKEN
+    # when it is set. Metrics are kept per worker process, so a scrape only sees those of the worker that answered it.
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: SecretStr | None = None
+
+    # Chat contents stored outside PostgreSQL are compressed from this size on, which takes about a fifth of the space
+    # and some more CPU to read (`python -m benchmarks.chat_storage`). PostgreSQL compresses large JSONB values itself.
+    CHAT_CONTENT_COMPRESS_FROM_BYTES: int = 1024
+    # `scripts/archive_chat_history.py` moves the messages of each user older than their last
+    # CHAT_HOT_WINDOW_MESSAGES to the archive, CHAT_ARCHIVE_BATCH_SIZE messages per transaction.
+    CHAT_HOT_WINDOW_MESSAGES: int = 200
+    CHAT_ARCHIVE_BATCH_SIZE: int = 1000
+    # A chat message sent again with the same Idempotency-Key header within CHAT_IDEMPOTENCY_TTL_SECONDS gets the
+    # answer of the first one. The worker remembers the last CHAT_IDEMPOTENCY_MAX_KEYS keys at most.
+    CHAT_IDEMPOTENCY_TTL_SECONDS: int = 600
+    CHAT_IDEMPOTENCY_MAX_KEYS: int = 10_000
+
+    # A statement repeated this many times in one request or tool call is logged as a likely N+1 query.
+    SQL_REPEATED_QUERY_WARNING_THRESHOLD: int = 10
+
+    BATCH_MAX_OPERATIONS: int = 500
+
+    USER_PROFILE_EVENTS_DAYS: int = 30
+
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_FILE_SIZE_BYTES: int = 20 * 1024 * 1024
+
     model_config = SettingsConfigDict(
         env_file=BASE_DIR / ".env",
         env_file_encoding='utf-8',
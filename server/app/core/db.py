@@ -1,13 +1,198 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import orjson
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+_UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed while a request, an LLM tool call or another tracked block was running."""
+    tag: str
+    parent: "QueryStats | None" = None
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    statement_counts: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if statement.lstrip()[:6].upper() == "SELECT":
+            self.statement_counts[statement] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def most_repeated(self) -> tuple[str | None, int]:
+        """
+        Returns the SELECT executed the most times and how many times it ran. Parameters are bound separately, so a
+        query repeated once per row of a previous result is the signature of an N+1 access pattern. Writes are left
+        out, since one statement per changed row is expected.
+        """
+        if not self.statement_counts:
+            return None, 0
+        return self.statement_counts.most_common(1)[0]
+
+
+class QueryMetrics:
+    """Thread-safe totals of the tracked blocks, aggregated by tag."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: dict[str, dict[str, float]] = {}
+
+    def observe(self, stats: QueryStats) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(stats.tag, {"calls": 0, "queries": 0, "seconds": 0.0,
+                                                         "max_queries": 0, "max_seconds": 0.0})
+            totals["calls"] += 1
+            totals["queries"] += stats.count
+            totals["seconds"] += stats.total_seconds
+            totals["max_queries"] = max(totals["max_queries"], stats.count)
+            totals["max_seconds"] = max(totals["max_seconds"], stats.slowest_seconds)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {tag: dict(totals) for tag, totals in self._totals.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+query_metrics = QueryMetrics()
+_current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+_process_query_stats: list[QueryStats] = []
+
+
+@contextmanager
+def track_queries(tag: str) -> Iterator[QueryStats]:
+    """
+    Records the statements executed in the current context, including tasks and threads started from it, while the
+    block runs. Nested blocks also count towards the enclosing ones. The totals are added to `query_metrics` on exit.
+    """
+    stats = QueryStats(tag=tag, parent=_current_query_stats.get())
+    token = _current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+        query_metrics.observe(stats)
+
+
+@contextmanager
+def track_all_queries(tag: str) -> Iterator[QueryStats]:
+    """
+    Records every statement executed in the process while the block runs, whatever context it runs in. Meant for
+    tests and benchmarks, where the application runs in another thread than the caller.
+    """
+    stats = QueryStats(tag=tag)
+    _process_query_stats.append(stats)
+    try:
+        yield stats
+    finally:
+        _process_query_stats.remove(stats)
+
+
+def warn_repeated_queries(stats: QueryStats) -> None:
+    """Logs a warning if a statement was repeated often enough in `stats` to suggest an N+1 query."""
+    statement, repetitions = stats.most_repeated()
+    if repetitions >= settings.SQL_REPEATED_QUERY_WARNING_THRESHOLD:
+        logger.warning("Possible N+1 query in %s: a statement ran %d times: %s", stats.tag, repetitions, statement)
+
+
+def instrument_engine(target: Engine) -> None:
+    """Makes the statements executed by `target` visible to `track_queries` and `track_all_queries`."""
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the context of the statement, which is dropped with it when it fails and `after_cursor_execute` isn't
+    # called.
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_start
+    stats = _current_query_stats.get()
+    while stats is not None:
+        stats.record(statement, seconds)
+        stats = stats.parent
+    for stats in list(_process_query_stats):
+        stats.record(statement, seconds)
+
+
 engine = create_engine(
     str(settings.DATABASE_URL),
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads,
 )
+instrument_engine(engine)
+
+if engine.dialect.name == "sqlite":
+    # SQLite ignores foreign keys, including their ON DELETE CASCADE, unless they are enabled on each connection.
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+
+class _EagerDefaultsBase:
+    # Server-generated columns are fetched with RETURNING when a row is flushed, instead of a later SELECT.
+    __mapper_args__ = {"eager_defaults": True}
+
+
+Base = declarative_base(cls=_EagerDefaultsBase)
+
+
+def in_unit_of_work(db: Session) -> bool:
+    return bool(db.info.get(_UNIT_OF_WORK_KEY))
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Groups every write made through `db` in a single transaction.
+
+    Inside the block, CRUD methods only flush their changes. The transaction is committed once when the block exits,
+    or rolled back if it raises. Nested blocks join the outermost one.
+    """
+    if in_unit_of_work(db):
+        yield db
+        return
+    db.info[_UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(_UNIT_OF_WORK_KEY, None)
+
+
+def flush_or_commit(db: Session) -> None:
+    """Flushes pending changes inside a unit of work, or commits them right away outside of one."""
+    if in_unit_of_work(db):
+        db.flush()
+    else:
+        db.commit()
@@ -0,0 +1,59 @@
+import zlib
+from typing import Any
+
+import orjson
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
+
+# The first byte of a zlib stream with the default window size. No JSON document starts with it ("x").
+_ZLIB_HEADER = b"\x78"
+
+
+def encode_compact_json(value: Any, compress_from_bytes: int) -> bytes:
+    """Encodes `value` as compact JSON, compressed with zlib when it takes `compress_from_bytes` bytes or more."""
+    data = orjson.dumps(value)
+    if len(data) >= compress_from_bytes:
+        compressed = zlib.compress(data)
+        if len(compressed) < len(data):
+            return compressed
+    return data
+
+
+def decode_compact_json(data: bytes | str) -> Any:
+    """Decodes a value encoded by `encode_compact_json`, or stored as JSON text by an earlier version."""
+    if isinstance(data, str):
+        return orjson.loads(data)
+    if data[:1] == _ZLIB_HEADER:
+        data = zlib.decompress(data)
+    return orjson.loads(data)
+
+
+class CompactJSON(TypeDecorator):
+    """
+    A JSON document, read and written as Python lists, dicts and scalars.
+
+    PostgreSQL stores it as JSONB, parsed once on write, and compresses large values itself when they are moved out of
+    the row (TOAST). Other databases store the compact JSON bytes, zlib-compressed from `compress_from_bytes` on.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, compress_from_bytes: int = 1024):
+        super().__init__()
+        self.compress_from_bytes = compress_from_bytes
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return encode_compact_json(value, self.compress_from_bytes)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return decode_compact_json(value)
@@ -0,0 +1,25 @@
+import threading
+
+_init_lock = threading.Lock()
+
+
+def get_firebase_app():
+    """
+    Returns the default Firebase app, initializing it with the application default credentials on first use. The
+    SDK is only imported here, which keeps it out of the import time of the app.
+    """
+    import firebase_admin
+    from firebase_admin import credentials
+
+    with _init_lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            return firebase_admin.initialize_app(credentials.ApplicationDefault())
+
+
+def verify_id_token(id_token: str) -> dict:
+    """Verifies a Firebase ID token and returns its decoded claims."""
+    from firebase_admin import auth
+
+    return auth.verify_id_token(id_token, app=get_firebase_app())
@@ -0,0 +1,246 @@
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from .db import query_metrics
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 8, 13, 21)
+
+LabelValues = tuple[str, ...]
+
+
+class _Metric:
+    type_name: str
+
+    def __init__(self, name: str, description: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        if labels.keys() != set(self.label_names):
+            raise ValueError(f"{self.name} expects the labels {self.label_names}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(self, values: LabelValues, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.label_names, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}", *self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str, label_names: Iterable[str] = ()):
+        super().__init__(name, description, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {_format_value(value)}"
+                    for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, label_names: Iterable[str] = ()):
+        super().__init__(name, description, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {_format_value(value)}"
+                    for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, label_names: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: the count of each bucket (not cumulative, the last one is +Inf), the sum and the count.
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        """Returns how many values were observed with `labels`."""
+        counts, _ = self._values.get(self._label_values(labels), ([], []))
+        return sum(counts)
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip((*self.buckets, math.inf), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _format_value(bound)
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, (('le', le),))} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_value(total[0])}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"A metric called {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, label_names: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, description, label_names))
+
+    def gauge(self, name: str, description: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, description, label_names))
+
+    def histogram(self, name: str, description: str, label_names: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, description, label_names, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """Adds a function called on every scrape that returns metrics built from another source."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _collect_query_metrics() -> list[_Metric]:
+    blocks = Counter("db_tracked_blocks_total", "Requests and tool calls whose SQL statements were tracked.", ["tag"])
+    queries = Counter("db_queries_total", "SQL statements executed, by request route or tool.", ["tag"])
+    seconds = Counter("db_query_seconds_total", "Time spent executing SQL statements, by request route or tool.",
+                      ["tag"])
+    max_queries = Gauge("db_queries_max", "Most SQL statements executed by a single request or tool call.", ["tag"])
+    for tag, totals in query_metrics.snapshot().items():
+        blocks.inc(totals["calls"], tag=tag)
+        queries.inc(totals["queries"], tag=tag)
+        seconds.inc(totals["seconds"], tag=tag)
+        max_queries.set(totals["max_queries"], tag=tag)
+    return [blocks, queries, seconds, max_queries]
+
+
+registry = MetricsRegistry()
+registry.add_collector(_collect_query_metrics)
+
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled.", ["method"])
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests, until the response is sent.",
+    ["method", "route", "status"])
+rate_limit_requests_total = registry.counter(
+    "rate_limit_requests_total", "Requests checked against the per user rate limits, by route and outcome.",
+    ["route", "outcome"])
+rate_limit_in_flight = registry.gauge(
+    "rate_limit_in_flight", "Rate limited requests currently holding a concurrency slot in this worker.", ["route"])
+chat_turn_queue_wait_seconds = registry.histogram(
+    "chat_turn_queue_wait_seconds", "Time a chat turn waited for the previous turns of its user to finish.",
+    buckets=LLM_BUCKETS)
+chat_turns_coalesced_total = registry.counter(
+    "chat_turns_coalesced_total", "Chat messages sent again with the idempotency key of a previous turn, answered "
+    "with its result.")
+llm_request_duration_seconds = registry.histogram(
+    "llm_request_duration_seconds", "Latency of calls to the LLM API.", ["model", "operation", "outcome"],
+    buckets=LLM_BUCKETS)
+llm_tool_loop_iterations = registry.histogram(
+    "llm_tool_loop_iterations", "Model calls needed to answer one chat message, including tool rounds.",
+    buckets=ITERATION_BUCKETS)
+llm_tokens_total = registry.counter(
+    "llm_tokens_total", "Tokens reported in the usage metadata of LLM responses.", ["model", "type"])
+llm_prompt_cache_requests_total = registry.counter(
+    "llm_prompt_cache_requests_total", "Lookups of cached prompt prefixes that used, created or refreshed a cache, "
+    "or failed to.", ["outcome"])
+llm_model_failovers_total = registry.counter(
+    "llm_model_failovers_total", "Chat calls sent to another model tier than the one chosen, because the chosen one "
+    "was degraded or the call failed.", ["model", "to_model", "reason"])
+llm_model_degraded = registry.gauge(
+    "llm_model_degraded", "1 while a model is considered degraded and its chat calls go to the other tier.", ["model"])
+llm_retries_total = registry.counter(
+    "llm_retries_total", "Calls to the LLM API sent again after a transient error.", ["operation"])
+llm_hedged_requests_total = registry.counter(
+    "llm_hedged_requests_total", "Calls to the LLM API sent a second time after running past their usual latency.",
+    ["model", "operation"])
+llm_circuit_open = registry.gauge(
+    "llm_circuit_open", "1 while calls to the LLM API fail at once, after too many consecutive transient errors.")
+llm_file_parts_total = registry.counter(
+    "llm_file_parts_total", "Files sent to the LLM API, as the text extracted from them, as they are or by "
+    "reference to their upload.", ["sent_as"])
+llm_file_bytes_total = registry.counter(
+    "llm_file_bytes_total", "Bytes of the files sent to the LLM API, before their base64 encoding.", ["sent_as"])
+llm_file_uploads_total = registry.counter(
+    "llm_file_uploads_total", "Files sent to the LLM API by reference to the file storage, uploaded or reused, and "
+    "uploads that failed.", ["outcome"])
+llm_image_processing_seconds = registry.histogram(
+    "llm_image_processing_seconds", "Time to scale down and re-encode an image sent to the LLM API, by whether it was "
+    "sent normalized, unchanged, or unchanged as its processing failed.", ["outcome"])
+course_extraction_parts = registry.histogram(
+    "course_extraction_parts", "Parts the files of a course were split into, each extracted by its own model call.",
+    buckets=ITERATION_BUCKETS)
+llm_tool_calls_total = registry.counter(
+    "llm_tool_calls_total", "Tool calls requested by the model.", ["tool", "outcome"])
+llm_tool_duration_seconds = registry.histogram(
+    "llm_tool_duration_seconds", "Latency of tool calls requested by the model.", ["tool"])
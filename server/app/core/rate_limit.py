@@ -0,0 +1,270 @@
+import asyncio
+import functools
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Protocol
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import Engine, case, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.core.metrics import rate_limit_in_flight, rate_limit_requests_total
+from app.core.security import get_current_user
+from app.models import RateLimitCounter, User
+
+logger = logging.getLogger(__name__)
+
+# Buckets that have refilled are the same as missing ones, and are dropped past this many by the in-memory backend.
+_MAX_IDLE_BUCKETS = 10_000
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A token bucket: `per_minute` requests refilled per minute, and up to `burst` at once."""
+    per_minute: float
+    burst: int
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+
+class RateLimitExceededError(Exception):
+    def __init__(self, message: str, retry_after_seconds: float):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class RateLimitBackend(Protocol):
+    """Where the rate limits are counted. Keys are opaque strings built by `RateLimiter`."""
+
+    async def take_token(self, key: str, limit: RateLimit) -> float:
+        """Takes a token from the bucket `key`. Returns 0 when one was taken, or the seconds until one is available."""
+
+    async def acquire_slot(self, key: str, limit: int, lease_seconds: float) -> bool:
+        """Counts one more request in flight under `key`, unless `limit` are already."""
+
+    async def release_slot(self, key: str) -> None:
+        """Counts one less request in flight under `key`."""
+
+
+class InMemoryRateLimitBackend:
+    """Counts in the memory of the worker: each worker of the server applies the limits on its own."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._in_flight: dict[str, int] = {}
+
+    async def take_token(self, key: str, limit: RateLimit) -> float:
+        now = self._clock()
+        tokens, refilled_at = self._buckets.get(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - refilled_at) * limit.per_second)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > _MAX_IDLE_BUCKETS:
+                self._drop_full_buckets(limit, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / limit.per_second
+
+    async def acquire_slot(self, key: str, limit: int, lease_seconds: float) -> bool:
+        if self._in_flight.get(key, 0) >= limit:
+            return False
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        return True
+
+    async def release_slot(self, key: str) -> None:
+        in_flight = self._in_flight.get(key, 0) - 1
+        if in_flight > 0:
+            self._in_flight[key] = in_flight
+        else:
+            self._in_flight.pop(key, None)
+
+    def _drop_full_buckets(self, limit: RateLimit, now: float) -> None:
+        # The buckets of other routes may refill slower, but then they are only dropped a bit early.
+        self._buckets = {
+            key: (tokens, refilled_at) for key, (tokens, refilled_at) in self._buckets.items()
+            if tokens + (now - refilled_at) * limit.per_second < limit.burst
+        }
+
+
+class DatabaseRateLimitBackend:
+    """
+    Counts in the `rate_limit_counters` table, shared by every worker and instance of the server. Each check is one
+    short transaction of conditional updates, which PostgreSQL and SQLite apply atomically.
+
+    Requests in flight are held under a lease: a count left behind by a worker that died is reset once no request
+    has acquired a slot under its key for `lease_seconds`.
+    """
+
+    def __init__(self, engine: Engine, clock: Callable[[], float] = time.time):
+        self.engine = engine
+        self._clock = clock
+
+    async def take_token(self, key: str, limit: RateLimit) -> float:
+        return await asyncio.to_thread(self._take_token, key, limit)
+
+    async def acquire_slot(self, key: str, limit: int, lease_seconds: float) -> bool:
+        return await asyncio.to_thread(self._acquire_slot, key, limit, lease_seconds)
+
+    async def release_slot(self, key: str) -> None:
+        await asyncio.to_thread(self._release_slot, key)
+
+    def _take_token(self, key: str, limit: RateLimit) -> float:
+        now = self._clock()
+        refilled = RateLimitCounter.tokens + (now - RateLimitCounter.refilled_at) * limit.per_second
+        tokens = case((refilled > limit.burst, float(limit.burst)), else_=refilled)
+        with self.engine.begin() as connection:
+            self._create(connection, key, tokens=float(limit.burst), refilled_at=now)
+            taken = connection.execute(
+                update(RateLimitCounter)
+                .where(RateLimitCounter.key == key, tokens >= 1)
+                .values(tokens=tokens - 1, refilled_at=now)
+            ).rowcount
+            if taken:
+                return 0.0
+            available = connection.execute(select(tokens).where(RateLimitCounter.key == key)).scalar_one()
+        return (1 - available) / limit.per_second
+
+    def _acquire_slot(self, key: str, limit: int, lease_seconds: float) -> bool:
+        now = self._clock()
+        expired = RateLimitCounter.lease_expires_at < now
+        with self.engine.begin() as connection:
+            self._create(connection, key)
+            return bool(connection.execute(
+                update(RateLimitCounter)
+                .where(RateLimitCounter.key == key, (RateLimitCounter.in_flight < limit) | expired)
+                .values(in_flight=case((expired, 1), else_=RateLimitCounter.in_flight + 1),
+                        lease_expires_at=now + lease_seconds)
+            ).rowcount)
+
+    def _release_slot(self, key: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(RateLimitCounter)
+                .where(RateLimitCounter.key == key, RateLimitCounter.in_flight > 0)
+                .values(in_flight=RateLimitCounter.in_flight - 1)
+            )
+
+    def _create(self, connection, key: str, **values) -> None:
+        """Inserts the row of `key` unless it exists, in the same statement, so that concurrent requests can't race."""
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        connection.execute(dialect.insert(RateLimitCounter).values(key=key, **values).on_conflict_do_nothing())
+
+
+class RateLimiter:
+    """
+    Limits the requests of each user to the AI endpoints, so that no user can exhaust the model quota shared by all.
+
+    Each route has a token bucket per user, from `limits`, and every route shares a cap of `concurrency_per_user`
+    requests in flight per user. When the backend fails, requests are let through rather than failed.
+    """
+
+    def __init__(self, backend: RateLimitBackend, limits: dict[str, RateLimit], concurrency_per_user: int,
+                 lease_seconds: float, enabled: bool = True):
+        self.backend = backend
+        self.limits = limits
+        self.concurrency_per_user = concurrency_per_user
+        self.lease_seconds = lease_seconds
+        self.enabled = enabled
+
+    async def acquire(self, route: str, user_uuid: str) -> bool:
+        """
+        Takes a token from the bucket of `route` and a concurrency slot for `user_uuid`, raising
+        `RateLimitExceededError` when either is exhausted. Returns whether a slot must be released after the request.
+        """
+        if not self.enabled:
+            return False
+        try:
+            retry_after = await self.backend.take_token(f"bucket:{route}:{user_uuid}", self.limits[route])
+            if retry_after > 0:
+                rate_limit_requests_total.inc(route=route, outcome="rate_limited")
+                raise RateLimitExceededError(f"Too many requests to {route}.", retry_after)
+            if not await self.backend.acquire_slot(f"in_flight:{user_uuid}", self.concurrency_per_user,
+                                                   self.lease_seconds):
+                rate_limit_requests_total.inc(route=route, outcome="concurrency_limited")
+                # The time a request takes isn't known, so the client is asked to wait a second.
+                raise RateLimitExceededError("Too many requests in progress.", 1.0)
+        except RateLimitExceededError:
+            raise
+        except Exception as error:
+            logger.warning("Rate limit check of %s failed, request allowed: %s", route, error)
+            rate_limit_requests_total.inc(route=route, outcome="error")
+            return False
+        rate_limit_requests_total.inc(route=route, outcome="allowed")
+        rate_limit_in_flight.inc(route=route)
+        return True
+
+    async def release(self, route: str, user_uuid: str) -> None:
+        rate_limit_in_flight.dec(route=route)
+        try:
+            await self.backend.release_slot(f"in_flight:{user_uuid}")
+        except Exception as error:
+            # The lease of the slot expires by itself.
+            logger.warning("Couldn't release the concurrency slot of %s: %s", user_uuid, error)
+
+
+@functools.cache
+def get_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "database":
+        from app.core.db import engine
+        backend: RateLimitBackend = DatabaseRateLimitBackend(engine)
+    else:
+        backend = InMemoryRateLimitBackend()
+    return RateLimiter(
+        backend,
+        limits={
+            "chat": RateLimit(settings.RATE_LIMIT_CHAT_PER_MINUTE, settings.RATE_LIMIT_CHAT_BURST),
+            "course_ai": RateLimit(settings.RATE_LIMIT_COURSE_AI_PER_MINUTE, settings.RATE_LIMIT_COURSE_AI_BURST),
+        },
+        concurrency_per_user=settings.RATE_LIMIT_AI_CONCURRENCY_PER_USER,
+        lease_seconds=settings.RATE_LIMIT_SLOT_LEASE_SECONDS,
+        enabled=settings.RATE_LIMIT_ENABLED,
+    )
+
+
+class RateLimitSlot:
+    """The concurrency slot of a request, released once by whichever of its holders is done with it first."""
+
+    def __init__(self, limiter: RateLimiter, route: str, user_uuid: str, held: bool):
+        self.limiter = limiter
+        self.route = route
+        self.user_uuid = user_uuid
+        self.held = held
+
+    async def release(self) -> None:
+        if self.held:
+            self.held = False
+            await self.limiter.release(self.route, self.user_uuid)
+
+
+async def acquire_rate_limit(limiter: RateLimiter, route: str, user: User | None) -> RateLimitSlot:
+    """Applies the rate limit of `route` and the concurrency cap to `user`, raising a 429 when either is exhausted."""
+    if not user:
+        return RateLimitSlot(limiter, route, "", held=False)
+    try:
+        held = await limiter.acquire(route, user.uuid)
+    except RateLimitExceededError as error:
+        raise HTTPException(status.HTTP_429_TOO_MANY_REQUESTS, detail=str(error),
+                            headers={"Retry-After": str(max(math.ceil(error.retry_after_seconds), 1))})
+    return RateLimitSlot(limiter, route, user.uuid, held)
+
+
+def rate_limited(route: str):
+    """
+    A dependency applying the rate limit of `route` and the concurrency cap to the current user, per request. The slot
+    is released before the body of a streaming response is sent: those call `acquire_rate_limit` themselves.
+    """
+    async def dependency(user: User = Depends(get_current_user),
+                         limiter: RateLimiter = Depends(get_rate_limiter)) -> AsyncIterator[None]:
+        slot = await acquire_rate_limit(limiter, route, user)
+        try:
+            yield
+        finally:
+            await slot.release()
+
+    return dependency
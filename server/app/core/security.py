@@ -1,8 +1,8 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from firebase_admin import auth
 from sqlalchemy.orm import Session
 
+from app.core.firebase import verify_id_token
 from app.crud import get_user_crud
 from app.dependencies import get_db
 from app.models import User
@@ -21,8 +21,10 @@ async def get_current_user(
             detail="Authentication token required"
         )
 
+    from firebase_admin import auth
+
     try:
-        decoded_token = auth.verify_id_token(token.credentials)
+        decoded_token = verify_id_token(token.credentials)
         firebase_uid = decoded_token['uid']
     except auth.ExpiredIdTokenError:
         raise HTTPException(
@@ -1,10 +1,12 @@
-from typing import Any, Generic, Type, TypeVar, Union, cast
+from itertools import islice
+from typing import Any, Callable, Generic, Iterable, Iterator, Type, TypeVar, Union, cast
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import Select, insert, select, tuple_
 from sqlalchemy.orm import Session
 
-from app.core.db import Base
+from app.core.db import Base, flush_or_commit, in_unit_of_work
+from app.utils.pagination import encode_cursor, decode_cursor
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -12,6 +14,9 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Columns used for keyset pagination. The last one must be unique, so that the order is total.
+    cursor_columns: tuple[str, ...] = ("uuid",)
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
@@ -21,38 +26,95 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = db.execute(query).scalars().first()
         return result
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> list[ModelType]:
+    def get_owned(self, db: Session, *, owner_uuid: str, obj_uuids: Iterable[str]) -> list[ModelType]:
+        """Retrieves, in a single query, the objects from `obj_uuids` that belong to `owner_uuid`."""
         query = (select(self.model)
-                 .offset(skip)
-                 .limit(limit))
+                 .filter(self.model.owner_uuid == owner_uuid, self.model.uuid.in_(list(obj_uuids))))
         result = db.execute(query).scalars().all()
         return cast(list[ModelType], result)
 
+    def get_multi(self, db: Session, *, cursor: str | None = None, limit: int = 100) -> list[ModelType]:
+        query = self._paginate(select(self.model), cursor=cursor, limit=limit)
+        result = db.execute(query).scalars().all()
+        return cast(list[ModelType], result)
+
+    def get_next_cursor(self, items: list[ModelType], limit: int) -> str | None:
+        """Returns the cursor for the page after `items`, or None if `items` is the last page."""
+        if not items or len(items) < limit:
+            return None
+        return encode_cursor([getattr(items[-1], name) for name in self.cursor_columns])
+
+    def iter_all(self, list_method: Callable[..., list[ModelType]], *, page_size: int = 500,
+                 **kwargs) -> Iterator[ModelType]:
+        """
+        Lazily yields every item returned by a paginated `list_method` of this CRUD, one page at a time.
+        Each page is a single index range scan, so iterating large accounts doesn't degrade on deep pages.
+        """
+        cursor = None
+        while True:
+            items = list_method(cursor=cursor, limit=page_size, **kwargs)
+            yield from items
+            cursor = self.get_next_cursor(items, page_size)
+            if cursor is None:
+                return
+
+    def _paginate(self, query: Select, *, cursor: str | None, limit: int) -> Select:
+        """
+        Orders `query` by `cursor_columns` and keeps only the `limit` rows after `cursor`.
+        Raises ValueError if the cursor is malformed.
+        """
+        columns = [getattr(self.model, name) for name in self.cursor_columns]
+        query = query.order_by(*columns).limit(limit)
+        if cursor:
+            values = decode_cursor(cursor, columns)
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+        return query
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        flush_or_commit(db)
         return db_obj
 
+    def create_multi(self, db: Session, *, objs_in: Iterable[CreateSchemaType], batch_size: int = 500) -> int:
+        """
+        Inserts every object from `objs_in` using multi-row INSERT statements of up to `batch_size` rows.
+
+        The iterable is consumed lazily, one batch at a time, and all batches are written in a single
+        transaction, which is committed right away unless a unit of work is open. Returns the number of inserted rows.
+        """
+        objs_iter = iter(objs_in)
+        inserted = 0
+        try:
+            while batch := [obj_in.model_dump() for obj_in in islice(objs_iter, batch_size)]:
+                db.execute(insert(self.model), batch)
+                inserted += len(batch)
+            flush_or_commit(db)
+        except Exception:
+            if not in_unit_of_work(db):
+                db.rollback()
+            raise
+        return inserted
+
     # noinspection PyMethodMayBeStatic
-    def update(self, db: Session, *, db_obj: ModelType, obj_in: Union[UpdateSchemaType, dict[str, Any]]) -> ModelType:
+    def update(self, db: Session, *, db_obj: ModelType,
+               obj_in: Union[UpdateSchemaType, dict[str, Any]]) -> ModelType:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
-        for field in update_data:
-            if field in update_data and update_data[field]:
-                setattr(db_obj, field, update_data[field])
+        for field, value in update_data.items():
+            # None means unchanged, but False, 0 and "" are values to set.
+            if value is not None:
+                setattr(db_obj, field, value)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        flush_or_commit(db)
         return db_obj
 
     def remove(self, db: Session, *, obj_uuid: str) -> ModelType | None:
         obj = db.get(self.model, obj_uuid)
         if obj:
             db.delete(obj)
-            db.commit()
+            flush_or_commit(db)
         return obj
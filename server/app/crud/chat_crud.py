@@ -2,10 +2,11 @@ import json
 import uuid
 from typing import Type, TypeVar
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.core.db import Base
-from app.models import ChatMessage, User
+from app.core.db import Base, flush_or_commit
+from app.models import ArchivedChatMessage, ChatMessage, User
 from app.schemas import ChatMessage as ChatMessageSchema
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -16,17 +17,34 @@ def get_chat_crud():
 
 
 class CRUDChat:
-    def __init__(self, model: Type[ModelType]):
+    def __init__(self, model: Type[ModelType], archive_model: Type[ModelType]):
         self.model = model
+        self.archive_model = archive_model
 
     # noinspection PyMethodMayBeStatic
     def get_chat_history(self, db: Session, user_uuid: str) -> list[ChatMessage]:
         user = db.get(User, user_uuid)
         return user.chat_history
 
-    def append_chat_history(self, db: Session, user_uuid: str, obj_in: ChatMessageSchema) -> None:
-        user = db.get(User, user_uuid)
-        next_order = len(user.chat_history)
+    def get_chat_contents(self, db: Session, user_uuid: str) -> list[list[dict]]:
+        """The stored LLM contents of each message of the history, oldest first."""
+        return list(db.scalars(
+            select(self.model.content).filter_by(owner_uuid=user_uuid).order_by(self.model.order)
+        ))
+
+    def lock_chat_history(self, db: Session, user_uuid: str) -> int:
+        """
+        Locks the chat of the user until the transaction ends, so that a turn running on another worker waits for it,
+        and returns the order of its next message. On SQLite, which has no row locks, a turn appending at that order
+        after another one did fails instead.
+        """
+        db.execute(select(User.uuid).where(User.uuid == user_uuid).with_for_update())
+        return self._next_order(db, user_uuid)
+
+    def append_chat_history(self, db: Session, user_uuid: str, obj_in: ChatMessageSchema,
+                            order: int | None = None) -> None:
+        if order is None:
+            order = self._next_order(db, user_uuid)
 
         obj_in_data = obj_in.model_dump(mode='json')
         if 'files' in obj_in_data and obj_in_data['files'] is not None:
@@ -35,16 +53,24 @@ class CRUDChat:
         db_msg = self.model(
             **obj_in_data,
             uuid=str(uuid.uuid4()),
-            order=next_order,
-            owner_uuid=user.uuid
+            order=order,
+            owner_uuid=user_uuid
         )
         db.add(db_msg)
-        db.commit()
+        flush_or_commit(db)
+
+    def _next_order(self, db: Session, user_uuid: str) -> int:
+        # Read from the table rather than from `user.chat_history`, which isn't reloaded between appends made in
+        # the same unit of work.
+        return db.execute(
+            select(func.coalesce(func.max(self.model.order) + 1, 0)).filter_by(owner_uuid=user_uuid)
+        ).scalar_one()
 
     def delete_chat_history(self, db: Session, user_uuid: str) -> int:
         num_deleted = db.query(self.model).filter_by(owner_uuid=user_uuid).delete()
-        db.commit()
+        num_deleted += db.query(self.archive_model).filter_by(owner_uuid=user_uuid).delete()
+        flush_or_commit(db)
         return num_deleted
 
 
-chat_crud = CRUDChat(ChatMessage)
+chat_crud = CRUDChat(ChatMessage, ArchivedChatMessage)
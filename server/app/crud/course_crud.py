@@ -1,6 +1,9 @@
-from sqlalchemy import select
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 
+from app.core.db import flush_or_commit
 from app.crud import CRUDBase
 from app.models import Course as CourseModel
 from app.schemas import Course, CourseCreate, CourseUpdate
@@ -14,19 +17,92 @@ class CRUDCourse(CRUDBase[CourseModel, CourseCreate, CourseUpdate]):
     def create_with_children(self, db: Session, *, obj_in: Course, owner_uuid: str) -> CourseModel:
         from app.models import Evaluation, Lecture
         db_obj = self.model(**obj_in.model_dump(exclude={"evaluations", "lectures"}), owner_uuid=owner_uuid)
-        db_obj.evaluations = [Evaluation(**evaluation.model_dump(mode='json'), course_uuid=obj_in.uuid)
+        # The type is stored by value, and the datetimes are kept as datetimes, which every driver accepts.
+        db_obj.evaluations = [Evaluation(**{**evaluation.model_dump(), "type": evaluation.type.value},
+                                         course_uuid=obj_in.uuid)
                               for evaluation in obj_in.evaluations]
         db_obj.lectures = [Lecture(**lecture.model_dump(), course_uuid=obj_in.uuid)
                            for lecture in obj_in.lectures]
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        flush_or_commit(db)
         return db_obj
 
+    def remove_with_children(self, db: Session, *, obj_uuid: str) -> tuple[int, int]:
+        """
+        Deletes a course, letting the database cascade the deletion to its lectures and evaluations.
+
+        Uses two statements regardless of the size of the course: one aggregate that counts the children and the
+        DELETE itself. Returns the number of deleted lectures and evaluations.
+        """
+        from app.models import Evaluation, Lecture
+        deleted_lectures, deleted_evaluations = db.execute(select(
+            select(func.count()).select_from(Lecture).filter(Lecture.course_uuid == obj_uuid).scalar_subquery(),
+            select(func.count()).select_from(Evaluation).filter(Evaluation.course_uuid == obj_uuid).scalar_subquery(),
+        )).one()
+        db.execute(delete(self.model).filter_by(uuid=obj_uuid))
+        flush_or_commit(db)
+        return deleted_lectures, deleted_evaluations
+
     def get_all_by_owner_uuid(self, db: Session, *, owner_uuid: str) -> list[CourseModel]:
         query = select(self.model).filter(self.model.owner_uuid == owner_uuid)
         result = db.execute(query).scalars().all()
         return list(result)
 
+    def get_course_graphs_by_owner(self, db: Session, *, owner_uuid: str) -> list[dict]:
+        """
+        Builds the JSON representation of every course of `owner_uuid`, with its lectures and evaluations, in the same
+        format as `Course.model_dump(mode='json')`.
+
+        Uses one query per table instead of lazy loading the children of each course, and builds the dictionaries
+        directly from the selected columns, without loading ORM objects.
+        """
+        from app.models import Evaluation, Lecture
+        courses: dict[str, dict] = {}
+        query = (select(self.model.uuid, self.model.title, self.model.semester)
+                 .filter(self.model.owner_uuid == owner_uuid))
+        for course_uuid, title, semester in db.execute(query):
+            courses[course_uuid] = {"title": title, "semester": semester, "uuid": course_uuid,
+                                    "lectures": [], "evaluations": []}
+        if not courses:
+            return []
+
+        query = (select(Lecture.course_uuid, Lecture.title, Lecture.start_datetime, Lecture.end_datetime,
+                        Lecture.summary, Lecture.uuid, Lecture.present)
+                 .join(self.model, Lecture.course_uuid == self.model.uuid)
+                 .filter(self.model.owner_uuid == owner_uuid)
+                 .order_by(Lecture.start_datetime, Lecture.uuid))
+        for course_uuid, title, start_datetime, end_datetime, summary, lecture_uuid, present in db.execute(query):
+            courses[course_uuid]["lectures"].append({
+                "title": title,
+                "start_datetime": _to_json_datetime(start_datetime),
+                "end_datetime": _to_json_datetime(end_datetime),
+                "summary": summary,
+                "uuid": lecture_uuid,
+                "present": present,
+            })
+
+        query = (select(Evaluation.course_uuid, Evaluation.type, Evaluation.title, Evaluation.start_datetime,
+                        Evaluation.end_datetime, Evaluation.uuid, Evaluation.present)
+                 .join(self.model, Evaluation.course_uuid == self.model.uuid)
+                 .filter(self.model.owner_uuid == owner_uuid)
+                 .order_by(Evaluation.start_datetime, Evaluation.uuid))
+        for course_uuid, type_, title, start_datetime, end_datetime, evaluation_uuid, present in db.execute(query):
+            courses[course_uuid]["evaluations"].append({
+                "type": type_,
+                "title": title,
+                "start_datetime": _to_json_datetime(start_datetime),
+                "end_datetime": _to_json_datetime(end_datetime),
+                "uuid": evaluation_uuid,
+                "present": present,
+            })
+
+        return list(courses.values())
+
+
+def _to_json_datetime(value: datetime) -> str:
+    """Formats a datetime like pydantic does in JSON mode, with 'Z' for UTC."""
+    formatted = value.isoformat()
+    return formatted[:-6] + "Z" if formatted.endswith("+00:00") else formatted
+
 
 course_crud = CRUDCourse(CourseModel)
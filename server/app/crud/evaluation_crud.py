@@ -1,9 +1,10 @@
 from datetime import datetime
-from typing import Union, Any
+from typing import Union, Any, Iterable
 
 from sqlalchemy import select, and_
 from sqlalchemy.orm import Session, contains_eager
 
+from app.core.db import flush_or_commit
 from app.crud.base import CRUDBase
 from app.models import Evaluation, Course
 from app.schemas import EvaluationCreate, EvaluationUpdate, EvaluationTypes
@@ -14,13 +15,15 @@ def get_evaluation_crud():
 
 
 class CRUDEvaluation(CRUDBase[Evaluation, EvaluationCreate, EvaluationUpdate]):
+    cursor_columns = ("start_datetime", "uuid")
+
     def get_evaluations_by_owner(
             self,
             db: Session,
             owner_uuid: str,
             start_utc: datetime | None = None,
             end_utc: datetime | None = None,
-            skip: int = 0,
+            cursor: str | None = None,
             limit: int = 100,
     ) -> list[Evaluation]:
         filters = [Course.owner_uuid == owner_uuid]
@@ -32,14 +35,20 @@ class CRUDEvaluation(CRUDBase[Evaluation, EvaluationCreate, EvaluationUpdate]):
             .join(Course)
             .options(contains_eager(self.model.course))
             .filter(and_(*filters))
-            .order_by(self.model.start_datetime)
-            .offset(skip)
-            .limit(limit)
         )
+        query = self._paginate(query, cursor=cursor, limit=limit)
 
         results = list(db.execute(query).scalars().all())
         return results
 
+    def get_owned(self, db: Session, *, owner_uuid: str, obj_uuids: Iterable[str]) -> list[Evaluation]:
+        query = (
+            select(self.model)
+            .join(Course)
+            .filter(Course.owner_uuid == owner_uuid, self.model.uuid.in_(list(obj_uuids)))
+        )
+        return list(db.execute(query).scalars().all())
+
     def create(self, db: Session, *, obj_in: EvaluationCreate) -> Evaluation:
         """
         Overrides the base create method to handle the EvaluationTypes enum.
@@ -50,8 +59,7 @@ class CRUDEvaluation(CRUDBase[Evaluation, EvaluationCreate, EvaluationUpdate]):
 
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        flush_or_commit(db)
         return db_obj
 
     def update(self, db: Session, *, db_obj: Evaluation, obj_in: Union[EvaluationUpdate, dict[str, Any]]) -> Evaluation:
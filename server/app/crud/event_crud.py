@@ -1,4 +1,3 @@
-from typing import Any, Union
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_
 from datetime import datetime
@@ -13,13 +12,15 @@ def get_event_crud():
 
 
 class CRUDEvent(CRUDBase[Event, EventCreateInDB, EventUpdate]):
+    cursor_columns = ("start_datetime", "uuid")
+
     def get_events_by_owner(
             self,
             db: Session,
             owner_uuid: str,
             start_utc: datetime | None = None,
             end_utc: datetime | None = None,
-            skip: int = 0,
+            cursor: str | None = None,
             limit: int = 100
     ) -> list[Event]:
         """Retrieves events for a specific owner within an optional datetime range.
@@ -34,12 +35,16 @@ class CRUDEvent(CRUDBase[Event, EventCreateInDB, EventUpdate]):
                 range (inclusive).
             end_utc (datetime | None): The UTC datetime for the end of the
                 range (exclusive).
-            skip (int): The number of events to skip for pagination.
+            cursor (str | None): The opaque cursor returned for the previous
+                page, or None for the first page.
             limit (int): The maximum number of events to return.
 
         Returns:
             list[Event]: A list of Event objects matching the criteria,
-                ordered by their start time.
+                ordered by their start time and UUID.
+
+        Raises:
+            ValueError: If the cursor is malformed.
         """
         filters = [self.model.owner_uuid == owner_uuid]
         if start_utc: filters.append(self.model.start_datetime >= start_utc)
@@ -48,25 +53,11 @@ class CRUDEvent(CRUDBase[Event, EventCreateInDB, EventUpdate]):
         query = (
             select(self.model)
             .filter(and_(*filters))
-            .order_by(self.model.start_datetime)
-            .offset(skip)
-            .limit(limit)
         )
+        query = self._paginate(query, cursor=cursor, limit=limit)
 
         results = list(db.execute(query).scalars().all())
         return results
 
-    def update(self, db: Session, *, db_obj: Event, obj_in: Union[EventUpdate, dict[str, Any]]) -> Event:
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.model_dump(exclude_unset=True)
-        # Converta datetime para string ISO 8601 para o modelo do DB (que usa String)
-        if 'start_datetime' in update_data and update_data['start_datetime'] is not None:
-            update_data['start_datetime'] = update_data['start_datetime'].isoformat()
-        if 'end_datetime' in update_data and update_data['end_datetime'] is not None:
-            update_data['end_datetime'] = update_data['end_datetime'].isoformat()
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
-
 
 event_crud = CRUDEvent(Event)
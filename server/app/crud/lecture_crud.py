@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Iterable
 
 from sqlalchemy import select, and_
 from sqlalchemy.orm import Session, contains_eager
@@ -13,13 +14,15 @@ def get_lecture_crud():
 
 
 class CRUDLecture(CRUDBase[Lecture, LectureCreate, LectureUpdate]):
+    cursor_columns = ("start_datetime", "uuid")
+
     def get_lectures_by_owner(
             self,
             db: Session,
             owner_uuid: str,
             start_utc: datetime | None = None,
             end_utc: datetime | None = None,
-            skip: int = 0,
+            cursor: str | None = None,
             limit: int = 100,
     ) -> list[Lecture]:
         filters = [Course.owner_uuid == owner_uuid]
@@ -31,13 +34,19 @@ class CRUDLecture(CRUDBase[Lecture, LectureCreate, LectureUpdate]):
             .join(Course)
             .options(contains_eager(self.model.course))
             .filter(and_(*filters))
-            .order_by(self.model.start_datetime)
-            .offset(skip)
-            .limit(limit)
         )
+        query = self._paginate(query, cursor=cursor, limit=limit)
 
         results = list(db.execute(query).scalars().all())
         return results
 
+    def get_owned(self, db: Session, *, owner_uuid: str, obj_uuids: Iterable[str]) -> list[Lecture]:
+        query = (
+            select(self.model)
+            .join(Course)
+            .filter(Course.owner_uuid == owner_uuid, self.model.uuid.in_(list(obj_uuids)))
+        )
+        return list(db.execute(query).scalars().all())
+
 
 lecture_crud = CRUDLecture(Lecture)
@@ -11,13 +11,18 @@ def get_routine_crud():
 
 
 class CRUDRoutine(CRUDBase[Routine, RoutineCreateInDB, RoutineUpdate]):
-    def get_routines_by_owner(self, db: Session, owner_uuid: str, skip: int = 0, limit: int = 100) -> list[Routine]:
+    def get_routines_by_owner(
+            self,
+            db: Session,
+            owner_uuid: str,
+            cursor: str | None = None,
+            limit: int = 100,
+    ) -> list[Routine]:
         query = (
             select(self.model)
             .filter(self.model.owner_uuid == owner_uuid)
-            .offset(skip)
-            .limit(limit)
         )
+        query = self._paginate(query, cursor=cursor, limit=limit)
         result = db.execute(query).scalars().all()
         return list(result)
 
@@ -1,9 +1,13 @@
+from datetime import datetime
+from typing import Iterable
+
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.crud.base import CRUDBase
+from app.models import Event
 from app.models.user_model import User
-from app.schemas import UserCreate, UserUpdate
+from app.schemas import UserCreate, UserUpdate, UserProfileInclude
 
 
 def get_user_crud():
@@ -16,5 +20,39 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         result = db.execute(query).scalars().first()
         return result
 
+    def get_profile(
+            self,
+            db: Session,
+            *,
+            user_uuid: str,
+            include: Iterable[UserProfileInclude],
+            events_start_utc: datetime,
+            events_end_utc: datetime,
+    ) -> User | None:
+        """
+        Retrieves a user with the relationships in `include` loaded by one `selectinload` query each.
+
+        Only the events starting in [`events_start_utc`, `events_end_utc`) are loaded into `User.events`.
+        """
+        options = []
+        for relationship in set(include):
+            match relationship:
+                case UserProfileInclude.COURSES:
+                    options.append(selectinload(self.model.courses))
+                case UserProfileInclude.ROUTINES:
+                    options.append(selectinload(self.model.routines))
+                case UserProfileInclude.EVENTS:
+                    options.append(selectinload(self.model.events.and_(
+                        Event.start_datetime >= events_start_utc,
+                        Event.start_datetime < events_end_utc,
+                    )))
+        # The user is usually already in the session from authentication, so its relationships are repopulated
+        # with the criteria above instead of reusing collections loaded elsewhere.
+        query = (select(self.model)
+                 .filter_by(uuid=user_uuid)
+                 .options(*options)
+                 .execution_options(populate_existing=True))
+        return db.execute(query).scalars().first()
+
 
-user_crud = CRUDUser(User)
\ No newline at end of file
+user_crud = CRUDUser(User)
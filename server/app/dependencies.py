@@ -1,11 +1,26 @@
-from typing import Generator
+from contextlib import contextmanager
+from typing import Generator, Iterator
 
-from app.core.db import SessionLocal
+from sqlalchemy.orm import Session
 
+from app.core.db import SessionLocal, unit_of_work
 
-def get_db() -> Generator:
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Opens a session whose writes are committed once, when the block exits. Used by code that runs outside of a
+    request, such as the LLM tools.
+    """
     db = SessionLocal()
     try:
-        yield db
+        with unit_of_work(db):
+            yield db
     finally:
         db.close()
+
+
+def get_db() -> Generator:
+    """Request-scoped session. Its writes are committed once, after the endpoint returns."""
+    with session_scope() as db:
+        yield db
@@ -1,7 +1,5 @@
-from sqlalchemy.orm import Session
-
 from app.crud import get_course_crud
-from app.dependencies import get_db
+from app.dependencies import session_scope
 from app.schemas import Course, CourseSummary, CourseUpdate, CourseCreate, CourseDeleteResponse
 
 
@@ -16,10 +14,10 @@ async def list_courses(user_uuid: str) -> dict:
         Caso ocorra algum erro na execução da função, o dicionário conterá apenas as informações do erro.
     """
     try:
-        db: Session = next(get_db())
-        course_crud = get_course_crud()
-        courses = course_crud.get_all_by_owner_uuid(db=db, owner_uuid=user_uuid)
-        return {"courses": [CourseSummary.model_validate(course).model_dump(mode='json') for course in courses]}
+        with session_scope() as db:
+            course_crud = get_course_crud()
+            courses = course_crud.get_all_by_owner_uuid(db=db, owner_uuid=user_uuid)
+            return {"courses": [CourseSummary.model_validate(course).model_dump(mode='json') for course in courses]}
     except Exception as e:
         return {"error": f"An error occurred while listing course summaries.: {e}."}
 
@@ -33,10 +31,9 @@ async def list_courses_and_details(user_uuid: str) -> dict:
         Caso ocorra algum erro na execução da função, o dicionário conterá apenas as informações do erro.
     """
     try:
-        db: Session = next(get_db())
-        course_crud = get_course_crud()
-        courses = course_crud.get_all_by_owner_uuid(db=db, owner_uuid=user_uuid)
-        return {"courses": [Course.model_validate(course).model_dump(mode='json') for course in courses]}
+        with session_scope() as db:
+            course_crud = get_course_crud()
+            return {"courses": course_crud.get_course_graphs_by_owner(db=db, owner_uuid=user_uuid)}
     except Exception as e:
         return {"error": f"An error occurred while listing full courses: {e}."}
 
@@ -46,14 +43,14 @@ async def create_course(user_uuid: str, title: str, semester: str | None = None)
     Cria um curso vazio (sem aulas ou avaliações).
     """
     try:
-        db: Session = next(get_db())
-        course_crud = get_course_crud()
+        with session_scope() as db:
+            course_crud = get_course_crud()
 
-        course_in = CourseCreate(title=title, semester=semester, owner_uuid=user_uuid)
-        db_course = course_crud.create(db=db, obj_in=course_in)
-        created_course = Course.model_validate(db_course)
+            course_in = CourseCreate(title=title, semester=semester, owner_uuid=user_uuid)
+            db_course = course_crud.create(db=db, obj_in=course_in)
+            created_course = Course.model_validate(db_course)
 
-        return {"success": True, "course": created_course.model_dump(mode='json')}
+            return {"success": True, "course": created_course.model_dump(mode='json')}
     except Exception as e:
         return {"error": f"Ocorreu um erro ao criar o curso: {e}"}
 
@@ -68,20 +65,20 @@ async def update_course(
     Atualiza os detalhes de um curso específico, como seu título ou semestre.
     """
     try:
-        db: Session = next(get_db())
-        course_crud = get_course_crud()
+        with session_scope() as db:
+            course_crud = get_course_crud()
 
-        db_course = course_crud.get(db=db, obj_uuid=course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Curso não encontrado."}
+            db_course = course_crud.get(db=db, obj_uuid=course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Curso não encontrado."}
 
-        update_data = CourseUpdate(title=new_title, semester=new_semester).model_dump(exclude_unset=True)
-        if not update_data:
-            return {"error": "Nenhum dado fornecido para atualização."}
+            update_data = CourseUpdate(title=new_title, semester=new_semester).model_dump(exclude_unset=True)
+            if not update_data:
+                return {"error": "Nenhum dado fornecido para atualização."}
 
-        db_course = course_crud.update(db=db, db_obj=db_course, obj_in=update_data)
-        updated_course = Course.model_validate(db_course)
-        return {"success": True, "course": updated_course.model_dump(mode='json')}
+            db_course = course_crud.update(db=db, db_obj=db_course, obj_in=update_data)
+            updated_course = Course.model_validate(db_course)
+            return {"success": True, "course": updated_course.model_dump(mode='json')}
     except Exception as e:
         return {"error": f"Ocorreu um erro ao atualizar o curso: {e}"}
 
@@ -91,19 +88,19 @@ async def delete_course(user_uuid: str, course_uuid: str) -> dict:
     Apaga um curso específico e todos os seus dados associados (aulas, avaliações).
     """
     try:
-        db: Session = next(get_db())
-        course_crud = get_course_crud()
-
-        db_course = course_crud.get(db=db, obj_uuid=course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Curso não encontrado."}
-
-        db_course = course_crud.remove(db=db, obj_uuid=course_uuid)
-        removed_course = CourseDeleteResponse.model_validate(db_course)
-        removed_course.deleted_lectures = len(db_course.lectures)
-        removed_course.deleted_evaluations = len(db_course.evaluations)
-        return {"success": True,
-                "message": f"Curso '{removed_course.title}' e suas {removed_course.deleted_lectures} aulas e {removed_course.deleted_evaluations} avaliações foram apagados."}
+        with session_scope() as db:
+            course_crud = get_course_crud()
+
+            db_course = course_crud.get(db=db, obj_uuid=course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Curso não encontrado."}
+
+            removed_course = CourseDeleteResponse.model_validate(db_course)
+            removed_course.deleted_lectures, removed_course.deleted_evaluations = course_crud.remove_with_children(
+                db=db, obj_uuid=course_uuid
+            )
+            return {"success": True,
+                    "message": f"Curso '{removed_course.title}' e suas {removed_course.deleted_lectures} aulas e {removed_course.deleted_evaluations} avaliações foram apagados."}
     except Exception as e:
         return {"error": f"Ocorreu um erro ao apagar o curso: {e}"}
 
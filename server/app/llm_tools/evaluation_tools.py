@@ -1,9 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy.orm import Session
-
 from app.crud import evaluation_crud, course_crud
-from app.dependencies import get_db
+from app.dependencies import session_scope
 from app.models import Evaluation as EvaluationModel, Course as CourseModel
 from app.schemas import EvaluationCreate, EvaluationUpdate, EvaluationTypes, Evaluation
 
@@ -35,22 +33,21 @@ async def create_evaluation(
         if evaluation_type not in valid_types:
             return {"error": f"Invalid evaluation type. Supported evaluation types: {valid_types}"}
 
-        db: Session = next(get_db())
-
-        db_course: CourseModel = course_crud.get(db=db, obj_uuid=course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Course not found."}
-
-        evaluation_in: EvaluationCreate = EvaluationCreate(
-            course_uuid=course_uuid,
-            title=title,
-            type=EvaluationTypes(evaluation_type),
-            start_datetime=datetime.fromisoformat(start_datetime),
-            end_datetime=datetime.fromisoformat(end_datetime),
-        )
-        db_evaluation: EvaluationModel = evaluation_crud.create(db=db, obj_in=evaluation_in)
-        created_evaluation: Evaluation = Evaluation.model_validate(db_evaluation)
-        return {"success": True, "evaluation": created_evaluation.model_dump(mode="json")}
+        with session_scope() as db:
+            db_course: CourseModel = course_crud.get(db=db, obj_uuid=course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Course not found."}
+
+            evaluation_in: EvaluationCreate = EvaluationCreate(
+                course_uuid=course_uuid,
+                title=title,
+                type=EvaluationTypes(evaluation_type),
+                start_datetime=datetime.fromisoformat(start_datetime),
+                end_datetime=datetime.fromisoformat(end_datetime),
+            )
+            db_evaluation: EvaluationModel = evaluation_crud.create(db=db, obj_in=evaluation_in)
+            created_evaluation: Evaluation = Evaluation.model_validate(db_evaluation)
+            return {"success": True, "evaluation": created_evaluation.model_dump(mode="json")}
     except Exception as e:
         return {"error": f"Error while creating the evaluation: {e}"}
 
@@ -82,25 +79,24 @@ async def update_evaluation(
         if new_evaluation_type and new_evaluation_type not in valid_types:
             return {"error": f"Invalid evaluation type. Supported evaluation types: {valid_types}"}
 
-        db: Session = next(get_db())
-
-        db_evaluation: EvaluationModel = evaluation_crud.get(db=db, obj_uuid=evaluation_uuid)
-        if not db_evaluation:
-            return {"error": "Evaluation not found."}
-
-        db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_evaluation.course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Evaluation not found."}
-
-        evaluation_update: EvaluationUpdate = EvaluationUpdate(
-            title=new_title,
-            type=new_evaluation_type,
-            start_datetime=new_start_datetime,
-            end_datetime=new_end_datetime,
-        )
-        updated_db_evaluation = evaluation_crud.update(db=db, db_obj=db_evaluation, obj_in=evaluation_update)
-        updated_evaluation: Evaluation = Evaluation.model_validate(updated_db_evaluation)
-        return {"success": True, "evaluation": updated_evaluation.model_dump(mode='json')}
+        with session_scope() as db:
+            db_evaluation: EvaluationModel = evaluation_crud.get(db=db, obj_uuid=evaluation_uuid)
+            if not db_evaluation:
+                return {"error": "Evaluation not found."}
+
+            db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_evaluation.course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Evaluation not found."}
+
+            evaluation_update: EvaluationUpdate = EvaluationUpdate(
+                title=new_title,
+                type=new_evaluation_type,
+                start_datetime=new_start_datetime,
+                end_datetime=new_end_datetime,
+            )
+            updated_db_evaluation = evaluation_crud.update(db=db, db_obj=db_evaluation, obj_in=evaluation_update)
+            updated_evaluation: Evaluation = Evaluation.model_validate(updated_db_evaluation)
+            return {"success": True, "evaluation": updated_evaluation.model_dump(mode='json')}
     except Exception as e:
         return {"error": f"Error while updating the evaluation: {e}"}
 
@@ -117,21 +113,20 @@ async def delete_evaluation(user_uuid: str, evaluation_uuid: str) -> dict:
              or an error key with a descriptive message.
     """
     try:
-        db: Session = next(get_db())
-
-        db_evaluation: EvaluationModel = evaluation_crud.get(db=db, obj_uuid=evaluation_uuid)
-        if not db_evaluation:
-            return {"error": "Evaluation not found."}
+        with session_scope() as db:
+            db_evaluation: EvaluationModel = evaluation_crud.get(db=db, obj_uuid=evaluation_uuid)
+            if not db_evaluation:
+                return {"error": "Evaluation not found."}
 
-        db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_evaluation.course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Evaluation not found."}
+            db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_evaluation.course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Evaluation not found."}
 
-        removed_db_evaluation: EvaluationModel = evaluation_crud.remove(db=db, obj_uuid=evaluation_uuid)
-        if not removed_db_evaluation:
-            return {"error": "Evaluation not found."}
+            removed_db_evaluation: EvaluationModel = evaluation_crud.remove(db=db, obj_uuid=evaluation_uuid)
+            if not removed_db_evaluation:
+                return {"error": "Evaluation not found."}
 
-        return {"success": True, "message": f"Evaluation '{removed_db_evaluation.title}' deleted."}
+            return {"success": True, "message": f"Evaluation '{removed_db_evaluation.title}' deleted."}
     except Exception as e:
         return {"error": f"Error while deleting evaluation: {e}"}
 
@@ -1,9 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy.orm import Session
-
 from app.crud import event_crud
-from app.dependencies import get_db
+from app.dependencies import session_scope
 from app.models import Event as EventModel
 from app.schemas import EventCreate, EventUpdate, Event, EventCreateInDB
 
@@ -27,20 +25,19 @@ async def create_event(
              or an error key with a descriptive message.
     """
     try:
-        db: Session = next(get_db())
-
-        event_in = EventCreate(
-            title=title,
-            description=description,
-            start_datetime=datetime.fromisoformat(start_datetime),
-            end_datetime=datetime.fromisoformat(end_datetime),
-        )
-
-        event_in_db = EventCreateInDB(**event_in.model_dump(), owner_uuid=user_uuid)
-
-        db_event: EventModel = event_crud.create(db=db, obj_in=event_in_db)
-        created_event: Event = Event.model_validate(db_event)
-        return {"success": True, "event": created_event.model_dump(mode="json")}
+        with session_scope() as db:
+            event_in = EventCreate(
+                title=title,
+                description=description,
+                start_datetime=datetime.fromisoformat(start_datetime),
+                end_datetime=datetime.fromisoformat(end_datetime),
+            )
+
+            event_in_db = EventCreateInDB(**event_in.model_dump(), owner_uuid=user_uuid)
+
+            db_event: EventModel = event_crud.create(db=db, obj_in=event_in_db)
+            created_event: Event = Event.model_validate(db_event)
+            return {"success": True, "event": created_event.model_dump(mode="json")}
     except Exception as e:
         return {"error": f"Error while creating the event: {e}"}
 
@@ -68,24 +65,23 @@ async def update_event(
              or an error key with a descriptive message.
     """
     try:
-        db: Session = next(get_db())
-
-        db_event: EventModel = event_crud.get(db=db, obj_uuid=event_uuid)
-        if not db_event or db_event.owner_uuid != user_uuid:
-            return {"error": "Event not found."}
-
-        update_data = {
-            "title": new_title,
-            "description": new_description,
-            "start_datetime": datetime.fromisoformat(new_start_datetime) if new_start_datetime else None,
-            "end_datetime": datetime.fromisoformat(new_end_datetime) if new_end_datetime else None,
-        }
-
-        event_update = EventUpdate(**update_data)
-
-        updated_db_event = event_crud.update(db=db, db_obj=db_event, obj_in=event_update)
-        updated_event: Event = Event.model_validate(updated_db_event)
-        return {"success": True, "event": updated_event.model_dump(mode='json')}
+        with session_scope() as db:
+            db_event: EventModel = event_crud.get(db=db, obj_uuid=event_uuid)
+            if not db_event or db_event.owner_uuid != user_uuid:
+                return {"error": "Event not found."}
+
+            update_data = {
+                "title": new_title,
+                "description": new_description,
+                "start_datetime": datetime.fromisoformat(new_start_datetime) if new_start_datetime else None,
+                "end_datetime": datetime.fromisoformat(new_end_datetime) if new_end_datetime else None,
+            }
+
+            event_update = EventUpdate(**update_data)
+
+            updated_db_event = event_crud.update(db=db, db_obj=db_event, obj_in=event_update)
+            updated_event: Event = Event.model_validate(updated_db_event)
+            return {"success": True, "event": updated_event.model_dump(mode='json')}
     except Exception as e:
         return {"error": f"Error while updating the event: {e}"}
 
@@ -102,17 +98,16 @@ async def delete_event(user_uuid: str, event_uuid: str) -> dict:
              or an error key with a descriptive message.
     """
     try:
-        db: Session = next(get_db())
-
-        db_event: EventModel = event_crud.get(db=db, obj_uuid=event_uuid)
-        if not db_event or db_event.owner_uuid != user_uuid:
-            return {"error": "Event not found."}
+        with session_scope() as db:
+            db_event: EventModel = event_crud.get(db=db, obj_uuid=event_uuid)
+            if not db_event or db_event.owner_uuid != user_uuid:
+                return {"error": "Event not found."}
 
-        removed_db_event: EventModel = event_crud.remove(db=db, obj_uuid=event_uuid)
-        if not removed_db_event:
-            return {"error": "Event not found."}
+            removed_db_event: EventModel = event_crud.remove(db=db, obj_uuid=event_uuid)
+            if not removed_db_event:
+                return {"error": "Event not found."}
 
-        return {"success": True, "message": f"Event '{removed_db_event.title}' deleted."}
+            return {"success": True, "message": f"Event '{removed_db_event.title}' deleted."}
     except Exception as e:
         return {"error": f"Error while deleting event: {e}"}
 
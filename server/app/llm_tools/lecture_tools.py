@@ -1,9 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy.orm import Session
-
 from app.crud import lecture_crud, course_crud
-from app.dependencies import get_db
+from app.dependencies import session_scope
 from app.models import Lecture as LectureModel, Course as CourseModel
 from app.schemas import LectureCreate, LectureUpdate, Lecture
 
@@ -31,22 +29,21 @@ async def create_lecture(
              or an error key with a descriptive message.
     """
     try:
-        db: Session = next(get_db())
-
-        db_course: CourseModel = course_crud.get(db=db, obj_uuid=course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Course not found."}
-
-        lecture_in: LectureCreate = LectureCreate(
-            course_uuid=course_uuid,
-            title=title,
-            start_datetime=datetime.fromisoformat(start_datetime),
-            end_datetime=datetime.fromisoformat(end_datetime),
-            summary=summary,
-        )
-        db_lecture: LectureModel = lecture_crud.create(db=db, obj_in=lecture_in)
-        created_lecture: Lecture = Lecture.model_validate(db_lecture)
-        return {"success": True, "lecture": created_lecture.model_dump(mode="json")}
+        with session_scope() as db:
+            db_course: CourseModel = course_crud.get(db=db, obj_uuid=course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Course not found."}
+
+            lecture_in: LectureCreate = LectureCreate(
+                course_uuid=course_uuid,
+                title=title,
+                start_datetime=datetime.fromisoformat(start_datetime),
+                end_datetime=datetime.fromisoformat(end_datetime),
+                summary=summary,
+            )
+            db_lecture: LectureModel = lecture_crud.create(db=db, obj_in=lecture_in)
+            created_lecture: Lecture = Lecture.model_validate(db_lecture)
+            return {"success": True, "lecture": created_lecture.model_dump(mode="json")}
     except Exception as e:
         return {"error": f"Error while creating the lecture: {e}"}
 
@@ -76,26 +73,25 @@ async def update_lecture(
              or an error key with a descriptive message.
     """
     try:
-        db: Session = next(get_db())
-
-        db_lecture: LectureModel = lecture_crud.get(db=db, obj_uuid=lecture_uuid)
-        if not db_lecture:
-            return {"error": "Lecture not found."}
-
-        db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_lecture.course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Lecture not found."}
-
-        lecture_update: LectureUpdate = LectureUpdate(
-            title=new_title,
-            summary=new_summary,
-            present=new_present,
-            start_datetime=datetime.fromisoformat(new_start_datetime) if new_start_datetime else None,
-            end_datetime=datetime.fromisoformat(new_end_datetime) if new_end_datetime else None,
-        )
-        updated_db_lecture = lecture_crud.update(db=db, db_obj=db_lecture, obj_in=lecture_update)
-        updated_lecture: Lecture = Lecture.model_validate(updated_db_lecture)
-        return {"success": True, "lecture": updated_lecture.model_dump(mode='json')}
+        with session_scope() as db:
+            db_lecture: LectureModel = lecture_crud.get(db=db, obj_uuid=lecture_uuid)
+            if not db_lecture:
+                return {"error": "Lecture not found."}
+
+            db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_lecture.course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Lecture not found."}
+
+            lecture_update: LectureUpdate = LectureUpdate(
+                title=new_title,
+                summary=new_summary,
+                present=new_present,
+                start_datetime=datetime.fromisoformat(new_start_datetime) if new_start_datetime else None,
+                end_datetime=datetime.fromisoformat(new_end_datetime) if new_end_datetime else None,
+            )
+            updated_db_lecture = lecture_crud.update(db=db, db_obj=db_lecture, obj_in=lecture_update)
+            updated_lecture: Lecture = Lecture.model_validate(updated_db_lecture)
+            return {"success": True, "lecture": updated_lecture.model_dump(mode='json')}
     except Exception as e:
         return {"error": f"Error while updating the lecture: {e}"}
 
@@ -112,21 +108,20 @@ async def delete_lecture(user_uuid: str, lecture_uuid: str) -> dict:
              or an error key with a descriptive message.
     """
     try:
-        db: Session = next(get_db())
-
-        db_lecture: LectureModel = lecture_crud.get(db=db, obj_uuid=lecture_uuid)
-        if not db_lecture:
-            return {"error": "Lecture not found."}
+        with session_scope() as db:
+            db_lecture: LectureModel = lecture_crud.get(db=db, obj_uuid=lecture_uuid)
+            if not db_lecture:
+                return {"error": "Lecture not found."}
 
-        db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_lecture.course_uuid)
-        if not db_course or db_course.owner_uuid != user_uuid:
-            return {"error": "Lecture not found."}
+            db_course: CourseModel = course_crud.get(db=db, obj_uuid=db_lecture.course_uuid)
+            if not db_course or db_course.owner_uuid != user_uuid:
+                return {"error": "Lecture not found."}
 
-        removed_db_lecture: LectureModel = lecture_crud.remove(db=db, obj_uuid=lecture_uuid)
-        if not removed_db_lecture:
-            return {"error": "Lecture not found."}
+            removed_db_lecture: LectureModel = lecture_crud.remove(db=db, obj_uuid=lecture_uuid)
+            if not removed_db_lecture:
+                return {"error": "Lecture not found."}
 
-        return {"success": True, "message": f"Lecture '{removed_db_lecture.title}' deleted."}
+            return {"success": True, "message": f"Lecture '{removed_db_lecture.title}' deleted."}
     except Exception as e:
         return {"error": f"Error while deleting lecture: {e}"}
 
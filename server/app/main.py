@@ -1,38 +1,59 @@
+import math
 from contextlib import asynccontextmanager
 
-import firebase_admin
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from firebase_admin import credentials
+from fastapi.responses import ORJSONResponse
 
+from app.core.config import settings
 from app.core.db import Base, engine
+from app.middleware import MetricsMiddleware, QueryStatsMiddleware, QUERY_STATS_HEADERS
 from app.routers import chat_router, course_router, user_router, events_router, routines_router
-from app.routers import lecture_router
-
-Base.metadata.create_all(bind=engine)
+from app.routers import lecture_router, import_router, batch_router, metrics_router
+from app.services import LLMUnavailableError, shutdown_image_pool
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    cred = credentials.ApplicationDefault()
-    firebase_admin.initialize_app(cred)
+    # The Firebase app and the Gemini client are built on first use, so startup only touches the database when the
+    # tables are managed here.
+    if settings.DATABASE_CREATE_TABLES_ON_STARTUP:
+        Base.metadata.create_all(bind=engine)
     yield
+    shutdown_image_pool()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 app.include_router(user_router, prefix="/api")
 app.include_router(chat_router, prefix="/api")
 app.include_router(course_router, prefix="/api")
 app.include_router(lecture_router, prefix="/api")
 app.include_router(events_router, prefix="/api")
 app.include_router(routines_router, prefix="/api")
+app.include_router(import_router, prefix="/api")
+app.include_router(batch_router, prefix="/api")
+app.include_router(metrics_router)
+
+
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, error: LLMUnavailableError) -> ORJSONResponse:
+    # The request can be sent again, after the delay asked by the API when it gave one.
+    headers = {"Retry-After": str(math.ceil(error.retry_after_seconds))} if error.retry_after_seconds else None
+    return ORJSONResponse({"detail": "The AI assistant is unavailable, try again shortly."}, status_code=503,
+                          headers=headers)
+
+
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Retry-After", *QUERY_STATS_HEADERS],
 )
 
 if __name__ == "__main__":
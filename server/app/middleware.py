@@ -0,0 +1,94 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db import QueryStats, track_queries, warn_repeated_queries
+from app.core.metrics import http_requests_in_flight, http_request_duration_seconds
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+SLOWEST_QUERY_TIME_HEADER = "X-DB-Slowest-Query-Ms"
+SLOWEST_QUERY_HEADER = "X-DB-Slowest-Query"
+REPEATED_QUERY_COUNT_HEADER = "X-DB-Most-Repeated-Query-Count"
+QUERY_STATS_HEADERS = [QUERY_COUNT_HEADER, QUERY_TIME_HEADER, SLOWEST_QUERY_TIME_HEADER, SLOWEST_QUERY_HEADER,
+                       REPEATED_QUERY_COUNT_HEADER]
+
+
+def route_tag(scope: Scope) -> str:
+    """Identifies a request by its method and route template, such as `GET /api/lecture/`."""
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else 'unmatched'}"
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the SQL statements of each HTTP request, tagged by route. In debug mode, their count and timings are
+    returned in the `X-DB-*` response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} unmatched") as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    # The route is only known after routing, and all statements have run once the response starts.
+                    stats.tag = route_tag(scope)
+                    if settings.DEBUG:
+                        self._add_headers(MutableHeaders(scope=message), stats)
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+        warn_repeated_queries(stats)
+
+    @staticmethod
+    def _add_headers(headers: MutableHeaders, stats: QueryStats) -> None:
+        headers[QUERY_COUNT_HEADER] = str(stats.count)
+        headers[QUERY_TIME_HEADER] = f"{stats.total_seconds * 1000:.2f}"
+        headers[SLOWEST_QUERY_TIME_HEADER] = f"{stats.slowest_seconds * 1000:.2f}"
+        if stats.slowest_statement:
+            statement = " ".join(stats.slowest_statement.split())[:256]
+            headers[SLOWEST_QUERY_HEADER] = statement.encode("ascii", "replace").decode()
+        headers[REPEATED_QUERY_COUNT_HEADER] = str(stats.most_repeated()[1])
+
+
+class MetricsMiddleware:
+    """Records the in-flight HTTP requests and the latency of each request by method, route and status."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            http_requests_in_flight.dec(method=method)
+            route = scope.get("route")
+            http_request_duration_seconds.observe(
+                time.perf_counter() - start,
+                method=method,
+                route=route.path if route is not None else "unmatched",
+                status=str(status_code),
+            )
@@ -1,7 +1,10 @@
+from .archived_chat_message_model import ArchivedChatMessage
 from .chat_message_model import ChatMessage
 from .course_model import Course
 from .evaluation_model import Evaluation
 from .event_model import Event
+from .job_checkpoint_model import JobCheckpoint
 from .lecture_model import Lecture
+from .rate_limit_model import RateLimitCounter
 from .routine_model import Routine
 from .user_model import User
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import deferred
+
+from app.core.config import settings
+from app.core.db import Base
+from app.core.db_types import CompactJSON
+
+
+class ArchivedChatMessage(Base):
+    """A chat message moved out of `chat_messages` by `archive_chat_history`, with its `order` unchanged."""
+    __tablename__ = "archived_chat_messages"
+
+    uuid = Column(String, primary_key=True)
+    order = Column(Integer, nullable=False)
+    role = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    files = Column(Text, nullable=True)
+    content = deferred(Column(CompactJSON(compress_from_bytes=settings.CHAT_CONTENT_COMPRESS_FROM_BYTES),
+                              nullable=False))
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    owner_uuid = Column(String, ForeignKey("users.uuid"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_archived_chat_messages_owner_uuid_order", "owner_uuid", "order"),
+    )
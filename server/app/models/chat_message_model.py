@@ -1,20 +1,27 @@
 import uuid
 
-from sqlalchemy import Column, String, Integer, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Text, ForeignKey, Index
+from sqlalchemy.orm import deferred, relationship
 
+from app.core.config import settings
 from app.core.db import Base
+from app.core.db_types import CompactJSON
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    # Two turns can't append at the same order: the one that read the history before the other appended fails.
+    __table_args__ = (Index("ix_chat_messages_owner_uuid_order", "owner_uuid", "order", unique=True),)
 
     uuid = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     order = Column(Integer, nullable=False)
     role = Column(String, nullable=False)
     text = Column(Text, nullable=False)
     files = Column(Text, nullable=True)
-    content = Column(Text, nullable=False)
+    # The `Content` list of the turn, as sent to the model. Only loaded when accessed, since the history shown to the
+    # user doesn't need it.
+    content = deferred(Column(CompactJSON(compress_from_bytes=settings.CHAT_CONTENT_COMPRESS_FROM_BYTES),
+                              nullable=False))
 
     owner_uuid = Column(String, ForeignKey("users.uuid"), index=True, nullable=False)
 
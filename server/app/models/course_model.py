@@ -17,5 +17,7 @@ class Course(Base):
     owner_uuid = Column(String, ForeignKey("users.uuid"), index=True, nullable=False)
 
     owner = relationship("User", back_populates="courses")
-    evaluations = relationship("Evaluation", back_populates="course", cascade="all, delete-orphan")
-    lectures = relationship("Lecture", back_populates="course", cascade="all, delete-orphan")
+    # Children are deleted by the ON DELETE CASCADE of their foreign keys, without being loaded first.
+    evaluations = relationship("Evaluation", back_populates="course", cascade="all, delete-orphan",
+                               passive_deletes=True)
+    lectures = relationship("Lecture", back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 import uuid
 
@@ -17,3 +17,7 @@ class Event(Base):
     owner_uuid = Column(String, ForeignKey("users.uuid"), index=True, nullable=False)
 
     owner = relationship("User", back_populates="events")
+
+    __table_args__ = (
+        Index("ix_events_owner_uuid_start_datetime_uuid", "owner_uuid", "start_datetime", "uuid"),
+    )
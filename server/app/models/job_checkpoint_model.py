@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+
+from app.core.db import Base
+
+
+class JobCheckpoint(Base):
+    """Where a maintenance job stopped, so that its next run continues from there."""
+    __tablename__ = "job_checkpoints"
+
+    job = Column(String, primary_key=True)
+    position = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, ForeignKey, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -16,6 +16,10 @@ class Lecture(Base):
     summary = Column(String, nullable=True)
     present = Column(Boolean, nullable=False, default=False)
 
-    course_uuid = Column(String, ForeignKey("courses.uuid"), index=True, nullable=False)
+    course_uuid = Column(String, ForeignKey("courses.uuid", ondelete="CASCADE"), index=True, nullable=False)
 
     course = relationship("Course", back_populates="lectures")
+
+    __table_args__ = (
+        Index("ix_lectures_course_uuid_start_datetime_uuid", "course_uuid", "start_datetime", "uuid"),
+    )
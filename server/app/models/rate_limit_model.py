@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Float, Integer, String
+
+from app.core.db import Base
+
+
+class RateLimitCounter(Base):
+    """
+    The state of a rate limit shared by every worker: a token bucket, or the requests in flight under a concurrency
+    cap. Times are seconds since the epoch.
+    """
+    __tablename__ = "rate_limit_counters"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False, default=0.0)
+    refilled_at = Column(Float, nullable=False, default=0.0)
+    in_flight = Column(Integer, nullable=False, default=0)
+    lease_expires_at = Column(Float, nullable=False, default=0.0)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String, Text, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -21,6 +21,10 @@ class Routine(Base):
 
     owner = relationship("User", back_populates="routines")
 
+    __table_args__ = (
+        Index("ix_routines_owner_uuid_uuid", "owner_uuid", "uuid"),
+    )
+
     SUNDAY = 1
     MONDAY = 2
     TUESDAY = 4
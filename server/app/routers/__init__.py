@@ -4,3 +4,6 @@ from .user_router import user_router
 from .events_router import events_router
 from .lecture_router import lecture_router
 from .routines_router import routines_router
+from .import_router import import_router
+from .batch_router import batch_router
+from .metrics_router import metrics_router
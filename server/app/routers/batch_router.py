@@ -0,0 +1,198 @@
+from datetime import datetime, time, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.crud import get_course_crud, get_lecture_crud, get_evaluation_crud, get_event_crud, get_routine_crud, \
+    CRUDBase, CRUDCourse, CRUDLecture, CRUDEvaluation, CRUDEvent, CRUDRoutine
+from app.dependencies import get_db
+from app.models import User as UserModel
+from app.schemas import BatchOperation, BatchOperationType, BatchResource, BatchRequest, BatchOperationResult, \
+    BatchResponse, Lecture, LectureCreate, LectureUpdate, Evaluation, EvaluationCreate, EvaluationUpdate, \
+    EvaluationTypes, Event, EventCreate, EventCreateInDB, EventUpdate, Routine, RoutineCreate, RoutineCreateInDB, \
+    RoutineUpdate
+
+batch_router = APIRouter(
+    prefix="/batch",
+    tags=["Batch"],
+)
+
+_UPDATE_SCHEMAS: dict[BatchResource, type[BaseModel]] = {
+    BatchResource.LECTURE: LectureUpdate,
+    BatchResource.EVALUATION: EvaluationUpdate,
+    BatchResource.EVENT: EventUpdate,
+    BatchResource.ROUTINE: RoutineUpdate,
+}
+_RESPONSE_SCHEMAS: dict[BatchResource, type[BaseModel]] = {
+    BatchResource.LECTURE: Lecture,
+    BatchResource.EVALUATION: Evaluation,
+    BatchResource.EVENT: Event,
+    BatchResource.ROUTINE: Routine,
+}
+_COURSE_CHILDREN = (BatchResource.LECTURE, BatchResource.EVALUATION)
+_TIME_RANGE_FIELDS: dict[BatchResource, tuple[str, str]] = {
+    BatchResource.LECTURE: ("start_datetime", "end_datetime"),
+    BatchResource.EVALUATION: ("start_datetime", "end_datetime"),
+    BatchResource.EVENT: ("start_datetime", "end_datetime"),
+    BatchResource.ROUTINE: ("start_time", "end_time"),
+}
+
+
+@batch_router.post(
+    path="/",
+    response_model=BatchResponse,
+    description="""
+Applies an ordered list of create, update and delete operations on lectures, evaluations, events and routines in a
+single transaction.
+
+Each operation has the fields and validation rules of the corresponding single-object endpoint. Either every
+operation is applied or none is: if any operation is invalid or targets an object the user doesn't own, the response
+has `applied` set to false and the status of the first failing operation, and `results` explains which operations
+failed.
+""",
+)
+def apply_batch(
+        batch: BatchRequest,
+        response: Response,
+        course_crud: CRUDCourse = Depends(get_course_crud),
+        lecture_crud: CRUDLecture = Depends(get_lecture_crud),
+        evaluation_crud: CRUDEvaluation = Depends(get_evaluation_crud),
+        event_crud: CRUDEvent = Depends(get_event_crud),
+        routine_crud: CRUDRoutine = Depends(get_routine_crud),
+        user: UserModel = Depends(get_current_user),
+        db: Session = Depends(get_db),
+):
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch cannot have more than {settings.BATCH_MAX_OPERATIONS} operations.",
+        )
+
+    cruds: dict[BatchResource, CRUDBase] = {
+        BatchResource.LECTURE: lecture_crud,
+        BatchResource.EVALUATION: evaluation_crud,
+        BatchResource.EVENT: event_crud,
+        BatchResource.ROUTINE: routine_crud,
+    }
+    operations = batch.operations
+    errors: dict[int, tuple[int, str]] = {}
+
+    payloads: list[BaseModel | None] = []
+    for index, operation in enumerate(operations):
+        try:
+            payloads.append(_validate_payload(operation, owner_uuid=user.uuid))
+        except ValueError as e:
+            payloads.append(None)
+            errors[index] = (status.HTTP_422_UNPROCESSABLE_ENTITY, str(e))
+
+    # Ownership is checked with one query per resource, plus one for the courses of new lectures and evaluations.
+    target_uuids: dict[BatchResource, set[str]] = {}
+    course_uuids: set[str] = set()
+    for operation, payload in zip(operations, payloads):
+        if operation.op != BatchOperationType.CREATE:
+            target_uuids.setdefault(operation.resource, set()).add(operation.uuid)
+        elif payload is not None and operation.resource in _COURSE_CHILDREN:
+            course_uuids.add(payload.course_uuid)
+    owned = {
+        resource: {obj.uuid: obj for obj in cruds[resource].get_owned(db, owner_uuid=user.uuid, obj_uuids=uuids)}
+        for resource, uuids in target_uuids.items()
+    }
+    owned_courses = {course.uuid for course in course_crud.get_owned(db, owner_uuid=user.uuid,
+                                                                     obj_uuids=course_uuids)} if course_uuids else set()
+
+    deleted: set[tuple[BatchResource, str]] = set()
+    for index, (operation, payload) in enumerate(zip(operations, payloads)):
+        if index in errors:
+            continue
+        if operation.op == BatchOperationType.CREATE:
+            if operation.resource in _COURSE_CHILDREN and payload.course_uuid not in owned_courses:
+                errors[index] = (status.HTTP_404_NOT_FOUND, "Course not found")
+            continue
+        if operation.uuid not in owned[operation.resource] or (operation.resource, operation.uuid) in deleted:
+            errors[index] = (status.HTTP_404_NOT_FOUND, f"{operation.resource.value.capitalize()} not found")
+        elif operation.op == BatchOperationType.DELETE:
+            deleted.add((operation.resource, operation.uuid))
+        else:
+            # The fields sent are checked together with those kept from the stored object.
+            db_obj = owned[operation.resource][operation.uuid]
+            start_field, end_field = _TIME_RANGE_FIELDS[operation.resource]
+            start = _comparable(getattr(payload, start_field) or getattr(db_obj, start_field))
+            end = _comparable(getattr(payload, end_field) or getattr(db_obj, end_field))
+            if end <= start:
+                errors[index] = (status.HTTP_422_UNPROCESSABLE_ENTITY, f"{end_field} must be after {start_field}.")
+
+    if errors:
+        response.status_code = errors[min(errors)][0]
+        return BatchResponse(applied=False, results=[
+            BatchOperationResult(index=index, status=errors[index][0], uuid=operation.uuid, detail=errors[index][1])
+            if index in errors else
+            BatchOperationResult(index=index, status=status.HTTP_424_FAILED_DEPENDENCY, uuid=operation.uuid,
+                                 detail="Not applied because another operation failed.")
+            for index, operation in enumerate(operations)
+        ])
+
+    results: list[BatchOperationResult] = []
+    try:
+        for index, (operation, payload) in enumerate(zip(operations, payloads)):
+            crud = cruds[operation.resource]
+            if operation.op == BatchOperationType.CREATE:
+                db_obj = crud.create(db, obj_in=payload)
+                result_status = status.HTTP_201_CREATED
+            elif operation.op == BatchOperationType.UPDATE:
+                # Only the fields sent are updated: the others were filled with None to validate the payload.
+                db_obj = crud.update(db, db_obj=owned[operation.resource][operation.uuid],
+                                     obj_in=payload.model_dump(include=set(operation.data)))
+                result_status = status.HTTP_200_OK
+            else:
+                db_obj = crud.remove(db, obj_uuid=operation.uuid)
+                result_status = status.HTTP_200_OK
+            data = _RESPONSE_SCHEMAS[operation.resource].model_validate(db_obj).model_dump(mode="json")
+            results.append(BatchOperationResult(index=index, status=result_status, uuid=db_obj.uuid, data=data))
+        # The request's unit of work commits every operation at once. Flushing here surfaces constraint errors while
+        # they can still be reported as a conflict.
+        db.flush()
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The batch could not be applied.")
+
+    return BatchResponse(applied=True, results=results)
+
+
+def _comparable(value: str | datetime) -> time | datetime:
+    """The start or end of a time range, as a routine time or as an aware datetime, naive ones being stored in UTC."""
+    if isinstance(value, str):
+        return time.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _validate_payload(operation: BatchOperation, owner_uuid: str) -> BaseModel | None:
+    """
+    Validates the data of an operation against the schema of its resource.
+    Returns None for deletions and raises ValueError if the data is invalid.
+    """
+    data = operation.data
+    if operation.op == BatchOperationType.DELETE:
+        return None
+    if operation.op == BatchOperationType.UPDATE:
+        if operation.resource == BatchResource.EVALUATION and data.get("type") is not None:
+            EvaluationTypes(data["type"])
+        schema = _UPDATE_SCHEMAS[operation.resource]
+        # Some update schemas have required nullable fields, so unset fields are filled with None to validate. Only
+        # the fields of `data` are applied.
+        return schema.model_validate({**dict.fromkeys(schema.model_fields), **data})
+
+    match operation.resource:
+        case BatchResource.LECTURE:
+            return LectureCreate.model_validate(data)
+        case BatchResource.EVALUATION:
+            return EvaluationCreate.model_validate(data)
+        case BatchResource.EVENT:
+            return EventCreateInDB(**EventCreate.model_validate(data).model_dump(), owner_uuid=owner_uuid)
+        case BatchResource.ROUTINE:
+            return RoutineCreateInDB(**RoutineCreate.model_validate(data).model_dump(), owner_uuid=owner_uuid)
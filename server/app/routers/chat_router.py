@@ -1,25 +1,33 @@
+import asyncio
 import functools
+import hashlib
 import inspect
-import json
 
-from fastapi import APIRouter, HTTPException, Depends, Form, UploadFile
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Form, Header, UploadFile
 from google.genai.types import Content
+from pydantic import TypeAdapter
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from starlette import status
 
 from app.core import settings
+from app.core.rate_limit import rate_limited
 from app.core.security import get_current_user
 from app.crud import get_chat_crud
 from app.dependencies import get_db
 from app.llm_tools import tools
 from app.models import User
 from app.schemas import ChatMessage, ChatMessageBase, ChatRole, ChatFile
-from app.services import get_google_ai_service
+from app.services import get_google_ai_service, get_chat_turn_queue, ChatTurnQueue, IdempotencyKeyReusedError
+from app.utils.json_response import ModelJSONResponse
 
 chat_router = APIRouter(
     prefix="/chat",
     tags=["Chat"],
 )
+_history_adapter = TypeAdapter(list[ChatMessageBase])
+_contents_adapter = TypeAdapter(list[Content])
 
 
 @chat_router.get("/history", response_model=list[ChatMessageBase])
@@ -30,7 +38,8 @@ async def get_chat_history(
 ):
     if not user:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Not authorized")
-    return chat_crud.get_chat_history(db=db, user_uuid=user.uuid)
+    history = chat_crud.get_chat_history(db=db, user_uuid=user.uuid)
+    return ModelJSONResponse(_history_adapter, history)
 
 
 @chat_router.delete("/history", status_code=status.HTTP_200_OK)
@@ -44,12 +53,14 @@ async def delete_chat_history(
     chat_crud.delete_chat_history(db=db, user_uuid=user.uuid)
 
 
-@chat_router.post("/message", response_model=str)
+@chat_router.post("/message", response_model=str, dependencies=[Depends(rate_limited("chat"))])
 async def send_chat_message(
         message: str = Form(),
         files: list[UploadFile] | None = None,
         chat_crud=Depends(get_chat_crud),
         ai_service=Depends(get_google_ai_service),
+        turn_queue: ChatTurnQueue = Depends(get_chat_turn_queue),
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
         db: Session = Depends(get_db),
         user: User = Depends(get_current_user)
 ):
@@ -89,32 +100,50 @@ async def send_chat_message(
             user_specific_tools.append(wrapper)
         else:
             user_specific_tools.append(tool_func)
-    history = chat_crud.get_chat_history(db=db, user_uuid=user.uuid)
-    llm_context: list[Content] = [
-        Content.model_validate(content_item)
-        for message in history
-        for content_item in json.loads(message.content)
-    ]
-    response, new_content = await ai_service.send_message(
-        instruction=settings.CHAT_SYSTEM_INSTRUCTIONS,
-        message=message,
-        tools=user_specific_tools,
-        files=[(await file.read(), file.content_type) for file in files] if files else None,
-        llm_context=llm_context)
-
-    user_message = ChatMessage(
-        role=ChatRole.USER,
-        text=message,
-        files=chat_files if len(chat_files) else None,
-        content=json.dumps([new_content[0].model_dump(mode='json')]),
-    )
-    model_message = ChatMessage(
-        role=ChatRole.MODEL,
-        text=response,
-        content=json.dumps([new_content[1].model_dump(mode='json')]),
-    )
-
-    chat_crud.append_chat_history(db=db, user_uuid=user.uuid, obj_in=user_message)
-    chat_crud.append_chat_history(db=db, user_uuid=user.uuid, obj_in=model_message)
-
-    return response
+
+    async def run_turn() -> str:
+        # The queue orders the turns of the worker, the lock those of every worker, waited for off the event loop.
+        next_order = await asyncio.to_thread(chat_crud.lock_chat_history, db=db, user_uuid=user.uuid)
+        llm_context: list[Content] = [
+            content_item
+            for message_content in chat_crud.get_chat_contents(db=db, user_uuid=user.uuid)
+            for content_item in _contents_adapter.validate_python(message_content)
+        ]
+        response, new_content = await ai_service.send_message(
+            instruction=settings.CHAT_SYSTEM_INSTRUCTIONS,
+            message=message,
+            tools=user_specific_tools,
+            files=[(await file.read(), file.content_type) for file in files] if files else None,
+            llm_context=llm_context)
+
+        user_message = ChatMessage(
+            role=ChatRole.USER,
+            text=message,
+            files=chat_files if len(chat_files) else None,
+            content=_contents_adapter.dump_python(new_content[:1], mode='json', exclude_none=True),
+        )
+        model_message = ChatMessage(
+            role=ChatRole.MODEL,
+            text=response,
+            content=_contents_adapter.dump_python(new_content[1:2], mode='json', exclude_none=True),
+        )
+
+        chat_crud.append_chat_history(db=db, user_uuid=user.uuid, obj_in=user_message, order=next_order)
+        chat_crud.append_chat_history(db=db, user_uuid=user.uuid, obj_in=model_message, order=next_order + 1)
+        # Committed before the queue lets the next turn of the user read the history, and before the response is
+        # kept for retries, rather than after the endpoint returns.
+        db.commit()
+
+        return response
+
+    # A retry with the same Idempotency-Key must send the same message and files.
+    fingerprint = hashlib.sha256(orjson.dumps(
+        [message, [(file.filename, file.content_type, file.size) for file in files or []]]
+    )).hexdigest()
+    try:
+        return await turn_queue.run(user.uuid, run_turn, idempotency_key=idempotency_key, fingerprint=fingerprint)
+    except IdempotencyKeyReusedError as error:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error))
+    except IntegrityError:
+        # Another turn of the user appended its messages first, on a database without row locks.
+        raise HTTPException(status.HTTP_409_CONFLICT, detail="Another message of this chat was sent meanwhile.")
@@ -1,17 +1,26 @@
+import logging
 import uuid
+from typing import AsyncIterator
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import orjson
 from fastapi import APIRouter, HTTPException, Form, UploadFile, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.background import BackgroundTask
 
 from app.core.config import settings
+from app.core.rate_limit import RateLimiter, acquire_rate_limit, get_rate_limiter, rate_limited
 from app.core.security import get_current_user
 from app.crud import get_course_crud
-from app.dependencies import get_db
+from app.dependencies import get_db, session_scope
 from app.models import User
-from app.schemas import Course, CourseUpdate, CourseGenerate, CourseDeleteResponse, Lecture, Evaluation
-from app.services import get_google_ai_service, GoogleAIService
+from app.schemas import Course, CourseListItem, CourseUpdate, CourseGenerate, CourseDeleteResponse, Lecture, Evaluation, \
+    LectureGenerate, EvaluationGenerate
+from app.services import get_google_ai_service, GoogleAIService, LLMUnavailableError, extract_course, is_text_file
+from app.utils.json_response import ModelJSONResponse
 from app.utils.time import to_utc_iso
 
 course_router = APIRouter(
@@ -19,6 +28,12 @@ course_router = APIRouter(
     tags=["Course"],
     responses={404: {"description": "Not found"}},
 )
+_course_list_adapter = TypeAdapter(list[CourseListItem])
+_MAX_INLINE_BYTES = 19922944  # 19MB, leaving 1MB for the rest of the prompt
+# The event streamed for each item of the list fields of `CourseGenerate`.
+_ITEM_EVENTS = {"lectures": "lecture", "evaluations": "evaluation"}
+
+logger = logging.getLogger(__name__)
 
 
 @course_router.put("/")
@@ -51,23 +66,24 @@ async def delete_course(
     course = course_crud.get(db=db, obj_uuid=course_uuid)
     if not course or course.owner_uuid != user.uuid:
         raise HTTPException(status_code=404, detail="Course not found")
-    removed_course = course_crud.remove(db=db, obj_uuid=course_uuid)
-    response = CourseDeleteResponse.model_validate(removed_course)
-    response.deleted_lectures = len(removed_course.lectures)
-    response.deleted_evaluations = len(removed_course.evaluations)
+    response = CourseDeleteResponse.model_validate(course)
+    response.deleted_lectures, response.deleted_evaluations = course_crud.remove_with_children(
+        db=db, obj_uuid=course_uuid
+    )
     return response
 
 
-@course_router.get("/list")
+@course_router.get("/list", response_model=list[CourseListItem])
 async def list_courses(
         course_crud=Depends(get_course_crud),
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user),
 ):
-    return course_crud.get_all_by_owner_uuid(db=db, owner_uuid=current_user.uuid)
+    courses = course_crud.get_all_by_owner_uuid(db=db, owner_uuid=current_user.uuid)
+    return ModelJSONResponse(_course_list_adapter, courses)
 
 
-@course_router.post("/ai")
+@course_router.post("/ai", response_model=Course, dependencies=[Depends(rate_limited("course_ai"))])
 async def create_course_ai(
         files: list[UploadFile],
         message: str | None = Form(None),
@@ -77,37 +93,118 @@ async def create_course_ai(
         current_user: User = Depends(get_current_user),
         ai_service: GoogleAIService = Depends(get_google_ai_service),
 ):
-    validate_files(files)
-    try:
-        if timezone: ZoneInfo(timezone)
-    except ZoneInfoNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid timezone identifier: '{timezone}'"
-        )
+    validate_files(files, max_total_bytes=settings.COURSE_AI_MAX_UPLOAD_BYTES)
+    client_tz = _client_timezone(timezone)
 
     try:
-        course_generated = await ai_service.generate_structured_output(
+        course_generated = await extract_course(
+            ai_service,
             files=[(await file.read(), file.content_type) for file in files],
-            schema=CourseGenerate,
             message=message,
         )
+    except LLMUnavailableError:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error while parsing course information"
         )
 
-    if timezone:
-        client_tz = ZoneInfo(timezone)
-        for lecture in course_generated.lectures:
-            lecture.start_datetime = to_utc_iso(lecture.start_datetime, client_tz)
-            lecture.end_datetime = to_utc_iso(lecture.end_datetime, client_tz)
-        for evaluation in course_generated.evaluations:
-            evaluation.start_datetime = to_utc_iso(evaluation.start_datetime, client_tz)
-            evaluation.end_datetime = to_utc_iso(evaluation.end_datetime, client_tz)
+    if client_tz:
+        for item in [*course_generated.lectures, *course_generated.evaluations]:
+            _to_utc(item, client_tz)
+    created_course = course_crud.create_with_children(db=db, obj_in=_new_course(course_generated),
+                                                      owner_uuid=current_user.uuid)
+    return created_course
+
 
-    course: Course = Course(
+@course_router.post("/ai/stream")
+async def stream_course_ai(
+        files: list[UploadFile],
+        message: str | None = Form(None),
+        timezone: str | None = Form(None),
+        course_crud=Depends(get_course_crud),
+        current_user: User = Depends(get_current_user),
+        ai_service: GoogleAIService = Depends(get_google_ai_service),
+        limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    """
+    Creates a course like `POST /course/ai`, streaming its progress as JSON lines: a `lecture` or `evaluation` event
+    for each item as soon as it is extracted, then a `course` event with the created course, or an `error` event.
+    """
+    validate_files(files)
+    client_tz = _client_timezone(timezone)
+    # The rate limit is applied here rather than by a dependency, whose exit runs before the response is streamed, so
+    # that the concurrency slot is held while the model runs. It is released when the stream ends, or after the
+    # response when its stream never started, such as when the client left first.
+    slot = await acquire_rate_limit(limiter, "course_ai", current_user)
+    try:
+        # The uploads and the session of the request are closed before the response is streamed.
+        contents = [(await file.read(), file.content_type) for file in files]
+    except BaseException:
+        await slot.release()
+        raise
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for event in course_events():
+                yield event
+        finally:
+            await slot.release()
+
+    async def course_events() -> AsyncIterator[bytes]:
+        course_generated = None
+        counts = dict.fromkeys(_ITEM_EVENTS, 0)
+        try:
+            async for field, item in ai_service.stream_structured_output(files=contents, schema=CourseGenerate,
+                                                                         message=message):
+                if field is None:
+                    course_generated = item
+                    continue
+                if client_tz:
+                    _to_utc(item, client_tz)
+                yield _event(_ITEM_EVENTS[field], index=counts[field], item=item.model_dump(mode="json"))
+                counts[field] += 1
+        except LLMUnavailableError as error:
+            yield _event("error", detail=str(error), retry_after_seconds=error.retry_after_seconds)
+            return
+        except Exception:
+            logger.exception("Course extraction failed")
+            yield _event("error", detail="Error while parsing course information")
+            return
+
+        try:
+            with session_scope() as db:
+                created_course = course_crud.create_with_children(db=db, obj_in=_new_course(course_generated),
+                                                                  owner_uuid=current_user.uuid)
+                course = Course.model_validate(created_course)
+        except Exception:
+            # The status was sent with the first event: the client can only tell a failure from the last one.
+            logger.exception("Course creation failed")
+            yield _event("error", detail="Error while saving the course")
+            return
+        yield _event("course", course=course.model_dump(mode="json"))
+
+    return StreamingResponse(events(), media_type="application/x-ndjson", background=BackgroundTask(slot.release))
+
+
+def _client_timezone(timezone: str | None) -> ZoneInfo | None:
+    try:
+        return ZoneInfo(timezone) if timezone else None
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid timezone identifier: '{timezone}'"
+        )
+
+
+def _to_utc(item: LectureGenerate | EvaluationGenerate, client_tz: ZoneInfo) -> None:
+    item.start_datetime = to_utc_iso(item.start_datetime, client_tz)
+    item.end_datetime = to_utc_iso(item.end_datetime, client_tz)
+
+
+def _new_course(course_generated: CourseGenerate) -> Course:
+    return Course(
         uuid=str(uuid.uuid4()),
         title=course_generated.title,
         semester=course_generated.semester,
@@ -116,15 +213,21 @@ async def create_course_ai(
         evaluations=[Evaluation(**{**evaluation.model_dump(), "type": evaluation.type.value}, uuid=str(uuid.uuid4()))
                      for evaluation in course_generated.evaluations]
     )
-    created_course = course_crud.create_with_children(db=db, obj_in=course, owner_uuid=current_user.uuid)
-    return created_course
 
 
-def validate_files(files: list[UploadFile]) -> None:
+def _event(event: str, **data) -> bytes:
+    return orjson.dumps({"event": event, **data}) + b"\n"
+
+
+def validate_files(files: list[UploadFile], max_total_bytes: int = _MAX_INLINE_BYTES) -> None:
+    """
+    Checks the type and size of the files sent to the model. Files other than text are sent whole, inline, and must
+    fit in one request; text files can be split into parts.
+    """
     files_size = 0
     for file in files:
         if file.content_type not in settings.SUPPORTED_FILE_TYPES:
             raise HTTPException(status_code=415, detail="Unsupported Media Type")
         files_size += file.size
-        if files_size > 19922944:  # 19MB, leaving 1MB for the rest of the prompt
+        if files_size > max_total_bytes or (file.size > _MAX_INLINE_BYTES and not is_text_file(file.content_type)):
             raise HTTPException(status_code=413, detail="Request Entity Too Large")
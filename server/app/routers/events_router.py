@@ -1,7 +1,7 @@
 from datetime import date, timedelta, datetime, time
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Form, Response
 from sqlalchemy.orm import Session
 
 from app.core.security import get_current_user
@@ -9,6 +9,7 @@ from app.crud import get_event_crud, CRUDEvent
 from app.dependencies import get_db
 from app.models import User
 from app.schemas import EventCreate, EventCreateInDB, EventUpdate, Event, EventsByDay
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 events_router = APIRouter(
     prefix="/event",
@@ -111,6 +112,42 @@ def delete_event(
     return event
 
 
+@events_router.get("/list", response_model=list[Event])
+def list_events(
+        response: Response,
+        start_datetime: datetime | None = Query(None, description="Only events starting at or after this datetime."),
+        end_datetime: datetime | None = Query(None, description="Only events starting before this datetime."),
+        cursor: str | None = Query(None, description="The `X-Next-Cursor` header of the previous page."),
+        limit: int = Query(100, ge=1, le=1000),
+        event_crud: CRUDEvent = Depends(get_event_crud),
+        user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+):
+    """
+    Returns a page of the user's events, ordered by start time. If there are more events, the response has an
+    `X-Next-Cursor` header that can be passed as `cursor` to get the next page.
+    """
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    try:
+        events = event_crud.get_events_by_owner(
+            db,
+            owner_uuid=user.uuid,
+            start_utc=start_datetime,
+            end_utc=end_datetime,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    next_cursor = event_crud.get_next_cursor(events, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return events
+
+
 @events_router.get("/week", response_model=EventsByDay)
 def get_events_for_week(
         start_date: date = Query(
@@ -147,12 +184,12 @@ def get_events_for_week(
     start_utc = start_of_period_local.astimezone(ZoneInfo("UTC"))
     end_utc = end_of_period_local.astimezone(ZoneInfo("UTC"))
 
-    all_events = event_crud.get_events_by_owner(
-        db,
+    all_events = event_crud.iter_all(
+        event_crud.get_events_by_owner,
+        db=db,
         owner_uuid=user.uuid,
         start_utc=start_utc,
         end_utc=end_utc,
-        limit=1000
     )
 
     events_grouped_by_day = {
@@ -0,0 +1,116 @@
+import io
+from typing import Callable, Iterable, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Form, UploadFile
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.crud import get_course_crud, get_event_crud, get_lecture_crud, CRUDCourse, CRUDEvent, CRUDLecture
+from app.dependencies import get_db
+from app.models import User as UserModel, Course as CourseModel
+from app.schemas import EventCreate, EventCreateInDB, LectureCreate, ImportResult, ImportRowError
+from app.utils.calendar_import import iter_ics_rows, iter_csv_rows, ics_entry, csv_entry
+
+import_router = APIRouter(
+    prefix="/import",
+    tags=["Import"],
+)
+
+
+@import_router.post(
+    path="/",
+    response_model=ImportResult,
+    description="""
+Imports events or lectures from an iCalendar (`.ics`) or CSV file, without going through the AI model.
+
+If `course_uuid` is provided, every entry becomes a lecture of that course. Otherwise, entries become events.
+
+CSV files must have a header with the columns `title`, `start_datetime`, `end_datetime` and, optionally,
+`description` (or `summary`). Datetimes must be in ISO 8601 format. Naive datetimes, and floating or all-day
+iCalendar times, are interpreted in `timezone` (defaults to UTC).
+
+Entries that fail validation are skipped and reported in `errors` with their line number.
+""",
+)
+def import_file(
+        file: UploadFile,
+        course_uuid: str | None = Form(None),
+        timezone: str | None = Form(None),
+        course_crud: CRUDCourse = Depends(get_course_crud),
+        event_crud: CRUDEvent = Depends(get_event_crud),
+        lecture_crud: CRUDLecture = Depends(get_lecture_crud),
+        user: UserModel = Depends(get_current_user),
+        db: Session = Depends(get_db),
+):
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    if file.size is not None and file.size > settings.IMPORT_MAX_FILE_SIZE_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Request Entity Too Large")
+
+    filename = (file.filename or "").lower()
+    if file.content_type == "text/calendar" or filename.endswith(".ics"):
+        iter_rows, to_entry = iter_ics_rows, ics_entry
+    elif file.content_type == "text/csv" or filename.endswith(".csv"):
+        iter_rows, to_entry = iter_csv_rows, csv_entry
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported Media Type")
+
+    try:
+        client_tz = ZoneInfo(timezone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        # Keys that aren't names, such as paths, raise ValueError.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid timezone identifier: '{timezone}'"
+        )
+
+    if course_uuid:
+        db_course: CourseModel = course_crud.get(db=db, obj_uuid=course_uuid)
+        if not db_course or db_course.owner_uuid != user.uuid:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+        crud = lecture_crud
+
+        def build(entry: dict) -> BaseModel:
+            return LectureCreate(
+                title=entry["title"],
+                start_datetime=entry["start_datetime"],
+                end_datetime=entry["end_datetime"],
+                summary=entry["description"],
+                course_uuid=course_uuid,
+            )
+    else:
+        crud = event_crud
+
+        def build(entry: dict) -> BaseModel:
+            return EventCreateInDB(**EventCreate(**entry).model_dump(), owner_uuid=user.uuid)
+
+    errors: list[ImportRowError] = []
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        rows = _validate_rows(iter_rows(stream), to_entry, build, client_tz, errors)
+        imported = crud.create_multi(db=db, objs_in=rows, batch_size=settings.IMPORT_BATCH_SIZE)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be UTF-8 encoded")
+    finally:
+        stream.detach()
+
+    return ImportResult(imported=imported, errors=errors)
+
+
+def _validate_rows(
+        rows: Iterable[tuple[int, dict]],
+        to_entry: Callable[[dict, ZoneInfo], dict],
+        build: Callable[[dict], BaseModel],
+        client_tz: ZoneInfo,
+        errors: list[ImportRowError],
+) -> Iterator[BaseModel]:
+    for row_number, raw in rows:
+        try:
+            yield build(to_entry(raw, client_tz))
+        except ValueError as e:
+            errors.append(ImportRowError(row=row_number, detail=str(e)))
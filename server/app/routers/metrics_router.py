@@ -0,0 +1,28 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from starlette import status
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+metrics_router = APIRouter(
+    tags=["Metrics"],
+)
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(authorization: str | None = Header(None)):
+    """
+    Exports the application metrics in the Prometheus text format. They are those of the worker process that answered:
+    under `app.server`, each scrape reaches one of the workers, told apart by the process id in the first line.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    token = settings.METRICS_TOKEN.get_secret_value() if settings.METRICS_TOKEN else ""
+    if token and not secrets.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(f"# Metrics of the worker process {os.getpid()}.\n" + registry.render(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,6 @@
 from datetime import time
 
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, Response
 from sqlalchemy.orm import Session
 
 from app.core.security import get_current_user
@@ -8,6 +8,7 @@ from app.crud import get_routine_crud, CRUDRoutine
 from app.dependencies import get_db
 from app.models import User as UserModel
 from app.schemas import RoutineCreateInDB, RoutineUpdate, Routine
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 routines_router = APIRouter(
     prefix="/routine",
@@ -219,11 +220,17 @@ def delete_routine(
 @routines_router.get(
     path="/list",
     response_model=list[Routine],
-    description="Retrieves a list of routines for the current user.",
+    description="""
+Retrieves a page of routines for the current user.
+
+If there are more routines, the response has an `X-Next-Cursor` header. Pass its value as `cursor` to get the next
+page.
+""",
 )
 def list_routines(
-        skip: int = 0,
-        limit: int = 100,
+        response: Response,
+        cursor: str | None = Query(None),
+        limit: int = Query(100, ge=1, le=1000),
         routine_crud: CRUDRoutine = Depends(get_routine_crud),
         user: UserModel = Depends(get_current_user),
         db: Session = Depends(get_db)
@@ -231,5 +238,12 @@ def list_routines(
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    routines = routine_crud.get_routines_by_owner(db, owner_uuid=user.uuid, skip=skip, limit=limit)
+    try:
+        routines = routine_crud.get_routines_by_owner(db, owner_uuid=user.uuid, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    next_cursor = routine_crud.get_next_cursor(routines, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return routines
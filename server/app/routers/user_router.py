@@ -3,16 +3,17 @@ from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from fastapi import APIRouter, Depends, HTTPException, status, Form, Query
 from fastapi.security import HTTPAuthorizationCredentials
-from firebase_admin import auth
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.firebase import verify_id_token
 from app.core.security import get_current_user
 from app.core.security import token_scheme
 from app.crud import get_user_crud, get_lecture_crud, get_evaluation_crud, get_event_crud, CRUDUser, CRUDLecture, \
     CRUDEvaluation, CRUDEvent
 from app.dependencies import get_db
 from app.models import User
-from app.schemas import UserCreate, UserUpdate, UserData, ScheduleResponse
+from app.schemas import UserCreate, UserUpdate, UserData, UserProfileInclude, ScheduleResponse
 
 user_router = APIRouter(
     prefix="/user",
@@ -29,7 +30,7 @@ def register_user(
         token: HTTPAuthorizationCredentials = Depends(token_scheme)
 ):
     try:
-        decoded_token = auth.verify_id_token(token.credentials)
+        decoded_token = verify_id_token(token.credentials)
         uid = decoded_token['uid']
         email = decoded_token['email']
     except Exception:
@@ -49,19 +50,68 @@ def register_user(
     return user
 
 
-@user_router.get("/", response_model=UserData)
+@user_router.get(
+    "/",
+    response_model=UserData,
+    response_model_exclude_unset=True,
+    description="""
+Returns the profile of the current user.
+
+Relationships are only returned when requested with `include`, which can be repeated (for example,
+`?include=courses&include=events`). Included events are limited to the ones starting between `events_start` (defaults
+to now) and `events_end` (defaults to `USER_PROFILE_EVENTS_DAYS` days after `events_start`).
+""",
+)
 def get_user(
+        include: list[UserProfileInclude] = Query([]),
+        events_start: datetime | None = Query(None, description="Only events starting at or after this datetime."),
+        events_end: datetime | None = Query(None, description="Only events starting before this datetime."),
         user_crud: CRUDUser = Depends(get_user_crud),
         user: User = Depends(get_current_user),
         db: Session = Depends(get_db),
 ):
-    user = user_crud.get(db, obj_uuid=user.uuid)
-    if user is None:
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    profile = {field: getattr(user, field) for field in ("uuid", "name", "nickname", "email")}
+    if not include:
+        # The user loaded during authentication already has every profile column.
+        return UserData.model_validate(profile)
+
+    events_start = _as_utc(events_start) if events_start else datetime.now(ZoneInfo("UTC"))
+    events_end = _as_utc(events_end) if events_end else events_start + timedelta(days=settings.USER_PROFILE_EVENTS_DAYS)
+    if events_end <= events_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="events_end must be after events_start"
+        )
+
+    db_user = user_crud.get_profile(
+        db,
+        user_uuid=user.uuid,
+        include=include,
+        events_start_utc=events_start,
+        events_end_utc=events_end,
+    )
+    if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+    if UserProfileInclude.COURSES in include:
+        profile["courses"] = db_user.courses
+    if UserProfileInclude.EVENTS in include:
+        profile["events"] = sorted(db_user.events, key=lambda event: (event.start_datetime, event.uuid))
+    if UserProfileInclude.ROUTINES in include:
+        profile["routines"] = db_user.routines
+    return UserData.model_validate(profile)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Interprets naive datetimes as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=ZoneInfo("UTC"))
+    return value.astimezone(ZoneInfo("UTC"))
 
 
 @user_router.put("/", response_model=UserData)
@@ -145,19 +195,15 @@ def get_schedule(
     start_utc = start_of_period_local.astimezone(ZoneInfo("UTC"))
     end_utc = end_of_period_local.astimezone(ZoneInfo("UTC"))
 
-    lectures = lecture_crud.get_lectures_by_owner(
-        db, owner_uuid=user.uuid, start_utc=start_utc, end_utc=end_utc, limit=1000
-    )
-    evaluations = evaluation_crud.get_evaluations_by_owner(
-        db, owner_uuid=user.uuid, start_utc=start_utc, end_utc=end_utc, limit=1000
-    )
-    events = event_crud.get_events_by_owner(
-        db, owner_uuid=user.uuid, start_utc=start_utc, end_utc=end_utc, limit=1000
-    )
-
-    for item in lectures + evaluations + events:
-        item.start_datetime = item.start_datetime.astimezone(client_tz)
-        item.end_datetime = item.end_datetime.astimezone(client_tz)
+    lectures = list(lecture_crud.iter_all(
+        lecture_crud.get_lectures_by_owner, db=db, owner_uuid=user.uuid, start_utc=start_utc, end_utc=end_utc
+    ))
+    evaluations = list(evaluation_crud.iter_all(
+        evaluation_crud.get_evaluations_by_owner, db=db, owner_uuid=user.uuid, start_utc=start_utc, end_utc=end_utc
+    ))
+    events = list(event_crud.iter_all(
+        event_crud.get_events_by_owner, db=db, owner_uuid=user.uuid, start_utc=start_utc, end_utc=end_utc
+    ))
 
     schedule_by_day = {
         (start_date + timedelta(days=i)).isoformat(): []
@@ -165,7 +211,9 @@ def get_schedule(
     }
 
     for lecture in lectures:
-        day_str = lecture.start_datetime.date().isoformat()
+        start_datetime = lecture.start_datetime.astimezone(client_tz)
+        end_datetime = lecture.end_datetime.astimezone(client_tz)
+        day_str = start_datetime.date().isoformat()
         if day_str in schedule_by_day:
             schedule_by_day[day_str].append({
                 "item_type": "lecture",
@@ -173,13 +221,15 @@ def get_schedule(
                 "course_title": lecture.course.title,
                 "uuid": lecture.uuid,
                 "title": lecture.title,
-                "start_datetime": lecture.start_datetime,
-                "end_datetime": lecture.end_datetime,
+                "start_datetime": start_datetime,
+                "end_datetime": end_datetime,
                 "summary": lecture.summary,
             })
 
     for evaluation in evaluations:
-        day_str = evaluation.start_datetime.date().isoformat()
+        start_datetime = evaluation.start_datetime.astimezone(client_tz)
+        end_datetime = evaluation.end_datetime.astimezone(client_tz)
+        day_str = start_datetime.date().isoformat()
         if day_str in schedule_by_day:
             schedule_by_day[day_str].append({
                 "item_type": "evaluation",
@@ -187,21 +237,23 @@ def get_schedule(
                 "course_title": evaluation.course.title,
                 "uuid": evaluation.uuid,
                 "title": evaluation.title,
-                "start_datetime": evaluation.start_datetime,
-                "end_datetime": evaluation.end_datetime,
+                "start_datetime": start_datetime,
+                "end_datetime": end_datetime,
                 "type": evaluation.type,
             })
 
     for event in events:
-        day_str = event.start_datetime.date().isoformat()
+        start_datetime = event.start_datetime.astimezone(client_tz)
+        end_datetime = event.end_datetime.astimezone(client_tz)
+        day_str = start_datetime.date().isoformat()
         if day_str in schedule_by_day:
             schedule_by_day[day_str].append({
                 "item_type": "event",
                 "uuid": event.uuid,
                 "title": event.title,
                 "description": event.description,
-                "start_datetime": event.start_datetime,
-                "end_datetime": event.end_datetime,
+                "start_datetime": start_datetime,
+                "end_datetime": end_datetime,
             })
 
     for day_data in schedule_by_day.values():
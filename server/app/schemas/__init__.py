@@ -1,10 +1,14 @@
+from .batch_schema import BatchOperationType, BatchResource, BatchOperation, BatchRequest, \
+    BatchOperationResult, BatchResponse
 from .chat_schemas import ChatRole, ChatMessage, ChatMessageBase, ChatFile
 from .course_schema import Course, CourseBase, CourseCreate, CourseUpdate, CourseGenerate, CourseSummary, \
-    CourseDeleteResponse
+    CourseListItem, CourseDeleteResponse
 from .evaluation_schema import EvaluationTypes, Evaluation, EvaluationBase, EvaluationCreate, EvaluationUpdate, \
-    EvaluationInSchedule
+    EvaluationInSchedule, EvaluationGenerate
 from .event_schema import Event, EventBase, EventCreate, EventCreateInDB, EventUpdate, EventsByDay, EventInSchedule
-from .lecture_schema import Lecture, LectureBase, LectureCreate, LectureUpdate, LectureInSchedule
+from .import_schema import ImportRowError, ImportResult
+from .lecture_schema import Lecture, LectureBase, LectureCreate, LectureUpdate, LectureInSchedule, \
+    LectureGenerate
 from .routine_schema import RoutineWeekdays, Routine, RoutineBase, RoutineCreate, RoutineCreateInDB, RoutineUpdate
-from .user_schema import User, UserData, UserBase, UserCreate, UserUpdate, DailySchedule, \
+from .user_schema import User, UserData, UserProfileInclude, UserBase, UserCreate, UserUpdate, DailySchedule, \
     ScheduleResponse
@@ -0,0 +1,53 @@
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class BatchOperationType(Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class BatchResource(Enum):
+    LECTURE = "lecture"
+    EVALUATION = "evaluation"
+    EVENT = "event"
+    ROUTINE = "routine"
+
+
+class BatchOperation(BaseModel):
+    op: BatchOperationType
+    resource: BatchResource
+    uuid: str | None = Field(
+        default=None,
+        description="The UUID of the object to update or delete. Must be omitted for 'create'.")
+    data: dict[str, Any] = Field(
+        default={},
+        description="The fields to create or update, with the same names as in the resource's schema.")
+
+    @model_validator(mode='after')
+    def validate_uuid(self):
+        if self.op == BatchOperationType.CREATE and self.uuid is not None:
+            raise ValueError("'uuid' must be omitted for 'create' operations.")
+        if self.op != BatchOperationType.CREATE and self.uuid is None:
+            raise ValueError(f"'uuid' is required for '{self.op.value}' operations.")
+        return self
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1)
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    status: int
+    uuid: str | None = None
+    data: dict[str, Any] | None = None
+    detail: str | None = None
+
+
+class BatchResponse(BaseModel):
+    applied: bool
+    results: list[BatchOperationResult]
@@ -1,5 +1,6 @@
 import json
 from enum import Enum
+from typing import Any
 
 from pydantic import BaseModel, ConfigDict, field_validator
 
@@ -32,5 +33,5 @@ class ChatMessageBase(BaseModel):
 
 
 class ChatMessage(ChatMessageBase):
-    content: str
+    content: list[dict[str, Any]]
     model_config = ConfigDict(from_attributes=True)
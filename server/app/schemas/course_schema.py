@@ -38,6 +38,11 @@ class CourseSummary(CourseBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CourseListItem(CourseSummary):
+    description: str | None = None
+    owner_uuid: str
+
+
 class CourseDeleteResponse(CourseSummary):
     deleted_lectures: int | None = None
     deleted_evaluations: int | None = None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    errors: list[ImportRowError] = []
@@ -1,6 +1,7 @@
+from datetime import time
 from enum import Enum
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 
 
 class RoutineWeekdays(Enum):
@@ -22,8 +23,30 @@ class RoutineBase(BaseModel):
     days_of_the_week: int
 
 
+def _validate_days_of_the_week(v: int | None) -> int | None:
+    if v is not None and not (1 <= v <= 127):
+        raise ValueError("days_of_the_week must be an integer between 1 and 127.")
+    return v
+
+
+def _normalize_time(v: str | None) -> str | None:
+    if v is None:
+        return v
+    try:
+        return str(time.fromisoformat(v))
+    except ValueError:
+        raise ValueError("Invalid ISO 8601 format for start or end time. Use HH:MM:SS.")
+
+
 class RoutineCreate(RoutineBase):
-    pass
+    _validate_days = field_validator('days_of_the_week')(_validate_days_of_the_week)
+    _normalize_times = field_validator('start_time', 'end_time')(_normalize_time)
+
+    @model_validator(mode='after')
+    def validate_time_range(self):
+        if time.fromisoformat(self.end_time) <= time.fromisoformat(self.start_time):
+            raise ValueError("end_time must be after start_time.")
+        return self
 
 
 class RoutineCreateInDB(RoutineBase):
@@ -38,6 +61,9 @@ class RoutineUpdate(BaseModel):
     end_time: str | None = None
     days_of_the_week: int | None = None
 
+    _validate_days = field_validator('days_of_the_week')(_validate_days_of_the_week)
+    _normalize_times = field_validator('start_time', 'end_time')(_normalize_time)
+
 
 class Routine(RoutineBase):
     uuid: str
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Union
 
 from pydantic import BaseModel, ConfigDict
@@ -27,11 +28,17 @@ class User(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserProfileInclude(str, Enum):
+    COURSES = "courses"
+    EVENTS = "events"
+    ROUTINES = "routines"
+
+
 class UserData(UserBase):
     uuid: str
-    courses: list[CourseSummary]
-    events: list[Event]
-    routines: list[Routine]
+    courses: list[CourseSummary] | None = None
+    events: list[Event] | None = None
+    routines: list[Routine] | None = None
     model_config = ConfigDict(from_attributes=True)
 
 
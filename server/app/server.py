@@ -0,0 +1,142 @@
+"""
+Production entrypoint. Runs the app in several Gunicorn worker processes, configured through `Settings`:
+
+    python -m app.server
+
+The app is imported once, in the master process, before the workers are forked. The Gemini client, the Firebase
+app and the database connections are only created on first use, so each worker builds its own after the fork. On
+SIGTERM, the workers stop accepting connections and finish their in-flight requests, such as chat turns waiting on
+the model, for up to WORKER_GRACEFUL_TIMEOUT_SECONDS. Each worker is replaced after WORKER_MAX_REQUESTS requests,
+which returns the memory held on to after large uploads.
+"""
+import logging
+import math
+import os
+from pathlib import Path
+
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+from app.core.config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+# Time left to the lifespan shutdown of a worker after its requests were drained, before Gunicorn kills it.
+_SHUTDOWN_MARGIN_SECONDS = 5
+
+
+class Worker(UvicornWorker):
+    """A Uvicorn worker that waits for its in-flight requests, up to the graceful timeout, when it is stopped."""
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS,
+                     "timeout_graceful_shutdown": settings.WORKER_GRACEFUL_TIMEOUT_SECONDS}
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        if settings.DATABASE_CREATE_TABLES_ON_STARTUP:
+            # Once, here, rather than concurrently in the startup of every worker.
+            from app.core.db import Base, engine
+            Base.metadata.create_all(bind=engine)
+            settings.DATABASE_CREATE_TABLES_ON_STARTUP = False
+        return app
+
+
+def available_cpus(cgroup_root: Path = CGROUP_ROOT) -> float:
+    """The CPUs the process may use: those it can run on, limited by the CPU quota of its container."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>" when unlimited.
+        quota, period = (cgroup_root / "cpu.max").read_text().split()
+        if quota != "max":
+            return min(cpus, int(quota) / int(period))
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: a quota of -1 is unlimited.
+        quota = int((cgroup_root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((cgroup_root / "cpu" / "cpu.cfs_period_us").read_text())
+        if quota > 0:
+            return min(cpus, quota / period)
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def available_memory_bytes(cgroup_root: Path = CGROUP_ROOT) -> int:
+    """The memory the process may use: the physical memory, limited by the memory limit of its container."""
+    memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for limit_file in (cgroup_root / "memory.max", cgroup_root / "memory" / "memory.limit_in_bytes"):
+        try:
+            limit = limit_file.read_text().strip()
+        except OSError:
+            continue
+        if limit.isdigit():
+            memory = min(memory, int(limit))
+    return memory
+
+
+def worker_count(cpus: float, memory_bytes: int, worker_memory_mb: int) -> int:
+    """
+    Two workers per CPU, plus one, so that a worker stays busy while another is blocked on the database. Capped by
+    the number of workers that fit in memory, and at least one.
+    """
+    by_cpu = math.floor(2 * cpus) + 1
+    by_memory = memory_bytes // (worker_memory_mb * 1024 * 1024)
+    return max(1, min(by_cpu, by_memory))
+
+
+def gunicorn_options(config: Settings, cpus: float, memory_bytes: int) -> dict:
+    return {
+        "bind": f"{config.HOST}:{config.PORT}",
+        "workers": config.WEB_CONCURRENCY or worker_count(cpus, memory_bytes, config.WORKER_MEMORY_MB),
+        "worker_class": "app.server.Worker",
+        "preload_app": True,
+        "max_requests": config.WORKER_MAX_REQUESTS,
+        "max_requests_jitter": config.WORKER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": config.WORKER_GRACEFUL_TIMEOUT_SECONDS + _SHUTDOWN_MARGIN_SECONDS,
+        "timeout": config.WORKER_TIMEOUT_SECONDS,
+        "keepalive": config.WORKER_KEEPALIVE_SECONDS,
+        "post_fork": _post_fork,
+        "accesslog": "-",
+    }
+
+
+def rate_limit_backend(config: Settings, workers: int) -> str:
+    """
+    The backend of the rate limits: the configured one, else the database when several workers must share the
+    counts, as each would otherwise let a user make as many requests as the limit allows.
+    """
+    if config.RATE_LIMIT_BACKEND is None:
+        return "database" if workers > 1 else "memory"
+    if config.RATE_LIMIT_BACKEND == "memory" and workers > 1:
+        logger.warning("The rate limits are counted per worker: with %d workers, a user may make %d times as many "
+                       "requests. Set RATE_LIMIT_BACKEND to \"database\" to share them.", workers, workers)
+    return config.RATE_LIMIT_BACKEND
+
+
+def _post_fork(server, worker) -> None:
+    # The connections opened by the master, to create the tables, belong to it and can't be used by the workers.
+    from app.core.db import engine
+    engine.dispose(close=False)
+
+
+def main() -> None:
+    options = gunicorn_options(settings, available_cpus(), available_memory_bytes())
+    # Set before the app is loaded, and the rate limiter created, in the master process.
+    settings.RATE_LIMIT_BACKEND = rate_limit_backend(settings, options["workers"])
+    Server(options).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,5 @@
+from .chat_turn_queue import get_chat_turn_queue, ChatTurnQueue, IdempotencyKeyReusedError
+from .course_extraction import extract_course, is_text_file
 from .google_ai_service import get_google_ai_service, GoogleAIService
+from .image_processing import get_image_pool, shutdown_image_pool
+from .llm_resilience import LLMUnavailableError
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import io
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from google.genai import errors
+from google.genai.types import Content, File, FileData, FileState, Part, UploadFileConfig
+
+from app.core.metrics import llm_file_uploads_total
+
+logger = logging.getLogger(__name__)
+
+# Status codes of the errors that mean that the API key can't use the file storage at all, or that a file is gone.
+_UNAVAILABLE_STATUS_CODES = {403, 404, 405, 501}
+_GONE_STATUS_CODES = {403, 404}
+_PROCESSING_POLL_SECONDS = 0.5
+_PROCESSING_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class RemoteFile:
+    name: str
+    uri: str
+    mime_type: str
+    expires_at: float
+
+
+class AttachmentManager:
+    """
+    Uploads the files sent to the model to the file storage of the Gemini API, so that requests, and the chat history
+    sent again with every turn, reference them instead of holding their bytes.
+
+    A file is uploaded once per content and MIME type, and its reference reused for `ttl_seconds`, which must be under
+    the 48 hours the API keeps files; the least recently used ones are forgotten past `max_entries`. Files under
+    `min_bytes`, or that fail to upload, are sent inline: `part` returns None for them. The file storage isn't tried
+    again for `ttl_seconds` when the API key can't use it.
+    """
+
+    def __init__(self, client, ttl_seconds: int, min_bytes: int, max_entries: int, enabled: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.min_bytes = min_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._clock = clock
+        self._files: OrderedDict[str, RemoteFile] = OrderedDict()
+        # Files referenced by the chat history, by URI, including those uploaded by other workers.
+        self._known: OrderedDict[str, RemoteFile | None] = OrderedDict()
+        self._uploading: dict[str, asyncio.Future] = {}
+        self._disabled_until = 0.0
+
+    async def part(self, data: bytes, mime_type: str) -> Part | None:
+        """
+        A part referencing the file holding `data`, uploading it unless it was already. Returns None when the file
+        should be sent inline.
+        """
+        if not self.enabled or len(data) < self.min_bytes or self._clock() < self._disabled_until:
+            return None
+        key = f"{hashlib.sha256(data).hexdigest()}:{mime_type}"
+        remote = self._files.get(key)
+        if remote is not None and self._is_usable(remote):
+            self._files.move_to_end(key)
+            llm_file_uploads_total.inc(outcome="reused")
+        elif key in self._uploading:
+            remote = await asyncio.shield(self._uploading[key])
+        else:
+            self._uploading[key] = asyncio.get_running_loop().create_future()
+            remote = None
+            try:
+                remote = await self._upload(key, data, mime_type)
+            finally:
+                self._uploading.pop(key).set_result(remote)
+        if remote is None:
+            return None
+        return Part(file_data=FileData(file_uri=remote.uri, mime_type=remote.mime_type))
+
+    async def resolve(self, contents: list[Content]) -> list[Content]:
+        """
+        Replaces the references to files that expired, in contents such as the chat history, with a note saying so:
+        the API rejects a request referencing a file it no longer has. Files uploaded by another worker are looked up
+        in the API once.
+        """
+        resolved = []
+        for content in contents:
+            parts = content.parts or []
+            uris = [part.file_data.file_uri for part in parts if part.file_data and part.file_data.file_uri]
+            if not uris:
+                resolved.append(content)
+                continue
+            available = {uri: await self._is_available(uri) for uri in uris}
+            if all(available.values()):
+                resolved.append(content)
+                continue
+            resolved.append(Content(role=content.role, parts=[
+                part if not part.file_data or available.get(part.file_data.file_uri, True)
+                else Part(text=f"[A {part.file_data.mime_type} file attached here has expired and is no longer "
+                               f"available.]")
+                for part in parts
+            ]))
+        return resolved
+
+    def _is_usable(self, remote: RemoteFile) -> bool:
+        # A file about to expire could be gone before the end of the request, or of the conversation.
+        return remote.expires_at - self._clock() > self.ttl_seconds / 4
+
+    async def _upload(self, key: str, data: bytes, mime_type: str) -> RemoteFile | None:
+        try:
+            uploaded = await self.client.aio.files.upload(
+                file=io.BytesIO(data), config=UploadFileConfig(mime_type=mime_type, display_name=key[:16]))
+            deadline = self._clock() + _PROCESSING_TIMEOUT_SECONDS
+            while uploaded.state == FileState.PROCESSING and self._clock() < deadline:
+                await asyncio.sleep(_PROCESSING_POLL_SECONDS)
+                uploaded = await self.client.aio.files.get(name=uploaded.name)
+            if uploaded.state not in (None, FileState.ACTIVE, FileState.STATE_UNSPECIFIED):
+                raise RuntimeError(f"The file {uploaded.name} is {uploaded.state.value}.")
+        except Exception as error:
+            llm_file_uploads_total.inc(outcome="failed")
+            if isinstance(error, errors.ClientError) and error.code in _UNAVAILABLE_STATUS_CODES:
+                logger.warning("The file storage is unavailable, not used for %ss: %s", self.ttl_seconds, error)
+                self._disabled_until = self._clock() + self.ttl_seconds
+            else:
+                logger.warning("Couldn't upload a file, sent inline: %s", error)
+            return None
+
+        llm_file_uploads_total.inc(outcome="uploaded")
+        remote = self._remote_file(uploaded, mime_type)
+        self._files[key] = remote
+        self._remember(remote.uri, remote)
+        while len(self._files) > self.max_entries:
+            self._files.popitem(last=False)
+        return remote
+
+    async def _is_available(self, uri: str) -> bool:
+        if uri not in self._known:
+            try:
+                remote = self._remote_file(await self.client.aio.files.get(name=_file_name(uri)), "")
+            except Exception as error:
+                if not isinstance(error, errors.ClientError) or error.code not in _GONE_STATUS_CODES:
+                    # Sent as it is: if the file is gone after all, the request fails like it would have.
+                    logger.warning("Couldn't look up the file %s: %s", uri, error)
+                    return True
+                remote = None
+            self._remember(uri, remote)
+        remote = self._known[uri]
+        # The request is sent right away, so a file still has to be there only for a few minutes.
+        return remote is not None and remote.expires_at - self._clock() > 60
+
+    def _remember(self, uri: str, remote: RemoteFile | None) -> None:
+        self._known[uri] = remote
+        self._known.move_to_end(uri)
+        while len(self._known) > self.max_entries:
+            self._known.popitem(last=False)
+
+    def _remote_file(self, file: File, mime_type: str) -> RemoteFile:
+        ttl_seconds = self.ttl_seconds
+        if file.expiration_time is not None:
+            ttl_seconds = min(ttl_seconds, (file.expiration_time - datetime.now(timezone.utc)).total_seconds())
+        return RemoteFile(name=file.name, uri=file.uri, mime_type=file.mime_type or mime_type,
+                          expires_at=self._clock() + ttl_seconds)
+
+
+def _file_name(uri: str) -> str:
+    """The name of a file of the API, "files/abc", from its URI."""
+    return "files/" + uri.rsplit("/files/", 1)[-1]
@@ -0,0 +1,129 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator
+
+from sqlalchemy import Connection, Engine, delete, func, insert, literal, select, true, update
+
+from app.models import ArchivedChatMessage, ChatMessage, JobCheckpoint
+
+CHAT_ARCHIVE_JOB = "archive_chat_history"
+_USERS_PER_PAGE = 500
+_MOVED_COLUMNS = ("uuid", "order", "role", "text", "files", "content", "owner_uuid")
+
+
+@dataclass
+class ChatArchiveRun:
+    users: int = 0
+    messages: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    finished: bool = False
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+
+def archive_chat_history(engine: Engine, keep_messages: int, batch_size: int,
+                         max_batches: int | None = None) -> ChatArchiveRun:
+    """
+    Moves the messages of each user older than their last `keep_messages` into `archived_chat_messages`, keeping
+    their `order`. Each batch of up to `batch_size` messages is copied and deleted in its own short transaction, so
+    the server can keep reading and appending messages meanwhile: appends go after the kept messages, and a message
+    deleted by its user in the meantime is neither copied nor deleted twice.
+
+    Users are visited in `uuid` order, from the checkpoint of the previous run. A run stopped after `max_batches`, or
+    interrupted, leaves the checkpoint at the last user whose messages were all moved; a complete pass clears it.
+    """
+    if keep_messages < 1:
+        raise ValueError("At least one message must be kept, to continue the order of the history.")
+
+    run = ChatArchiveRun()
+    started = time.perf_counter()
+    pending: list[str] = []
+    finished_user = _read_checkpoint(engine)
+
+    def batches_left() -> bool:
+        return max_batches is None or run.batches < max_batches
+
+    def move_pending(checkpoint: str | None) -> None:
+        with engine.begin() as connection:
+            _move(connection, pending)
+            _write_checkpoint(connection, checkpoint)
+        if pending:
+            run.messages += len(pending)
+            run.batches += 1
+            pending.clear()
+
+    for owner_uuid, last_archived_order in _users_to_archive(engine, finished_user, keep_messages):
+        while True:
+            with engine.connect() as connection:
+                pending.extend(connection.execute(
+                    select(ChatMessage.uuid)
+                    .where(ChatMessage.owner_uuid == owner_uuid, ChatMessage.order <= last_archived_order)
+                    .order_by(ChatMessage.order)
+                    .limit(batch_size - len(pending))
+                ).scalars())
+            if len(pending) < batch_size:
+                break
+            if not batches_left():
+                break
+            # The current user may have more messages to move, so the checkpoint stays at the previous one.
+            move_pending(checkpoint=finished_user)
+        if not batches_left():
+            break
+        finished_user = owner_uuid
+        run.users += 1
+    else:
+        if pending or finished_user is not None:
+            move_pending(checkpoint=None)
+        run.finished = True
+
+    run.seconds = time.perf_counter() - started
+    return run
+
+
+def _users_to_archive(engine: Engine, after_user: str | None, keep_messages: int) -> Iterator[tuple[str, int]]:
+    """The users with more than `keep_messages` messages, after `after_user`, with the last order to archive."""
+    while True:
+        with engine.connect() as connection:
+            users = connection.execute(
+                select(ChatMessage.owner_uuid, func.max(ChatMessage.order) - keep_messages)
+                .where(ChatMessage.owner_uuid > after_user if after_user is not None else true())
+                .group_by(ChatMessage.owner_uuid)
+                .having(func.count() > keep_messages)
+                .order_by(ChatMessage.owner_uuid)
+                .limit(_USERS_PER_PAGE)
+            ).all()
+        yield from users
+        if len(users) < _USERS_PER_PAGE:
+            return
+        after_user = users[-1][0]
+
+
+def _move(connection: Connection, uuids: list[str]) -> None:
+    if not uuids:
+        return
+    columns = [getattr(ChatMessage, name) for name in _MOVED_COLUMNS]
+    connection.execute(
+        insert(ArchivedChatMessage).from_select(
+            [*_MOVED_COLUMNS, "archived_at"],
+            select(*columns, literal(datetime.now(timezone.utc), ArchivedChatMessage.archived_at.type))
+            .where(ChatMessage.uuid.in_(uuids))
+        )
+    )
+    connection.execute(delete(ChatMessage).where(ChatMessage.uuid.in_(uuids)))
+
+
+def _read_checkpoint(engine: Engine) -> str | None:
+    with engine.connect() as connection:
+        return connection.execute(
+            select(JobCheckpoint.position).filter_by(job=CHAT_ARCHIVE_JOB)
+        ).scalar_one_or_none()
+
+
+def _write_checkpoint(connection: Connection, position: str | None) -> None:
+    values = {"position": position, "updated_at": datetime.now(timezone.utc)}
+    if not connection.execute(update(JobCheckpoint).filter_by(job=CHAT_ARCHIVE_JOB).values(**values)).rowcount:
+        connection.execute(insert(JobCheckpoint).values(job=CHAT_ARCHIVE_JOB, **values))
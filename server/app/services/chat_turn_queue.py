@@ -0,0 +1,127 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import chat_turn_queue_wait_seconds, chat_turns_coalesced_total
+
+T = TypeVar("T")
+
+
+class IdempotencyKeyReusedError(Exception):
+    """An idempotency key was sent again with a different request."""
+
+
+@dataclass
+class _UserQueue:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    turns: int = 0
+
+
+@dataclass
+class _IdempotentTurn:
+    fingerprint: str
+    future: asyncio.Future
+    expires_at: float = float("inf")
+
+
+@functools.cache
+def get_chat_turn_queue() -> "ChatTurnQueue":
+    return ChatTurnQueue(ttl_seconds=settings.CHAT_IDEMPOTENCY_TTL_SECONDS,
+                         max_keys=settings.CHAT_IDEMPOTENCY_MAX_KEYS)
+
+
+class ChatTurnQueue:
+    """
+    Runs the chat turns of each user one at a time, in the order they arrived, so that a turn reads the history
+    written by the previous one and appends after it.
+
+    A turn sent with an idempotency key already used by the same user, such as a retry after a timeout, gets the
+    result of the first turn, waiting for it while it runs, instead of calling the model again. Results are kept for
+    `ttl_seconds`, and for the last `max_keys` keys at most; failed turns aren't kept, so their retries run again.
+
+    The queues live in the worker, and only order the turns it receives: those of other workers are ordered by the
+    lock `lock_chat_history` takes on the chat in the database, and retries are only coalesced within a worker.
+    """
+
+    def __init__(self, ttl_seconds: float, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._clock = clock
+        self._queues: dict[str, _UserQueue] = {}
+        self._turns: OrderedDict[tuple[str, str], _IdempotentTurn] = OrderedDict()
+
+    async def run(self, user_uuid: str, turn: Callable[[], Awaitable[T]], idempotency_key: str | None = None,
+                  fingerprint: str = "") -> T:
+        """
+        Runs `turn()` after the previous turns of `user_uuid`, or returns the result of the turn sent with the same
+        `idempotency_key`. Raises `IdempotencyKeyReusedError` when that turn had another `fingerprint`.
+        """
+        if idempotency_key is None:
+            async with self._turn_of(user_uuid):
+                return await turn()
+
+        key = (user_uuid, idempotency_key)
+        while (previous := self._previous_turn(key)) is not None:
+            if previous.fingerprint != fingerprint:
+                raise IdempotencyKeyReusedError("The idempotency key was already used for another message.")
+            chat_turns_coalesced_total.inc()
+            try:
+                return await asyncio.shield(previous.future)
+            except asyncio.CancelledError:
+                if not previous.future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The request running the turn was cancelled before it finished: this one runs it instead.
+
+        future = asyncio.get_running_loop().create_future()
+        # Marks the error as retrieved, for the turns that no other request waited for.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._turns[key] = entry = _IdempotentTurn(fingerprint, future)
+        try:
+            async with self._turn_of(user_uuid):
+                result = await turn()
+        except BaseException as error:
+            self._turns.pop(key, None)
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(error)
+            raise
+        future.set_result(result)
+        entry.expires_at = self._clock() + self.ttl_seconds
+        self._evict()
+        return result
+
+    def _previous_turn(self, key: tuple[str, str]) -> _IdempotentTurn | None:
+        entry = self._turns.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            del self._turns[key]
+            return None
+        return entry
+
+    def _evict(self) -> None:
+        now = self._clock()
+        for key, entry in list(self._turns.items()):
+            if len(self._turns) <= self.max_keys and entry.expires_at > now:
+                break
+            if entry.future.done():
+                del self._turns[key]
+
+    @asynccontextmanager
+    async def _turn_of(self, user_uuid: str) -> AsyncIterator[None]:
+        queue = self._queues.setdefault(user_uuid, _UserQueue())
+        queue.turns += 1
+        start = time.perf_counter()
+        try:
+            # Locks of asyncio are fair: the waiting turns get it in the order they asked for it.
+            async with queue.lock:
+                chat_turn_queue_wait_seconds.observe(time.perf_counter() - start)
+                yield
+        finally:
+            queue.turns -= 1
+            if not queue.turns:
+                del self._queues[user_uuid]
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime
+from typing import TypeVar
+
+from app.core.config import settings
+from app.core.metrics import course_extraction_parts
+from app.schemas import CourseGenerate, EvaluationGenerate, LectureGenerate
+from app.services.google_ai_service import GoogleAIService
+from app.utils.document_text import EXTRACTED_TYPES, extract_document_text
+
+# A file to send to the model, as (content, MIME type).
+File = tuple[bytes, str]
+
+Item = TypeVar("Item", LectureGenerate, EvaluationGenerate)
+
+_TEXT_TYPES = {"application/x-javascript", "application/x-python"}
+
+
+def is_text_file(mime_type: str) -> bool:
+    """Whether files of `mime_type` are text, which can be split anywhere between two lines."""
+    return mime_type.startswith("text/") or mime_type in _TEXT_TYPES
+
+
+async def extract_course(ai_service: GoogleAIService, files: list[File], message: str | None = None
+                         ) -> CourseGenerate:
+    """
+    Extracts a course from its files. Each file is extracted on its own, and text files, or PDF and HTML documents
+    whose text is, longer than COURSE_EXTRACTION_TEXT_PART_CHARS in several parts; the parts are extracted at the same time, up to
+    COURSE_EXTRACTION_CONCURRENCY at once, and the courses found are merged. When a part fails, the others are
+    cancelled and its error is raised.
+    """
+    # Extracting the text of the documents takes a few milliseconds of CPU, kept off the event loop.
+    parts = await asyncio.to_thread(split_into_parts, files, settings.COURSE_EXTRACTION_TEXT_PART_CHARS,
+                                    settings.COURSE_EXTRACTION_TEXT_OVERLAP_CHARS,
+                                    extract_documents=settings.LLM_DOCUMENT_TEXT_EXTRACTION_ENABLED)
+    course_extraction_parts.observe(len(parts))
+    if len(parts) == 1:
+        return await ai_service.generate_structured_output(files=parts, schema=CourseGenerate, message=message)
+
+    semaphore = asyncio.Semaphore(settings.COURSE_EXTRACTION_CONCURRENCY)
+
+    async def extract_part(index: int, part: File) -> CourseGenerate:
+        part_message = (f"This file is part {index + 1} of {len(parts)} of the material of the course: extract the "
+                        f"lectures and evaluations it contains.")
+        async with semaphore:
+            return await ai_service.generate_structured_output(
+                files=[part], schema=CourseGenerate,
+                message=f"{message}\n\n{part_message}" if message else part_message)
+
+    tasks = [asyncio.ensure_future(extract_part(index, part)) for index, part in enumerate(parts)]
+    try:
+        courses = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return merge_courses(courses)
+
+
+def split_into_parts(files: list[File], text_part_chars: int, overlap_chars: int,
+                     extract_documents: bool = False) -> list[File]:
+    """
+    Splits files into the parts extracted separately: a part per file, except for text files longer than
+    `text_part_chars`, cut at the end of a line into parts of up to that many characters. Each part of a text file
+    starts with the lines in the last `overlap_chars` of the previous one, so that an entry cut in two is whole in one
+    of them. With `extract_documents`, the PDF and HTML documents whose text is that long are split as text files.
+    """
+    overlap_chars = min(overlap_chars, text_part_chars // 2)
+    parts = []
+    for data, mime_type in files:
+        if extract_documents and mime_type in EXTRACTED_TYPES:
+            text = extract_document_text(data, mime_type)
+            if text is not None and len(text) > text_part_chars:
+                data, mime_type = text.encode(), "text/plain"
+        if not is_text_file(mime_type) or len(data) <= text_part_chars:
+            parts.append((data, mime_type))
+            continue
+        text = data.decode("utf-8", errors="replace")
+        start = 0
+        while True:
+            end = min(start + text_part_chars, len(text))
+            if end < len(text):
+                line_end = text.rfind("\n", start + overlap_chars + 1, end)
+                if line_end != -1:
+                    end = line_end + 1
+            parts.append((text[start:end].encode(), mime_type))
+            if end == len(text):
+                break
+            overlap_start = text.find("\n", end - overlap_chars, end)
+            start = overlap_start + 1 if overlap_start != -1 else end - overlap_chars
+    return parts
+
+
+def merge_courses(courses: list[CourseGenerate]) -> CourseGenerate:
+    """
+    Merges the courses extracted from the parts of the same material. The title and semester are the first found in
+    the order of the parts. Lectures and evaluations with the same start and title are kept once, in order of start.
+    """
+    return CourseGenerate(
+        title=next((course.title for course in courses if course.title), ""),
+        semester=next((course.semester for course in courses if course.semester), None),
+        lectures=_unique_by_start_and_title([lecture for course in courses for lecture in course.lectures]),
+        evaluations=_unique_by_start_and_title([evaluation for course in courses for evaluation in course.evaluations]),
+    )
+
+
+def _unique_by_start_and_title(items: list[Item]) -> list[Item]:
+    unique: dict[tuple[str, str], Item] = {}
+    for item in items:
+        unique.setdefault((_sortable_datetime(item.start_datetime), " ".join(item.title.casefold().split())), item)
+    return [item for _, item in sorted(unique.items(), key=lambda entry: entry[0])]
+
+
+def _sortable_datetime(value: str) -> str:
+    """The ISO 8601 datetime `value` in one format, so that "2025-08-04T10:00" and "2025-08-04T10:00:00" are equal."""
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        return value
@@ -1,44 +1,118 @@
 import asyncio
 import functools
 import inspect
-import json
+import logging
+import time
+import typing
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+import orjson
 
 from google import genai
+from google.genai import errors
 from google.genai.types import Content, Part, Blob, GenerateContentConfig, FunctionDeclaration, Tool, FunctionResponse, \
-    ToolConfig, FunctionCallingConfig, FunctionCallingConfigMode
-from pydantic import BaseModel
+    ToolConfig, FunctionCallingConfig, FunctionCallingConfigMode, GenerateContentResponse
+from pydantic import BaseModel, TypeAdapter
 
 from app.core import settings
+from app.core.db import track_queries, warn_repeated_queries
+from app.core.metrics import llm_request_duration_seconds, llm_tool_loop_iterations, llm_tokens_total, \
+    llm_tool_calls_total, llm_tool_duration_seconds, llm_model_failovers_total, llm_retries_total, \
+    llm_hedged_requests_total, llm_file_parts_total, llm_file_bytes_total
+from app.services.attachments import AttachmentManager
+from app.services.image_processing import normalize_image
+from app.services.llm_resilience import CircuitBreaker, LatencyWindow, LLMDeadlineExceededError, \
+    LLMUnavailableError, RetryPolicy, hedged, is_transient_error, retry_after_seconds
+from app.services.model_router import ModelRouter
+from app.services.prompt_cache import PromptCache
+from app.utils.document_text import EXTRACTED_TYPES, extract_document_text
+from app.utils.json_stream import JSONObjectStream
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 _MAX_CONTEXT_SIZE_BYTES = 20 * 1024 * 1024
+_USAGE_TOKEN_FIELDS = {
+    "prompt": "prompt_token_count",
+    "response": "candidates_token_count",
+    "cached": "cached_content_token_count",
+    "thoughts": "thoughts_token_count",
+    "tool_use_prompt": "tool_use_prompt_token_count",
+}
+# Hedging sends a call twice: worth it for the short chat calls, not for the extraction of whole documents.
+_HEDGED_OPERATIONS = {"chat"}
+_content_adapter = TypeAdapter(Content)
 
 
-def get_google_ai_service():
-    return google_ai_service
+@functools.cache
+def get_google_ai_service() -> "GoogleAIService":
+    """
+    Builds the service on first use. Constructing the API client takes a noticeable part of a cold start, and the
+    app can be imported without `GOOGLE_API_KEY`, failing only the requests that need the model.
+    """
+    api_key = settings.GOOGLE_API_KEY.get_secret_value() if settings.GOOGLE_API_KEY else ""
+    return GoogleAIService(api_key=api_key)
 
 
 class GoogleAIService:
-    def __init__(self, api_key: str, client=None):
+    def __init__(self, api_key: str, client=None, prompt_cache: PromptCache | None = None,
+                 model_router: ModelRouter | None = None, retry_policy: RetryPolicy | None = None,
+                 circuit_breaker: CircuitBreaker | None = None, attachments: AttachmentManager | None = None):
         if client:
             self.client = client
         else:
             if not api_key:
                 raise ValueError("Google API key not configured.")
             self.client = genai.Client(api_key=api_key)
+        self.prompt_cache = prompt_cache or PromptCache(
+            self.client,
+            ttl_seconds=settings.LLM_PROMPT_CACHE_TTL_SECONDS,
+            min_tokens=settings.LLM_PROMPT_CACHE_MIN_TOKENS,
+            max_entries=settings.LLM_PROMPT_CACHE_MAX_ENTRIES,
+            history_step=settings.LLM_PROMPT_CACHE_HISTORY_STEP,
+            enabled=settings.LLM_PROMPT_CACHE_ENABLED,
+        )
+        self.model_router = model_router or ModelRouter(
+            full_model=settings.LLM_FULL_MODEL,
+            fast_model=settings.LLM_FAST_MODEL,
+            fast_tools=settings.LLM_FAST_TOOLS,
+            simple_message_max_chars=settings.LLM_SIMPLE_MESSAGE_MAX_CHARS,
+            health_window=settings.LLM_MODEL_HEALTH_WINDOW,
+            health_min_calls=settings.LLM_MODEL_HEALTH_MIN_CALLS,
+            max_error_rate=settings.LLM_MODEL_MAX_ERROR_RATE,
+            latency_slo_seconds=settings.LLM_MODEL_LATENCY_SLO_SECONDS,
+            cooldown_seconds=settings.LLM_MODEL_COOLDOWN_SECONDS,
+        )
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=settings.LLM_MAX_ATTEMPTS,
+            base_delay_seconds=settings.LLM_RETRY_BASE_DELAY_SECONDS,
+            max_delay_seconds=settings.LLM_RETRY_MAX_DELAY_SECONDS,
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.LLM_CIRCUIT_RESET_SECONDS,
+        )
+        self.attachments = attachments or AttachmentManager(
+            self.client,
+            ttl_seconds=settings.LLM_FILE_UPLOAD_TTL_SECONDS,
+            min_bytes=settings.LLM_FILE_UPLOAD_MIN_BYTES,
+            max_entries=settings.LLM_FILE_UPLOAD_MAX_ENTRIES,
+            enabled=settings.LLM_FILE_UPLOAD_ENABLED,
+        )
+        self._latencies: dict[tuple[str, str], LatencyWindow] = {}
 
-    def _get_contents_size(self, contents: list[Content]) -> int:
-        """Calculates the approximate size of the content list in bytes."""
-        dict_representation = [
-            content.model_dump_json(exclude_none=True) for content in contents
-        ]
-        return len(json.dumps(dict_representation).encode('utf-8'))
+    def _get_content_sizes(self, contents: list[Content]) -> list[int]:
+        """Calculates the approximate size in bytes of each content of the list."""
+        return [len(_content_adapter.dump_json(content, exclude_none=True)) for content in contents]
 
     async def _trim_context_to_size(self, contents: list[Content]) -> list[Content]:
         """
         Trims the contents list from the beginning until it's under the size limit.
         It removes the oldest messages (user/model pairs) first.
         """
-        current_size = self._get_contents_size(contents)
+        sizes = self._get_content_sizes(contents)
+        current_size = sum(sizes)
         while current_size > _MAX_CONTEXT_SIZE_BYTES:
             if len(contents) < 2:
                 raise ValueError(
@@ -47,7 +121,8 @@ class GoogleAIService:
                 )
 
             del contents[0:2]
-            current_size = self._get_contents_size(contents)
+            current_size -= sum(sizes[0:2])
+            del sizes[0:2]
         return contents
 
     async def send_message(self,
@@ -66,45 +141,54 @@ class GoogleAIService:
 
         all_parts = []
         if files:
-            file_parts = await create_parts_from_files(files)
+            file_parts = await create_parts_from_files(files, self.attachments)
             all_parts.extend(file_parts)
         all_parts.append(Part(text=message))
 
         user_content = Content(role="user", parts=all_parts)
-        contents = list(llm_context or [])
+        contents = await self.attachments.resolve(list(llm_context or []))
         contents.append(user_content)
+        # The history is the same for the next turns of the conversation, unlike the new message and tool rounds.
+        stable_contents = len(contents) - 1
+        config = GenerateContentConfig(
+            system_instruction=instruction,
+            tools=sdk_tools,
+            tool_config=ToolConfig(
+                function_calling_config=FunctionCallingConfig(mode=FunctionCallingConfigMode.AUTO)
+            )
+        )
 
+        # The tool rounds share the deadline of the turn, but a tool that started isn't interrupted.
+        deadline = asyncio.get_running_loop().time() + settings.LLM_CHAT_TURN_DEADLINE_SECONDS
+        iterations = 0
+        called_tools: list[str] = []
         while True:
+            length_before_trim = len(contents)
             contents = await self._trim_context_to_size(contents)
-            response = await self.client.aio.models.generate_content(
-                model="gemini-2.5-flash",
+            stable_contents -= length_before_trim - len(contents)
+            iterations += 1
+            response = await self._generate_chat_content(
+                self.model_router.chat_model(message, has_files=bool(files), called_tools=called_tools),
                 contents=contents,
-                config=GenerateContentConfig(
-                    system_instruction=instruction,
-                    tools=sdk_tools,
-                    tool_config=ToolConfig(
-                        function_calling_config=FunctionCallingConfig(mode=FunctionCallingConfigMode.AUTO)
-                    )
-                )
+                config=config,
+                prefix_length=self.prompt_cache.prefix_length(max(stable_contents, 0)),
+                deadline=deadline,
             )
 
             response_part = response.candidates[0].content.parts[0]
             if not response_part.function_call:
                 final_text = response.text
+                llm_tool_loop_iterations.observe(iterations)
                 break
 
             contents.append(response.candidates[0].content)
             function_calls = [part.function_call for part in response.candidates[0].content.parts]
+            called_tools.extend(call.name for call in function_calls)
 
             tasks_to_run = []
             for call in function_calls:
                 if call.name in tool_map:
-                    func = tool_map[call.name]
-                    args = dict(call.args)
-                    if inspect.iscoroutinefunction(func):
-                        tasks_to_run.append(func(**args))
-                    else:
-                        tasks_to_run.append(asyncio.to_thread(func, **args))
+                    tasks_to_run.append(_call_tool(call.name, tool_map[call.name], dict(call.args)))
 
             tool_results = await asyncio.gather(*tasks_to_run)
 
@@ -123,16 +207,14 @@ class GoogleAIService:
                                          instruction: str | None = None,
                                          message: str | None = None
                                          ) -> BaseModel:
-        content: Content = await create_content_from_files(role="user", files=files)
-        if message:
-            content.parts.append(Part(text=message))
-        response: str = (await self.client.aio.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=content,
-            config=GenerateContentConfig(
-                system_instruction=instruction,
-                response_mime_type="application/json",
-                response_schema=schema))).text
+        content, config = await _structured_output_request(schema, files, instruction, message, self.attachments)
+        deadline = asyncio.get_running_loop().time() + settings.LLM_STRUCTURED_OUTPUT_DEADLINE_SECONDS
+        response: str = (await self._with_retries(
+            "structured_output",
+            lambda model: self._generate_content_with_prompt_cache(
+                "structured_output", model=model, contents=[content], config=config, prefix_length=0,
+                deadline=deadline),
+            model=self.model_router.extraction_model(), deadline=deadline, switch_models=False)).text
         try:
             start_index = response.index('{')
             end_index = response.rindex('}')
@@ -141,15 +223,303 @@ class GoogleAIService:
             raise ValueError("Invalid JSON format: Couldn't find starting or ending braces.")
         return schema.model_validate_json(response)
 
+    async def stream_structured_output(self,
+                                       schema: type[BaseModel],
+                                       files: list[tuple[bytes, str]],
+                                       instruction: str | None = None,
+                                       message: str | None = None
+                                       ) -> AsyncIterator[tuple[str | None, BaseModel]]:
+        """
+        Streams the structured output of `generate_structured_output`, parsing it as it arrives. Each item of the
+        list fields of `schema` that hold models, like the lectures of a course, is validated and yielded as soon as
+        it is complete, as a (field, item) pair. The whole output is yielded last, as (None, output).
+        """
+        content, config = await _structured_output_request(schema, files, instruction, message, self.attachments)
+        item_models = _list_item_models(schema)
+        deadline = asyncio.get_running_loop().time() + settings.LLM_STRUCTURED_OUTPUT_DEADLINE_SECONDS
+        # Only the start of the call is retried: once items were yielded, a retry would yield them again.
+        chunks = await self._with_retries(
+            "structured_output",
+            lambda model: self._generate_content_with_prompt_cache(
+                "structured_output", model=model, contents=[content], config=config, prefix_length=0,
+                deadline=deadline, stream=True),
+            model=self.model_router.extraction_model(), deadline=deadline, switch_models=False)
+
+        parser = JSONObjectStream(array_fields=item_models)
+        fields: dict[str, Any] = {field: [] for field in item_models}
+        try:
+            async for chunk in chunks:
+                for field, value in parser.feed(chunk.text or ""):
+                    if field in item_models:
+                        item = item_models[field].model_validate_json(value)
+                        fields[field].append(item)
+                        yield field, item
+                    else:
+                        fields[field] = orjson.loads(value)
+        finally:
+            # Closes the connection when the output is invalid or no longer read.
+            await chunks.aclose()
+        parser.close()
+        yield None, schema.model_validate(fields)
+
+    async def _generate_chat_content(self, model: str, *, contents: list[Content], config: GenerateContentConfig,
+                                     prefix_length: int, deadline: float):
+        """Calls `model` for a chat turn, retrying transient errors on the other model tier."""
+        return await self._with_retries(
+            "chat",
+            lambda tier: self._generate_routed_content(tier, contents=contents, config=config,
+                                                       prefix_length=prefix_length, deadline=deadline),
+            model=model, deadline=deadline, switch_models=True)
+
+    async def _generate_routed_content(self, model: str, **kwargs):
+        """Calls the model, recording the latency and outcome of the call in the health of the model."""
+        start = time.perf_counter()
+        try:
+            response = await self._generate_content_with_prompt_cache("chat", model=model, **kwargs)
+        except LLMUnavailableError:
+            # The call wasn't sent, or was cut short by the deadline of the turn.
+            raise
+        except Exception as error:
+            # Requests rejected for their content say nothing about the health of the model.
+            self.model_router.record(model, time.perf_counter() - start, not is_transient_error(error))
+            raise
+        self.model_router.record(model, time.perf_counter() - start, True)
+        return response
+
+    async def _with_retries(self, operation: str, call: Callable[[str], Awaitable[T]], *, model: str,
+                            deadline: float, switch_models: bool) -> T:
+        """
+        Runs `call(model)`, and runs it again after transient errors as the retry policy allows, unless the retry
+        couldn't start before `deadline`. With `switch_models`, each retry goes to the other model tier, which has its
+        own quota, so that only the backoff applies and not the Retry-After of the failed model.
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 1
+        while True:
+            try:
+                return await call(model)
+            except Exception as error:
+                if not is_transient_error(error):
+                    raise
+                retry_model = (self.model_router.retry_model(model) or model) if switch_models else model
+                delay = self.retry_policy.delay(attempt, error if retry_model == model else None)
+                if attempt >= self.retry_policy.max_attempts or loop.time() + delay >= deadline:
+                    raise LLMUnavailableError(f"The LLM API failed after {attempt} attempts: {error}",
+                                              retry_after_seconds=retry_after_seconds(error)) from error
+                logger.warning("LLM %s call to %s failed, retrying on %s in %.2fs: %s", operation, model, retry_model,
+                               delay, error)
+                llm_retries_total.inc(operation=operation)
+                if retry_model != model:
+                    llm_model_failovers_total.inc(model=model, to_model=retry_model, reason="error")
+            await asyncio.sleep(delay)
+            model = retry_model
+            attempt += 1
+
+    async def _generate_content_with_prompt_cache(self, operation: str, *, model: str, contents: list[Content],
+                                                  config: GenerateContentConfig, prefix_length: int,
+                                                  deadline: float | None = None, stream: bool = False):
+        """
+        Calls the model with the system instruction, tools and first `prefix_length` contents read from a cache, when
+        one is available, and otherwise with the whole prompt. With `stream`, returns the chunks of the response.
+        """
+        generate = self._open_content_stream if stream else self._generate_content
+        cache_name = await self.prompt_cache.get(model, config, contents[:prefix_length])
+        if cache_name:
+            # A cached request can't repeat what the cache holds.
+            cached_config = config.model_copy(update={
+                "system_instruction": None, "tools": None, "tool_config": None, "cached_content": cache_name,
+            })
+            try:
+                return await generate(operation, model=model, deadline=deadline, contents=contents[prefix_length:],
+                                      config=cached_config)
+            except errors.ClientError as error:
+                if error.code not in (403, 404):
+                    raise
+                # The cache expired or was deleted before its expected time.
+                self.prompt_cache.invalidate(cache_name)
+        return await generate(operation, model=model, deadline=deadline, contents=contents, config=config)
+
+    async def _generate_content(self, operation: str, *, model: str, deadline: float | None = None, **kwargs):
+        """
+        Calls the model, recording the latency of the call and the tokens it used. The call fails at once while the
+        circuit breaker is open, is cut at `deadline`, a time of the event loop, and is hedged when enabled.
+        """
+        if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            raise LLMDeadlineExceededError(f"The LLM {operation} ran past its deadline.")
+        self.circuit_breaker.before_call()
+        latencies = self._latencies.setdefault((model, operation), LatencyWindow(settings.LLM_HEDGING_WINDOW))
+        hedge_after = None
+        if settings.LLM_HEDGING_ENABLED and operation in _HEDGED_OPERATIONS \
+                and len(latencies) >= settings.LLM_HEDGING_MIN_CALLS:
+            hedge_after = latencies.percentile(95)
+
+        start = time.perf_counter()
+        outcome = "error"
+        timeout = asyncio.timeout_at(deadline)
+        try:
+            async with timeout:
+                response = await hedged(
+                    lambda: self.client.aio.models.generate_content(model=model, **kwargs), hedge_after,
+                    on_hedge=lambda: llm_hedged_requests_total.inc(model=model, operation=operation))
+            outcome = "success"
+        except BaseException as error:
+            self.circuit_breaker.record(error)
+            if isinstance(error, TimeoutError) and timeout.expired():
+                raise LLMDeadlineExceededError(f"The LLM {operation} ran past its deadline.") from error
+            raise
+        finally:
+            llm_request_duration_seconds.observe(time.perf_counter() - start, model=model, operation=operation,
+                                                 outcome=outcome)
+        self.circuit_breaker.record(None)
+        latencies.record(time.perf_counter() - start)
+        _record_usage(model, response)
+        return response
+
+    async def _open_content_stream(self, operation: str, *, model: str, deadline: float | None = None,
+                                   **kwargs) -> AsyncIterator[GenerateContentResponse]:
+        """
+        Starts a streamed call of the model and waits for its first chunk, so that a failed call fails here, where it
+        can be retried, rather than while its chunks are read. Like `_generate_content`, the call fails at once while
+        the circuit breaker is open and is cut at `deadline`. Its latency and tokens are recorded after the last chunk.
+        """
+        if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            raise LLMDeadlineExceededError(f"The LLM {operation} ran past its deadline.")
+        self.circuit_breaker.before_call()
+        start = time.perf_counter()
+        timeout = asyncio.timeout_at(deadline)
+        try:
+            async with timeout:
+                stream = await self.client.aio.models.generate_content_stream(model=model, **kwargs)
+                first_chunk = await anext(stream, None)
+        except BaseException as error:
+            self.circuit_breaker.record(error)
+            llm_request_duration_seconds.observe(time.perf_counter() - start, model=model, operation=operation,
+                                                 outcome="error")
+            if isinstance(error, TimeoutError) and timeout.expired():
+                raise LLMDeadlineExceededError(f"The LLM {operation} ran past its deadline.") from error
+            raise
+        self.circuit_breaker.record(None)
+        return self._read_content_stream(operation, model, stream, first_chunk, start, deadline)
+
+    async def _read_content_stream(self, operation: str, model: str,
+                                   stream: AsyncIterator[GenerateContentResponse],
+                                   chunk: GenerateContentResponse | None, start: float,
+                                   deadline: float | None) -> AsyncIterator[GenerateContentResponse]:
+        outcome = "error"
+        usage_chunk = None
+        try:
+            while chunk is not None:
+                if chunk.usage_metadata is not None:
+                    usage_chunk = chunk
+                yield chunk
+                timeout = asyncio.timeout_at(deadline)
+                try:
+                    async with timeout:
+                        chunk = await anext(stream, None)
+                except TimeoutError as error:
+                    if timeout.expired():
+                        raise LLMDeadlineExceededError(f"The LLM {operation} ran past its deadline.") from error
+                    raise
+                except Exception as error:
+                    self.circuit_breaker.record(error)
+                    if is_transient_error(error):
+                        # Part of the output was already used, so the call can't be retried.
+                        raise LLMUnavailableError(f"The LLM API failed while streaming: {error}",
+                                                  retry_after_seconds=retry_after_seconds(error)) from error
+                    raise
+            outcome = "success"
+        finally:
+            llm_request_duration_seconds.observe(time.perf_counter() - start, model=model, operation=operation,
+                                                 outcome=outcome)
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+        if usage_chunk is not None:
+            _record_usage(model, usage_chunk)
+
+
+def _record_usage(model: str, response: GenerateContentResponse) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    for token_type, field_name in _USAGE_TOKEN_FIELDS.items():
+        count = getattr(usage, field_name, None)
+        if isinstance(count, int) and count:
+            llm_tokens_total.inc(count, model=model, type=token_type)
+
+
+async def _structured_output_request(schema: type[BaseModel], files: list[tuple[bytes, str]],
+                                     instruction: str | None, message: str | None,
+                                     attachments: AttachmentManager | None = None
+                                     ) -> tuple[Content, GenerateContentConfig]:
+    content: Content = await create_content_from_files(role="user", files=files, attachments=attachments)
+    if message:
+        content.parts.append(Part(text=message))
+    config = GenerateContentConfig(
+        system_instruction=instruction,
+        response_mime_type="application/json",
+        response_schema=schema)
+    return content, config
+
+
+def _list_item_models(schema: type[BaseModel]) -> dict[str, type[BaseModel]]:
+    """The fields of `schema` holding a list of models, with the model of their items."""
+    item_models = {}
+    for name, field in schema.model_fields.items():
+        if typing.get_origin(field.annotation) is list:
+            item = typing.get_args(field.annotation)[0]
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                item_models[name] = item
+    return item_models
+
+
+async def _call_tool(name: str, func, args: dict):
+    """Runs a tool, recording its latency and outcome, with its SQL statements tracked under the tool's name."""
+    start = time.perf_counter()
+    outcome = "exception"
+    try:
+        with track_queries(f"tool {name}") as stats:
+            if inspect.iscoroutinefunction(func):
+                result = await func(**args)
+            else:
+                result = await asyncio.to_thread(func, **args)
+        outcome = "error" if isinstance(result, dict) and "error" in result else "success"
+    finally:
+        llm_tool_calls_total.inc(tool=name, outcome=outcome)
+        llm_tool_duration_seconds.observe(time.perf_counter() - start, tool=name)
+    warn_repeated_queries(stats)
+    return result
+
 
-async def create_parts_from_files(files: list[tuple[bytes, str]]) -> list[Part]:
-    return [Part(inline_data=Blob(data=data, mime_type=mime)) for data, mime in files]
+async def create_parts_from_files(files: list[tuple[bytes, str]], attachments: AttachmentManager | None = None
+                                  ) -> list[Part]:
+    """
+    The parts sending files to the model. Documents whose text is extracted here, when enabled by
+    LLM_DOCUMENT_TEXT_EXTRACTION_ENABLED, are sent as that text, images scaled down when enabled by
+    LLM_IMAGE_DOWNSCALING_ENABLED, and the other files as they are: by reference to their upload by `attachments`,
+    or inline.
+    """
+    return list(await asyncio.gather(*(_create_part(data, mime, attachments) for data, mime in files)))
 
 
-async def create_content_from_files(role: str, files: list[tuple[bytes, str]]) -> Content:
-    parts = [Part(inline_data=Blob(data=data, mime_type=mime))
-             for data, mime in files]
-    return Content(role=role, parts=parts)
+async def create_content_from_files(role: str, files: list[tuple[bytes, str]],
+                                    attachments: AttachmentManager | None = None) -> Content:
+    return Content(role=role, parts=await create_parts_from_files(files, attachments))
 
 
-google_ai_service = GoogleAIService(api_key=settings.GOOGLE_API_KEY.get_secret_value())
+async def _create_part(data: bytes, mime_type: str, attachments: AttachmentManager | None) -> Part:
+    if settings.LLM_IMAGE_DOWNSCALING_ENABLED and mime_type.startswith("image/"):
+        data, mime_type = await normalize_image(data, mime_type)
+    text = None
+    if settings.LLM_DOCUMENT_TEXT_EXTRACTION_ENABLED and mime_type in EXTRACTED_TYPES:
+        # Parsing a large document takes a few milliseconds of CPU, kept off the event loop.
+        text = await asyncio.to_thread(extract_document_text, data, mime_type)
+    if text is None:
+        reference = await attachments.part(data, mime_type) if attachments is not None else None
+        if reference is not None:
+            llm_file_parts_total.inc(sent_as="reference")
+            return reference
+        llm_file_parts_total.inc(sent_as="bytes")
+        llm_file_bytes_total.inc(len(data), sent_as="bytes")
+        return Part(inline_data=Blob(data=data, mime_type=mime_type))
+    text = f"Text of an attached {mime_type} document:\n\n{text}"
+    llm_file_parts_total.inc(sent_as="text")
+    llm_file_bytes_total.inc(len(text.encode()), sent_as="text")
+    return Part(text=text)
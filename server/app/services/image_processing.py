@@ -0,0 +1,48 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.core.metrics import llm_image_processing_seconds
+from app.utils.images import NORMALIZED_MIME_TYPE, downscale_image
+
+
+@functools.cache
+def get_image_pool() -> ProcessPoolExecutor:
+    # Spawned rather than forked, as forking the threads of a running server can leave their locks held.
+    return ProcessPoolExecutor(max_workers=settings.LLM_IMAGE_PROCESS_WORKERS,
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+def shutdown_image_pool() -> None:
+    """Stops the workers of the image pool, if it was started."""
+    if get_image_pool.cache_info().currsize:
+        get_image_pool().shutdown(cancel_futures=True)
+        get_image_pool.cache_clear()
+
+
+async def normalize_image(data: bytes, mime_type: str) -> tuple[bytes, str]:
+    """
+    An image as it is sent to the model: downscaled to LLM_IMAGE_MAX_SIDE pixels and re-encoded without metadata, in
+    the image pool so that the event loop isn't blocked. Images that can't be read, or whose re-encoding is larger, are
+    returned as they are.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    pool = get_image_pool()
+    try:
+        normalized = await loop.run_in_executor(pool, downscale_image, data, settings.LLM_IMAGE_MAX_SIDE,
+                                                settings.LLM_IMAGE_QUALITY)
+    except BrokenProcessPool:
+        # A worker died, out of memory on a huge image for one: the pool is started again for the next images.
+        if get_image_pool() is pool:
+            shutdown_image_pool()
+        llm_image_processing_seconds.observe(loop.time() - start, outcome="failed")
+        return data, mime_type
+    if normalized is None or len(normalized) >= len(data):
+        llm_image_processing_seconds.observe(loop.time() - start, outcome="unchanged")
+        return data, mime_type
+    llm_image_processing_seconds.observe(loop.time() - start, outcome="normalized")
+    return normalized, NORMALIZED_MIME_TYPE
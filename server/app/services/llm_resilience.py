@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from google.genai import errors
+
+from app.core.metrics import llm_circuit_open
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Client errors worth sending again: request timeouts and exhausted quotas.
+_TRANSIENT_CLIENT_STATUS_CODES = {408, 429}
+_RETRY_INFO_TYPE = "type.googleapis.com/google.rpc.RetryInfo"
+
+
+class LLMUnavailableError(Exception):
+    """The LLM API can't answer now: it keeps failing, its circuit is open, or the request ran out of time."""
+
+    def __init__(self, message: str, retry_after_seconds: float | None = None):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class LLMDeadlineExceededError(LLMUnavailableError):
+    """The chat turn or extraction took longer than its deadline."""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed call to the API could succeed if sent again."""
+    if isinstance(error, errors.ServerError):
+        return True
+    if isinstance(error, errors.ClientError):
+        return error.code in _TRANSIENT_CLIENT_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """
+    The delay asked by the API before sending a request again: the Retry-After header of the response, or the
+    RetryInfo detail of the error body, which the Gemini API sends with its 429s.
+    """
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if isinstance(response, httpx.Response) else None
+    if header:
+        try:
+            return max(float(header), 0.0)
+        except ValueError:
+            try:
+                return max((parsedate_to_datetime(header) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    body = getattr(error, "details", None)
+    if isinstance(body, dict) and isinstance(body.get("error"), dict):
+        body = body["error"]
+    if not isinstance(body, dict):
+        return None
+    for detail in body.get("details") or []:
+        if isinstance(detail, dict) and detail.get("@type") == _RETRY_INFO_TYPE:
+            try:
+                return max(float(str(detail.get("retryDelay", "")).removesuffix("s")), 0.0)
+            except ValueError:
+                return None
+    return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How often and how long after a transient error a call is sent again: up to `max_attempts` attempts in all, after
+    a delay drawn at random up to `base_delay_seconds`, doubled on each retry up to `max_delay_seconds`. A longer
+    delay asked by the API is honoured.
+    """
+    max_attempts: int
+    base_delay_seconds: float
+    max_delay_seconds: float
+    rng: random.Random = field(default_factory=random.Random)
+
+    def delay(self, attempt: int, error: BaseException | None) -> float:
+        """The delay before the retry following the failed `attempt`, counted from 1."""
+        backoff = self.rng.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempt - 1)))
+        asked = retry_after_seconds(error) if error is not None else None
+        return max(backoff, asked) if asked is not None else backoff
+
+
+class CircuitBreaker:
+    """
+    Fails the calls to the API at once while it is unhealthy, instead of making each request wait for its retries.
+
+    After `failure_threshold` consecutive transient failures the circuit opens for `reset_seconds`. A single call is
+    then let through to probe the API: the circuit closes when it gets an answer, and opens again when it fails.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "open" if self._probing or self._remaining_seconds() > 0 else "half_open"
+
+    def before_call(self) -> None:
+        """Raises `LLMUnavailableError` while the circuit is open, or while another call probes the API."""
+        if self._opened_at is None:
+            return
+        remaining = self._remaining_seconds()
+        if remaining > 0 or self._probing:
+            raise LLMUnavailableError("The LLM API is failing, calls are suspended.",
+                                      retry_after_seconds=max(remaining, 1.0))
+        self._probing = True
+
+    def record(self, error: BaseException | None) -> None:
+        """Records the outcome of a call let through by `before_call`: None when it succeeded."""
+        if error is None or (isinstance(error, errors.APIError) and not is_transient_error(error)):
+            # The API answered, even if only to reject the request.
+            self._failures = 0
+            if self._opened_at is not None:
+                logger.info("The LLM API answered again, circuit closed.")
+                llm_circuit_open.set(0)
+            self._opened_at = None
+        elif is_transient_error(error):
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                logger.warning("The LLM API failed %s times in a row, circuit open for %ss.", self._failures,
+                               self.reset_seconds)
+                self._opened_at = self._clock()
+                llm_circuit_open.set(1)
+        # Calls cancelled or out of time say nothing about the API, but free the probe for the next call.
+        self._probing = False
+
+    def _remaining_seconds(self) -> float:
+        return self._opened_at + self.reset_seconds - self._clock()
+
+
+class LatencyWindow:
+    """The latencies of the last `size` successful calls, to tell when a call is slower than usual."""
+
+    def __init__(self, size: int):
+        self._latencies: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def percentile(self, percent: float) -> float | None:
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[max(math.ceil(len(latencies) * percent / 100) - 1, 0)]
+
+
+async def hedged(call: Callable[[], Awaitable[T]], hedge_after_seconds: float | None,
+                 on_hedge: Callable[[], None] = lambda: None) -> T:
+    """
+    Awaits `call()`, and sends it a second time if it hasn't finished after `hedge_after_seconds`. Returns the first
+    successful result, cancelling the other call, or raises the error of the last call to fail.
+    """
+    if hedge_after_seconds is None:
+        return await call()
+    tasks = {asyncio.ensure_future(call())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after_seconds)
+        if not done:
+            on_hedge()
+            tasks.add(asyncio.ensure_future(call()))
+        error: BaseException | None = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
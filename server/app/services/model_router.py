@@ -0,0 +1,106 @@
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Iterable
+
+from app.core.metrics import llm_model_degraded, llm_model_failovers_total
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHealth:
+    """The latency and outcome of the last `window` chat calls to a model, and until when it is degraded."""
+
+    def __init__(self, window: int):
+        self.calls: deque[tuple[float, bool]] = deque(maxlen=window)
+        self.degraded_until = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return sum(not succeeded for _, succeeded in self.calls) / len(self.calls) if self.calls else 0.0
+
+    @property
+    def latency_p95(self) -> float:
+        latencies = sorted(seconds for seconds, _ in self.calls)
+        return latencies[math.ceil(len(latencies) * 0.95) - 1] if latencies else 0.0
+
+
+class ModelRouter:
+    """
+    Chooses between a full model and a faster, cheaper one for each call to the LLM.
+
+    A chat turn starts on the fast model when the message is short and has no files. Once the model has called tools,
+    the turn stays on the fast model only while every tool it called is one of `fast_tools`, whose results need no
+    reasoning to use. A failed chat call is retried on the other tier, and the course extraction always uses the full
+    model.
+
+    The latency and errors of the chat calls are recorded per model. A model that fails more than `max_error_rate` of
+    its last calls, or whose 95th percentile latency goes over `latency_slo_seconds`, is degraded for
+    `cooldown_seconds`: its calls go to the other tier meanwhile, unless that one is degraded too.
+    """
+
+    def __init__(self, full_model: str, fast_model: str, fast_tools: Iterable[str], simple_message_max_chars: int,
+                 health_window: int, health_min_calls: int, max_error_rate: float, latency_slo_seconds: float,
+                 cooldown_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.full_model = full_model
+        self.fast_model = fast_model
+        self.fast_tools = frozenset(fast_tools)
+        self.simple_message_max_chars = simple_message_max_chars
+        self.health_window = health_window
+        self.health_min_calls = health_min_calls
+        self.max_error_rate = max_error_rate
+        self.latency_slo_seconds = latency_slo_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._health: dict[str, ModelHealth] = {}
+
+    def chat_model(self, message: str, has_files: bool, called_tools: list[str]) -> str:
+        """The model for the next call of a chat turn, given the tools the model has called so far in the turn."""
+        if called_tools:
+            fast = all(name in self.fast_tools for name in called_tools)
+        else:
+            fast = not has_files and len(message) <= self.simple_message_max_chars
+        return self._available(self.fast_model if fast else self.full_model)
+
+    def extraction_model(self) -> str:
+        """The model for structured output, such as the course extraction, which needs the full model."""
+        return self.full_model
+
+    def retry_model(self, model: str) -> str | None:
+        """The model to retry a failed chat call on: the fast one, or the full one when the fast one failed."""
+        retry = self.fast_model if model != self.fast_model else self.full_model
+        return retry if retry != model else None
+
+    def record(self, model: str, seconds: float, succeeded: bool) -> None:
+        """Records a chat call, degrading the model when its recent calls are too slow or fail too often."""
+        health = self._health.setdefault(model, ModelHealth(self.health_window))
+        health.calls.append((seconds, succeeded))
+        if len(health.calls) < self.health_min_calls:
+            return
+        error_rate, latency_p95 = health.error_rate, health.latency_p95
+        if error_rate > self.max_error_rate or latency_p95 > self.latency_slo_seconds:
+            logger.warning("Model %s degraded for %ss: %.0f%% errors, p95 latency %.1fs over the last %s calls.",
+                           model, self.cooldown_seconds, error_rate * 100, latency_p95, len(health.calls))
+            health.degraded_until = self._clock() + self.cooldown_seconds
+            # The model is judged again from the calls made after the cooldown.
+            health.calls.clear()
+            llm_model_degraded.set(1, model=model)
+
+    def is_degraded(self, model: str) -> bool:
+        health = self._health.get(model)
+        if health is None or not health.degraded_until:
+            return False
+        if self._clock() < health.degraded_until:
+            return True
+        health.degraded_until = 0.0
+        llm_model_degraded.set(0, model=model)
+        logger.info("Model %s is used again after its cooldown.", model)
+        return False
+
+    def _available(self, model: str) -> str:
+        other = self.full_model if model == self.fast_model else self.fast_model
+        if other != model and self.is_degraded(model) and not self.is_degraded(other):
+            llm_model_failovers_total.inc(model=model, to_model=other, reason="degraded")
+            return other
+        return model
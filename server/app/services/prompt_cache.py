@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import orjson
+from google.genai import errors
+from google.genai.types import Content, CreateCachedContentConfig, GenerateContentConfig, UpdateCachedContentConfig
+from pydantic import TypeAdapter
+
+from app.core.metrics import llm_prompt_cache_requests_total
+
+logger = logging.getLogger(__name__)
+
+_contents_adapter = TypeAdapter(list[Content])
+_CHARS_PER_TOKEN = 4
+# Status codes of the errors that mean that the API key or the model can't use explicit caching at all.
+_UNAVAILABLE_STATUS_CODES = {403, 404, 405, 501}
+
+
+@dataclass
+class CachedPrefix:
+    name: str
+    expires_at: float
+
+
+class PromptCache:
+    """
+    Explicit caches of the Gemini API for the stable prefix of the prompts: the system instruction, the tools and the
+    older contents of a conversation. Requests that reuse a cached prefix send only what follows it, and are billed
+    for the cached tokens at a reduced rate.
+
+    Caches are kept for `ttl_seconds` after they were created or last refreshed. One that is used during the second
+    half of its lifetime has its TTL extended, and the least recently used ones are deleted past `max_entries`.
+    Prefixes estimated under `min_tokens`, the minimum accepted by the API, aren't cached. When a cache can't be
+    created, `get` returns None and the request is sent whole; the same prefix isn't retried for a TTL, nor any prefix
+    when the API doesn't support caching for the key.
+    """
+
+    def __init__(self, client, ttl_seconds: int, min_tokens: int, max_entries: int, history_step: int,
+                 enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        self.history_step = history_step
+        self.enabled = enabled
+        self._clock = clock
+        self._entries: OrderedDict[str, CachedPrefix] = OrderedDict()
+        self._creating: dict[str, asyncio.Future] = {}
+        self._failed_until: dict[str, float] = {}
+        self._disabled_until = 0.0
+        self._deletions: set[asyncio.Task] = set()
+
+    def prefix_length(self, stable_contents: int) -> int:
+        """
+        How many of the first `stable_contents` contents to cache. Rounded down to a multiple of `history_step`, so
+        that the same cache serves the next turns of a conversation until the history has grown by another step.
+        """
+        return stable_contents - stable_contents % self.history_step
+
+    async def get(self, model: str, config: GenerateContentConfig, contents: list[Content]) -> str | None:
+        """
+        Returns the name of a cache holding the system instruction, tools and tool config of `config`, followed by
+        `contents`, creating or refreshing it as needed. Returns None when the prefix shouldn't or can't be cached.
+        """
+        now = self._clock()
+        if not self.enabled or now < self._disabled_until:
+            return None
+        prefix = orjson.dumps([
+            model,
+            config.system_instruction and _dump(config.system_instruction),
+            [_dump(tool) for tool in config.tools or []],
+            config.tool_config and _dump(config.tool_config),
+        ]) + _contents_adapter.dump_json(contents, exclude_none=True)
+        if len(prefix) // _CHARS_PER_TOKEN < self.min_tokens:
+            return None
+        key = hashlib.sha256(prefix).hexdigest()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at - now > self._expiry_margin:
+            self._entries.move_to_end(key)
+            if entry.expires_at - now < self.ttl_seconds / 2:
+                await self._refresh(entry)
+            else:
+                llm_prompt_cache_requests_total.inc(outcome="hit")
+            return entry.name
+        if now < self._failed_until.get(key, 0):
+            return None
+        if key in self._creating:
+            return await asyncio.shield(self._creating[key])
+
+        self._creating[key] = asyncio.get_running_loop().create_future()
+        name = None
+        try:
+            name = await self._create(key, model, config, contents)
+        finally:
+            self._creating.pop(key).set_result(name)
+        return name
+
+    def invalidate(self, name: str) -> None:
+        """Forgets a cache that the API no longer knows, such as one deleted or expired before its expected time."""
+        for key, entry in list(self._entries.items()):
+            if entry.name == name:
+                del self._entries[key]
+
+    @property
+    def _expiry_margin(self) -> float:
+        # A cache about to expire could be gone by the time the request using it arrives.
+        return min(30.0, self.ttl_seconds / 4)
+
+    async def _create(self, key: str, model: str, config: GenerateContentConfig, contents: list[Content]) -> str | None:
+        try:
+            cached = await self.client.aio.caches.create(model=model, config=CreateCachedContentConfig(
+                ttl=f"{self.ttl_seconds}s",
+                system_instruction=config.system_instruction,
+                tools=config.tools,
+                tool_config=config.tool_config,
+                contents=contents or None,
+            ))
+        except Exception as error:
+            llm_prompt_cache_requests_total.inc(outcome="failed")
+            if isinstance(error, errors.ClientError) and error.code in _UNAVAILABLE_STATUS_CODES:
+                logger.warning("Prompt caching is unavailable, disabled for %ss: %s", self.ttl_seconds, error)
+                self._disabled_until = self._clock() + self.ttl_seconds
+            else:
+                logger.warning("Couldn't cache a prompt prefix, not retried for %ss: %s", self.ttl_seconds, error)
+                self._failed_until[key] = self._clock() + self.ttl_seconds
+            return None
+
+        llm_prompt_cache_requests_total.inc(outcome="created")
+        self._entries[key] = CachedPrefix(name=cached.name, expires_at=self._clock() + self.ttl_seconds)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._delete_later(evicted.name)
+        self._failed_until = {key: until for key, until in self._failed_until.items() if until > self._clock()}
+        return cached.name
+
+    async def _refresh(self, entry: CachedPrefix) -> None:
+        try:
+            await self.client.aio.caches.update(name=entry.name,
+                                                config=UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s"))
+        except Exception as error:
+            # The cache is still valid until it expires, and is recreated after that.
+            logger.warning("Couldn't extend the TTL of the prompt cache %s: %s", entry.name, error)
+            llm_prompt_cache_requests_total.inc(outcome="failed")
+            return
+        entry.expires_at = self._clock() + self.ttl_seconds
+        llm_prompt_cache_requests_total.inc(outcome="refreshed")
+
+    def _delete_later(self, name: str) -> None:
+        async def delete() -> None:
+            try:
+                await self.client.aio.caches.delete(name=name)
+            except Exception as error:
+                # It expires with its TTL anyway.
+                logger.info("Couldn't delete the evicted prompt cache %s: %s", name, error)
+
+        task = asyncio.get_running_loop().create_task(delete())
+        self._deletions.add(task)
+        task.add_done_callback(self._deletions.discard)
+
+
+def _dump(value) -> object:
+    return value.model_dump(mode="json", exclude_none=True) if hasattr(value, "model_dump") else value
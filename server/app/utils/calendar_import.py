@@ -0,0 +1,163 @@
+import csv
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, TextIO
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+UNTITLED_EVENT_TITLE = "Untitled event"
+
+_ICS_DURATION_PATTERN = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+_ICS_ESCAPE_PATTERN = re.compile(r"\\([\\;,nN])")
+
+
+def iter_ics_rows(stream: TextIO) -> Iterator[tuple[int, dict[str, tuple[dict[str, str], str]]]]:
+    """
+    Lazily yields the properties of every VEVENT in an iCalendar stream.
+
+    Folded lines are unfolded as they are read, so only one event is kept in memory at a time.
+    Each item is the line number where the event starts and a mapping of property name to (params, value).
+    """
+    event: dict[str, tuple[dict[str, str], str]] | None = None
+    event_line = 0
+    # Depth of the components nested in the event, such as VALARM, whose properties aren't the event's.
+    nested = 0
+    pending: str | None = None
+    pending_line = 0
+
+    def handle(line_number: int, line: str) -> tuple[int, dict[str, tuple[dict[str, str], str]]] | None:
+        nonlocal event, event_line, nested
+        name_part, _, value = line.partition(":")
+        name, *raw_params = name_part.split(";")
+        name = name.upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event, event_line, nested = {}, line_number, 0
+        elif event is not None and name == "BEGIN":
+            nested += 1
+        elif event is not None and name == "END" and nested:
+            nested -= 1
+        elif name == "END" and value.upper() == "VEVENT" and event is not None:
+            finished, event = event, None
+            return event_line, finished
+        elif event is not None and not nested and name not in event:
+            params = {}
+            for raw_param in raw_params:
+                key, _, param_value = raw_param.partition("=")
+                params[key.upper()] = param_value.strip('"')
+            event[name] = (params, value)
+        return None
+
+    for line_number, raw_line in enumerate(stream, start=1):
+        line = raw_line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            finished_event = handle(pending_line, pending)
+            if finished_event:
+                yield finished_event
+        pending, pending_line = line, line_number
+
+    if pending is not None:
+        finished_event = handle(pending_line, pending)
+        if finished_event:
+            yield finished_event
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[tuple[int, dict[str, str]]]:
+    """
+    Lazily yields the rows of a CSV stream with a header line, keyed by lowercase column name.
+    The row number counts the header as line 1.
+    """
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {key: (value or "").strip() for key, value in row.items() if key}
+
+
+def ics_entry(properties: dict[str, tuple[dict[str, str], str]], default_tz: ZoneInfo) -> dict:
+    """
+    Converts the properties of one VEVENT into a dictionary with a title, a description and UTC datetimes.
+    Floating and all-day times are interpreted in `default_tz`. Events without a SUMMARY, which calendars export for
+    busy time, are titled UNTITLED_EVENT_TITLE.
+    """
+    if "DTSTART" not in properties:
+        raise ValueError("Event has no DTSTART.")
+    start_params, start_value = properties["DTSTART"]
+    start_datetime = _parse_ics_datetime(start_value, start_params, default_tz)
+
+    if "DTEND" in properties:
+        end_params, end_value = properties["DTEND"]
+        end_datetime = _parse_ics_datetime(end_value, end_params, default_tz)
+    elif "DURATION" in properties:
+        end_datetime = start_datetime + _parse_ics_duration(properties["DURATION"][1])
+    elif _is_ics_date(start_value, start_params):
+        end_datetime = start_datetime + timedelta(days=1)
+    else:
+        end_datetime = start_datetime
+
+    return {
+        "title": _unescape_ics_text(properties.get("SUMMARY", ({}, ""))[1]).strip() or UNTITLED_EVENT_TITLE,
+        "description": _unescape_ics_text(properties["DESCRIPTION"][1]) if "DESCRIPTION" in properties else None,
+        "start_datetime": start_datetime,
+        "end_datetime": end_datetime,
+    }
+
+
+def csv_entry(row: dict[str, str], default_tz: ZoneInfo) -> dict:
+    """
+    Converts one CSV row into a dictionary with a title, a description and UTC datetimes.
+    The `description` column may also be called `summary`. Naive datetimes are interpreted in `default_tz`.
+    """
+    for column in ("title", "start_datetime", "end_datetime"):
+        if not row.get(column):
+            raise ValueError(f"Missing value for column '{column}'.")
+    return {
+        "title": row["title"],
+        "description": row.get("description") or row.get("summary") or None,
+        "start_datetime": _to_utc(datetime.fromisoformat(row["start_datetime"]), default_tz),
+        "end_datetime": _to_utc(datetime.fromisoformat(row["end_datetime"]), default_tz),
+    }
+
+
+def _to_utc(value: datetime, default_tz: ZoneInfo) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=default_tz)
+    return value.astimezone(timezone.utc)
+
+
+def _is_ics_date(value: str, params: dict[str, str]) -> bool:
+    return params.get("VALUE", "").upper() == "DATE" or len(value) == 8
+
+
+def _parse_ics_datetime(value: str, params: dict[str, str], default_tz: ZoneInfo) -> datetime:
+    value = value.strip()
+    if _is_ics_date(value, params):
+        return _to_utc(datetime.strptime(value, "%Y%m%d"), default_tz)
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+
+    tz = default_tz
+    if "TZID" in params:
+        try:
+            tz = ZoneInfo(params["TZID"])
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Invalid timezone identifier: '{params['TZID']}'")
+    return _to_utc(datetime.strptime(value, "%Y%m%dT%H%M%S"), tz)
+
+
+def _parse_ics_duration(value: str) -> timedelta:
+    match = _ICS_DURATION_PATTERN.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid DURATION: '{value}'")
+    parts = {key: int(amount) for key, amount in match.groupdict().items() if key != "sign" and amount}
+    duration = timedelta(**parts)
+    return -duration if match.group("sign") == "-" else duration
+
+
+def _unescape_ics_text(value: str) -> str:
+    return _ICS_ESCAPE_PATTERN.sub(lambda match: "\n" if match.group(1) in "nN" else match.group(1), value)
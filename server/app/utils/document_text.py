@@ -0,0 +1,71 @@
+from html.parser import HTMLParser
+from typing import Callable
+
+from app.utils.pdf_text import extract_pdf_text
+
+_HTML_BLOCK_TAGS = {"address", "article", "br", "div", "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer", "hr",
+                    "li", "p", "pre", "section", "table", "tr", "ul", "ol"}
+_HTML_HIDDEN_TAGS = {"script", "style", "template", "noscript", "head"}
+
+
+def extract_document_text(data: bytes, mime_type: str) -> str | None:
+    """
+    Extracts the text of a document of a type read here, the PDF and HTML ones, when it holds the whole content of the
+    document and is smaller than the document itself. Returns None otherwise, for the document to be sent as it is.
+    """
+    extractor = _EXTRACTORS.get(mime_type)
+    text = extractor(data) if extractor else None
+    if text is None or len(text.encode()) >= len(data):
+        return None
+    return text
+
+
+class _HTMLText(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.pieces: list[str] = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in _HTML_HIDDEN_TAGS:
+            self._hidden += 1
+        elif tag in _HTML_BLOCK_TAGS:
+            self.pieces.append("\n")
+        elif tag in ("td", "th"):
+            self.pieces.append("\t")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _HTML_HIDDEN_TAGS:
+            self._hidden = max(self._hidden - 1, 0)
+        elif tag in _HTML_BLOCK_TAGS:
+            self.pieces.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._hidden:
+            self.pieces.append(data)
+
+
+def _html_text(data: bytes) -> str | None:
+    try:
+        html = data.decode("utf-8")
+    except UnicodeDecodeError:
+        # Pages in another charset are left to the model, which reads their declaration.
+        return None
+    parser = _HTMLText()
+    parser.feed(html)
+    parser.close()
+    lines = []
+    for line in "".join(parser.pieces).splitlines():
+        # The cells of a table row are on one line, between bars.
+        cells = [" ".join(cell.split()) for cell in line.split("\t")]
+        if any(cells):
+            lines.append(" | ".join(cell for cell in cells if cell))
+    return "\n".join(lines)
+
+
+_EXTRACTORS: dict[str, Callable[[bytes], str | None]] = {
+    "application/pdf": extract_pdf_text,
+    "text/html": _html_text,
+}
+# The MIME types of the documents whose text is extracted.
+EXTRACTED_TYPES = frozenset(_EXTRACTORS)
@@ -0,0 +1,32 @@
+import io
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Images are re-encoded to WebP, which the model reads and which is about a third of the size of a JPEG of the same
+# quality for photos of documents.
+NORMALIZED_MIME_TYPE = "image/webp"
+
+
+def downscale_image(data: bytes, max_side: int, quality: int) -> bytes | None:
+    """
+    Re-encodes an image to WebP at `quality`, scaled down so that its longest side is at most `max_side` pixels, upright
+    and without metadata such as the EXIF location of a photo. Returns None for images that can't be read, like
+    HEIC ones, which are sent as they are.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEGs are decoded at a fraction of their size when that is still larger than needed, which is faster.
+            image.draft("RGB", (max_side, max_side))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if _has_transparency(image) else "RGB")
+            output = io.BytesIO()
+            image.save(output, format="WEBP", quality=quality, method=4)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+        return None
+    return output.getvalue()
+
+
+def _has_transparency(image: Image.Image) -> bool:
+    return image.mode in ("LA", "PA") or "transparency" in image.info
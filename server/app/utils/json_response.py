@@ -0,0 +1,23 @@
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class ModelJSONResponse(Response):
+    """
+    A JSON response serialized by pydantic, straight from the models to bytes.
+
+    FastAPI serializes a `response_model` into Python dicts and lists, which the response class then encodes again.
+    Routes with large, known responses return this instead: their objects, ORM instances included, are validated
+    against `adapter` and written out by pydantic-core in one pass. The route should still declare its
+    `response_model`, which keeps the schema in the OpenAPI document.
+    """
+    media_type = "application/json"
+
+    def __init__(self, adapter: TypeAdapter, content: Any, status_code: int = 200, headers: dict | None = None):
+        self.adapter = adapter
+        super().__init__(content=content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(content, from_attributes=True))
@@ -0,0 +1,132 @@
+import re
+from typing import Collection
+
+import orjson
+
+_STRING_END = re.compile(r'["\\]')
+_WHITESPACE = " \t\r\n"
+
+
+class JSONObjectStream:
+    """
+    Splits a JSON object that arrives in pieces into its values, as soon as each one is complete: the fields of the
+    object, and the elements of the arrays in `array_fields` one by one, so that a long array can be used before the
+    object ends. Text around the object, like the fence of a Markdown code block, is ignored.
+
+    Only the value being read is kept in memory. The values are returned as JSON text, and aren't checked further
+    than their brackets and quotes, which is left to whoever parses them.
+    """
+
+    def __init__(self, array_fields: Collection[str] = ()):
+        self.array_fields = frozenset(array_fields)
+        self._buffer = ""
+        self._position = 0
+        self._depth = 0
+        self._closed = False
+        self._in_string = False
+        self._in_array = False
+        self._expects_key = False
+        self._key = ""
+        # Where the key or value being read starts in the buffer, and the depth it was opened at.
+        self._token_start: int | None = None
+        self._token_depth = 0
+
+    @property
+    def closed(self) -> bool:
+        """Whether the whole object has been read."""
+        return self._closed
+
+    def feed(self, text: str) -> list[tuple[str, str]]:
+        """
+        Reads the next piece of the object, returning each value it completes as a (field, JSON text) pair. The
+        elements of the arrays in `array_fields` are returned with the field of their array, and the array itself
+        isn't. Raises ValueError when the text can't be a JSON object.
+        """
+        values: list[tuple[str, str]] = []
+        self._buffer += text
+        buffer = self._buffer
+        i = self._position
+        while i < len(buffer) and not self._closed:
+            if self._in_string:
+                match = _STRING_END.search(buffer, i)
+                if match is None:
+                    i = len(buffer)
+                    break
+                i = match.end()
+                if match.group() == "\\":
+                    if i == len(buffer):
+                        # The escaped character is in the next piece.
+                        i -= 1
+                        break
+                    i += 1
+                    continue
+                self._in_string = False
+                if self._depth == self._token_depth and self._token_start is not None:
+                    self._end_token(i, values)
+                continue
+
+            char = buffer[i]
+            if self._token_start is not None and self._token_depth == self._depth and char in _WHITESPACE + ",:]}":
+                # The end of a number, true, false or null.
+                self._end_token(i, values)
+            if char in _WHITESPACE:
+                pass
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._expects_key = True
+            elif char == '"':
+                self._in_string = True
+                self._start_token(i)
+            elif char in "{[":
+                if self._depth == 1 and not self._expects_key and char == "[" and self._key in self.array_fields \
+                        and self._token_start is None:
+                    self._in_array = True
+                else:
+                    self._start_token(i)
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._token_start is not None and self._depth == self._token_depth:
+                    self._end_token(i + 1, values)
+                elif self._depth == 1:
+                    self._in_array = False
+                elif self._depth == 0:
+                    self._closed = True
+            elif char == ":" and self._depth == 1:
+                self._expects_key = False
+            elif char == "," and self._depth == 1:
+                self._expects_key = True
+            elif char not in ",:":
+                self._start_token(i)
+            i += 1
+
+        # Drops what was read, except the key or value in progress.
+        keep_from = i if self._token_start is None else self._token_start
+        self._buffer = buffer[keep_from:]
+        self._position = i - keep_from
+        if self._token_start is not None:
+            self._token_start -= keep_from
+        return values
+
+    def close(self) -> None:
+        """Raises ValueError unless the whole object was read."""
+        if not self._closed:
+            raise ValueError("Invalid JSON format: The object ended early.")
+
+    def _start_token(self, index: int) -> None:
+        if self._token_start is not None:
+            return
+        if self._depth == 1 or (self._depth == 2 and self._in_array):
+            self._token_start = index
+            self._token_depth = self._depth
+
+    def _end_token(self, end: int, values: list[tuple[str, str]]) -> None:
+        token = self._buffer[self._token_start:end]
+        self._token_start = None
+        if self._depth == 1 and self._expects_key:
+            if not token.startswith('"'):
+                raise ValueError(f"Invalid JSON format: Expected a key, got {token[:20]!r}.")
+            self._key = orjson.loads(token)
+        else:
+            values.append((self._key, token))
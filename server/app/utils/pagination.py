@@ -0,0 +1,35 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm import InstrumentedAttribute
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encodes the keyset values of the last item of a page into an opaque, URL-safe cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[InstrumentedAttribute]) -> list[Any]:
+    """
+    Decodes a cursor created by `encode_cursor` into values matching the types of `columns`.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("Invalid cursor.")
+        values = []
+        for value, column in zip(payload, columns):
+            # A tampered cursor can hold any JSON value, which the columns can't be compared with.
+            if isinstance(value, bool) or not isinstance(value, (str, int)):
+                raise ValueError("Invalid cursor.")
+            values.append(datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    return values
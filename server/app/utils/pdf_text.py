@@ -0,0 +1,81 @@
+import io
+
+from pypdf import PdfReader
+from pypdf.generic import DictionaryObject
+
+# An image this large is more likely a scanned page or a table than a logo, and its content would be lost.
+_MAX_IMAGE_PIXELS = 250_000
+# Documents with fewer printable characters per page, once extracted, are taken for scans.
+_MIN_CHARS_PER_PAGE = 100
+# What reading a document may cost, in bytes of decompressed page content: a multiple of its size, up to a cap, so
+# that a small PDF crafted to expand, a decompression bomb, is dropped before its text is extracted. pypdf also caps
+# each stream it decompresses. Documents over the budget are sent as they are.
+_CONTENT_BYTES_PER_BYTE = 20
+_MAX_CONTENT_BYTES = 32 * 1024 * 1024
+_MIN_BUDGETED_BYTES = 64 * 1024
+# Documents with more pages are sent as they are. Counting them walks the page tree, whose nodes can be the kids of
+# several others, making a small tree of many pages: pypdf stops past 100,000 of them.
+_MAX_PAGES = 2000
+
+
+class _UnreadablePDFError(Exception):
+    pass
+
+
+def extract_pdf_text(data: bytes) -> str | None:
+    """
+    Extracts the text of the pages of a PDF, in order, when it holds the whole content of the document: returns None
+    for scanned documents, PDFs with large images, encrypted ones, and those that can't be read.
+    """
+    try:
+        return _extract_text(data)
+    except Exception:
+        # Malformed documents, such as ones missing an object, are sent as they are, for the model to make sense of.
+        return None
+
+
+def _extract_text(data: bytes) -> str | None:
+    if not data.startswith(b"%PDF-"):
+        return None
+    reader = PdfReader(io.BytesIO(data))
+    if reader.is_encrypted:
+        return None
+    if not 0 < len(reader.pages) <= _MAX_PAGES:
+        return None
+
+    budget = min(max(len(data), _MIN_BUDGETED_BYTES) * _CONTENT_BYTES_PER_BYTE, _MAX_CONTENT_BYTES)
+    texts = []
+    for page in reader.pages:
+        if _has_large_images(page.get("/Resources")):
+            return None
+        contents = page.get_contents()
+        budget -= len(contents.get_data()) if contents is not None else 0
+        if budget < 0:
+            raise _UnreadablePDFError("The document decompresses to too many bytes.")
+        texts.append(page.extract_text() if contents is not None else "")
+
+    text = "\n\n".join("\n".join(" ".join(line.split()) for line in page_text.splitlines() if line.strip())
+                       for page_text in texts)
+    printable = sum(1 for char in text if char.isprintable() and not char.isspace())
+    if printable < _MIN_CHARS_PER_PAGE * len(texts) or text.count("�") > printable // 100:
+        return None
+    return text
+
+
+def _has_large_images(resources, depth: int = 0) -> bool:
+    """Whether the images of the resources of a page, including those of its forms, are large."""
+    if depth > 8:
+        raise _UnreadablePDFError("The forms are nested too deeply.")
+    resources = resources.get_object() if resources is not None else None
+    if not isinstance(resources, DictionaryObject):
+        return False
+    xobjects = resources.get("/XObject")
+    xobjects = xobjects.get_object() if xobjects is not None else {}
+    for xobject in xobjects.values():
+        xobject = xobject.get_object()
+        if xobject.get("/Subtype") == "/Image":
+            if int(xobject.get("/Width", 0)) * int(xobject.get("/Height", 0)) > _MAX_IMAGE_PIXELS:
+                return True
+        elif xobject.get("/Subtype") == "/Form" and _has_large_images(xobject.get("/Resources"), depth + 1):
+            return True
+    return False
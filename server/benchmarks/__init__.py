@@ -0,0 +1,7 @@
+"""
+Offline load tests for the API. Requests go through the real app, routers, CRUD layer and LLM tools. Gemini and
+Firebase are replaced by deterministic fakes, and the database is seeded with realistic data volumes.
+
+Usage (from the server directory):
+    python -m benchmarks --help
+"""
@@ -0,0 +1,114 @@
+"""
+Runs the offline load tests and reports the throughput and the p50/p95/p99 latencies of each scenario.
+
+Usage (from the server directory):
+    python -m benchmarks                                  # Every scenario, on an in-memory SQLite database.
+    python -m benchmarks chat schedule --concurrency 50
+    python -m benchmarks --database-url postgresql://localhost/planit_benchmark
+    python -m benchmarks --save-json baseline.json        # On the main branch...
+    python -m benchmarks --compare baseline.json          # ...then on a branch. Exits with 1 on a regression.
+
+The database at --database-url has all of its tables dropped and seeded again: use one dedicated to benchmarks.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from benchmarks.database import SeedVolumes
+from benchmarks.fakes import FakeGenAIClient, ToolRound
+from benchmarks.runner import find_regressions, format_results, run_benchmarks
+from benchmarks.scenarios import SCENARIOS
+
+
+def parse_tool_script(value: str) -> list[ToolRound]:
+    """Parses rounds separated by `;`, each with the tools called at once separated by `,`."""
+    return [[(name.strip(), {}) for name in tool_round.split(",") if name.strip()]
+            for tool_round in value.split(";") if tool_round.strip()]
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", default=[],
+                        help=f"Scenarios to run, all by default: {', '.join(SCENARIOS)}.")
+    parser.add_argument("--database-url", help="Defaults to an in-memory SQLite database.")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once.")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests sent before each scenario.")
+    parser.add_argument("--seed", type=int, default=0)
+
+    volumes = parser.add_argument_group("seeded data, per user")
+    defaults = SeedVolumes()
+    for name, value in vars(defaults).items():
+        volumes.add_argument(f"--{name.replace('_', '-')}", type=int, default=value, dest=f"volume_{name}")
+
+    llm = parser.add_argument_group("fake Gemini model")
+    llm.add_argument("--llm-latency-ms", type=float, default=800.0, help="Latency of each model call.")
+    llm.add_argument("--llm-jitter-ms", type=float, default=200.0, help="Uniform jitter around the latency.")
+    llm.add_argument("--tool-script", type=parse_tool_script,
+                     default=parse_tool_script("get_current_utc_time;get_user_schedule,list_courses"),
+                     help="Tool rounds of each chat turn, such as 'get_current_utc_time;get_user_schedule,"
+                          "list_courses'.")
+    llm.add_argument("--response-chars", type=int, default=1200, help="Length of the model's answers.")
+    llm.add_argument("--course-lectures", type=int, default=32, help="Lectures in each extracted course.")
+    llm.add_argument("--course-evaluations", type=int, default=5, help="Evaluations in each extracted course.")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--save-json", type=Path, help="Saves the results, to be used later with --compare.")
+    output.add_argument("--compare", type=Path, help="Results of a previous run to check for regressions.")
+    output.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative p95 increase or throughput drop allowed by --compare.")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    # Warnings about repeated queries are expected under load, and would drown the report.
+    logging.getLogger("app.core.db").setLevel(logging.ERROR)
+
+    volumes = SeedVolumes(**{name: getattr(args, f"volume_{name}") for name in vars(SeedVolumes())})
+    genai_client = FakeGenAIClient(
+        latency_seconds=args.llm_latency_ms / 1000,
+        jitter_seconds=args.llm_jitter_ms / 1000,
+        tool_script=args.tool_script,
+        response_chars=args.response_chars,
+        course_lectures=args.course_lectures,
+        course_evaluations=args.course_evaluations,
+        seed=args.seed,
+    )
+
+    results = asyncio.run(run_benchmarks(
+        args.scenarios or list(SCENARIOS),
+        database_url=args.database_url or "sqlite://",
+        volumes=volumes,
+        genai_client=genai_client,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        seed=args.seed,
+    ))
+    print(format_results(results))
+
+    if args.save_json:
+        args.save_json.write_text(json.dumps([result.as_dict() for result in results], indent=2))
+    if args.compare:
+        regressions = find_regressions(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
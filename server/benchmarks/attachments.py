@@ -0,0 +1,56 @@
+"""
+Compares a chat about a PDF sent inline, and so again in the history of every turn, with one about the PDF uploaded
+once to the file storage and referenced. The user sends a --file-mb PDF with the first of --turns messages. Reports the
+bytes of the contents of all the requests, those uploaded to the file storage, and the time to send both at
+--upload-mbps. Prompt caching is disabled, to compare the requests whole.
+
+Usage (from the server directory):
+    python -m benchmarks.attachments --file-mb 5 --turns 8
+"""
+import argparse
+import asyncio
+import random
+import sys
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.services import GoogleAIService
+from benchmarks.fakes import FakeGenAIClient
+
+
+async def chat(args: argparse.Namespace, pdf: bytes) -> FakeGenAIClient:
+    """Returns the client the chat was sent to."""
+    client = FakeGenAIClient()
+    ai_service = GoogleAIService(api_key="", client=client)
+    history = []
+    for turn in range(args.turns):
+        files = [(pdf, "application/pdf")] if turn == 0 else None
+        _, new_content = await ai_service.send_message(instruction="", message=f"Question {turn} about the PDF.",
+                                                       tools=[], files=files, llm_context=history)
+        history += new_content
+    return client
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.attachments", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file-mb", type=float, default=5)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--upload-mbps", type=float, default=20)
+    args = parser.parse_args(argv)
+    pdf = b"%PDF-1.7\n" + random.Random(0).randbytes(int(args.file_mb * 1024 * 1024))
+
+    print(f"{'mode':<11}{'requests MB':>13}{'uploads MB':>12}{'send s':>8}")
+    for enabled in (False, True):
+        with patch.object(settings, "LLM_FILE_UPLOAD_ENABLED", enabled), \
+                patch.object(settings, "LLM_PROMPT_CACHE_ENABLED", False):
+            client = asyncio.run(chat(args, pdf))
+        requests_mb = sum(client.request_bytes) / 1024 / 1024
+        uploads_mb = client.files.uploaded_bytes / 1024 / 1024
+        send_seconds = (requests_mb + uploads_mb) * 8 * 1.048576 / args.upload_mbps
+        print(f"{'reference' if enabled else 'inline':<11}{requests_mb:>13.2f}{uploads_mb:>12.2f}{send_seconds:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
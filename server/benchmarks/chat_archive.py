@@ -0,0 +1,115 @@
+"""
+Measures the throughput of the chat archival job (`scripts/archive_chat_history.py`) on a large history. Seeds
+--users users with --messages-per-user messages each, then archives all but the last --keep-messages of each user,
+reporting the seeding time, the messages moved per second and the time per batch.
+
+With --reader, a thread reads the hot window of random users while the job runs, as the chat router does before a
+turn, and the latencies of those reads are reported too.
+
+Usage (from the server directory):
+    python -m benchmarks.chat_archive --users 2000 --messages-per-user 1000
+    python -m benchmarks.chat_archive --database-url postgresql://... --users 2000 --messages-per-user 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import Engine, create_engine, insert, select
+
+import app.models  # noqa: F401 (registers every table in Base.metadata)
+from app.core.db import Base
+from app.models import ChatMessage, User
+from app.services.chat_archive_service import archive_chat_history
+from benchmarks.fakes import fake_text
+from benchmarks.runner import percentile
+
+_INSERT_BATCH_SIZE = 10_000
+
+
+def seed_history(engine: Engine, users: int, messages_per_user: int, rng: random.Random) -> None:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    texts = [fake_text(rng.randint(40, 400), rng) for _ in range(64)]
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"uuid": f"user-{u:06d}", "name": f"User {u}", "email": f"user-{u}@planit.ai", "hashed_password": ""}
+            for u in range(users)
+        ])
+        rows = []
+        for u in range(users):
+            for order in range(messages_per_user):
+                text = texts[(u + order) % len(texts)]
+                role = "user" if order % 2 == 0 else "model"
+                rows.append({"uuid": f"user-{u:06d}-{order}", "order": order, "role": role, "text": text,
+                             "content": [{"role": role, "parts": [{"text": text}]}],
+                             "owner_uuid": f"user-{u:06d}"})
+                if len(rows) == _INSERT_BATCH_SIZE:
+                    connection.execute(insert(ChatMessage), rows)
+                    rows.clear()
+        if rows:
+            connection.execute(insert(ChatMessage), rows)
+
+
+def read_hot_windows(engine: Engine, users: int, keep_messages: int, stop: threading.Event,
+                     latencies: list[float]) -> None:
+    rng = random.Random(1)
+    while not stop.is_set():
+        start = time.perf_counter()
+        with engine.connect() as connection:
+            connection.execute(
+                select(ChatMessage.content).filter_by(owner_uuid=f"user-{rng.randrange(users):06d}")
+                .order_by(ChatMessage.order.desc()).limit(keep_messages)
+            ).all()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.chat_archive", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None,
+                        help="Defaults to a temporary SQLite file. The tables of the database are dropped.")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--messages-per-user", type=int, default=1000)
+    parser.add_argument("--keep-messages", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--reader", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(directory, 'chat_archive.db')}")
+        total = args.users * args.messages_per_user
+        start = time.perf_counter()
+        seed_history(engine, args.users, args.messages_per_user, random.Random(args.seed))
+        print(f"Seeded {total} messages in {time.perf_counter() - start:.1f}s.")
+
+        stop = threading.Event()
+        latencies: list[float] = []
+        reader = threading.Thread(target=read_hot_windows,
+                                  args=(engine, args.users, args.keep_messages, stop, latencies))
+        if args.reader:
+            reader.start()
+        try:
+            run = archive_chat_history(engine, keep_messages=args.keep_messages, batch_size=args.batch_size)
+        finally:
+            stop.set()
+            if args.reader:
+                reader.join()
+        engine.dispose()
+
+    print(f"Archived {run.messages} messages of {run.users} users in {run.batches} batches: {run.seconds:.1f}s, "
+          f"{run.messages_per_second:.0f} messages/s, {run.seconds / max(run.batches, 1) * 1000:.1f} ms per batch.")
+    if latencies:
+        latencies.sort()
+        print(f"Hot window reads during the run: {len(latencies)}, p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+              f"p99 {percentile(latencies, 99) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,94 @@
+"""
+Compares the storage of chat contents on SQLite as JSON text, the format written before `CompactJSON`, with
+`CompactJSON`, uncompressed and compressed from --compress-from-bytes on. Reports the bytes stored for a history and
+the CPU spent reading it back into `Content` objects, as the chat router does before each turn. On PostgreSQL, the
+JSONB column is parsed like the uncompressed format, and compressed by the database.
+
+The contents are a mix of short messages, long answers and turns carrying the output of `list_courses_and_details`.
+
+Usage (from the server directory):
+    python -m benchmarks.chat_storage --messages 200
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from google.genai.types import Content, Part
+from pydantic import TypeAdapter
+from sqlalchemy import Column, Integer, MetaData, Table, Text, create_engine, func, insert, select
+
+from app.core.config import settings
+from app.core.db_types import CompactJSON
+from benchmarks.fakes import fake_text
+from benchmarks.serialization import turn_contents
+
+_contents_adapter = TypeAdapter(list[Content])
+
+
+def history_contents(messages: int, rng: random.Random) -> list[list[Content]]:
+    history = []
+    for order in range(messages):
+        if order % 10 == 9:
+            history.append(turn_contents(courses=6, lectures=32, rng=rng))
+        else:
+            role, chars = ("user", 120) if order % 2 == 0 else ("model", 900)
+            history.append([Content(role=role, parts=[Part(text=fake_text(chars, rng))])])
+    return history
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.chat_storage", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--compress-from-bytes", type=int, default=settings.CHAT_CONTENT_COMPRESS_FROM_BYTES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    history = history_contents(args.messages, random.Random(args.seed))
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    formats = {
+        "json text": Text(),
+        "compact": CompactJSON(compress_from_bytes=sys.maxsize),
+        "compressed": CompactJSON(compress_from_bytes=args.compress_from_bytes),
+    }
+    tables = {name: Table(name.replace(" ", "_"), metadata, Column("id", Integer, primary_key=True),
+                          Column("content", column_type))
+              for name, column_type in formats.items()}
+    metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        connection.execute(insert(tables["json text"]), [
+            {"id": i, "content": json.dumps([content.model_dump(mode="json") for content in contents])}
+            for i, contents in enumerate(history)
+        ])
+        for name in ("compact", "compressed"):
+            connection.execute(insert(tables[name]), [
+                {"id": i, "content": _contents_adapter.dump_python(contents, mode="json", exclude_none=True)}
+                for i, contents in enumerate(history)
+            ])
+
+    def read(connection, table: Table) -> list[Content]:
+        rows = connection.execute(select(table.c.content).order_by(table.c.id)).scalars()
+        if table is tables["json text"]:
+            return [Content.model_validate(item) for row in rows for item in json.loads(row)]
+        return [content for row in rows for content in _contents_adapter.validate_python(row)]
+
+    print(f"{'format':<14}{'KiB stored':>12}{'CPU ms per read':>18}")
+    with engine.connect() as connection:
+        for name, table in tables.items():
+            assert read(connection, table) == read(connection, tables["json text"])
+            stored = connection.execute(select(func.sum(func.length(table.c.content)))).scalar_one()
+            start = time.process_time()
+            for _ in range(args.iterations):
+                read(connection, table)
+            cpu = (time.process_time() - start) / args.iterations
+            print(f"{name:<14}{stored / 1024:>12.1f}{cpu * 1000:>18.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
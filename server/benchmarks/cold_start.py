@@ -0,0 +1,100 @@
+"""
+Measures the cold start of the API, as paid by the first request of a container that scaled from zero. Each run
+starts a fresh interpreter and times, in order:
+
+    interpreter    starting Python, until the benchmark code runs
+    import         importing app.main
+    startup        running the app's lifespan
+    first request  an authenticated request, which initializes the Firebase app and opens the first connection
+    ai service     building the Gemini client, paid by the first chat message or course extraction
+
+Usage (from the server directory):
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_MODULE_STARTED_AT = time.time()
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+PHASES = ["interpreter", "import", "startup", "first request", "ai service"]
+_USER_UUID = "cold-start-user"
+_LAUNCHED_AT_ENV = "COLD_START_LAUNCHED_AT"
+
+
+async def _measure_in_process() -> dict[str, float]:
+    timings = {"interpreter": _MODULE_STARTED_AT - float(os.environ[_LAUNCHED_AT_ENV])}
+    start = time.perf_counter()
+    from app.main import app
+    timings["import"] = time.perf_counter() - start
+
+    import httpx
+    from app.core.db import SessionLocal
+    from app.models import User
+    from app.services import get_google_ai_service
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup"] = time.perf_counter() - start
+
+        with SessionLocal() as db:
+            db.add(User(uuid=_USER_UUID, name="Cold Start", email="cold-start@planit.ai", hashed_password=""))
+            db.commit()
+
+        # The fake verifier imports the Firebase SDK, which the app would import on its first request.
+        start = time.perf_counter()
+        from benchmarks.fakes import FakeFirebaseVerifier
+        verifier = FakeFirebaseVerifier()
+        with verifier.installed():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://cold-start") as client:
+                response = await client.get("/api/user/", headers=verifier.headers_for(_USER_UUID))
+                timings["first request"] = time.perf_counter() - start
+        response.raise_for_status()
+
+        start = time.perf_counter()
+        get_google_ai_service()
+        timings["ai service"] = time.perf_counter() - start
+    return timings
+
+
+def _run_once(database_url: str) -> dict[str, float]:
+    env = {**os.environ, "DATABASE_URL": database_url, _LAUNCHED_AT_ENV: repr(time.time())}
+    env.setdefault("GOOGLE_API_KEY", "cold-start")
+    process = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", "--child"], cwd=SERVER_DIR, env=env,
+                             capture_output=True, text=True, check=True)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(_measure_in_process())))
+        return 0
+
+    runs = []
+    for run in range(args.runs):
+        with tempfile.TemporaryDirectory() as directory:
+            runs.append(_run_once(f"sqlite:///{directory}/cold_start.db"))
+
+    print(f"{'phase':<16}{'median ms':>12}{'max ms':>12}")
+    for phase in [*PHASES, "total"]:
+        values = [sum(run.values()) if phase == "total" else run[phase] for run in runs]
+        print(f"{phase:<16}{statistics.median(values) * 1000:>12.1f}{max(values) * 1000:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""
+Measures the course extraction of `extract_course` for a long text syllabus, sent whole in one model call or split
+into parts of --part-chars characters extracted --concurrency at a time. The fake model answers after --llm-latency-ms
+plus --prefill-ms-per-1k-tokens for each thousand tokens of the prompt, so that a longer prompt takes longer.
+
+Usage (from the server directory):
+    python -m benchmarks.course_extraction --syllabus-chars 400000 --part-chars 100000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.services import GoogleAIService, extract_course
+from benchmarks.fakes import FakeGenAIClient, fake_text
+
+
+async def extract(args: argparse.Namespace, syllabus: bytes) -> tuple[float, int]:
+    """Returns the seconds the extraction took and the model calls it made."""
+    client = FakeGenAIClient(latency_seconds=args.llm_latency_ms / 1000,
+                             prefill_seconds_per_1k_tokens=args.prefill_ms_per_1k_tokens / 1000)
+    ai_service = GoogleAIService(api_key="", client=client)
+    start = time.perf_counter()
+    await extract_course(ai_service, files=[(syllabus, "text/plain")])
+    return time.perf_counter() - start, client.calls
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.course_extraction", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--syllabus-chars", type=int, default=400_000)
+    parser.add_argument("--part-chars", type=int, default=settings.COURSE_EXTRACTION_TEXT_PART_CHARS)
+    parser.add_argument("--concurrency", type=int, default=settings.COURSE_EXTRACTION_CONCURRENCY)
+    parser.add_argument("--llm-latency-ms", type=float, default=2000)
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=100)
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+    syllabus = "\n".join(fake_text(80, rng) for _ in range(args.syllabus_chars // 81)).encode()
+
+    print(f"{'mode':<10}{'seconds':>10}{'calls':>8}")
+    for mode, part_chars in (("whole", len(syllabus) + 1), ("parts", args.part_chars)):
+        with patch.object(settings, "COURSE_EXTRACTION_TEXT_PART_CHARS", part_chars), \
+                patch.object(settings, "COURSE_EXTRACTION_CONCURRENCY", args.concurrency):
+            seconds, calls = asyncio.run(extract(args, syllabus))
+        print(f"{mode:<10}{seconds:>10.2f}{calls:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,156 @@
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterator
+
+from google.genai.types import Content, Part
+from sqlalchemy import Engine, create_engine, event, insert
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 (registers every table in Base.metadata)
+from app.core.db import Base, SessionLocal, instrument_engine
+from app.models import ChatMessage, Course, Evaluation, Event, Lecture, Routine, User
+from benchmarks.fakes import fake_text
+
+_INSERT_BATCH_SIZE = 1000
+_WEEKDAYS = 0b0011111
+
+
+@dataclass
+class SeedVolumes:
+    """Rows seeded per user. The defaults are those of a student halfway through a semester."""
+    users: int = 50
+    courses: int = 6
+    lectures_per_course: int = 32
+    evaluations_per_course: int = 5
+    events: int = 120
+    routines: int = 6
+    chat_messages: int = 60
+
+
+@dataclass
+class SeededUser:
+    uuid: str
+    course_uuids: list[str] = field(default_factory=list)
+    lecture_uuids: list[str] = field(default_factory=list)
+    event_uuids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SeededData:
+    users: list[SeededUser]
+    semester_start: datetime
+    semester_end: datetime
+
+
+def create_benchmark_engine(database_url: str) -> Engine:
+    """
+    Creates an engine configured like the app's.
+
+    An in-memory SQLite database lives in a single connection, shared by every session. It runs in autocommit mode,
+    since the transactions of concurrent requests would otherwise be interleaved on that connection. Transaction
+    contention is only measured against a real server, such as PostgreSQL.
+    """
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        engine = create_engine(database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool,
+                               isolation_level="AUTOCOMMIT")
+    else:
+        engine = create_engine(database_url, pool_pre_ping=True)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", lambda dbapi_connection, _: dbapi_connection.execute("PRAGMA foreign_keys=ON"))
+    instrument_engine(engine)
+    return engine
+
+
+@contextmanager
+def bound_sessions(engine: Engine) -> Iterator[None]:
+    """Binds `SessionLocal`, used by the request sessions and the LLM tools, to `engine` while the block runs."""
+    previous = SessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)
+    try:
+        yield
+    finally:
+        SessionLocal.configure(bind=previous)
+
+
+def seed_database(engine: Engine, volumes: SeedVolumes, seed: int = 0,
+                  today: datetime | None = None) -> SeededData:
+    """
+    Drops and recreates every table, then fills them with `volumes` rows per user. The semester is centered on
+    `today`, so that schedule reads find lectures, evaluations and events around the current date.
+
+    Every table is dropped first: never point this at a database whose data matters.
+    """
+    rng = random.Random(seed)
+    today = (today or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+    semester_start = today - timedelta(weeks=8)
+    semester_weeks = max(1, (volumes.lectures_per_course + 1) // 2)
+    semester_end = semester_start + timedelta(weeks=semester_weeks)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    rows: dict[type, list[dict]] = {model: [] for model in (User, Course, Lecture, Evaluation, Event, Routine,
+                                                            ChatMessage)}
+    user_content, model_content = _chat_contents(rng)
+    users = []
+    for u in range(volumes.users):
+        user = SeededUser(uuid=f"benchmark-user-{u}")
+        users.append(user)
+        rows[User].append(dict(uuid=user.uuid, name=f"Benchmark User {u}", email=f"benchmark-{u}@planit.ai",
+                               hashed_password="", is_active=True))
+
+        for c in range(volumes.courses):
+            course_uuid = f"{user.uuid}-course-{c}"
+            user.course_uuids.append(course_uuid)
+            rows[Course].append(dict(uuid=course_uuid, title=f"Course {c}", semester="2025.2",
+                                     description="A course seeded for the benchmarks.", owner_uuid=user.uuid))
+            # Two lectures a week, at the same weekday and hour, like a timetable.
+            weekday, hour = (c * 2) % 5, 8 + 2 * (c % 5)
+            for i in range(volumes.lectures_per_course):
+                start = semester_start + timedelta(weeks=i // 2, days=weekday + 2 * (i % 2), hours=hour)
+                lecture_uuid = f"{course_uuid}-lecture-{i}"
+                user.lecture_uuids.append(lecture_uuid)
+                rows[Lecture].append(dict(uuid=lecture_uuid, title=f"Lecture {i + 1}", start_datetime=start,
+                                          end_datetime=start + timedelta(hours=2), summary=f"Topics {i + 1}.",
+                                          present=start < today, course_uuid=course_uuid))
+            for e in range(volumes.evaluations_per_course):
+                week = (e + 1) * semester_weeks // (volumes.evaluations_per_course + 1)
+                start = semester_start + timedelta(weeks=week, days=weekday, hours=hour)
+                rows[Evaluation].append(dict(uuid=f"{course_uuid}-evaluation-{e}", type="exam", title=f"Exam {e + 1}",
+                                             start_datetime=start, end_datetime=start + timedelta(hours=2),
+                                             present=False, course_uuid=course_uuid))
+
+        for e in range(volumes.events):
+            start = semester_start + timedelta(days=rng.randrange(semester_weeks * 7), hours=rng.randrange(8, 22))
+            event_uuid = f"{user.uuid}-event-{e}"
+            user.event_uuids.append(event_uuid)
+            rows[Event].append(dict(uuid=event_uuid, title=f"Event {e}", description="Seeded event.",
+                                    start_datetime=start, end_datetime=start + timedelta(hours=rng.randint(1, 3)),
+                                    owner_uuid=user.uuid))
+        for r in range(volumes.routines):
+            start = time(6 + 2 * r % 16)
+            rows[Routine].append(dict(uuid=f"{user.uuid}-routine-{r}", title=f"Routine {r}", flexible=r % 2 == 0,
+                                      start_time=start.strftime("%H:%M"),
+                                      end_time=time(start.hour + 1).strftime("%H:%M"),
+                                      days_of_the_week=_WEEKDAYS, owner_uuid=user.uuid))
+        for m in range(volumes.chat_messages):
+            role, content = ("user", user_content) if m % 2 == 0 else ("model", model_content)
+            rows[ChatMessage].append(dict(uuid=f"{user.uuid}-message-{m}", order=m, role=role,
+                                          text=f"Seeded {role} message {m}.", content=content, owner_uuid=user.uuid))
+
+    with engine.begin() as connection:
+        for model, model_rows in rows.items():
+            for start in range(0, len(model_rows), _INSERT_BATCH_SIZE):
+                connection.execute(insert(model), model_rows[start:start + _INSERT_BATCH_SIZE])
+
+    return SeededData(users=users, semester_start=semester_start, semester_end=semester_end)
+
+
+def _chat_contents(rng: random.Random) -> tuple[list[dict], list[dict]]:
+    """The stored LLM contents of a user message and of a model answer, of typical lengths."""
+    user_content = Content(role="user", parts=[Part(text=fake_text(120, rng))])
+    model_content = Content(role="model", parts=[Part(text=fake_text(900, rng))])
+    return ([user_content.model_dump(mode="json", exclude_none=True)],
+            [model_content.model_dump(mode="json", exclude_none=True)])
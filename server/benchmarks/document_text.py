@@ -0,0 +1,59 @@
+"""
+Compares sending syllabi to the model as they are with sending the text extracted from them, over a corpus of PDF
+syllabi of --lectures lectures each, text-based and scanned. Reports, per syllabus, the bytes of the request content
+sent to the API, with files in base64, and the latency of the course extraction. The fake model answers after
+--llm-latency-ms plus --prefill-ms-per-1k-tokens for each thousand tokens of the prompt, counted from its size.
+
+Usage (from the server directory):
+    python -m benchmarks.document_text --lectures 15 30 60 120
+"""
+import argparse
+import asyncio
+import sys
+import time
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.schemas import CourseGenerate
+from app.services import GoogleAIService
+from app.services.google_ai_service import create_content_from_files
+from benchmarks.fakes import FakeGenAIClient, fake_syllabus_pdf
+
+
+async def extract(args: argparse.Namespace, syllabus: bytes) -> tuple[int, float]:
+    """Returns the bytes of the request content and the seconds the extraction took."""
+    content = await create_content_from_files(role="user", files=[(syllabus, "application/pdf")])
+    client = FakeGenAIClient(latency_seconds=args.llm_latency_ms / 1000,
+                             prefill_seconds_per_1k_tokens=args.prefill_ms_per_1k_tokens / 1000)
+    ai_service = GoogleAIService(api_key="", client=client)
+    start = time.perf_counter()
+    await ai_service.generate_structured_output(CourseGenerate, files=[(syllabus, "application/pdf")])
+    return len(content.model_dump_json(exclude_none=True)), time.perf_counter() - start
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.document_text", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lectures", type=int, nargs="+", default=[15, 30, 60, 120])
+    parser.add_argument("--evaluations", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=2000)
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=100)
+    args = parser.parse_args(argv)
+
+    print(f"{'syllabus':<16}{'pdf KB':>9}{'bytes KB':>10}{'text KB':>9}{'bytes ms':>10}{'text ms':>9}")
+    for lectures in args.lectures:
+        for scanned in (False, True):
+            syllabus = fake_syllabus_pdf(lectures, args.evaluations, scanned=scanned)
+            results = []
+            for enabled in (False, True):
+                with patch.object(settings, "LLM_DOCUMENT_TEXT_EXTRACTION_ENABLED", enabled):
+                    results.append(asyncio.run(extract(args, syllabus)))
+            (inline_bytes, inline_seconds), (text_bytes, text_seconds) = results
+            name = f"{lectures} {'scanned' if scanned else 'text'}"
+            print(f"{name:<16}{len(syllabus) / 1024:>9.1f}{inline_bytes / 1024:>10.1f}{text_bytes / 1024:>9.1f}"
+                  f"{inline_seconds * 1000:>10.0f}{text_seconds * 1000:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,461 @@
+import asyncio
+import io
+import itertools
+import json
+import random
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Iterable, Iterator
+from unittest.mock import patch
+
+import orjson
+from firebase_admin import auth
+from google.genai import errors
+from PIL import Image, ImageDraw
+from google.genai.types import CachedContent, Candidate, Content, CreateCachedContentConfig, File, FileState, \
+    FinishReason, FunctionCall, GenerateContentConfig, GenerateContentResponse, GenerateContentResponseUsageMetadata, \
+    Part, UpdateCachedContentConfig, UploadFileConfig
+from pydantic import BaseModel, TypeAdapter
+
+# A round of tool calls requested at once by the model, as (tool name, arguments) pairs.
+ToolRound = list[tuple[str, dict]]
+# A fault injected in a call of `FaultyGenAIClient`: an error to raise, seconds of extra latency, or None for none.
+Fault = Exception | float | None
+
+_WORDS = ("the", "lecture", "schedule", "exam", "week", "course", "study", "assignment", "review", "notes", "class",
+          "project", "deadline", "topic", "chapter")
+_CHARS_PER_TOKEN = 4
+_ERROR_STATUSES = {400: "INVALID_ARGUMENT", 429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE",
+                   504: "DEADLINE_EXCEEDED"}
+_contents_adapter = TypeAdapter(list[Content])
+
+
+class FakeGenAIClient:
+    """
+    Stands in for `genai.Client` in `GoogleAIService`, answering `client.aio.models.generate_content` after a
+    configurable latency.
+
+    Chat calls follow `tool_script`: each round of tool calls is requested in turn, counted from the last user
+    message, and the model then answers with `response_chars` characters of text. Structured output calls return
+    `structured_output(schema)`, a course with `course_lectures` lectures and `course_evaluations` evaluations by
+    default. The same `seed` always produces the same latencies and texts.
+
+    `client.aio.models.generate_content_stream` answers the same, in chunks of `stream_chunk_chars` characters: the
+    first after the latency of the whole response, and each of the others `stream_chunk_seconds` later.
+
+    Prompts cost `prefill_seconds_per_1k_tokens` of extra latency per thousand input tokens, except for the tokens
+    read from a cache. `client.aio.caches` keeps explicit caches like the API does, refusing those under
+    `min_cache_tokens` tokens and requests that repeat what their cache holds. Set `supports_caching` to false to
+    reject every cache, as for a model without explicit caching. `client.aio.files` keeps uploaded files, whose
+    references cost the tokens of the file in a prompt, and are rejected once the file is gone. The size of the
+    contents of each request is kept in `request_bytes`.
+    """
+
+    def __init__(self,
+                 latency_seconds: float = 0.0,
+                 jitter_seconds: float = 0.0,
+                 tool_script: list[ToolRound] | None = None,
+                 response_chars: int = 500,
+                 course_lectures: int = 30,
+                 course_evaluations: int = 5,
+                 structured_output: Callable[[type[BaseModel]], str] | None = None,
+                 prefill_seconds_per_1k_tokens: float = 0.0,
+                 min_cache_tokens: int = 1024,
+                 supports_caching: bool = True,
+                 stream_chunk_chars: int = 256,
+                 stream_chunk_seconds: float = 0.0,
+                 seed: int = 0):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.tool_script = tool_script or []
+        self.response_chars = response_chars
+        self.course_lectures = course_lectures
+        self.course_evaluations = course_evaluations
+        self.structured_output = structured_output or (lambda _: fake_course_json(
+            lectures=self.course_lectures, evaluations=self.course_evaluations))
+        self.prefill_seconds_per_1k_tokens = prefill_seconds_per_1k_tokens
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_seconds = stream_chunk_seconds
+        self.calls = 0
+        self._random = random.Random(seed)
+        self.caches = FakeCaches(min_cache_tokens, supports_caching)
+        self.files = FakeFiles()
+        self.request_bytes: list[int] = []
+        self.aio = _FakeAsyncClient(self)
+
+    async def generate_content(self, *, model: str, contents, config: GenerateContentConfig | None = None):
+        self.calls += 1
+        contents = contents if isinstance(contents, list) else [contents]
+        cached_tokens = 0
+        if config is not None and config.cached_content:
+            if config.system_instruction or config.tools or config.tool_config:
+                raise _client_error(400, "CachedContent can not be used with GenerateContent request setting "
+                                         "system_instruction, tools or tool_config.", "INVALID_ARGUMENT")
+            cached_tokens = self.caches.tokens(config.cached_content)
+        self.request_bytes.append(len(_contents_adapter.dump_json(contents, exclude_none=True)))
+        prompt_tokens = _prompt_tokens(config, contents) + self.files.referenced_tokens(contents)
+        await asyncio.sleep(self._latency() + self.prefill_seconds_per_1k_tokens * prompt_tokens / 1000)
+
+        if config is not None and config.response_schema is not None:
+            parts = [Part(text=self.structured_output(config.response_schema))]
+        else:
+            tool_round = _count_tool_rounds(contents)
+            if tool_round < len(self.tool_script):
+                parts = [Part(function_call=FunctionCall(name=name, args=args))
+                         for name, args in self.tool_script[tool_round]]
+            else:
+                parts = [Part(text=fake_text(self.response_chars, self._random))]
+
+        return GenerateContentResponse(
+            candidates=[Candidate(content=Content(role="model", parts=parts), finish_reason=FinishReason.STOP)],
+            usage_metadata=_usage_metadata(prompt_tokens, cached_tokens, parts),
+        )
+
+    async def generate_content_stream(self, *, model: str, contents, config: GenerateContentConfig | None = None
+                                      ) -> AsyncIterator[GenerateContentResponse]:
+        response = await self.generate_content(model=model, contents=contents, config=config)
+        return self._stream(response)
+
+    async def _stream(self, response: GenerateContentResponse) -> AsyncIterator[GenerateContentResponse]:
+        parts = response.candidates[0].content.parts
+        if parts[0].text is None:
+            yield response
+            return
+        text = "".join(part.text for part in parts)
+        pieces = [text[i:i + self.stream_chunk_chars] for i in range(0, len(text), self.stream_chunk_chars)] or [""]
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(self.stream_chunk_seconds)
+            last = index == len(pieces) - 1
+            yield GenerateContentResponse(
+                candidates=[Candidate(content=Content(role="model", parts=[Part(text=piece)]),
+                                      finish_reason=FinishReason.STOP if last else None)],
+                usage_metadata=response.usage_metadata if last else None,
+            )
+
+    def _latency(self) -> float:
+        return max(0.0, self.latency_seconds + self._random.uniform(-self.jitter_seconds, self.jitter_seconds))
+
+
+class FaultyGenAIClient(FakeGenAIClient):
+    """
+    A `FakeGenAIClient` whose calls fail or stall. The calls take the faults of `faults` in turn, then draw them at
+    random: a 503 with probability `error_rate`, or else `stall_seconds` of extra latency with probability
+    `stall_rate`. The model of each call is kept in `models`.
+    """
+
+    def __init__(self, faults: Iterable[Fault] = (), error_rate: float = 0.0, stall_rate: float = 0.0,
+                 stall_seconds: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.faults = list(faults)
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.models: list[str] = []
+
+    async def generate_content(self, *, model: str, contents, config: GenerateContentConfig | None = None):
+        self.models.append(model)
+        fault = self.faults.pop(0) if self.faults else self._draw_fault()
+        if isinstance(fault, Exception):
+            await asyncio.sleep(self._latency())
+            raise fault
+        if fault:
+            await asyncio.sleep(fault)
+        return await super().generate_content(model=model, contents=contents, config=config)
+
+    def _draw_fault(self) -> Fault:
+        draw = self._random.random()
+        if draw < self.error_rate:
+            return api_error(503)
+        if draw < self.error_rate + self.stall_rate:
+            return self.stall_seconds
+        return None
+
+
+class FakeCaches:
+    """The explicit caches of `FakeGenAIClient`, as `client.aio.caches`."""
+
+    def __init__(self, min_tokens: int, supported: bool = True):
+        self.min_tokens = min_tokens
+        self.supported = supported
+        self.created = 0
+        self.updated = 0
+        self.deleted = 0
+        self._tokens: dict[str, int] = {}
+        self._names = itertools.count(1)
+
+    async def create(self, *, model: str, config: CreateCachedContentConfig) -> CachedContent:
+        if not self.supported:
+            raise _client_error(404, f"models/{model} is not found for createCachedContent.", "NOT_FOUND")
+        tokens = _prompt_tokens(config, config.contents or [])
+        if tokens < self.min_tokens:
+            raise _client_error(400, f"Cached content is too small. total_token_count={tokens}, "
+                                     f"min_total_token_count={self.min_tokens}", "INVALID_ARGUMENT")
+        name = f"cachedContents/fake-{next(self._names)}"
+        self._tokens[name] = tokens
+        self.created += 1
+        return CachedContent(name=name, model=model)
+
+    async def update(self, *, name: str, config: UpdateCachedContentConfig) -> CachedContent:
+        self.tokens(name)
+        self.updated += 1
+        return CachedContent(name=name)
+
+    async def delete(self, *, name: str) -> None:
+        self.tokens(name)
+        del self._tokens[name]
+        self.deleted += 1
+
+    def expire(self, name: str) -> None:
+        """Drops a cache as if its TTL had run out on the API's side."""
+        del self._tokens[name]
+
+    def tokens(self, name: str) -> int:
+        if name not in self._tokens:
+            raise _client_error(403, "CachedContent not found (or permission denied)", "PERMISSION_DENIED")
+        return self._tokens[name]
+
+
+class FakeFiles:
+    """The file storage of `FakeGenAIClient`, as `client.aio.files`."""
+
+    def __init__(self):
+        self.uploaded = 0
+        self.uploaded_bytes = 0
+        self._files: dict[str, File] = {}
+        self._names = itertools.count(1)
+
+    async def upload(self, *, file: io.IOBase, config: UploadFileConfig) -> File:
+        data = file.read()
+        name = f"files/fake-{next(self._names)}"
+        self._files[name] = File(
+            name=name, uri=f"https://generativelanguage.googleapis.com/v1beta/{name}", mime_type=config.mime_type,
+            size_bytes=len(data), state=FileState.ACTIVE,
+            expiration_time=datetime.now(timezone.utc) + timedelta(hours=48))
+        self.uploaded += 1
+        self.uploaded_bytes += len(data)
+        return self._files[name]
+
+    async def get(self, *, name: str) -> File:
+        if name not in self._files:
+            raise _client_error(403, f"You do not have permission to access the File {name.removeprefix('files/')} "
+                                     f"or it may not exist.", "PERMISSION_DENIED")
+        return self._files[name]
+
+    def expire(self, name: str) -> None:
+        """Drops a file as if its 48 hours had run out on the API's side."""
+        del self._files[name]
+
+    def referenced_tokens(self, contents: list[Content]) -> int:
+        """The tokens of the files referenced by `contents`, as many as if they were sent inline."""
+        tokens = 0
+        for content in contents:
+            for part in content.parts or []:
+                if part.file_data:
+                    file = self._files.get("files/" + part.file_data.file_uri.rsplit("/files/", 1)[-1])
+                    if file is None:
+                        raise _client_error(403, "You do not have permission to access the File or it may not "
+                                                 "exist.", "PERMISSION_DENIED")
+                    tokens += file.size_bytes * 4 // 3 // _CHARS_PER_TOKEN
+        return tokens
+
+
+class _FakeAsyncClient:
+    def __init__(self, client: FakeGenAIClient):
+        self.models = client
+        self.caches = client.caches
+        self.files = client.files
+
+
+class FakeFirebaseVerifier:
+    """
+    Replaces `firebase_admin.auth.verify_id_token` while installed. Tokens issued by `token_for` decode to the
+    Firebase UID they were issued for, and any other token is rejected.
+    """
+
+    _PREFIX = "fake-firebase-token:"
+
+    def token_for(self, uid: str) -> str:
+        return f"{self._PREFIX}{uid}"
+
+    def headers_for(self, uid: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token_for(uid)}"}
+
+    def verify_id_token(self, id_token: str, *args, **kwargs) -> dict:
+        if not id_token.startswith(self._PREFIX):
+            raise auth.InvalidIdTokenError("The token was not issued by the fake Firebase verifier.")
+        uid = id_token.removeprefix(self._PREFIX)
+        return {"uid": uid, "user_id": uid, "sub": uid}
+
+    @contextmanager
+    def installed(self) -> Iterator["FakeFirebaseVerifier"]:
+        with patch.object(auth, "verify_id_token", self.verify_id_token):
+            yield self
+
+
+def fake_text(chars: int, rng: random.Random) -> str:
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+def fake_course_json(lectures: int, evaluations: int, start: datetime = datetime(2025, 8, 4, 10)) -> str:
+    """A course as the model would extract it from a syllabus, with two lectures a week."""
+    def slot(index: int) -> tuple[str, str]:
+        day = start + timedelta(weeks=index // 2, days=2 * (index % 2))
+        return day.isoformat(), (day + timedelta(hours=2)).isoformat()
+
+    course = {
+        "title": "Benchmark Course",
+        "semester": "2025.2",
+        "lectures": [
+            dict(zip(("start_datetime", "end_datetime"), slot(i)), title=f"Lecture {i + 1}",
+                 summary=f"Topics of lecture {i + 1}.")
+            for i in range(lectures)
+        ],
+        "evaluations": [
+            dict(zip(("start_datetime", "end_datetime"), slot(i * 4 + 3)), type="exam", title=f"Exam {i + 1}")
+            for i in range(evaluations)
+        ],
+    }
+    return json.dumps(course)
+
+
+def fake_syllabus_pdf(lectures: int, evaluations: int, scanned: bool = False, lines_per_page: int = 45) -> bytes:
+    """
+    A syllabus as a PDF, with the course of `fake_course_json` written as lines of text in a font embedded like a word
+    processor does, as 40KB of subset TrueType data. A `scanned` one has each page as an image instead, like a
+    document from a scanner, with the same number of pages.
+    """
+    course = json.loads(fake_course_json(lectures, evaluations))
+    lines = [course["title"], f"Semester {course['semester']}", "", "Schedule"]
+    lines += [f"{lecture['start_datetime'][:16].replace('T', ' ')} to {lecture['end_datetime'][11:16]}  "
+              f"{lecture['title']}: {lecture['summary']}" for lecture in course["lectures"]]
+    lines += ["", "Evaluations"]
+    lines += [f"{evaluation['start_datetime'][:16].replace('T', ' ')}  {evaluation['title']} ({evaluation['type']})"
+              for evaluation in course["evaluations"]]
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+
+    # Objects 1 and 2 are the catalog and the page tree, 3 to 5 the font, then each page and its content.
+    font_file = random.Random(0).randbytes(40_000)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"",
+               b"<< /Type /Font /Subtype /TrueType /BaseFont /AAAAAA+Arial /Encoding /WinAnsiEncoding "
+               b"/FontDescriptor 4 0 R >>",
+               b"<< /Type /FontDescriptor /FontName /AAAAAA+Arial /Flags 32 /FontFile2 5 0 R >>",
+               b"<< /Length %d >>\nstream\n%s\nendstream" % (len(font_file), font_file)]
+    page_numbers = []
+    for page_lines in pages:
+        if scanned:
+            # A grey page at 200 dpi: compressed, it is as small as the scan of a mostly white page.
+            image = zlib.compress(bytes([200]) * (1700 * 2200))
+            objects.append(b"<< /Type /XObject /Subtype /Image /Width 1700 /Height 2200 /ColorSpace /DeviceGray "
+                           b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream"
+                           % (len(image), image))
+            content = b"q 612 0 0 792 0 0 cm /Im1 Do Q"
+            resources = b"<< /XObject << /Im1 %d 0 R >> >>" % len(objects)
+        else:
+            escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page_lines]
+            text = b" ".join(b"(%s) Tj T*" % line.encode("cp1252") for line in escaped)
+            content = b"BT /F1 10 Tf 14 TL 50 760 Td " + text + b" ET"
+            resources = b"<< /Font << /F1 3 0 R >> >>"
+        stream = zlib.compress(content)
+        objects.append(b"<< /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources %s /Contents %d 0 R >>"
+                       % (resources, len(objects)))
+        page_numbers.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % number for number in page_numbers), len(page_numbers))
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def fake_timetable_photo(width: int = 4032, height: int = 3024, format: str = "JPEG", quality: int = 92) -> bytes:
+    """
+    A phone photo of a printed timetable: a grid of lines of text on paper, with the sensor noise that makes photos
+    large once compressed, and the EXIF of a phone, its location included, rotated like a photo taken upright.
+    """
+    rng = random.Random(0)
+    image = Image.merge("RGB", [Image.effect_noise((width, height), 24).point(lambda value: value + shift)
+                                for shift in (90, 85, 70)])
+    draw = ImageDraw.Draw(image)
+    rows, columns = 12, 6
+    for row in range(rows + 1):
+        draw.line([(0, row * height // rows), (width, row * height // rows)], fill=(20, 20, 20), width=6)
+    for column in range(columns + 1):
+        draw.line([(column * width // columns, 0), (column * width // columns, height)], fill=(20, 20, 20), width=6)
+    for row in range(rows):
+        for column in range(columns):
+            draw.text((column * width // columns + 20, row * height // rows + 20), fake_text(30, rng),
+                      fill=(10, 10, 10), font_size=max(height // 60, 10))
+
+    exif = Image.Exif()
+    exif[0x010F] = "Phone maker"
+    exif[0x0110] = "Phone model"
+    exif[0x0112] = 6  # Rotated by 90 degrees.
+    exif[0x8825] = {1: "S", 2: (8.0, 3.0, 14.0), 3: "W", 4: (34.0, 52.0, 51.0)}
+    output = io.BytesIO()
+    image.save(output, format=format, quality=quality, exif=exif)
+    return output.getvalue()
+
+
+def _count_tool_rounds(contents) -> int:
+    """Counts the tool rounds the model has already requested since the last message typed by the user."""
+    if not isinstance(contents, list):
+        return 0
+    rounds = 0
+    for content in reversed(contents):
+        parts = content.parts or []
+        if content.role == "model" and any(part.function_call for part in parts):
+            rounds += 1
+        elif content.role == "user" and any(part.text for part in parts):
+            break
+    return rounds
+
+
+def _usage_metadata(prompt_tokens: int, cached_tokens: int, parts: list[Part]) -> GenerateContentResponseUsageMetadata:
+    # Like the API, the prompt token count includes the tokens read from the cache.
+    response_tokens = sum(len(part.text or "") for part in parts) // _CHARS_PER_TOKEN + 1
+    return GenerateContentResponseUsageMetadata(prompt_token_count=prompt_tokens + cached_tokens,
+                                                cached_content_token_count=cached_tokens or None,
+                                                candidates_token_count=response_tokens,
+                                                total_token_count=prompt_tokens + cached_tokens + response_tokens)
+
+
+def _prompt_tokens(config: GenerateContentConfig | CreateCachedContentConfig | None, contents: list[Content]) -> int:
+    """Estimates the tokens of a prompt from the size of its JSON: the system instruction, the tools and contents."""
+    size = len(_contents_adapter.dump_json(contents, exclude_none=True))
+    if config is not None:
+        size += len(orjson.dumps([config.system_instruction if isinstance(config.system_instruction, str) else None,
+                                  [tool.model_dump(mode="json", exclude_none=True) for tool in config.tools or []]]))
+    return size // _CHARS_PER_TOKEN + 1
+
+
+def api_error(code: int, retry_after_seconds: float | None = None) -> errors.APIError:
+    """An error of the API with the status `code`, asking to retry after `retry_after_seconds` like its 429s do."""
+    status = _ERROR_STATUSES.get(code, "UNKNOWN")
+    body = {"code": code, "message": f"Fake {status.lower()} error.", "status": status}
+    if retry_after_seconds is not None:
+        body["details"] = [{"@type": "type.googleapis.com/google.rpc.RetryInfo",
+                            "retryDelay": f"{retry_after_seconds}s"}]
+    error_class = errors.ServerError if code >= 500 else errors.ClientError
+    return error_class(code, {"error": body})
+
+
+def _client_error(code: int, message: str, status: str) -> errors.ClientError:
+    return errors.ClientError(code, {"error": {"code": code, "message": message, "status": status}})
+
+
@@ -0,0 +1,96 @@
+"""
+Compares sending photos of timetables to the model as they are with sending them scaled down and re-encoded by
+`create_parts_from_files`, in the image pool. Reports, per photo, the bytes sent, the time spent processing it and the
+longest the event loop was blocked meanwhile, the time to upload the request at --upload-mbps, and the model latency:
+--llm-latency-ms plus --prefill-ms-per-1k-tokens per thousand tokens, counted like the API does for images, 258 per
+768x768 tile.
+
+Usage (from the server directory):
+    python -m benchmarks.image_processing --upload-mbps 20
+"""
+import argparse
+import asyncio
+import base64
+import io
+import math
+import sys
+import time
+from unittest.mock import patch
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services import shutdown_image_pool
+from app.services.google_ai_service import create_parts_from_files
+from benchmarks.fakes import fake_timetable_photo
+
+_TILE_PIXELS = 768
+_TOKENS_PER_TILE = 258
+
+
+def image_tokens(data: bytes) -> int:
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+    if width <= 384 and height <= 384:
+        return _TOKENS_PER_TILE
+    return math.ceil(width / _TILE_PIXELS) * math.ceil(height / _TILE_PIXELS) * _TOKENS_PER_TILE
+
+
+async def send(data: bytes, mime_type: str) -> tuple[bytes, float, float]:
+    """Returns the image sent, the seconds it took to prepare and the longest the event loop was blocked meanwhile."""
+    stalls = [0.0]
+
+    async def tick() -> None:
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - before - 0.001)
+
+    ticker = asyncio.ensure_future(tick())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    [part] = await create_parts_from_files([(data, mime_type)])
+    elapsed = time.perf_counter() - start
+    ticker.cancel()
+    return part.inline_data.data, elapsed, max(stalls)
+
+
+async def run(args: argparse.Namespace, photos: list[tuple[str, bytes, str]]) -> None:
+    # The pool is started before measuring, as the workers of a server are after their first image.
+    await create_parts_from_files([(photos[0][1], photos[0][2])])
+    print(f"{'photo':<16}{'mode':<12}{'sent KB':>9}{'tokens':>8}{'process ms':>12}{'stall ms':>10}{'upload ms':>11}"
+          f"{'model ms':>10}{'total ms':>10}")
+    for name, data, mime_type in photos:
+        for enabled in (False, True):
+            with patch.object(settings, "LLM_IMAGE_DOWNSCALING_ENABLED", enabled):
+                sent, process_seconds, stall_seconds = await send(data, mime_type)
+            upload_ms = len(base64.b64encode(sent)) * 8 / (args.upload_mbps * 1000)
+            tokens = image_tokens(sent)
+            model_ms = args.llm_latency_ms + args.prefill_ms_per_1k_tokens * tokens / 1000
+            total_ms = process_seconds * 1000 + upload_ms + model_ms
+            print(f"{name:<16}{'normalized' if enabled else 'original':<12}{len(sent) / 1024:>9.0f}{tokens:>8}"
+                  f"{process_seconds * 1000:>12.0f}{stall_seconds * 1000:>10.1f}{upload_ms:>11.0f}{model_ms:>10.0f}"
+                  f"{total_ms:>10.0f}")
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.image_processing", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upload-mbps", type=float, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=2000)
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=100)
+    args = parser.parse_args(argv)
+    photos = [
+        ("12MP JPEG", fake_timetable_photo(4032, 3024), "image/jpeg"),
+        ("3MP JPEG", fake_timetable_photo(2016, 1512), "image/jpeg"),
+        ("3MP PNG", fake_timetable_photo(2016, 1512, format="PNG"), "image/png"),
+    ]
+    try:
+        asyncio.run(run(args, photos))
+    finally:
+        shutdown_image_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
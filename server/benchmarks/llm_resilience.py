@@ -0,0 +1,77 @@
+"""
+Measures the chat turn latency and failures of `GoogleAIService` against a faulty model. The fake model answers after
+--llm-latency-ms (± --jitter-ms), fails --error-rate of its calls with a 503 and stalls --stall-rate of them for
+--stall-ms more. Plays --turns turns, --concurrency at a time, once with retries only and once with hedging too, and
+reports the p50/p95/p99 turn latency, the turns that failed and the model calls made.
+
+Usage (from the server directory):
+    python -m benchmarks.llm_resilience --turns 2000 --error-rate 0.05 --stall-rate 0.03
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.services import GoogleAIService, LLMUnavailableError
+from app.services.llm_resilience import CircuitBreaker
+from benchmarks.fakes import FaultyGenAIClient
+from benchmarks.runner import percentile
+
+
+async def play_turns(args: argparse.Namespace) -> tuple[list[float], int, int]:
+    """Returns the latency of each successful turn, the failed turns and the model calls made."""
+    client = FaultyGenAIClient(latency_seconds=args.llm_latency_ms / 1000, jitter_seconds=args.jitter_ms / 1000,
+                               error_rate=args.error_rate, stall_rate=args.stall_rate,
+                               stall_seconds=args.stall_ms / 1000, response_chars=200, seed=args.seed)
+    # The benchmark measures the retries and hedging, with a breaker that only opens on a real outage.
+    ai_service = GoogleAIService(api_key="", client=client,
+                                 circuit_breaker=CircuitBreaker(failure_threshold=50, reset_seconds=1))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    failures = 0
+
+    async def turn() -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await ai_service.send_message(instruction="Plan.", message="What is due this week?", tools=[])
+            except LLMUnavailableError:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(turn() for _ in range(args.turns)))
+    return sorted(latencies), failures, len(client.models)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.llm_resilience", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall-ms", type=float, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    # Every retry is logged, which would bury the results.
+    logging.getLogger("app.services").setLevel(logging.ERROR)
+
+    print(f"{'hedging':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'failed':>8}{'calls':>8}")
+    for hedging in (False, True):
+        with patch.object(settings, "LLM_HEDGING_ENABLED", hedging):
+            latencies, failures, calls = asyncio.run(play_turns(args))
+        print(f"{'on' if hedging else 'off':<10}{percentile(latencies, 50) * 1000:>10.1f}"
+              f"{percentile(latencies, 95) * 1000:>10.1f}{percentile(latencies, 99) * 1000:>10.1f}"
+              f"{failures:>8}{calls:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
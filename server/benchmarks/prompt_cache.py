@@ -0,0 +1,85 @@
+"""
+Measures what prompt-prefix caching saves on a long chat. Plays --turns turns of a conversation through
+`GoogleAIService`, with the app's system instruction and tools, against a fake model whose latency grows with the
+uncached input tokens (--prefill-ms-per-1k-tokens). Runs the conversation with and without caching and reports, for
+the last --last-turns turns, the input tokens sent, the tokens read from the cache and the latency of a turn.
+
+Usage (from the server directory):
+    python -m benchmarks.prompt_cache --turns 60 --prefill-ms-per-1k-tokens 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from google.genai.types import Content
+
+from app.core.config import settings
+from app.llm_tools import tools
+from app.services import GoogleAIService
+from app.services.prompt_cache import PromptCache
+from benchmarks.fakes import FakeGenAIClient, fake_text
+
+
+class _UsageRecordingClient(FakeGenAIClient):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.usages = []
+
+    async def generate_content(self, *, model, contents, config=None):
+        response = await super().generate_content(model=model, contents=contents, config=config)
+        self.usages.append(response.usage_metadata)
+        return response
+
+
+async def play_conversation(args: argparse.Namespace, caching: bool) -> list[tuple[int, int, float]]:
+    """Returns the input tokens, cached tokens and latency of each turn."""
+    client = _UsageRecordingClient(latency_seconds=args.llm_latency_ms / 1000,
+                                   prefill_seconds_per_1k_tokens=args.prefill_ms_per_1k_tokens / 1000,
+                                   response_chars=args.response_chars, seed=args.seed)
+    ai_service = GoogleAIService(api_key="", client=client, prompt_cache=PromptCache(
+        client, ttl_seconds=settings.LLM_PROMPT_CACHE_TTL_SECONDS, min_tokens=settings.LLM_PROMPT_CACHE_MIN_TOKENS,
+        max_entries=settings.LLM_PROMPT_CACHE_MAX_ENTRIES, history_step=settings.LLM_PROMPT_CACHE_HISTORY_STEP,
+        enabled=caching))
+    rng = random.Random(args.seed)
+    history: list[Content] = []
+    turns = []
+    for _ in range(args.turns):
+        message = fake_text(args.message_chars, rng)
+        start = time.perf_counter()
+        _, new_contents = await ai_service.send_message(instruction=settings.CHAT_SYSTEM_INSTRUCTIONS,
+                                                        message=message, tools=tools, llm_context=history)
+        usage = client.usages[-1]
+        turns.append((usage.prompt_token_count, usage.cached_content_token_count or 0, time.perf_counter() - start))
+        history.extend(new_contents)
+    return turns
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.prompt_cache", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--last-turns", type=int, default=20)
+    parser.add_argument("--message-chars", type=int, default=300)
+    parser.add_argument("--response-chars", type=int, default=1500)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'caching':<10}{'input tokens':>14}{'cached tokens':>15}{'billed tokens':>15}{'turn ms':>10}")
+    for caching in (False, True):
+        last = asyncio.run(play_conversation(args, caching))[-args.last_turns:]
+        prompt = statistics.mean(turn[0] for turn in last)
+        cached = statistics.mean(turn[1] for turn in last)
+        # Cached tokens are billed at a quarter of the price of input tokens on the Gemini 2.5 models.
+        billed = prompt - cached + cached / 4
+        latency = statistics.mean(turn[2] for turn in last)
+        print(f"{'on' if caching else 'off':<10}{prompt:>14.0f}{cached:>15.0f}{billed:>15.0f}{latency * 1000:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
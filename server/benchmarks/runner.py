@@ -0,0 +1,146 @@
+import asyncio
+import math
+import random
+import time
+from dataclasses import asdict, dataclass
+
+import httpx
+
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimiter, get_rate_limiter
+from app.main import app
+from app.services import GoogleAIService, get_google_ai_service
+from benchmarks.database import SeedVolumes, bound_sessions, create_benchmark_engine, seed_database
+from benchmarks.fakes import FakeFirebaseVerifier, FakeGenAIClient
+from benchmarks.scenarios import SCENARIOS, Scenario, ScenarioContext
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_scenario(scenario: Scenario, ctx: ScenarioContext, *, requests: int, concurrency: int,
+                       warmup: int = 0) -> ScenarioResult:
+    """
+    Sends `requests` requests of the scenario, at most `concurrency` at a time, after `warmup` untimed ones. A
+    response with an error status counts as an error, and its latency is still recorded.
+    """
+    for index in range(warmup):
+        try:
+            await scenario.request(ctx, index)
+        except Exception:
+            pass
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def timed_request(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(ctx, warmup + index)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_request(index) for index in range(requests)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return ScenarioResult(
+        scenario=scenario.name,
+        requests=requests,
+        errors=errors,
+        seconds=seconds,
+        throughput=requests / seconds if seconds else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        max_ms=(latencies[-1] if latencies else 0.0) * 1000,
+    )
+
+
+async def run_benchmarks(scenario_names: list[str], *, database_url: str, volumes: SeedVolumes,
+                         genai_client: FakeGenAIClient, requests: int, concurrency: int, warmup: int = 0,
+                         seed: int = 0) -> list[ScenarioResult]:
+    """
+    Seeds the database at `database_url` and runs each scenario in turn against the app, in process. Every table of
+    that database is dropped first.
+    """
+    engine = create_benchmark_engine(database_url)
+    verifier = FakeFirebaseVerifier()
+    data = seed_database(engine, volumes, seed=seed)
+    app.dependency_overrides[get_google_ai_service] = lambda: GoogleAIService(api_key="", client=genai_client)
+    # A few seeded users make all the requests, which the per user rate limits would mostly refuse.
+    app.dependency_overrides[get_rate_limiter] = lambda: RateLimiter(InMemoryRateLimitBackend(), limits={},
+                                                                     concurrency_per_user=0, lease_seconds=0,
+                                                                     enabled=False)
+    try:
+        with bound_sessions(engine), verifier.installed():
+            # Exceptions raised by the app become 500 responses, counted as errors, as they would be behind a server.
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+                results = []
+                for name in scenario_names:
+                    ctx = ScenarioContext(client=client, data=data, verifier=verifier, rng=random.Random(seed))
+                    results.append(await run_scenario(SCENARIOS[name], ctx, requests=requests,
+                                                      concurrency=concurrency, warmup=warmup))
+                return results
+    finally:
+        app.dependency_overrides.pop(get_google_ai_service, None)
+        app.dependency_overrides.pop(get_rate_limiter, None)
+        engine.dispose()
+
+
+def find_regressions(results: list[ScenarioResult], baseline: list[dict], tolerance: float) -> list[str]:
+    """
+    Compares the results with a baseline saved by a previous run. A scenario regresses when its p95 latency grows,
+    or its throughput drops, by more than `tolerance` (0.2 is 20%), or when it has errors the baseline didn't.
+    """
+    baseline_by_scenario = {result["scenario"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_by_scenario.get(result.scenario)
+        if previous is None:
+            continue
+        if result.p95_ms > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{result.scenario}: p95 went from {previous['p95_ms']:.1f}ms to {result.p95_ms:.1f}ms")
+        if result.throughput < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{result.scenario}: throughput went from {previous['throughput']:.1f} to "
+                               f"{result.throughput:.1f} requests/s")
+        if result.errors > previous["errors"]:
+            regressions.append(f"{result.scenario}: {result.errors} errors, {previous['errors']} in the baseline")
+    return regressions
+
+
+def format_results(results: list[ScenarioResult]) -> str:
+    lines = [f"{'scenario':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+             f"{'max ms':>10}"]
+    for r in results:
+        lines.append(f"{r.scenario:<12}{r.requests:>10}{r.errors:>8}{r.throughput:>10.1f}{r.p50_ms:>10.1f}"
+                     f"{r.p95_ms:>10.1f}{r.p99_ms:>10.1f}{r.max_ms:>10.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,87 @@
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.database import SeededData, SeededUser
+from benchmarks.fakes import FakeFirebaseVerifier, fake_text
+
+
+@dataclass
+class ScenarioContext:
+    client: httpx.AsyncClient
+    data: SeededData
+    verifier: FakeFirebaseVerifier
+    rng: random.Random
+
+    def user(self, index: int) -> SeededUser:
+        """Spreads the requests over the seeded users, so that concurrent requests come from different users."""
+        return self.data.users[index % len(self.data.users)]
+
+    def headers(self, user: SeededUser) -> dict[str, str]:
+        return self.verifier.headers_for(user.uuid)
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    request: Callable[[ScenarioContext, int], Awaitable[httpx.Response]]
+
+
+async def chat_turn(ctx: ScenarioContext, index: int) -> httpx.Response:
+    user = ctx.user(index)
+    return await ctx.client.post("/api/chat/message", headers=ctx.headers(user),
+                                 data={"message": fake_text(80, ctx.rng)})
+
+
+async def schedule_read(ctx: ScenarioContext, index: int) -> httpx.Response:
+    user = ctx.user(index)
+    semester_days = (ctx.data.semester_end - ctx.data.semester_start).days
+    start_date = (ctx.data.semester_start + timedelta(days=ctx.rng.randrange(semester_days))).date()
+    return await ctx.client.get("/api/user/schedule", headers=ctx.headers(user), params={
+        "start_date": start_date.isoformat(), "days": 7, "timezone": "America/Recife"})
+
+
+async def course_ai_creation(ctx: ScenarioContext, index: int) -> httpx.Response:
+    user = ctx.user(index)
+    syllabus = fake_text(20_000, ctx.rng).encode()
+    return await ctx.client.post("/api/course/ai", headers=ctx.headers(user),
+                                 files=[("files", ("syllabus.pdf", syllabus, "application/pdf"))],
+                                 data={"timezone": "America/Recife"})
+
+
+async def crud_burst(ctx: ScenarioContext, index: int) -> httpx.Response:
+    """Cycles through the writes and list reads of a user editing their calendar."""
+    user = ctx.user(index)
+    headers = ctx.headers(user)
+    start = ctx.data.semester_start + timedelta(days=ctx.rng.randrange(30), hours=ctx.rng.randrange(8, 20))
+    end = start + timedelta(hours=1)
+    match index % 5:
+        case 0:
+            return await ctx.client.post("/api/lecture/", headers=headers, data={
+                "title": "Extra lecture", "course_uuid": ctx.rng.choice(user.course_uuids),
+                "start_datetime": start.isoformat(), "end_datetime": end.isoformat()})
+        case 1:
+            return await ctx.client.put("/api/lecture/", headers=headers, data={
+                "lecture_uuid": ctx.rng.choice(user.lecture_uuids), "new_title": "Renamed lecture"})
+        case 2:
+            return await ctx.client.post("/api/event/", headers=headers, data={
+                "title": "Study session", "start_datetime": start.isoformat(), "end_datetime": end.isoformat()})
+        case 3:
+            return await ctx.client.get("/api/event/list", headers=headers)
+        case _:
+            return await ctx.client.post("/api/batch/", headers=headers, json={"operations": [
+                {"op": "update", "resource": "lecture", "uuid": lecture_uuid, "data": {"summary": "Reviewed."}}
+                for lecture_uuid in ctx.rng.sample(user.lecture_uuids, min(10, len(user.lecture_uuids)))]})
+
+
+SCENARIOS: dict[str, Scenario] = {scenario.name: scenario for scenario in [
+    Scenario("chat", "A chat message answered after the scripted tool rounds.", chat_turn),
+    Scenario("schedule", "A week of a user's schedule.", schedule_read),
+    Scenario("course_ai", "A course, with its lectures and evaluations, extracted from a syllabus.",
+             course_ai_creation),
+    Scenario("crud", "Lecture and event writes, event lists and batch updates.", crud_burst),
+]}
@@ -0,0 +1,183 @@
+"""
+Measures the CPU spent serializing the largest responses of the API, per response, through each JSON path:
+
+    stdlib           the response model serialized to Python objects by FastAPI, encoded by `json` (the old default)
+    orjson           the same objects, encoded by `ORJSONResponse` (the default response class)
+    model_dump_json  `ModelJSONResponse`, validated and written out to bytes by pydantic in one pass
+
+The payloads are a schedule, a chat history, the list of courses and a chat turn as persisted in the database, sized
+by the options below. The persisted turn compares `json.dumps` of `model_dump` with `TypeAdapter.dump_json`.
+
+pydantic serializes unions, like the items of the schedule, faster to Python objects than to JSON, so the schedule
+stays on the default response class.
+
+Usage (from the server directory):
+    python -m benchmarks.serialization --schedule-days 30 --items-per-day 20 --history-messages 200
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from google.genai.types import Content, FunctionResponse, Part
+from pydantic import TypeAdapter
+
+from app.models import ChatMessage, Course
+from app.schemas import ChatMessageBase, CourseListItem, ScheduleResponse
+from app.utils.json_response import ModelJSONResponse
+from benchmarks.fakes import fake_text
+
+
+@dataclass
+class Payload:
+    name: str
+    response_model: Any
+    content: Any
+
+
+def schedule_payload(days: int, items_per_day: int, rng: random.Random) -> Payload:
+    """A schedule as built by `GET /user/schedule`, alternating lectures, evaluations and events."""
+    start = datetime(2025, 8, 4, 8, tzinfo=timezone(timedelta(hours=-3)))
+    schedule = {}
+    for day in range(days):
+        items = []
+        for index in range(items_per_day):
+            start_datetime = start + timedelta(days=day, minutes=30 * index)
+            item = {"uuid": str(uuid.uuid4()), "title": fake_text(40, rng), "start_datetime": start_datetime,
+                    "end_datetime": start_datetime + timedelta(minutes=30)}
+            if index % 3 == 0:
+                item.update(item_type="lecture", course_uuid=str(uuid.uuid4()), course_title="Benchmark Course",
+                            summary=fake_text(200, rng))
+            elif index % 3 == 1:
+                item.update(item_type="evaluation", course_uuid=str(uuid.uuid4()), course_title="Benchmark Course",
+                            type="exam")
+            else:
+                item.update(item_type="event", description=fake_text(120, rng))
+            items.append(item)
+        schedule[(start + timedelta(days=day)).date().isoformat()] = items
+    return Payload("schedule", ScheduleResponse, schedule)
+
+
+def history_payload(messages: int, text_chars: int, rng: random.Random) -> Payload:
+    """A chat history as loaded by `GET /chat/history`: ORM rows, with the files stored as JSON."""
+    history = [
+        ChatMessage(uuid=str(uuid.uuid4()), order=order, role="user" if order % 2 == 0 else "model",
+                    text=fake_text(text_chars, rng), content=[],
+                    files=json.dumps([{"filename": "syllabus.pdf", "mimetype": "application/pdf"}])
+                    if order % 10 == 0 else None)
+        for order in range(messages)
+    ]
+    return Payload("chat history", list[ChatMessageBase], history)
+
+
+def course_list_payload(courses: int, rng: random.Random) -> Payload:
+    """The courses of a user as loaded by `GET /course/list`."""
+    rows = [Course(uuid=str(uuid.uuid4()), title=fake_text(30, rng), semester="2025.2",
+                   description=fake_text(300, rng), owner_uuid="benchmark-user")
+            for _ in range(courses)]
+    return Payload("course list", list[CourseListItem], rows)
+
+
+def turn_contents(courses: int, lectures: int, rng: random.Random) -> list[Content]:
+    """A model turn carrying the output of `list_courses_and_details`, as persisted after a chat message."""
+    output = {"courses": [
+        {"uuid": str(uuid.uuid4()), "title": fake_text(30, rng), "lectures": [
+            {"uuid": str(uuid.uuid4()), "title": fake_text(30, rng), "start_datetime": "2025-08-04T10:00:00-03:00",
+             "end_datetime": "2025-08-04T12:00:00-03:00", "summary": fake_text(200, rng)}
+            for _ in range(lectures)
+        ]}
+        for _ in range(courses)
+    ]}
+    return [Content(role="user", parts=[Part(function_response=FunctionResponse(
+        name="list_courses_and_details", response={"output": output}))])]
+
+
+def _cpu_per_call(function: Callable[[], Any], iterations: int, repeats: int = 3) -> float:
+    """The least CPU time, in seconds, of one call, over `repeats` rounds of `iterations` calls."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        for _ in range(iterations):
+            function()
+        best = min(best, (time.process_time() - start) / iterations)
+    return best
+
+
+def _complete(coroutine) -> Any:
+    """Runs a coroutine that never suspends, such as `serialize_response` for async routes, without an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("The coroutine suspended.")
+
+
+def response_paths(payload: Payload) -> dict[str, Callable[[], bytes]]:
+    field = create_model_field(name="Response", type_=payload.response_model, mode="serialization")
+    adapter = TypeAdapter(payload.response_model)
+
+    def fastapi_path(response_class: type[JSONResponse]) -> Callable[[], bytes]:
+        def render() -> bytes:
+            content = _complete(serialize_response(field=field, response_content=payload.content))
+            return response_class(content).body
+        return render
+
+    return {
+        "stdlib": fastapi_path(JSONResponse),
+        "orjson": fastapi_path(ORJSONResponse),
+        "model_dump_json": lambda: ModelJSONResponse(adapter, payload.content).body,
+    }
+
+
+def turn_paths(contents: list[Content]) -> dict[str, Callable[[], bytes]]:
+    adapter = TypeAdapter(list[Content])
+    return {
+        "stdlib": lambda: json.dumps([content.model_dump(mode="json") for content in contents]).encode(),
+        "model_dump_json": lambda: adapter.dump_json(contents, exclude_none=True),
+    }
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schedule-days", type=int, default=30)
+    parser.add_argument("--items-per-day", type=int, default=20)
+    parser.add_argument("--history-messages", type=int, default=200)
+    parser.add_argument("--message-chars", type=int, default=800)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--turn-courses", type=int, default=6)
+    parser.add_argument("--turn-lectures", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    cases = [
+        (payload.name, response_paths(payload))
+        for payload in (schedule_payload(args.schedule_days, args.items_per_day, rng),
+                        history_payload(args.history_messages, args.message_chars, rng),
+                        course_list_payload(args.courses, rng))
+    ]
+    cases.append(("persisted turn", turn_paths(turn_contents(args.turn_courses, args.turn_lectures, rng))))
+
+    print(f"{'payload':<16}{'path':<18}{'KiB':>10}{'CPU ms':>10}{'speedup':>10}")
+    for name, paths in cases:
+        baseline = None
+        for path, render in paths.items():
+            size = len(render())
+            cpu = _cpu_per_call(render, args.iterations)
+            baseline = baseline or cpu
+            print(f"{name:<16}{path:<18}{size / 1024:>10.1f}{cpu * 1000:>10.3f}{baseline / cpu:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
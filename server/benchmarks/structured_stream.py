@@ -0,0 +1,65 @@
+"""
+Compares the course extraction of `generate_structured_output`, which parses the response once it is whole, with
+`stream_structured_output`, which parses it as it streams in. The fake model starts answering after --llm-latency-ms
+and sends the course, with --lectures lectures, in chunks of --chunk-chars characters every --chunk-ms. Reports the
+time until the first lecture and until the whole course is validated.
+
+Usage (from the server directory):
+    python -m benchmarks.structured_stream --lectures 120 --chunk-ms 20
+"""
+import argparse
+import asyncio
+import math
+import sys
+import time
+
+from app.schemas import CourseGenerate
+from app.services import GoogleAIService
+from benchmarks.fakes import FakeGenAIClient, fake_course_json
+
+_FILES = [(b"%PDF", "application/pdf")]
+
+
+async def extract(args: argparse.Namespace, stream: bool) -> tuple[float, float]:
+    """Returns the seconds until the first lecture was available, and until the whole course was."""
+    latency_seconds = args.llm_latency_ms / 1000
+    if not stream:
+        # The whole response arrives when the last chunk of the stream would have.
+        chunks = math.ceil(len(fake_course_json(args.lectures, args.evaluations)) / args.chunk_chars)
+        latency_seconds += (chunks - 1) * args.chunk_ms / 1000
+    client = FakeGenAIClient(latency_seconds=latency_seconds, course_lectures=args.lectures,
+                             course_evaluations=args.evaluations, stream_chunk_chars=args.chunk_chars,
+                             stream_chunk_seconds=args.chunk_ms / 1000)
+    ai_service = GoogleAIService(api_key="", client=client)
+    start = time.perf_counter()
+    if not stream:
+        await ai_service.generate_structured_output(CourseGenerate, files=_FILES)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    first_lecture = None
+    async for field, _ in ai_service.stream_structured_output(CourseGenerate, files=_FILES):
+        if field == "lectures" and first_lecture is None:
+            first_lecture = time.perf_counter() - start
+    return first_lecture, time.perf_counter() - start
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.structured_stream", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lectures", type=int, default=120)
+    parser.add_argument("--evaluations", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--chunk-chars", type=int, default=512)
+    parser.add_argument("--chunk-ms", type=float, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<10}{'first lecture ms':>18}{'course ms':>12}")
+    for stream in (False, True):
+        first_lecture, total = asyncio.run(extract(args, stream))
+        print(f"{'stream' if stream else 'buffered':<10}{first_lecture * 1000:>18.1f}{total * 1000:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+Moves the chat messages of each user older than their last CHAT_HOT_WINDOW_MESSAGES to `archived_chat_messages`, in
+batches of CHAT_ARCHIVE_BATCH_SIZE. Safe to run while the server is live, and meant to run periodically: each run
+continues from the checkpoint of the previous one.
+
+Usage (from the server directory):
+    python scripts/archive_chat_history.py [--keep-messages 200] [--batch-size 1000] [--max-batches N]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.core.db import engine
+from app.services.chat_archive_service import archive_chat_history
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep-messages", type=int, default=settings.CHAT_HOT_WINDOW_MESSAGES)
+    parser.add_argument("--batch-size", type=int, default=settings.CHAT_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None,
+                        help="Stop after this many batches; the next run continues from there.")
+    args = parser.parse_args(argv)
+
+    run = archive_chat_history(engine, keep_messages=args.keep_messages, batch_size=args.batch_size,
+                               max_batches=args.max_batches)
+    print(f"Archived {run.messages} messages of {run.users} users in {run.batches} batches, "
+          f"{run.seconds:.1f}s ({run.messages_per_second:.0f} messages/s).")
+    if not run.finished:
+        print("Stopped before the last user; the next run continues from the checkpoint.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
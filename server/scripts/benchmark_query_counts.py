@@ -0,0 +1,124 @@
+"""
+Counts the SQL statements and commits issued by the main router flows, with and without the request-scoped unit of
+work, against an in-memory SQLite database.
+
+Usage (from the server directory):
+    python scripts/benchmark_query_counts.py
+"""
+import os
+import sys
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.db import Base, instrument_engine, track_all_queries, unit_of_work
+from app.core.security import get_current_user
+from app.dependencies import get_db
+from app.main import app
+from app.models import Course, Lecture, User
+
+USER_UUID = "benchmark-user"
+COURSE_UUID = "benchmark-course"
+START = datetime(2025, 3, 3, 10, tzinfo=timezone.utc)
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+instrument_engine(engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+counters = {"commits": 0}
+
+
+@event.listens_for(engine, "connect")
+def _enable_foreign_keys(dbapi_connection, _):
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+@event.listens_for(engine, "commit")
+def _count_commit(*_):
+    counters["commits"] += 1
+
+
+def seed() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        db.add(User(uuid=USER_UUID, name="Benchmark", email="benchmark@planit.ai", hashed_password=""))
+        db.add(Course(uuid=COURSE_UUID, title="Benchmark", owner_uuid=USER_UUID))
+        db.add_all(Lecture(uuid=f"lecture-{i}", title=f"Lecture {i}", course_uuid=COURSE_UUID,
+                           start_datetime=START + timedelta(days=i), end_datetime=START + timedelta(days=i, hours=2))
+                   for i in range(20))
+        db.commit()
+
+
+def run_flows(client: TestClient) -> list[tuple[str, int, int]]:
+    ics = "".join(
+        f"BEGIN:VEVENT\nSUMMARY:Imported {i}\nDTSTART:20250310T{10 + i % 8:02d}0000Z\nDURATION:PT1H\nEND:VEVENT\n"
+        for i in range(50)
+    )
+    flows = [
+        ("create lecture", lambda: client.post("/api/lecture/", data={
+            "title": "New", "course_uuid": COURSE_UUID,
+            "start_datetime": START.isoformat(), "end_datetime": (START + timedelta(hours=1)).isoformat()})),
+        ("update lecture", lambda: client.put("/api/lecture/", data={"lecture_uuid": "lecture-0", "new_title": "Up"})),
+        ("delete lecture", lambda: client.request("DELETE", "/api/lecture/", data={"lecture_uuid": "lecture-1"})),
+        ("create event", lambda: client.post("/api/event/", data={
+            "title": "Event", "start_datetime": START.isoformat(),
+            "end_datetime": (START + timedelta(hours=1)).isoformat()})),
+        ("update course", lambda: client.put("/api/course/", data={"course_uuid": COURSE_UUID, "new_title": "Up"})),
+        ("schedule (7 days)", lambda: client.get("/api/user/schedule", params={"start_date": "2025-03-03"})),
+        ("batch (10 updates)", lambda: client.post("/api/batch/", json={"operations": [
+            {"op": "update", "resource": "lecture", "uuid": f"lecture-{i}", "data": {"title": f"Batch {i}"}}
+            for i in range(2, 12)]})),
+        ("import (50 events)", lambda: client.post(
+            "/api/import/", files={"file": ("calendar.ics", ics.encode(), "text/calendar")})),
+        ("delete course", lambda: client.request("DELETE", "/api/course/", data={"course_uuid": COURSE_UUID})),
+    ]
+
+    results = []
+    for name, request in flows:
+        counters.update(commits=0)
+        with track_all_queries(name) as stats:
+            response = request()
+        assert response.status_code < 400, f"{name}: {response.status_code} {response.text}"
+        results.append((name, stats.count, counters["commits"]))
+    return results
+
+
+def measure(use_unit_of_work: bool) -> list[tuple[str, int, int]]:
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            with unit_of_work(db) if use_unit_of_work else nullcontext():
+                yield db
+        finally:
+            db.close()
+
+    def override_get_current_user(db: Session = Depends(get_db)):
+        return db.get(User, USER_UUID)
+
+    seed()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    try:
+        return run_flows(TestClient(app))
+    finally:
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    per_call = measure(use_unit_of_work=False)
+    unit = measure(use_unit_of_work=True)
+    print(f"{'flow':<22}{'per-call commit':>20}{'unit of work':>20}")
+    print(f"{'':<22}{'queries / commits':>20}{'queries / commits':>20}")
+    for (name, queries, commits), (_, uow_queries, uow_commits) in zip(per_call, unit):
+        print(f"{name:<22}{f'{queries} / {commits}':>20}{f'{uow_queries} / {uow_commits}':>20}")
+    print(f"{'total':<22}{f'{sum(r[1] for r in per_call)} / {sum(r[2] for r in per_call)}':>20}"
+          f"{f'{sum(r[1] for r in unit)} / {sum(r[2] for r in unit)}':>20}")
@@ -0,0 +1,21 @@
+"""
+Creates the missing tables, and the missing indexes of existing tables, such as the unique order of the chat messages.
+Used on releases of deployments that set DATABASE_CREATE_TABLES_ON_STARTUP to false.
+
+Usage (from the server directory):
+    python scripts/create_tables.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app.models  # noqa: F401 (registers every table in Base.metadata)
+from app.core.db import Base, engine
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    print(f"Tables created on {engine.url.render_as_string(hide_password=True)}.")
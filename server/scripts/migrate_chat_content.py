@@ -0,0 +1,77 @@
+"""
+Converts the stored chat contents from JSON text to the `CompactJSON` column of `ChatMessage.content`. Safe to run
+more than once: only the rows still holding text are converted.
+
+On PostgreSQL the column becomes JSONB, in one statement that rewrites the table under an exclusive lock. On SQLite
+the rows are rewritten in batches as compact JSON, without null fields, and compressed when large.
+
+Usage (from the server directory):
+    python scripts/migrate_chat_content.py [--batch-size 500]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from google.genai.types import Content
+from pydantic import TypeAdapter
+from sqlalchemy import Engine, bindparam, func, inspect, select, text, update
+
+from app.core.db import engine
+from app.models import ChatMessage
+
+_contents_adapter = TypeAdapter(list[Content])
+
+
+def migrate_postgresql(db_engine: Engine) -> bool:
+    columns = {column["name"]: column for column in inspect(db_engine).get_columns(ChatMessage.__tablename__)}
+    if str(columns["content"]["type"]).upper() == "JSONB":
+        return False
+    with db_engine.begin() as connection:
+        connection.execute(text(
+            f"ALTER TABLE {ChatMessage.__tablename__} ALTER COLUMN content TYPE JSONB USING content::jsonb"
+        ))
+    return True
+
+
+def migrate_sqlite(db_engine: Engine, batch_size: int) -> int:
+    table = ChatMessage.__table__
+    statement = update(table).where(table.c.uuid == bindparam("b_uuid")).values(content=bindparam("b_content"))
+    migrated = 0
+    while True:
+        with db_engine.begin() as connection:
+            # The column type decodes both formats, so the rows left are told apart by their storage class.
+            rows = connection.execute(
+                select(table.c.uuid, table.c.content).where(func.typeof(table.c.content) == "text").limit(batch_size)
+            ).all()
+            if not rows:
+                return migrated
+            connection.execute(statement, [
+                {"b_uuid": row.uuid,
+                 "b_content": _contents_adapter.dump_python(_contents_adapter.validate_python(row.content),
+                                                            mode="json", exclude_none=True)}
+                for row in rows
+            ])
+        migrated += len(rows)
+        print(f"{migrated} messages converted...")
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if engine.dialect.name == "postgresql":
+        converted = migrate_postgresql(engine)
+        print("chat_messages.content converted to JSONB." if converted else "chat_messages.content is already JSONB.")
+    elif engine.dialect.name == "sqlite":
+        print(f"{migrate_sqlite(engine, args.batch_size)} messages converted.")
+    else:
+        print(f"Unsupported database: {engine.dialect.name}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,96 @@
+import json
+import random
+
+import pytest
+
+from app.main import app
+from app.schemas import CourseGenerate
+from app.services import GoogleAIService
+from benchmarks.database import SeedVolumes
+from benchmarks.fakes import FakeGenAIClient
+from benchmarks.runner import ScenarioResult, find_regressions, percentile, run_benchmarks
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.serialization import course_list_payload, history_payload, response_paths, schedule_payload
+
+
+async def echo_tool(param: str) -> dict:
+    return {"echo": param}
+
+
+def lookup_tool() -> dict:
+    return {"found": True}
+
+
+@pytest.mark.asyncio
+async def test_fake_client_follows_the_tool_script():
+    client = FakeGenAIClient(tool_script=[[("echo_tool", {"param": "a"}), ("lookup_tool", {})],
+                                          [("echo_tool", {"param": "b"})]], response_chars=40)
+    service = GoogleAIService(api_key="", client=client)
+
+    text, new_content = await service.send_message(instruction="", message="Hi", tools=[echo_tool, lookup_tool])
+
+    assert client.calls == 3
+    assert len(text) == 40
+    assert [content.role for content in new_content] == ["user", "model"]
+
+
+@pytest.mark.asyncio
+async def test_fake_client_structured_output_is_a_valid_course():
+    service = GoogleAIService(api_key="", client=FakeGenAIClient(course_lectures=7, course_evaluations=2))
+
+    course = await service.generate_structured_output(schema=CourseGenerate, files=[(b"%PDF", "application/pdf")])
+
+    assert len(course.lectures) == 7
+    assert len(course.evaluations) == 2
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 95) == 0.0
+
+
+def test_find_regressions_applies_the_tolerance():
+    baseline = [{"scenario": "chat", "errors": 0, "throughput": 10.0, "p95_ms": 100.0}]
+
+    def result(p95_ms: float, throughput: float, errors: int = 0) -> ScenarioResult:
+        return ScenarioResult("chat", requests=10, errors=errors, seconds=1.0, throughput=throughput, p50_ms=p95_ms,
+                              p95_ms=p95_ms, p99_ms=p95_ms, max_ms=p95_ms)
+
+    assert find_regressions([result(115.0, 9.0)], baseline, tolerance=0.2) == []
+    assert len(find_regressions([result(130.0, 7.0, errors=1)], baseline, tolerance=0.2)) == 3
+
+
+@pytest.mark.asyncio
+async def test_every_scenario_runs_without_errors(monkeypatch):
+    monkeypatch.setattr(app, "dependency_overrides", {})
+    client = FakeGenAIClient(tool_script=[[("get_current_utc_time", {})], [("get_user_schedule", {})]])
+
+    results = await run_benchmarks(
+        list(SCENARIOS),
+        database_url="sqlite://",
+        volumes=SeedVolumes(users=2, courses=2, lectures_per_course=4, evaluations_per_course=1, events=5,
+                            routines=1, chat_messages=4),
+        genai_client=client,
+        requests=5,
+        concurrency=2,
+    )
+
+    assert [result.scenario for result in results] == list(SCENARIOS)
+    assert all(result.errors == 0 for result in results), results
+    assert all(result.p50_ms <= result.p95_ms <= result.p99_ms <= result.max_ms for result in results)
+
+
+@pytest.mark.parametrize("payload", [
+    schedule_payload(days=2, items_per_day=3, rng=random.Random(0)),
+    history_payload(messages=4, text_chars=20, rng=random.Random(0)),
+    course_list_payload(courses=2, rng=random.Random(0)),
+], ids=lambda payload: payload.name)
+def test_serialization_paths_render_the_same_json(payload):
+    rendered = {path: json.loads(render()) for path, render in response_paths(payload).items()}
+
+    assert rendered["orjson"] == rendered["stdlib"]
+    assert rendered["model_dump_json"] == rendered["stdlib"]
@@ -0,0 +1,18 @@
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def no_tables_on_startup(monkeypatch):
+    """The tests bring their own databases, so starting the app must not create tables in the configured one."""
+    monkeypatch.setattr(settings, "DATABASE_CREATE_TABLES_ON_STARTUP", False)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limits():
+    """Each test starts with full token buckets and no requests in flight."""
+    from app.core.rate_limit import get_rate_limiter
+    get_rate_limiter.cache_clear()
+    yield
+    get_rate_limiter.cache_clear()
@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from app.core.db import instrument_engine, track_all_queries
+
+
+def test_failed_statements_leave_nothing_on_the_pooled_connection():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    instrument_engine(engine)
+
+    with track_all_queries("test") as stats, engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1"))
+
+        assert connection.info == {}
+    assert stats.count == 1
+    assert stats.slowest_statement == "SELECT 1"
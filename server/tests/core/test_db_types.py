@@ -0,0 +1,46 @@
+import zlib
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select, text
+
+from app.core.db_types import CompactJSON, decode_compact_json, encode_compact_json
+
+CONTENT = [{"role": "user", "parts": [{"text": "Olá, when is the next exam?"}]}]
+
+
+@pytest.fixture
+def documents():
+    engine = create_engine("sqlite://")
+    table = Table("documents", MetaData(), Column("id", Integer, primary_key=True),
+                  Column("content", CompactJSON(compress_from_bytes=256)))
+    table.metadata.create_all(engine)
+    with engine.begin() as connection:
+        yield connection, table
+
+
+def test_small_documents_are_stored_as_compact_json(documents):
+    connection, table = documents
+    connection.execute(insert(table).values(id=1, content=CONTENT))
+
+    assert connection.execute(select(table.c.content)).scalar_one() == CONTENT
+    stored = connection.execute(text("SELECT content FROM documents")).scalar_one()
+    assert stored == b'[{"role":"user","parts":[{"text":"Ol\xc3\xa1, when is the next exam?"}]}]'
+
+
+def test_large_documents_are_compressed(documents):
+    connection, table = documents
+    content = CONTENT * 50
+    connection.execute(insert(table).values(id=1, content=content))
+
+    assert connection.execute(select(table.c.content)).scalar_one() == content
+    stored = connection.execute(text("SELECT content FROM documents")).scalar_one()
+    assert len(stored) < len(encode_compact_json(content, compress_from_bytes=10 ** 9)) / 5
+    assert zlib.decompress(stored)
+
+
+def test_documents_stored_as_json_text_are_still_read(documents):
+    connection, table = documents
+    connection.execute(text("""INSERT INTO documents VALUES (1, '[{"role": "user", "parts": []}]')"""))
+
+    assert connection.execute(select(table.c.content)).scalar_one() == [{"role": "user", "parts": []}]
+    assert decode_compact_json('{"a": null}') == {"a": None}
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+import firebase_admin
+import pytest
+
+from app.core.firebase import get_firebase_app, verify_id_token
+
+
+@pytest.fixture
+def no_firebase_app():
+    for app in list(firebase_admin._apps.values()):
+        firebase_admin.delete_app(app)
+    yield
+    for app in list(firebase_admin._apps.values()):
+        firebase_admin.delete_app(app)
+
+
+def test_firebase_app_is_initialized_once_on_first_use(no_firebase_app):
+    assert not firebase_admin._apps
+
+    app = get_firebase_app()
+
+    assert get_firebase_app() is app
+    assert list(firebase_admin._apps.values()) == [app]
+
+
+def test_verify_id_token_uses_the_lazy_app(no_firebase_app):
+    with patch("firebase_admin.auth.verify_id_token", return_value={"uid": "user"}) as verify:
+        assert verify_id_token("token") == {"uid": "user"}
+
+    verify.assert_called_once_with("token", app=firebase_admin.get_app())
@@ -0,0 +1,47 @@
+import pytest
+
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("request_seconds", "Latency.", ["route"], buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/api/user/")
+
+    assert histogram.count(route="/api/user/") == 4
+    assert registry.render().splitlines() == [
+        "# HELP request_seconds Latency.",
+        "# TYPE request_seconds histogram",
+        'request_seconds_bucket{route="/api/user/",le="0.1"} 2',
+        'request_seconds_bucket{route="/api/user/",le="1"} 3',
+        'request_seconds_bucket{route="/api/user/",le="+Inf"} 4',
+        'request_seconds_sum{route="/api/user/"} 3.65',
+        'request_seconds_count{route="/api/user/"} 4',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("calls_total", "Calls.", ["tool"])
+
+    counter.inc(tool='say "hi"\n')
+    counter.inc(2, tool='say "hi"\n')
+
+    assert counter.value(tool='say "hi"\n') == 3
+    assert counter.samples() == ['calls_total{tool="say \\"hi\\"\\n"} 3']
+
+
+def test_metric_rejects_unknown_labels():
+    counter = Counter("calls_total", "Calls.", ["tool"])
+
+    with pytest.raises(ValueError):
+        counter.inc(route="/")
+
+
+def test_registry_rejects_duplicate_names():
+    registry = MetricsRegistry()
+    registry.counter("calls_total", "Calls.")
+
+    with pytest.raises(ValueError):
+        registry.register(Histogram("calls_total", "Calls."))
@@ -0,0 +1,207 @@
+import json
+import uuid
+from io import BytesIO
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from google.genai.types import Content, Part
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from starlette.datastructures import Headers
+
+from app.core.db import Base
+from app.core.metrics import rate_limit_requests_total
+from app.core.rate_limit import DatabaseRateLimitBackend, InMemoryRateLimitBackend, RateLimit, \
+    RateLimitExceededError, RateLimiter, get_rate_limiter
+from app.core.security import get_current_user
+from app.crud import get_chat_crud, get_course_crud
+from app.dependencies import get_db
+from app.main import app
+from app.models import RateLimitCounter
+from app.routers.course_router import stream_course_ai
+from app.services import get_google_ai_service, LLMUnavailableError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "database"])
+def backend_and_clock(request):
+    clock = Clock()
+    if request.param == "memory":
+        yield InMemoryRateLimitBackend(clock=clock), clock
+        return
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RateLimitCounter.__table__])
+    yield DatabaseRateLimitBackend(engine, clock=clock), clock
+    engine.dispose()
+
+
+def make_limiter(backend, **options) -> RateLimiter:
+    options = {"limits": {"chat": RateLimit(per_minute=6, burst=2)}, "concurrency_per_user": 2,
+               "lease_seconds": 300, **options}
+    return RateLimiter(backend, **options)
+
+
+@pytest.mark.asyncio
+async def test_token_buckets_allow_a_burst_then_the_refill_rate(backend_and_clock):
+    backend, clock = backend_and_clock
+    limit = RateLimit(per_minute=6, burst=2)
+
+    assert await backend.take_token("user-1", limit) == 0
+    assert await backend.take_token("user-1", limit) == 0
+    # A token comes back every 10 seconds.
+    assert await backend.take_token("user-1", limit) == pytest.approx(10)
+    assert await backend.take_token("user-2", limit) == 0
+
+    clock.now += 4
+    assert await backend.take_token("user-1", limit) == pytest.approx(6)
+    clock.now += 6
+    assert await backend.take_token("user-1", limit) == 0
+    clock.now += 3600
+    # The bucket holds no more than the burst.
+    assert [await backend.take_token("user-1", limit) for _ in range(3)][2] > 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_slots_are_capped(backend_and_clock):
+    backend, clock = backend_and_clock
+
+    assert await backend.acquire_slot("user-1", limit=2, lease_seconds=300)
+    assert await backend.acquire_slot("user-1", limit=2, lease_seconds=300)
+    assert not await backend.acquire_slot("user-1", limit=2, lease_seconds=300)
+    assert await backend.acquire_slot("user-2", limit=2, lease_seconds=300)
+
+    await backend.release_slot("user-1")
+    assert await backend.acquire_slot("user-1", limit=2, lease_seconds=300)
+
+
+@pytest.mark.asyncio
+async def test_slots_left_by_a_dead_worker_expire_with_their_lease():
+    clock = Clock()
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RateLimitCounter.__table__])
+    backend = DatabaseRateLimitBackend(engine, clock=clock)
+    assert await backend.acquire_slot("user-1", limit=1, lease_seconds=300)
+    assert not await backend.acquire_slot("user-1", limit=1, lease_seconds=300)
+
+    clock.now += 301
+
+    assert await backend.acquire_slot("user-1", limit=1, lease_seconds=300)
+    assert not await backend.acquire_slot("user-1", limit=1, lease_seconds=300)
+
+
+@pytest.mark.asyncio
+async def test_the_limiter_applies_the_bucket_and_the_concurrency_cap():
+    limiter = make_limiter(InMemoryRateLimitBackend(clock=Clock()), concurrency_per_user=1)
+    limited = rate_limit_requests_total.value(route="chat", outcome="concurrency_limited")
+
+    assert await limiter.acquire("chat", "user-1")
+    with pytest.raises(RateLimitExceededError):
+        await limiter.acquire("chat", "user-1")
+    assert rate_limit_requests_total.value(route="chat", outcome="concurrency_limited") == limited + 1
+
+    await limiter.release("chat", "user-1")
+    with pytest.raises(RateLimitExceededError) as raised:
+        await limiter.acquire("chat", "user-1")
+    # Both tokens of the burst were taken, the second by the request refused for its concurrency.
+    assert raised.value.retry_after_seconds == pytest.approx(10)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_allowed_when_the_backend_fails():
+    backend = MagicMock()
+    backend.take_token.side_effect = ConnectionError("Database unavailable.")
+    limiter = make_limiter(backend)
+
+    assert not await limiter.acquire("chat", "user-1")
+    assert rate_limit_requests_total.value(route="chat", outcome="error") >= 1
+
+
+@pytest.fixture
+def chat_client():
+    user = MagicMock(uuid=str(uuid.uuid4()))
+    ai_service = MagicMock()
+    contents = [Content(role="user", parts=[Part(text="Hi")]), Content(role="model", parts=[Part(text="Hello")])]
+    ai_service.send_message = AsyncMock(return_value=("Hello", contents))
+    chat_crud = MagicMock()
+    chat_crud.get_chat_contents.return_value = []
+    limiter = make_limiter(InMemoryRateLimitBackend())
+    app.dependency_overrides[get_chat_crud] = lambda: chat_crud
+    app.dependency_overrides[get_google_ai_service] = lambda: ai_service
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+
+    with TestClient(app) as test_client:
+        yield test_client, limiter
+
+    app.dependency_overrides = {}
+
+
+def test_chat_messages_over_the_limit_get_a_429(chat_client):
+    client, limiter = chat_client
+
+    responses = [client.post("/api/chat/message", data={"message": "Hi"}) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].headers["Retry-After"] == "10"
+    # The concurrency slots were released after each request.
+    assert limiter.backend._in_flight == {}
+
+
+def test_course_streams_hold_a_concurrency_slot_until_they_end():
+    user = MagicMock(uuid=str(uuid.uuid4()))
+    limiter = make_limiter(InMemoryRateLimitBackend(), limits={"course_ai": RateLimit(per_minute=6, burst=3)},
+                           concurrency_per_user=1)
+    in_flight_while_streaming = []
+
+    async def stream_structured_output(**kwargs):
+        in_flight_while_streaming.append(dict(limiter.backend._in_flight))
+        raise LLMUnavailableError("Circuit open.", retry_after_seconds=5)
+        yield
+
+    app.dependency_overrides[get_course_crud] = lambda: MagicMock()
+    app.dependency_overrides[get_google_ai_service] = lambda: MagicMock(
+        stream_structured_output=stream_structured_output)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    files = [("files", ("timetable.pdf", BytesIO(b"pdf content"), "application/pdf"))]
+    try:
+        with TestClient(app) as client:
+            first = client.post("/api/course/ai/stream", files=files)
+            # Another request holds the only slot of the user.
+            limiter.backend._in_flight[f"in_flight:{user.uuid}"] = 1
+            limited = client.post("/api/course/ai/stream", files=files)
+            del limiter.backend._in_flight[f"in_flight:{user.uuid}"]
+    finally:
+        app.dependency_overrides = {}
+
+    assert in_flight_while_streaming == [{f"in_flight:{user.uuid}": 1}]
+    assert [json.loads(line)["event"] for line in first.text.splitlines()] == ["error"]
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "1"
+    assert limiter.backend._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_the_slot_of_a_course_stream_that_never_started_is_released():
+    user = MagicMock(uuid=str(uuid.uuid4()))
+    limiter = make_limiter(InMemoryRateLimitBackend(), limits={"course_ai": RateLimit(per_minute=6, burst=3)})
+    files = [UploadFile(BytesIO(b"pdf content"), size=11, filename="timetable.pdf",
+                        headers=Headers({"content-type": "application/pdf"}))]
+
+    response = await stream_course_ai(files=files, message=None, timezone=None, course_crud=MagicMock(),
+                                      current_user=user, ai_service=MagicMock(), limiter=limiter)
+
+    assert limiter.backend._in_flight == {f"in_flight:{user.uuid}": 1}
+    # The client left before the stream started: only the background task of the response runs.
+    await response.background()
+    assert limiter.backend._in_flight == {}
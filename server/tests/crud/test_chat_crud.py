@@ -5,7 +5,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.crud.chat_crud import chat_crud
-from tests.mock_models import TestBase, MockUser, MockChatMessage, MockChatMessageSchema, MockChatRole
+from tests.mock_models import TestBase, MockUser, MockChatMessage, MockChatMessageSchema, MockChatRole, \
+    MockArchivedChatMessage
 
 
 @pytest.fixture(scope="function")
@@ -24,6 +25,7 @@ def test_db_session() -> Session:
 @pytest.fixture(scope="function")
 def mock_chat_model(monkeypatch):
     monkeypatch.setattr(chat_crud, 'model', MockChatMessage)
+    monkeypatch.setattr(chat_crud, 'archive_model', MockArchivedChatMessage)
 
 
 @pytest.fixture(scope="function")
@@ -60,6 +62,18 @@ def test_get_empty_chat_history(test_db_session: Session, test_user: MockUser, m
     assert history == []
 
 
+def test_get_chat_contents_in_order(test_db_session: Session, test_user: MockUser, mock_chat_model):
+    test_db_session.add_all([
+        MockChatMessage(uuid=str(uuid.uuid4()), role="model", text="Hi", content="second", order=1,
+                        owner_uuid=test_user.uuid),
+        MockChatMessage(uuid=str(uuid.uuid4()), role="user", text="Hello", content="first", order=0,
+                        owner_uuid=test_user.uuid),
+    ])
+    test_db_session.commit()
+
+    assert chat_crud.get_chat_contents(db=test_db_session, user_uuid=test_user.uuid) == ["first", "second"]
+
+
 def test_append_chat_history(test_db_session: Session, test_user: MockUser, mock_chat_model):
     new_message = MockChatMessageSchema(role=MockChatRole.USER, text="First message")
 
@@ -113,4 +127,16 @@ def test_delete_chat_history_isolates_users(test_db_session: Session, test_user:
     assert num_deleted == 1
     assert test_db_session.query(MockChatMessage).count() == 1
     remaining_message = test_db_session.query(MockChatMessage).one()
-    assert remaining_message.owner_uuid == user2.uuid
\ No newline at end of file
+    assert remaining_message.owner_uuid == user2.uuid
+
+def test_delete_chat_history_includes_archived_messages(test_db_session: Session, test_user: MockUser,
+                                                        mock_chat_model):
+    test_db_session.add_all([
+        MockArchivedChatMessage(uuid=str(uuid.uuid4()), role="user", text="Archived", order=0,
+                                owner_uuid=test_user.uuid),
+        MockChatMessage(uuid=str(uuid.uuid4()), role="model", text="Kept", order=1, owner_uuid=test_user.uuid),
+    ])
+    test_db_session.commit()
+
+    assert chat_crud.delete_chat_history(db=test_db_session, user_uuid=test_user.uuid) == 2
+    assert test_db_session.query(MockArchivedChatMessage).count() == 0
@@ -1,10 +1,12 @@
 import uuid
+from datetime import datetime
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.crud.course_crud import course_crud
+from app.schemas import Course
 from tests.mock_models import TestBase, MockCourse, MockEvaluation, MockLecture, MockUser, \
     MockCourseSchema, MockEvaluationSchema, MockLectureSchema
 
@@ -12,6 +14,7 @@ from tests.mock_models import TestBase, MockCourse, MockEvaluation, MockLecture,
 @pytest.fixture(scope="function")
 def test_db_session() -> Session:
     engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", lambda dbapi_connection, _: dbapi_connection.execute("PRAGMA foreign_keys=ON"))
     TestBase.metadata.create_all(bind=engine)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
@@ -63,11 +66,18 @@ def test_get_multi_courses(test_db_session: Session, test_user: MockUser):
     first_two = course_crud.get_multi(test_db_session, limit=2)
     assert len(first_two) == 2
 
-    next_two = course_crud.get_multi(test_db_session, skip=2, limit=2)
+    cursor = course_crud.get_next_cursor(first_two, limit=2)
+    next_two = course_crud.get_multi(test_db_session, cursor=cursor, limit=2)
     assert len(next_two) == 2
 
-    assert first_two[0].title == "Course 0"
-    assert next_two[0].title == "Course 2"
+    cursor = course_crud.get_next_cursor(next_two, limit=2)
+    last_one = course_crud.get_multi(test_db_session, cursor=cursor, limit=2)
+    assert len(last_one) == 1
+    assert course_crud.get_next_cursor(last_one, limit=2) is None
+
+    courses = first_two + next_two + last_one
+    assert [course.uuid for course in courses] == sorted(course.uuid for course in courses)
+    assert {course.title for course in courses} == {f"Course {i}" for i in range(5)}
 
 
 def test_get_all_by_owner_uuid(test_db_session: Session, test_user: MockUser, mock_models):
@@ -136,3 +146,43 @@ def test_remove_course_with_cascading_delete(test_db_session: Session, test_user
     assert test_db_session.query(MockCourse).count() == 0
     assert test_db_session.query(MockEvaluation).count() == 0
     assert test_db_session.query(MockLecture).count() == 0
+
+
+def test_remove_with_children_counts_and_cascades(test_db_session: Session, test_user: MockUser, mock_models):
+    course = MockCourse(uuid=str(uuid.uuid4()), title="Course to Delete", owner_uuid=test_user.uuid)
+    start = datetime.fromisoformat("2025-08-01T10:00:00+00:00")
+    course.lectures = [MockLecture(title=f"Class {i}", start_datetime=start, end_datetime=start) for i in range(3)]
+    course.evaluations = [MockEvaluation(uuid=str(uuid.uuid4()), title="Midterm", type="exam",
+                                         start_datetime=start, end_datetime=start)]
+    test_db_session.add(course)
+    test_db_session.commit()
+
+    deleted_lectures, deleted_evaluations = course_crud.remove_with_children(test_db_session, obj_uuid=course.uuid)
+
+    assert (deleted_lectures, deleted_evaluations) == (3, 1)
+    assert test_db_session.query(MockCourse).count() == 0
+    assert test_db_session.query(MockEvaluation).count() == 0
+    assert test_db_session.query(MockLecture).count() == 0
+
+
+def test_get_course_graphs_by_owner_uses_constant_queries(test_db_session: Session, test_user: MockUser, mock_models):
+    start = datetime.fromisoformat("2025-08-01T10:00:00+00:00")
+    for i in range(5):
+        course = MockCourse(uuid=f"course-{i}", title=f"Course {i}", owner_uuid=test_user.uuid)
+        course.lectures = [MockLecture(uuid=f"lecture-{i}-{j}", title="Class", present=False,
+                                       start_datetime=start, end_datetime=start) for j in range(3)]
+        course.evaluations = [MockEvaluation(uuid=f"evaluation-{i}", title="Exam", type="exam", present=None,
+                                             start_datetime=start, end_datetime=start)]
+        test_db_session.add(course)
+    test_db_session.commit()
+    expected = [Course.model_validate(course).model_dump(mode="json")
+                for course in course_crud.get_all_by_owner_uuid(test_db_session, owner_uuid=test_user.uuid)]
+    owner_uuid = test_user.uuid
+    test_db_session.expire_all()
+
+    statements = []
+    event.listen(test_db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    courses = course_crud.get_course_graphs_by_owner(test_db_session, owner_uuid=owner_uuid)
+
+    assert len(statements) == 3
+    assert courses == expected
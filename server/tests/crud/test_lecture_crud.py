@@ -0,0 +1,97 @@
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, Session
+
+from app.crud.lecture_crud import lecture_crud
+from tests.mock_models import TestBase, MockCourse, MockLecture, MockUser, MockLectureCreate
+
+
+@pytest.fixture(scope="function")
+def test_db_session() -> Session:
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestBase.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        TestBase.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def mock_lecture_model(monkeypatch):
+    monkeypatch.setattr(lecture_crud, 'model', MockLecture)
+    # The `app.crud.lecture_crud` attribute is shadowed by the CRUD instance re-exported by `app.crud`.
+    monkeypatch.setattr(sys.modules['app.crud.lecture_crud'], 'Course', MockCourse)
+
+
+@pytest.fixture(scope="function")
+def test_course(test_db_session: Session) -> MockCourse:
+    user = MockUser(uuid=str(uuid.uuid4()), name="Test User", email="test@example.com",
+                    hashed_password="fake_password")
+    course = MockCourse(uuid=str(uuid.uuid4()), title="Calculus I", owner=user)
+    test_db_session.add(course)
+    test_db_session.commit()
+    return course
+
+
+def test_create_multi_inserts_in_batches(test_db_session: Session, test_course: MockCourse, mock_lecture_model):
+    lectures = (MockLectureCreate(title=f"Lecture {i}", course_uuid=test_course.uuid) for i in range(7))
+
+    inserted = lecture_crud.create_multi(db=test_db_session, objs_in=lectures, batch_size=3)
+
+    assert inserted == 7
+    assert test_db_session.query(MockLecture).count() == 7
+    assert all(lecture.uuid for lecture in test_db_session.query(MockLecture))
+
+
+def test_create_multi_rolls_back_on_error(test_db_session: Session, test_course: MockCourse, mock_lecture_model):
+    def lectures():
+        yield MockLectureCreate(title="Lecture 0", course_uuid=test_course.uuid)
+        raise ValueError("Broken input")
+
+    with pytest.raises(ValueError):
+        lecture_crud.create_multi(db=test_db_session, objs_in=lectures(), batch_size=1)
+
+    assert test_db_session.query(MockLecture).count() == 0
+
+
+def test_get_lectures_by_owner_keyset_pagination(test_db_session: Session, test_course: MockCourse,
+                                                 mock_lecture_model):
+    start = datetime.fromisoformat("2025-08-01T10:00:00Z")
+    # Pairs of lectures share the same start time, so the UUID must break the ties.
+    lectures = [MockLectureCreate(title=f"Lecture {i}", course_uuid=test_course.uuid,
+                                  start_datetime=start + timedelta(days=i // 2),
+                                  end_datetime=start + timedelta(days=i // 2, hours=1))
+                for i in range(7)]
+    lecture_crud.create_multi(db=test_db_session, objs_in=lectures)
+
+    pages, cursor = [], None
+    while True:
+        page = lecture_crud.get_lectures_by_owner(test_db_session, owner_uuid=test_course.owner_uuid,
+                                                  cursor=cursor, limit=3)
+        pages.append(page)
+        cursor = lecture_crud.get_next_cursor(page, limit=3)
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    retrieved = [lecture for page in pages for lecture in page]
+    assert len({lecture.uuid for lecture in retrieved}) == 7
+    keys = [(lecture.start_datetime, lecture.uuid) for lecture in retrieved]
+    assert keys == sorted(keys)
+
+    iterated = list(lecture_crud.iter_all(lecture_crud.get_lectures_by_owner, db=test_db_session,
+                                          owner_uuid=test_course.owner_uuid, page_size=2))
+    assert [lecture.uuid for lecture in iterated] == [lecture.uuid for lecture in retrieved]
+
+
+def test_get_lectures_by_owner_invalid_cursor(test_db_session: Session, test_course: MockCourse,
+                                              mock_lecture_model):
+    with pytest.raises(ValueError):
+        lecture_crud.get_lectures_by_owner(test_db_session, owner_uuid=test_course.owner_uuid, cursor="not-a-cursor")
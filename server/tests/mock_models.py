@@ -26,12 +26,24 @@ class MockChatMessage(TestBase):
     uuid = Column(String, primary_key=True)
     role = Column(String)
     text = Column(Text)
+    files = Column(Text, nullable=True)
     content = Column(Text, nullable=True)
     order = Column(Integer)
     owner_uuid = Column(String, ForeignKey("users.uuid"))
     owner = relationship("MockUser", back_populates="chat_history")
 
 
+class MockArchivedChatMessage(TestBase):
+    __tablename__ = "archived_chat_messages"
+    uuid = Column(String, primary_key=True)
+    role = Column(String)
+    text = Column(Text)
+    files = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)
+    order = Column(Integer)
+    owner_uuid = Column(String, ForeignKey("users.uuid"))
+
+
 class MockEvaluationTypes(Enum):
     ASSIGNMENT = "assignment"
 
@@ -49,6 +61,13 @@ class MockLectureSchema(BaseModel):
     end_datetime: datetime = datetime.fromisoformat("2025-07-23T15:00:00Z")
 
 
+class MockLectureCreate(BaseModel):
+    title: str = "Test Lecture"
+    start_datetime: datetime = datetime.fromisoformat("2025-07-23T14:00:00Z")
+    end_datetime: datetime = datetime.fromisoformat("2025-07-23T15:00:00Z")
+    course_uuid: str
+
+
 class MockEvaluationGenerate(BaseModel):
     title: str = "AI Generated Evaluation"
     type: MockEvaluationTypes = MockEvaluationTypes.ASSIGNMENT
@@ -102,19 +121,19 @@ class MockEvaluation(TestBase):
     start_datetime = Column(DateTime(timezone=True))
     end_datetime = Column(DateTime(timezone=True))
     present = Column(Boolean, nullable=True)
-    course_uuid = Column(String, ForeignKey("courses.uuid"))
+    course_uuid = Column(String, ForeignKey("courses.uuid", ondelete="CASCADE"))
     course = relationship("MockCourse", back_populates="evaluations")
 
 
 class MockLecture(TestBase):
     __tablename__ = "lectures"
-    uuid = Column(String, primary_key=True)
+    uuid = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String)
     summary = Column(Text, nullable=True)
     start_datetime = Column(DateTime(timezone=True))
     end_datetime = Column(DateTime(timezone=True))
     present = Column(Boolean, nullable=True)
-    course_uuid = Column(String, ForeignKey("courses.uuid"))
+    course_uuid = Column(String, ForeignKey("courses.uuid", ondelete="CASCADE"))
     course = relationship("MockCourse", back_populates="lectures")
 
 
@@ -126,5 +145,7 @@ class MockCourse(TestBase):
     semester = Column(String)
     owner_uuid = Column(String, ForeignKey("users.uuid"))
     owner = relationship("MockUser", back_populates="courses")
-    evaluations = relationship("MockEvaluation", back_populates="course", cascade="all, delete-orphan")
-    lectures = relationship("MockLecture", back_populates="course", cascade="all, delete-orphan")
+    evaluations = relationship("MockEvaluation", back_populates="course", cascade="all, delete-orphan",
+                               passive_deletes=True)
+    lectures = relationship("MockLecture", back_populates="course", cascade="all, delete-orphan",
+                            passive_deletes=True)
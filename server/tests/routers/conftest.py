@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 (registers every table in Base.metadata)
+from app.core.db import Base, instrument_engine, track_all_queries, unit_of_work
+from app.core.security import get_current_user
+from app.dependencies import get_db
+from app.main import app
+from app.models import User
+
+
+@pytest.fixture
+def db_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    event.listen(engine, "connect", lambda dbapi_connection, _: dbapi_connection.execute("PRAGMA foreign_keys=ON"))
+    instrument_engine(engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session_factory(db_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+
+@pytest.fixture
+def db_user(db_session_factory) -> User:
+    with db_session_factory(expire_on_commit=False) as db:
+        user = User(uuid="test-user", name="Test User", email="test@example.com", hashed_password="")
+        db.add(user)
+        db.commit()
+    return user
+
+
+@pytest.fixture
+def db_client(db_session_factory, db_user):
+    """A client for the real app, backed by an in-memory SQLite database, authenticated as `db_user`."""
+    def override_get_db():
+        db = db_session_factory()
+        try:
+            with unit_of_work(db):
+                yield db
+        finally:
+            db.close()
+
+    def override_get_current_user(db: Session = Depends(get_db)):
+        return db.get(User, db_user.uuid)
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    yield TestClient(app)
+
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Asserts that the block runs at most `max_queries` SQL statements, so that lazy loads and N+1 queries fail the
+    tests instead of slowing down production.
+
+        with query_budget(3):
+            db_client.get("/api/...")
+    """
+    @contextmanager
+    def assert_query_budget(max_queries: int):
+        with track_all_queries("query budget") as stats:
+            yield stats
+        statement, repetitions = stats.most_repeated()
+        assert stats.count <= max_queries, (
+            f"Ran {stats.count} SQL statements, over the budget of {max_queries}. "
+            f"The most repeated SELECT ran {repetitions} times: {statement}"
+        )
+
+    return assert_query_budget
@@ -0,0 +1,158 @@
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.security import get_current_user
+from app.crud import get_course_crud, get_lecture_crud, get_evaluation_crud, get_event_crud, get_routine_crud
+from app.dependencies import get_db
+from app.main import app
+from app.models import Course, Lecture, Evaluation, Event
+from tests.mock_models import MockCourse, MockLecture
+
+
+def make_lecture(lecture_uuid: str, course_uuid: str = "course-uuid") -> MockLecture:
+    return MockLecture(uuid=lecture_uuid, title="Lecture", course_uuid=course_uuid, present=False,
+                       start_datetime=datetime.fromisoformat("2025-08-01T10:00:00Z"),
+                       end_datetime=datetime.fromisoformat("2025-08-01T12:00:00Z"))
+
+
+@pytest.fixture
+def mock_user():
+    return MagicMock(uuid=str(uuid.uuid4()))
+
+
+@pytest.fixture
+def mock_cruds():
+    cruds = {name: MagicMock() for name in ("course", "lecture", "evaluation", "event", "routine")}
+    cruds["course"].get_owned.return_value = [MockCourse(uuid="course-uuid", title="Course")]
+    cruds["lecture"].get_owned.return_value = [make_lecture("lecture-1"), make_lecture("lecture-2")]
+    cruds["lecture"].update.side_effect = lambda db, db_obj, obj_in: db_obj
+    cruds["lecture"].create.side_effect = lambda db, obj_in: make_lecture("new-lecture")
+    cruds["lecture"].remove.side_effect = lambda db, obj_uuid: make_lecture(obj_uuid)
+    return cruds
+
+
+@pytest.fixture
+def mock_db_session():
+    return MagicMock(spec=Session)
+
+
+@pytest.fixture
+def client(mock_cruds, mock_user, mock_db_session):
+    app.dependency_overrides[get_course_crud] = lambda: mock_cruds["course"]
+    app.dependency_overrides[get_lecture_crud] = lambda: mock_cruds["lecture"]
+    app.dependency_overrides[get_evaluation_crud] = lambda: mock_cruds["evaluation"]
+    app.dependency_overrides[get_event_crud] = lambda: mock_cruds["event"]
+    app.dependency_overrides[get_routine_crud] = lambda: mock_cruds["routine"]
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+    app.dependency_overrides[get_db] = lambda: mock_db_session
+
+    yield TestClient(app)
+
+    app.dependency_overrides = {}
+
+
+def test_batch_applies_all_operations_in_one_transaction(client, mock_cruds, mock_user, mock_db_session):
+    operations = [
+        {"op": "update", "resource": "lecture", "uuid": "lecture-1", "data": {"present": True}},
+        {"op": "create", "resource": "lecture", "data": {
+            "title": "New", "course_uuid": "course-uuid",
+            "start_datetime": "2025-08-02T10:00:00Z", "end_datetime": "2025-08-02T12:00:00Z"}},
+        {"op": "delete", "resource": "lecture", "uuid": "lecture-2"},
+    ]
+
+    response = client.post("/api/batch/", json={"operations": operations})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["applied"] is True
+    assert [result["status"] for result in body["results"]] == [200, 201, 200]
+    assert body["results"][1]["uuid"] == "new-lecture"
+
+    mock_cruds["lecture"].get_owned.assert_called_once()
+    assert mock_cruds["lecture"].get_owned.call_args.kwargs["obj_uuids"] == {"lecture-1", "lecture-2"}
+    mock_cruds["course"].get_owned.assert_called_once()
+    # The commit is left to the request's unit of work.
+    mock_db_session.flush.assert_called_once()
+    mock_db_session.commit.assert_not_called()
+
+
+def test_batch_is_not_applied_if_any_operation_fails(client, mock_cruds, mock_db_session):
+    operations = [
+        {"op": "delete", "resource": "lecture", "uuid": "lecture-1"},
+        {"op": "update", "resource": "lecture", "uuid": "lecture-1", "data": {"title": "Deleted before"}},
+        {"op": "update", "resource": "lecture", "uuid": "not-owned", "data": {"title": "Not mine"}},
+        {"op": "create", "resource": "event", "data": {"title": "Missing datetimes"}},
+    ]
+
+    response = client.post("/api/batch/", json={"operations": operations})
+
+    assert response.status_code == 404
+    body = response.json()
+    assert body["applied"] is False
+    assert [result["status"] for result in body["results"]] == [424, 404, 404, 422]
+    mock_cruds["lecture"].update.assert_not_called()
+    mock_cruds["lecture"].remove.assert_not_called()
+    mock_db_session.commit.assert_not_called()
+
+
+def test_batch_rejects_uuid_on_create(client):
+    operations = [{"op": "create", "resource": "event", "uuid": "some-uuid", "data": {}}]
+
+    response = client.post("/api/batch/", json={"operations": operations})
+
+    assert response.status_code == 422
+
+
+def test_batch_update_sets_false_values_and_keeps_unsent_fields(db_client, db_session_factory, db_user):
+    with db_session_factory() as db:
+        db.add(Course(uuid="course-1", title="Course", owner_uuid=db_user.uuid))
+        db.add(Lecture(uuid="lecture-1", title="Lecture", summary="Limits", present=True, course_uuid="course-1",
+                       start_datetime=datetime.fromisoformat("2025-08-01T10:00:00Z"),
+                       end_datetime=datetime.fromisoformat("2025-08-01T12:00:00Z")))
+        db.commit()
+
+    response = db_client.post("/api/batch/", json={"operations": [
+        {"op": "update", "resource": "lecture", "uuid": "lecture-1", "data": {"present": False}},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["data"]["present"] is False
+    with db_session_factory() as db:
+        lecture = db.get(Lecture, "lecture-1")
+        assert lecture.present is False
+        assert (lecture.title, lecture.summary) == ("Lecture", "Limits")
+
+
+def test_batch_update_checks_the_time_range_with_the_stored_fields(db_client, db_session_factory, db_user):
+    start = datetime.fromisoformat("2025-08-01T10:00:00Z")
+    end = datetime.fromisoformat("2025-08-01T12:00:00Z")
+    with db_session_factory() as db:
+        db.add(Course(uuid="course-1", title="Course", owner_uuid=db_user.uuid))
+        db.add(Lecture(uuid="lecture-1", title="Lecture", course_uuid="course-1", start_datetime=start,
+                       end_datetime=end))
+        db.add(Evaluation(uuid="evaluation-1", type="exam", title="Exam", course_uuid="course-1",
+                          start_datetime=start, end_datetime=end))
+        db.add(Event(uuid="event-1", title="Event", owner_uuid=db_user.uuid, start_datetime=start, end_datetime=end))
+        db.commit()
+
+    response = db_client.post("/api/batch/", json={"operations": [
+        {"op": "update", "resource": "lecture", "uuid": "lecture-1", "data": {"end_datetime": "2025-08-01T09:00:00Z"}},
+        {"op": "update", "resource": "evaluation", "uuid": "evaluation-1",
+         "data": {"start_datetime": "2025-08-01T12:00:00Z"}},
+        {"op": "update", "resource": "event", "uuid": "event-1", "data": {"start_datetime": "2025-08-01T13:00:00Z"}},
+    ]})
+
+    assert response.status_code == 422
+    assert [result["status"] for result in response.json()["results"]] == [422, 422, 422]
+    assert response.json()["results"][0]["detail"] == "end_datetime must be after start_datetime."
+
+    response = db_client.post("/api/batch/", json={"operations": [
+        {"op": "update", "resource": "event", "uuid": "event-1", "data": {"start_datetime": "2025-08-01T11:00:00Z"}},
+    ]})
+
+    assert response.status_code == 200
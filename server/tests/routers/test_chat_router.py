@@ -1,23 +1,31 @@
-import json
+import asyncio
+import itertools
 import uuid
 from unittest.mock import MagicMock, AsyncMock, call
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from google.genai.types import Content, Part
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.db import Base, unit_of_work
 from app.core.security import get_current_user
 from app.crud import get_chat_crud
 from app.dependencies import get_db
 from app.main import app
+from app.models import User
 from app.schemas import ChatMessageBase, ChatMessage, ChatRole
-from app.services import get_google_ai_service
+from app.services import get_google_ai_service, get_chat_turn_queue, ChatTurnQueue, LLMUnavailableError
 
 
 @pytest.fixture
 def mock_chat_crud():
-    return MagicMock()
+    chat_crud = MagicMock()
+    chat_crud.lock_chat_history.return_value = 5
+    return chat_crud
 
 
 @pytest.fixture
@@ -54,7 +62,7 @@ def client(mock_chat_crud, mock_ai_service, mock_user, mock_db_session):
 
 def test_get_chat_history(client, mock_chat_crud, mock_user, mock_db_session):
     mock_history = [
-        ChatMessage(role=ChatRole.USER, text="Test message", content="[]")
+        ChatMessage(role=ChatRole.USER, text="Test message", content=[])
     ]
     mock_chat_crud.get_chat_history.return_value = mock_history
 
@@ -86,9 +94,7 @@ async def test_send_chat_message(client, mock_chat_crud, mock_ai_service, mock_u
     mock_ai_service.send_message.return_value = (ai_response_text, [user_content, model_content])
 
     history_content = Content(role="user", parts=[Part(text="Old message")])
-    mock_chat_crud.get_chat_history.return_value = [
-        ChatMessage(role=ChatRole.USER, text="Old message", content=json.dumps([history_content.model_dump()]))
-    ]
+    mock_chat_crud.get_chat_contents.return_value = [[history_content.model_dump(mode='json')]]
 
     response = client.post("/api/chat/message", data={"message": user_message_text})
 
@@ -99,12 +105,116 @@ async def test_send_chat_message(client, mock_chat_crud, mock_ai_service, mock_u
     assert mock_chat_crud.append_chat_history.call_count == 2
 
     expected_user_msg = ChatMessage(role=ChatRole.USER, text=user_message_text,
-                                    content=json.dumps([user_content.model_dump()]))
+                                    content=[user_content.model_dump(mode='json', exclude_none=True)])
     expected_model_msg = ChatMessage(role=ChatRole.MODEL, text=ai_response_text,
-                                     content=json.dumps([model_content.model_dump()]))
+                                     content=[model_content.model_dump(mode='json', exclude_none=True)])
 
     expected_calls = [
-        call(db=mock_db_session, user_uuid=mock_user.uuid, obj_in=expected_user_msg),
-        call(db=mock_db_session, user_uuid=mock_user.uuid, obj_in=expected_model_msg)
+        call(db=mock_db_session, user_uuid=mock_user.uuid, obj_in=expected_user_msg, order=5),
+        call(db=mock_db_session, user_uuid=mock_user.uuid, obj_in=expected_model_msg, order=6)
     ]
     mock_chat_crud.append_chat_history.assert_has_calls(expected_calls, any_order=True)
+
+
+def test_send_chat_message_when_the_llm_is_unavailable(client, mock_chat_crud, mock_ai_service):
+    mock_chat_crud.get_chat_contents.return_value = []
+    mock_ai_service.send_message.side_effect = LLMUnavailableError("Circuit open.", retry_after_seconds=12.5)
+
+    response = client.post("/api/chat/message", data={"message": "Hello AI"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "13"
+    mock_chat_crud.append_chat_history.assert_not_called()
+
+
+def test_send_chat_message_retried_with_an_idempotency_key(client, mock_chat_crud, mock_ai_service):
+    mock_chat_crud.get_chat_contents.return_value = []
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post("/api/chat/message", data={"message": "Hello AI"}, headers=headers)
+    retry = client.post("/api/chat/message", data={"message": "Hello AI"}, headers=headers)
+    reused = client.post("/api/chat/message", data={"message": "Something else"}, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json() == "Hi back"
+    assert reused.status_code == 422
+    mock_ai_service.send_message.assert_awaited_once()
+    assert mock_chat_crud.append_chat_history.call_count == 2
+
+
+async def send_overlapping_turns(tmp_path, turn_queues: list[ChatTurnQueue]):
+    """
+    Sends two chat turns at once, each through the next of `turn_queues`, and returns the responses, the length of the
+    history each turn read and the history after them.
+    """
+    # A database file, unlike the in-memory one shared by the sessions of the other tests, only shows a session what
+    # the others committed.
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory(expire_on_commit=False) as db:
+        user = User(uuid="test-user", name="Test User", email="test@example.com", hashed_password="")
+        db.add(user)
+        db.commit()
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            with unit_of_work(db):
+                yield db
+        finally:
+            db.close()
+
+    queues = itertools.cycle(turn_queues)
+    context_lengths = []
+
+    async def send_message(instruction, message, tools, files, llm_context):
+        context_lengths.append(len(llm_context))
+        await asyncio.sleep(0.05)
+        return f"Reply to {message}", [Content(role="user", parts=[Part(text=message)]),
+                                       Content(role="model", parts=[Part(text=f"Reply to {message}")])]
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_google_ai_service] = lambda: MagicMock(send_message=send_message)
+    app.dependency_overrides[get_chat_turn_queue] = lambda: next(queues)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            responses = await asyncio.gather(client.post("/api/chat/message", data={"message": "First"}),
+                                             client.post("/api/chat/message", data={"message": "Second"}))
+            history = await client.get("/api/chat/history")
+    finally:
+        app.dependency_overrides = {}
+        engine.dispose()
+    return responses, context_lengths, history.json()
+
+
+@pytest.mark.asyncio
+async def test_overlapping_chat_turns_read_the_history_of_the_previous_one(tmp_path):
+    responses, context_lengths, history = await send_overlapping_turns(
+        tmp_path, [ChatTurnQueue(ttl_seconds=60, max_keys=10)])
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert context_lengths == [0, 2]
+    assert len(history) == 4
+
+
+@pytest.mark.asyncio
+async def test_overlapping_chat_turns_on_two_workers_without_row_locks_conflict(tmp_path):
+    # Each worker has its own queue, and SQLite ignores the lock of the chat.
+    responses, context_lengths, history = await send_overlapping_turns(
+        tmp_path, [ChatTurnQueue(ttl_seconds=60, max_keys=10), ChatTurnQueue(ttl_seconds=60, max_keys=10)])
+
+    assert sorted(response.status_code for response in responses) == [200, 409]
+    assert context_lengths == [0, 0]
+    assert len(history) == 2
+
+
+def test_the_chat_is_locked_for_update_on_postgresql():
+    statements = []
+    db = MagicMock(spec=Session)
+    db.execute.side_effect = lambda statement: statements.append(statement) or MagicMock()
+
+    get_chat_crud().lock_chat_history(db=db, user_uuid="test-user")
+
+    assert "FOR UPDATE" in str(statements[0].compile(dialect=postgresql.dialect()))
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime, timezone
 from io import BytesIO
 from unittest.mock import MagicMock, AsyncMock
@@ -10,7 +11,8 @@ from app.core.security import get_current_user
 from app.crud import get_course_crud
 from app.dependencies import get_db
 from app.main import app
-from app.services import get_google_ai_service
+from app.schemas import CourseGenerate
+from app.services import get_google_ai_service, LLMUnavailableError
 from tests.mock_models import MockCourseGenerate, MockCourse, MockUser
 
 
@@ -22,7 +24,7 @@ def override_get_db():
 def mock_course_crud():
     crud = MagicMock()
     crud.get_all_by_owner_uuid.return_value = [
-        MockCourse(uuid="test-uuid-1", title="DS", semester="2025.2")
+        MockCourse(uuid="test-uuid-1", title="DS", semester="2025.2", owner_uuid="test-user")
     ]
     new_course = MockCourse(
         uuid="new-course-uuid", title="New Course", semester="2025.2"
@@ -97,10 +99,11 @@ async def test_create_course_success(client, mock_course_crud, mock_ai_service,
 
 
 @pytest.mark.asyncio
-async def test_create_course_invalid_timezone(client):
+@pytest.mark.parametrize("timezone_key", ["Invalid/Timezone", "../Invalid"])
+async def test_create_course_invalid_timezone(client, timezone_key):
     file_content = b"pdf content"
     files = [("files", ("mock.pdf", BytesIO(file_content), "application/pdf"))]
-    form_data = {"timezone": "Invalid/Timezone"}
+    form_data = {"timezone": timezone_key}
 
     response = client.post("/api/course/ai", files=files, data=form_data)
 
@@ -154,3 +157,77 @@ async def test_create_course_pydantic_validation_error(client, mock_ai_service):
 
     assert response.status_code == 500
     assert response.json()["detail"] == "Error while parsing course information"
+
+
+def stream_of(course_generated, error: Exception | None = None):
+    async def stream_structured_output(**kwargs):
+        for lecture in course_generated.lectures:
+            yield "lectures", lecture
+        if error:
+            raise error
+        for evaluation in course_generated.evaluations:
+            yield "evaluations", evaluation
+        yield None, course_generated
+
+    return stream_structured_output
+
+
+def test_stream_course_ai_sends_each_item_then_the_course(client, mock_course_crud, mock_ai_service,
+                                                         mock_current_user):
+    mock_ai_service.stream_structured_output = stream_of(MockCourseGenerate())
+    files = [("files", ("mock.pdf", BytesIO(b"pdf content"), "application/pdf"))]
+
+    response = client.post("/api/course/ai/stream", files=files, data={"timezone": "America/Sao_Paulo"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["lecture", "evaluation", "course"]
+    assert events[0]["index"] == 0
+    assert events[0]["item"]["start_datetime"] == "2025-08-01T13:00:00Z"
+    assert events[2]["course"]["title"] == "New Course"
+    call_args = mock_course_crud.create_with_children.call_args[1]
+    assert call_args["owner_uuid"] == mock_current_user.uuid
+    assert call_args["obj_in"].lectures[0].start_datetime == datetime(2025, 8, 1, 13, 0, tzinfo=timezone.utc)
+
+
+def test_stream_course_ai_ends_with_an_error_event(client, mock_course_crud, mock_ai_service):
+    mock_ai_service.stream_structured_output = stream_of(
+        MockCourseGenerate(), error=LLMUnavailableError("Circuit open.", retry_after_seconds=5))
+    files = [("files", ("mock.pdf", BytesIO(b"pdf content"), "application/pdf"))]
+
+    response = client.post("/api/course/ai/stream", files=files)
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["lecture", "error"]
+    assert events[1]["retry_after_seconds"] == 5
+    mock_course_crud.create_with_children.assert_not_called()
+
+
+def test_stream_course_ai_ends_with_an_error_event_when_the_course_isnt_saved(client, mock_course_crud,
+                                                                              mock_ai_service):
+    mock_ai_service.stream_structured_output = stream_of(MockCourseGenerate())
+    mock_course_crud.create_with_children.side_effect = RuntimeError("Database unavailable.")
+    files = [("files", ("mock.pdf", BytesIO(b"pdf content"), "application/pdf"))]
+
+    response = client.post("/api/course/ai/stream", files=files)
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["lecture", "evaluation", "error"]
+    assert events[2]["detail"] == "Error while saving the course"
+
+
+def test_create_course_extracts_each_file_separately(client, mock_course_crud, mock_ai_service):
+    mock_ai_service.generate_structured_output.return_value = CourseGenerate.model_validate(
+        MockCourseGenerate().model_dump(mode="json"))
+    # Together the files are over the size of a single request to the model.
+    files = [("files", (f"part{i}.pdf", BytesIO(b"0" * (10 * 1024 * 1024)), "application/pdf")) for i in range(2)]
+
+    response = client.post("/api/course/ai", files=files)
+
+    assert response.status_code == 200
+    assert mock_ai_service.generate_structured_output.await_count == 2
+    # The lectures and evaluations found in both files are kept once.
+    created_course_obj = mock_course_crud.create_with_children.call_args[1]["obj_in"]
+    assert len(created_course_obj.lectures) == 1
+    assert len(created_course_obj.evaluations) == 1
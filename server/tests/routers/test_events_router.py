@@ -0,0 +1,10 @@
+import base64
+
+
+def test_list_events_rejects_tampered_cursors(db_client):
+    cursor = base64.urlsafe_b64encode(b'[1,"x"]').decode()
+
+    response = db_client.get("/api/event/list", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
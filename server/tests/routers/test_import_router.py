@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Event
+from app.utils.calendar_import import UNTITLED_EVENT_TITLE
+
+ICS_CONTENT = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Algorithms\r\n"
+    "DTSTART:20250801T100000Z\r\n"
+    "DTEND:20250801T120000Z\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART;TZID=America/Sao_Paulo:20250802T080000\r\n"
+    "DURATION:PT1H\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:No start\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+def test_import_ics_creates_the_events_and_reports_invalid_ones(db_client, db_session_factory, db_user):
+    response = db_client.post("/api/import/", files={"file": ("calendar.ics", ICS_CONTENT.encode(), "text/calendar")})
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 2
+    assert [error["row"] for error in response.json()["errors"]] == [12]
+    with db_session_factory() as db:
+        events = db.scalars(select(Event).where(Event.owner_uuid == db_user.uuid)
+                            .order_by(Event.start_datetime)).all()
+        assert [event.title for event in events] == ["Algorithms", UNTITLED_EVENT_TITLE]
+        # 08:00 in Sao Paulo (UTC-3) is 11:00 in UTC.
+        assert events[1].start_datetime.replace(tzinfo=timezone.utc) == datetime(2025, 8, 2, 11, tzinfo=timezone.utc)
+
+
+def test_import_rejects_unsupported_and_undecodable_files(db_client, db_session_factory):
+    unsupported = db_client.post("/api/import/", files={"file": ("notes.txt", b"hello", "text/plain")})
+    undecodable = db_client.post("/api/import/",
+                                 files={"file": ("calendar.ics", "SUMMARY:Café".encode("latin-1"), "text/calendar")})
+
+    assert unsupported.status_code == 415
+    assert undecodable.status_code == 400
+    with db_session_factory() as db:
+        assert db.scalars(select(Event)).all() == []
+
+
+@pytest.mark.parametrize("timezone_key", ["Nowhere/City", "../../etc/localtime", "/etc/localtime"])
+def test_import_rejects_invalid_timezones(db_client, timezone_key):
+    response = db_client.post("/api/import/", data={"timezone": timezone_key},
+                              files={"file": ("calendar.ics", ICS_CONTENT.encode(), "text/calendar")})
+
+    assert response.status_code == 400
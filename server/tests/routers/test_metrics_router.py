@@ -0,0 +1,42 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+
+from app.core.config import settings
+from app.main import app
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+
+
+def test_metrics_exports_route_latency(metrics_enabled):
+    client = TestClient(app)
+    client.get("/metrics")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert response.text.startswith(f"# Metrics of the worker process {os.getpid()}.\n")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/metrics",status="200"}' in response.text
+    assert 'http_requests_in_flight{method="GET"} 1' in response.text
+
+
+def test_metrics_are_disabled_by_default():
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 404
+
+
+def test_metrics_require_the_token_when_set(metrics_enabled, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", SecretStr("scrape-secret"))
+    client = TestClient(app)
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
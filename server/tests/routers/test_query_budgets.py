@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.db import query_metrics
+from app.middleware import QUERY_COUNT_HEADER, REPEATED_QUERY_COUNT_HEADER
+from app.models import Course, Evaluation, Event, Lecture, Routine
+
+START = datetime(2025, 8, 4, 10, tzinfo=timezone.utc)
+ITEMS_PER_TABLE = 20
+
+
+@pytest.fixture(autouse=True)
+def seeded(db_session_factory, db_user):
+    """Enough rows in every table that a query per row blows any budget below."""
+    with db_session_factory() as db:
+        db.add(Course(uuid="course", title="Course", owner_uuid=db_user.uuid))
+        for i in range(ITEMS_PER_TABLE):
+            start = START + timedelta(hours=i)
+            db.add(Lecture(uuid=f"lecture-{i}", title="Lecture", course_uuid="course",
+                           start_datetime=start, end_datetime=start + timedelta(hours=1)))
+            db.add(Evaluation(uuid=f"evaluation-{i}", type="exam", title="Exam", course_uuid="course",
+                              start_datetime=start, end_datetime=start + timedelta(hours=1)))
+            db.add(Event(uuid=f"event-{i}", title="Event", owner_uuid=db_user.uuid,
+                         start_datetime=start, end_datetime=start + timedelta(hours=1)))
+            db.add(Routine(uuid=f"routine-{i}", title="Routine", flexible=False, start_time="08:00",
+                           end_time="09:00", days_of_the_week=31, owner_uuid=db_user.uuid))
+        db.commit()
+
+
+@pytest.mark.parametrize("method, url, kwargs, budget", [
+    ("GET", "/api/user/", {}, 1),
+    ("GET", "/api/user/", {"params": {"include": ["courses", "events", "routines"],
+                                      "events_start": START.isoformat()}}, 5),
+    ("GET", "/api/user/schedule", {"params": {"start_date": "2025-08-04", "timezone": "UTC"}}, 4),
+    ("GET", "/api/event/list", {}, 2),
+    ("GET", "/api/routine/list", {}, 2),
+    ("GET", "/api/lecture/", {"params": {"lecture_uuid": "lecture-0"}}, 3),
+    ("POST", "/api/lecture/", {"data": {"title": "New", "course_uuid": "course",
+                                        "start_datetime": START.isoformat(),
+                                        "end_datetime": START.isoformat()}}, 3),
+    ("PUT", "/api/lecture/", {"data": {"lecture_uuid": "lecture-0", "new_title": "Updated"}}, 4),
+    ("DELETE", "/api/lecture/", {"data": {"lecture_uuid": "lecture-0"}}, 4),
+    ("DELETE", "/api/course/", {"data": {"course_uuid": "course"}}, 4),
+    ("POST", "/api/batch/", {"json": {"operations": [
+        {"op": "update", "resource": "lecture", "uuid": f"lecture-{i}", "data": {"title": "Batch"}}
+        for i in range(ITEMS_PER_TABLE)]}}, 2 + ITEMS_PER_TABLE),  # Reads are constant, each update is one UPDATE.
+])
+def test_endpoint_query_budget(db_client, query_budget, method, url, kwargs, budget):
+    with query_budget(budget):
+        response = db_client.request(method, url, **kwargs)
+
+    assert response.status_code < 400, response.text
+
+
+def test_query_stats_headers_in_debug_mode(db_client, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", True)
+
+    response = db_client.get("/api/user/", params={"include": "courses"})
+
+    assert response.status_code == 200
+    assert response.headers[QUERY_COUNT_HEADER] == "3"
+    assert response.headers[REPEATED_QUERY_COUNT_HEADER] == "1"
+    assert query_metrics.snapshot()["GET /api/user/"]["calls"] >= 1
+
+
+def test_query_stats_headers_hidden_outside_debug_mode(db_client):
+    response = db_client.get("/api/user/")
+
+    assert QUERY_COUNT_HEADER not in response.headers
@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.security import get_current_user
+from app.crud import get_user_crud
+from app.dependencies import get_db
+from app.main import app
+from app.schemas import UserProfileInclude
+from tests.mock_models import MockCourse
+
+
+@pytest.fixture
+def mock_user():
+    return MagicMock(uuid=str(uuid.uuid4()), nickname=None, email="user@planit.ai")
+
+
+@pytest.fixture
+def mock_user_crud():
+    return MagicMock()
+
+
+@pytest.fixture
+def client(mock_user_crud, mock_user):
+    app.dependency_overrides[get_user_crud] = lambda: mock_user_crud
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+    app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+
+    yield TestClient(app)
+
+    app.dependency_overrides = {}
+
+
+def test_get_user_without_include_skips_relationships(client, mock_user_crud, mock_user):
+    mock_user.name = "Test User"
+
+    response = client.get("/api/user/")
+
+    assert response.status_code == 200
+    assert response.json() == {"uuid": mock_user.uuid, "name": "Test User", "nickname": None,
+                               "email": "user@planit.ai"}
+    mock_user_crud.get_profile.assert_not_called()
+
+
+def test_get_user_loads_only_included_relationships(client, mock_user_crud, mock_user):
+    mock_user.name = "Test User"
+    db_user = MagicMock(courses=[MockCourse(uuid="course-uuid", title="Course")])
+    mock_user_crud.get_profile.return_value = db_user
+
+    response = client.get("/api/user/", params={
+        "include": "courses",
+        "events_start": "2025-08-01T00:00:00Z",
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["courses"] == [{"uuid": "course-uuid", "title": "Course", "semester": None}]
+    assert "events" not in body and "routines" not in body
+    kwargs = mock_user_crud.get_profile.call_args.kwargs
+    assert kwargs["include"] == [UserProfileInclude.COURSES]
+    assert kwargs["events_start_utc"] == datetime(2025, 8, 1, tzinfo=timezone.utc)
+    assert kwargs["events_end_utc"] > kwargs["events_start_utc"]
+
+
+def test_get_user_rejects_empty_event_range(client, mock_user_crud):
+    response = client.get("/api/user/", params={
+        "include": "events",
+        "events_start": "2025-08-02T00:00:00Z",
+        "events_end": "2025-08-01T00:00:00Z",
+    })
+
+    assert response.status_code == 400
+    mock_user_crud.get_profile.assert_not_called()
@@ -0,0 +1,95 @@
+import asyncio
+import random
+
+import pytest
+
+from app.core.metrics import llm_file_uploads_total
+from app.schemas import CourseGenerate
+from app.services import GoogleAIService
+from app.services.attachments import AttachmentManager
+from benchmarks.fakes import FakeGenAIClient, api_error
+
+PDF = b"%PDF-1.7\n" + random.Random(0).randbytes(2000)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def service_with_attachments(client: FakeGenAIClient, **options) -> GoogleAIService:
+    options = {"ttl_seconds": 3600, "min_bytes": 1000, "max_entries": 8, **options}
+    return GoogleAIService(api_key="", client=client, attachments=AttachmentManager(client, **options))
+
+
+@pytest.mark.asyncio
+async def test_files_are_uploaded_once_and_referenced_by_the_history():
+    client = FakeGenAIClient()
+    ai_service = service_with_attachments(client)
+
+    _, turn = await ai_service.send_message(instruction="", message="Read this", tools=[],
+                                            files=[(PDF, "application/pdf")])
+    await ai_service.send_message(instruction="", message="And again", tools=[], files=[(PDF, "application/pdf")],
+                                  llm_context=turn)
+    await ai_service.generate_structured_output(CourseGenerate, files=[(PDF, "application/pdf")])
+
+    assert client.files.uploaded == 1
+    [file_part] = [part for part in turn[0].parts if part.file_data]
+    assert file_part.file_data.mime_type == "application/pdf" and file_part.inline_data is None
+    # The history and the new message reference the file, in a few hundred bytes instead of the whole PDF.
+    assert all(size < len(PDF) / 2 for size in client.request_bytes)
+
+
+@pytest.mark.asyncio
+async def test_small_files_and_failed_uploads_are_sent_inline():
+    client = FakeGenAIClient()
+    attachments = AttachmentManager(client, ttl_seconds=3600, min_bytes=1000, max_entries=8)
+    failed = llm_file_uploads_total.value(outcome="failed")
+
+    assert await attachments.part(b"%PDF-1.7", "application/pdf") is None
+
+    async def unavailable(**_):
+        raise api_error(403)
+
+    client.files.upload = unavailable
+    assert await attachments.part(PDF, "application/pdf") is None
+    assert await attachments.part(PDF + b"\n", "application/pdf") is None
+    # The file storage isn't tried again once the API key can't use it.
+    assert llm_file_uploads_total.value(outcome="failed") == failed + 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_an_upload_and_expired_files_are_uploaded_again():
+    clock = Clock()
+    client = FakeGenAIClient()
+    attachments = AttachmentManager(client, ttl_seconds=3600, min_bytes=1000, max_entries=8, clock=clock)
+
+    first, second = await asyncio.gather(attachments.part(PDF, "application/pdf"),
+                                         attachments.part(PDF, "application/pdf"))
+    assert first == second and client.files.uploaded == 1
+
+    clock.now = 3000
+    third = await attachments.part(PDF, "application/pdf")
+    assert third != first and client.files.uploaded == 2
+
+
+@pytest.mark.asyncio
+async def test_references_to_files_that_are_gone_are_replaced_in_the_history():
+    client = FakeGenAIClient()
+    _, turn = await service_with_attachments(client).send_message(
+        instruction="", message="Read this", tools=[], files=[(PDF, "application/pdf")])
+    [file_part] = [part for part in turn[0].parts if part.file_data]
+
+    # Another worker, which didn't upload the file, looks it up.
+    assert await service_with_attachments(client).attachments.resolve(turn) == turn
+
+    client.files.expire("files/" + file_part.file_data.file_uri.rsplit("/files/", 1)[-1])
+    other_worker = service_with_attachments(client)
+    text, new_turn = await other_worker.send_message(instruction="", message="And now?", tools=[], llm_context=turn)
+
+    assert text
+    [resolved] = await other_worker.attachments.resolve(turn[:1])
+    assert "expired" in resolved.parts[0].text and resolved.parts[1:] == turn[0].parts[1:]
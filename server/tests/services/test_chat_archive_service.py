@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 (registers every table in Base.metadata)
+from app.core.db import Base
+from app.models import ArchivedChatMessage, ChatMessage, JobCheckpoint, User
+from app.services.chat_archive_service import archive_chat_history
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def seed(engine, messages_per_user: dict[str, int]) -> None:
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"uuid": user, "name": user, "email": f"{user}@planit.ai", "hashed_password": ""}
+            for user in messages_per_user
+        ])
+        connection.execute(insert(ChatMessage), [
+            {"uuid": f"{user}-{order}", "order": order, "role": "user" if order % 2 == 0 else "model",
+             "text": f"Message {order}", "content": [{"role": "user", "parts": [{"text": str(order)}]}],
+             "owner_uuid": user}
+            for user, count in messages_per_user.items()
+            for order in range(count)
+        ])
+
+
+def orders(engine, model, user: str) -> list[int]:
+    with engine.connect() as connection:
+        return list(connection.execute(select(model.order).filter_by(owner_uuid=user).order_by(model.order)).scalars())
+
+
+def test_archives_the_messages_older_than_the_hot_window(engine):
+    seed(engine, {"alice": 10, "bob": 3})
+
+    run = archive_chat_history(engine, keep_messages=4, batch_size=4)
+
+    assert run.finished and run.messages == 6 and run.users == 1
+    assert orders(engine, ChatMessage, "alice") == [6, 7, 8, 9]
+    assert orders(engine, ArchivedChatMessage, "alice") == [0, 1, 2, 3, 4, 5]
+    assert orders(engine, ChatMessage, "bob") == [0, 1, 2]
+    with engine.connect() as connection:
+        archived = connection.execute(select(ArchivedChatMessage.content).filter_by(uuid="alice-5")).scalar_one()
+    assert archived == [{"role": "user", "parts": [{"text": "5"}]}]
+
+
+def test_an_interrupted_run_continues_from_the_checkpoint(engine):
+    seed(engine, {"alice": 6, "bob": 6, "carol": 6})
+
+    first = archive_chat_history(engine, keep_messages=2, batch_size=3, max_batches=2)
+
+    assert not first.finished and first.messages == 6
+    with engine.connect() as connection:
+        assert connection.execute(select(JobCheckpoint.position)).scalar_one() == "alice"
+
+    second = archive_chat_history(engine, keep_messages=2, batch_size=3)
+
+    assert second.finished and first.messages + second.messages == 12
+    for user in ("alice", "bob", "carol"):
+        assert orders(engine, ChatMessage, user) == [4, 5]
+        assert orders(engine, ArchivedChatMessage, user) == [0, 1, 2, 3]
+    with engine.connect() as connection:
+        assert connection.execute(select(JobCheckpoint.position)).scalar_one() is None
+
+
+def test_at_least_one_message_is_kept(engine):
+    with pytest.raises(ValueError):
+        archive_chat_history(engine, keep_messages=0, batch_size=10)
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import chat_turns_coalesced_total
+from app.services import ChatTurnQueue, IdempotencyKeyReusedError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Turns:
+    """Turns that record when they run, and finish when released."""
+
+    def __init__(self):
+        self.log: list[str] = []
+        self.calls = 0
+
+    def make(self, name: str, result: str | Exception | None = None, release: asyncio.Event | None = None):
+        async def turn() -> str:
+            self.calls += 1
+            self.log.append(f"start {name}")
+            if release is not None:
+                await release.wait()
+            else:
+                await asyncio.sleep(0.01)
+            self.log.append(f"end {name}")
+            if isinstance(result, Exception):
+                raise result
+            return result or name
+
+        return turn
+
+
+@pytest.mark.asyncio
+async def test_turns_of_a_user_run_one_at_a_time_in_order():
+    queue = ChatTurnQueue(ttl_seconds=60, max_keys=10)
+    turns = Turns()
+
+    results = await asyncio.gather(*(queue.run("user-1", turns.make(name)) for name in ("a", "b", "c")))
+
+    assert results == ["a", "b", "c"]
+    assert turns.log == ["start a", "end a", "start b", "end b", "start c", "end c"]
+    assert queue._queues == {}
+
+
+@pytest.mark.asyncio
+async def test_turns_of_different_users_overlap():
+    queue = ChatTurnQueue(ttl_seconds=60, max_keys=10)
+    turns = Turns()
+    release = asyncio.Event()
+
+    first = asyncio.ensure_future(queue.run("user-1", turns.make("a", release=release)))
+    second = asyncio.ensure_future(queue.run("user-2", turns.make("b", release=release)))
+    await asyncio.sleep(0.01)
+    assert turns.log == ["start a", "start b"]
+
+    release.set()
+    assert await asyncio.gather(first, second) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_retries_with_the_same_key_share_the_result():
+    clock = Clock()
+    queue = ChatTurnQueue(ttl_seconds=60, max_keys=10, clock=clock)
+    turns = Turns()
+    coalesced = chat_turns_coalesced_total.value()
+
+    results = await asyncio.gather(
+        queue.run("user-1", turns.make("a"), idempotency_key="key-1", fingerprint="hi"),
+        queue.run("user-1", turns.make("a again"), idempotency_key="key-1", fingerprint="hi"),
+    )
+    late = await queue.run("user-1", turns.make("a late"), idempotency_key="key-1", fingerprint="hi")
+    other_user = await queue.run("user-2", turns.make("b"), idempotency_key="key-1", fingerprint="hi")
+
+    assert results == ["a", "a"] and late == "a" and other_user == "b"
+    assert turns.calls == 2
+    assert chat_turns_coalesced_total.value() == coalesced + 2
+
+    clock.now = 61
+    assert await queue.run("user-1", turns.make("a expired"), idempotency_key="key-1", fingerprint="hi") == "a expired"
+
+
+@pytest.mark.asyncio
+async def test_keys_reused_for_another_message_are_rejected():
+    queue = ChatTurnQueue(ttl_seconds=60, max_keys=10)
+    turns = Turns()
+    await queue.run("user-1", turns.make("a"), idempotency_key="key-1", fingerprint="hi")
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        await queue.run("user-1", turns.make("b"), idempotency_key="key-1", fingerprint="bye")
+
+
+@pytest.mark.asyncio
+async def test_failed_turns_are_not_kept():
+    queue = ChatTurnQueue(ttl_seconds=60, max_keys=10)
+    turns = Turns()
+
+    results = await asyncio.gather(
+        queue.run("user-1", turns.make("a", result=ValueError("Model failed.")), idempotency_key="key-1"),
+        queue.run("user-1", turns.make("a again"), idempotency_key="key-1"),
+        return_exceptions=True,
+    )
+    retried = await queue.run("user-1", turns.make("a retried"), idempotency_key="key-1")
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert retried == "a retried"
+    assert turns.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_a_retry_runs_the_turn_when_the_first_request_is_cancelled():
+    queue = ChatTurnQueue(ttl_seconds=60, max_keys=10)
+    turns = Turns()
+    release = asyncio.Event()
+
+    first = asyncio.ensure_future(queue.run("user-1", turns.make("a", release=release), idempotency_key="key-1"))
+    await asyncio.sleep(0)
+    retry = asyncio.ensure_future(queue.run("user-1", turns.make("a retried"), idempotency_key="key-1"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await retry == "a retried"
+    assert turns.log == ["start a", "start a retried", "end a retried"]
+
+
+@pytest.mark.asyncio
+async def test_only_the_last_keys_are_kept():
+    queue = ChatTurnQueue(ttl_seconds=60, max_keys=2)
+    turns = Turns()
+    for key in ("key-1", "key-2", "key-3"):
+        await queue.run("user-1", turns.make(key), idempotency_key=key)
+
+    assert [key for _, key in queue._turns] == ["key-2", "key-3"]
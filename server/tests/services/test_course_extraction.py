@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.schemas import CourseGenerate, EvaluationGenerate, LectureGenerate
+from app.services import extract_course
+from app.services.course_extraction import merge_courses, split_into_parts
+from benchmarks.fakes import fake_syllabus_pdf
+
+
+def lecture(title: str, start: str) -> LectureGenerate:
+    return LectureGenerate(title=title, start_datetime=start, end_datetime=start)
+
+
+def test_files_are_split_into_parts():
+    text = "".join(f"Week {week}: lecture on topic {week}\n" for week in range(100)).encode()
+
+    parts = split_into_parts([(b"%PDF", "application/pdf"), (text, "text/plain"), (b"short", "text/plain")],
+                             text_part_chars=600, overlap_chars=100)
+
+    assert parts[0] == (b"%PDF", "application/pdf")
+    assert parts[-1] == (b"short", "text/plain")
+    text_parts = [data.decode() for data, _ in parts[1:-1]]
+    assert len(text_parts) > 1
+    assert all(len(part) <= 600 and part.endswith("\n") for part in text_parts)
+    for previous, part in zip(text_parts, text_parts[1:]):
+        # Each part starts with the last whole lines of the previous one.
+        overlap = previous[previous.rindex(part.splitlines(keepends=True)[0]):]
+        assert part.startswith(overlap) and 0 < len(overlap) <= 100
+    assert {line for part in text_parts for line in part.splitlines()} == set(text.decode().splitlines())
+
+
+def test_documents_with_long_text_are_split_as_text():
+    pdf = fake_syllabus_pdf(lectures=120, evaluations=3)
+    short_pdf = fake_syllabus_pdf(lectures=3, evaluations=1)
+
+    parts = split_into_parts([(pdf, "application/pdf"), (short_pdf, "application/pdf")], text_part_chars=2000,
+                             overlap_chars=200, extract_documents=True)
+
+    assert parts[-1] == (short_pdf, "application/pdf")
+    assert len(parts) > 3 and {mime_type for _, mime_type in parts[:-1]} == {"text/plain"}
+    text = "".join(data.decode() for data, _ in parts[:-1])
+    assert all(f"Lecture {number}:" in text for number in range(1, 121))
+    assert split_into_parts([(pdf, "application/pdf")], text_part_chars=2000, overlap_chars=200) == [
+        (pdf, "application/pdf")]
+
+
+def test_courses_of_the_parts_are_merged():
+    first = CourseGenerate(title="Calculus", lectures=[lecture("Limits", "2025-08-11T10:00"),
+                                                      lecture("Series", "2025-09-01T10:00")])
+    second = CourseGenerate(title="Calculus I", semester="2025.2", lectures=[
+        lecture(" limits ", "2025-08-11T10:00:00"), lecture("Derivatives", "2025-08-18T10:00")],
+        evaluations=[EvaluationGenerate(type="exam", title="Midterm", start_datetime="2025-10-01T10:00",
+                                        end_datetime="2025-10-01T12:00")])
+
+    course = merge_courses([first, second])
+
+    assert (course.title, course.semester) == ("Calculus", "2025.2")
+    assert [lecture.title for lecture in course.lectures] == ["Limits", "Derivatives", "Series"]
+    assert [evaluation.title for evaluation in course.evaluations] == ["Midterm"]
+
+
+class FakeAIService:
+    def __init__(self, fail_on: bytes | None = None):
+        self.fail_on = fail_on
+        self.running = 0
+        self.most_running = 0
+        self.cancelled = 0
+
+    async def generate_structured_output(self, files, schema, message=None):
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        try:
+            await asyncio.sleep(0.01 if files[0][0] != self.fail_on else 0)
+            if files[0][0] == self.fail_on:
+                raise ValueError("Invalid JSON format.")
+            await asyncio.sleep(0.05 if self.fail_on else 0)
+            return CourseGenerate(title="Calculus", lectures=[lecture(files[0][0].decode(), "2025-08-11T10:00")])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_parts_are_extracted_concurrently(monkeypatch):
+    monkeypatch.setattr(settings, "COURSE_EXTRACTION_CONCURRENCY", 2)
+    ai_service = FakeAIService()
+
+    course = await extract_course(ai_service, files=[(f"{i}".encode(), "application/pdf") for i in range(5)])
+
+    assert ai_service.most_running == 2
+    assert sorted(lecture.title for lecture in course.lectures) == ["0", "1", "2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_part_cancels_the_others():
+    ai_service = FakeAIService(fail_on=b"1")
+
+    with pytest.raises(ValueError):
+        await extract_course(ai_service, files=[(f"{i}".encode(), "application/pdf") for i in range(3)])
+    await asyncio.sleep(0)
+
+    assert ai_service.cancelled == 2
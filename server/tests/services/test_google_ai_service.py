@@ -1,10 +1,17 @@
+import functools
 from unittest.mock import AsyncMock, MagicMock, patch, create_autospec
 
 import pytest
-from google.genai.types import FunctionCall
-from pydantic import ValidationError, BaseModel
+from google.genai.types import FunctionCall, Content, Part, GenerateContentResponseUsageMetadata
+from pydantic import ValidationError, BaseModel, SecretStr
 
-from app.services import GoogleAIService
+from app.core.config import settings
+from app.core.metrics import llm_request_duration_seconds, llm_tool_loop_iterations, llm_tokens_total, \
+    llm_tool_calls_total, llm_tool_duration_seconds, llm_file_parts_total
+from app.schemas import CourseGenerate
+from app.services import GoogleAIService, get_google_ai_service
+from app.services.google_ai_service import create_parts_from_files
+from benchmarks.fakes import FakeGenAIClient, fake_syllabus_pdf
 
 
 class MockCourse(BaseModel):
@@ -20,6 +27,14 @@ def mock_sync_tool_template(param: str) -> dict:
     return {"status": "sync task complete", "param": param}
 
 
+def as_coroutine_function(mock_tool):
+    # Autospecced coroutine functions are only told apart from plain ones by inspect from Python 3.12.
+    @functools.wraps(mock_tool)
+    async def tool(**kwargs):
+        return await mock_tool(**kwargs)
+    return tool
+
+
 @pytest.fixture
 def mock_tools():
     mock_async_tool = create_autospec(mock_async_tool_template, spec_set=True)
@@ -31,8 +46,7 @@ def mock_tools():
     mock_async_tool.__name__ = "mock_async_tool"
     mock_sync_tool.__name__ = "mock_sync_tool"
 
-    with patch('app.services.google_ai_service.tools', [mock_async_tool, mock_sync_tool]) as patched_tools:
-        yield patched_tools
+    return [mock_async_tool, mock_sync_tool]
 
 
 @pytest.fixture
@@ -69,7 +83,8 @@ async def test_send_message_success(mock_ai_service, mock_tools):
 
     response_text, new_content = await ai_service.send_message(
         instruction="Test instruction",
-        message="Hello, use a tool."
+        message="Hello, use a tool.",
+        tools=[as_coroutine_function(mock_async_tool), mock_sync_tool],
     )
 
     assert response_text == "This is the final AI response."
@@ -131,3 +146,115 @@ async def test_generate_structured_output_api_error(mock_ai_service):
             files=[(b'Bytes', "application/pdf")],
             message="Hello.")
     mock_generate_content.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_send_message_records_llm_and_tool_metrics(mock_ai_service):
+    ai_service, mock_generate_content = mock_ai_service
+
+    async def lookup_course(title: str) -> dict:
+        return {"error": f"Course {title} not found."}
+
+    usage = GenerateContentResponseUsageMetadata(prompt_token_count=120, candidates_token_count=30)
+    call_content = Content(role="model", parts=[Part(function_call=FunctionCall(name="lookup_course",
+                                                                                 args={"title": "Calculus"}))])
+    mock_response_with_call = MagicMock(candidates=[MagicMock(content=call_content)], usage_metadata=usage)
+    final_content = Content(role="model", parts=[Part(text="Not found.")])
+    mock_final_response = MagicMock(candidates=[MagicMock(content=final_content)], text="Not found.",
+                                    usage_metadata=usage)
+    mock_generate_content.side_effect = [mock_response_with_call, mock_final_response]
+
+    models = (settings.LLM_FAST_MODEL, settings.LLM_FULL_MODEL)
+    prompt_tokens = [llm_tokens_total.value(model=model, type="prompt") for model in models]
+    chat_calls = [llm_request_duration_seconds.count(model=model, operation="chat", outcome="success")
+                  for model in models]
+    loops = llm_tool_loop_iterations.count()
+    tool_errors = llm_tool_calls_total.value(tool="lookup_course", outcome="error")
+
+    response_text, _ = await ai_service.send_message(instruction="Test instruction", message="Find Calculus.",
+                                                     tools=[lookup_course])
+
+    assert response_text == "Not found."
+    # The short message starts on the fast model, and the round after a tool other than the fast ones on the full one.
+    for model, tokens, calls in zip(models, prompt_tokens, chat_calls):
+        assert llm_tokens_total.value(model=model, type="prompt") == tokens + 120
+        assert llm_request_duration_seconds.count(model=model, operation="chat", outcome="success") == calls + 1
+    assert llm_tool_loop_iterations.count() == loops + 1
+    assert llm_tool_calls_total.value(tool="lookup_course", outcome="error") == tool_errors + 1
+    assert llm_tool_duration_seconds.count(tool="lookup_course") >= 1
+
+
+def test_google_ai_service_is_built_on_first_use(monkeypatch):
+    get_google_ai_service.cache_clear()
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", None)
+    try:
+        with pytest.raises(ValueError, match="not configured"):
+            get_google_ai_service()
+
+        monkeypatch.setattr(settings, "GOOGLE_API_KEY", SecretStr("dummy"))
+        with patch("app.services.google_ai_service.genai.Client") as client_class:
+            service = get_google_ai_service()
+            assert get_google_ai_service() is service
+        client_class.assert_called_once_with(api_key="dummy")
+    finally:
+        get_google_ai_service.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_trim_context_drops_the_oldest_pairs_over_the_limit(mock_ai_service, monkeypatch):
+    ai_service, _ = mock_ai_service
+    contents = [Content(role="user" if i % 2 == 0 else "model", parts=[Part(text=f"{i}" * 100)]) for i in range(6)]
+    pair_size = sum(ai_service._get_content_sizes(contents[:2]))
+    monkeypatch.setattr("app.services.google_ai_service._MAX_CONTEXT_SIZE_BYTES", 2 * pair_size)
+
+    trimmed = await ai_service._trim_context_to_size(contents)
+
+    assert [content.parts[0].text[0] for content in trimmed] == ["2", "3", "4", "5"]
+
+
+@pytest.mark.asyncio
+async def test_stream_structured_output_yields_each_item_then_the_output():
+    client = FakeGenAIClient(course_lectures=3, course_evaluations=1, stream_chunk_chars=40)
+    ai_service = GoogleAIService(api_key="", client=client)
+    tokens = llm_tokens_total.value(model=settings.LLM_FULL_MODEL, type="response")
+
+    events = [event async for event in ai_service.stream_structured_output(
+        CourseGenerate, files=[(b"%PDF", "application/pdf")])]
+
+    assert [field for field, _ in events] == ["lectures", "lectures", "lectures", "evaluations", None]
+    course = events[-1][1]
+    assert course.lectures == [item for field, item in events if field == "lectures"]
+    assert course == await ai_service.generate_structured_output(CourseGenerate, files=[(b"%PDF", "application/pdf")])
+    assert llm_request_duration_seconds.count(model=settings.LLM_FULL_MODEL, operation="structured_output",
+                                              outcome="success") >= 2
+    assert llm_tokens_total.value(model=settings.LLM_FULL_MODEL, type="response") > tokens
+
+
+@pytest.mark.asyncio
+async def test_stream_structured_output_validates_each_item():
+    client = FakeGenAIClient(structured_output=lambda _: '{"title": "Calculus", "lectures": [{"title": "Limits"}]}')
+    ai_service = GoogleAIService(api_key="", client=client)
+
+    with pytest.raises(ValidationError):
+        async for _ in ai_service.stream_structured_output(CourseGenerate, files=[(b"%PDF", "application/pdf")]):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_documents_are_sent_as_their_text_unless_scanned(monkeypatch):
+    text_pdf = fake_syllabus_pdf(lectures=10, evaluations=1)
+    scanned_pdf = fake_syllabus_pdf(lectures=10, evaluations=1, scanned=True)
+    sent_as_text = llm_file_parts_total.value(sent_as="text")
+
+    text_part, scanned_part, image_part = await create_parts_from_files(
+        [(text_pdf, "application/pdf"), (scanned_pdf, "application/pdf"), (b"\x89PNG", "image/png")])
+
+    assert text_part.inline_data is None
+    assert "Lecture 10: Topics of lecture 10." in text_part.text
+    assert scanned_part.inline_data.data == scanned_pdf
+    assert image_part.inline_data.mime_type == "image/png"
+    assert llm_file_parts_total.value(sent_as="text") == sent_as_text + 1
+
+    monkeypatch.setattr(settings, "LLM_DOCUMENT_TEXT_EXTRACTION_ENABLED", False)
+    [part] = await create_parts_from_files([(text_pdf, "application/pdf")])
+    assert part.inline_data.data == text_pdf
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import llm_image_processing_seconds
+from app.services import get_image_pool, shutdown_image_pool
+from app.services.google_ai_service import create_parts_from_files
+from benchmarks.fakes import fake_timetable_photo
+
+
+@pytest.fixture
+def image_pool(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_IMAGE_MAX_SIDE", 256)
+    monkeypatch.setattr(settings, "LLM_IMAGE_PROCESS_WORKERS", 1)
+    shutdown_image_pool()
+    yield
+    shutdown_image_pool()
+
+
+@pytest.mark.asyncio
+async def test_images_are_sent_normalized_by_the_pool(image_pool, monkeypatch):
+    photo = fake_timetable_photo(800, 600)
+    normalized = llm_image_processing_seconds.count(outcome="normalized")
+    unchanged = llm_image_processing_seconds.count(outcome="unchanged")
+
+    photo_part, heic_part = await create_parts_from_files([(photo, "image/jpeg"), (b"\x00ftypheic", "image/heic")])
+
+    assert photo_part.inline_data.mime_type == "image/webp"
+    assert len(photo_part.inline_data.data) < len(photo) / 10
+    assert heic_part.inline_data.data == b"\x00ftypheic" and heic_part.inline_data.mime_type == "image/heic"
+    assert llm_image_processing_seconds.count(outcome="normalized") == normalized + 1
+    assert llm_image_processing_seconds.count(outcome="unchanged") == unchanged + 1
+
+    monkeypatch.setattr(settings, "LLM_IMAGE_DOWNSCALING_ENABLED", False)
+    [part] = await create_parts_from_files([(photo, "image/jpeg")])
+    assert part.inline_data.data == photo
+
+
+@pytest.mark.asyncio
+async def test_the_pool_is_started_again_after_a_worker_dies(image_pool):
+    pool = get_image_pool()
+    pool.submit(_exit).exception()
+
+    [part] = await create_parts_from_files([(fake_timetable_photo(800, 600), "image/jpeg")])
+    assert part.inline_data.mime_type == "image/jpeg"
+    assert llm_image_processing_seconds.count(outcome="failed") >= 1
+
+    [part] = await create_parts_from_files([(fake_timetable_photo(800, 600), "image/jpeg")])
+    assert part.inline_data.mime_type == "image/webp"
+    assert get_image_pool() is not pool
+
+
+def _exit() -> None:
+    os._exit(1)
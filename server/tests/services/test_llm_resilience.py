@@ -0,0 +1,191 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from google.genai import errors
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.metrics import llm_circuit_open, llm_hedged_requests_total, llm_retries_total
+from app.services import GoogleAIService, LLMUnavailableError
+from app.services.llm_resilience import CircuitBreaker, LLMDeadlineExceededError, RetryPolicy, retry_after_seconds
+from benchmarks.fakes import FaultyGenAIClient, api_error
+
+
+class Course(BaseModel):
+    title: str
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def resilient_service(client: FaultyGenAIClient, **options) -> GoogleAIService:
+    options = {"retry_policy": RetryPolicy(max_attempts=3, base_delay_seconds=0.01, max_delay_seconds=0.01),
+               "circuit_breaker": CircuitBreaker(failure_threshold=5, reset_seconds=30), **options}
+    return GoogleAIService(api_key="", client=client, **options)
+
+
+def course_client(**kwargs) -> FaultyGenAIClient:
+    return FaultyGenAIClient(structured_output=lambda _: '{"title": "Calculus"}', **kwargs)
+
+
+async def extract_course(ai_service: GoogleAIService) -> Course:
+    return await ai_service.generate_structured_output(Course, files=[(b"%PDF", "application/pdf")])
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    client = course_client(faults=[api_error(503), api_error(429)])
+    retries = llm_retries_total.value(operation="structured_output")
+
+    course = await extract_course(resilient_service(client))
+
+    assert course.title == "Calculus"
+    # The extraction stays on the full model.
+    assert client.models == [settings.LLM_FULL_MODEL] * 3
+    assert llm_retries_total.value(operation="structured_output") == retries + 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_fail_as_unavailable():
+    client = course_client(faults=[api_error(503)] * 2 + [api_error(429, retry_after_seconds=0.01)])
+
+    with pytest.raises(LLMUnavailableError) as raised:
+        await extract_course(resilient_service(client))
+
+    assert len(client.models) == 3
+    assert raised.value.retry_after_seconds == pytest.approx(0.01)
+
+
+@pytest.mark.asyncio
+async def test_rejected_requests_are_not_retried():
+    client = course_client(faults=[api_error(400)])
+
+    with pytest.raises(errors.ClientError):
+        await extract_course(resilient_service(client))
+
+    assert len(client.models) == 1
+
+
+def test_retry_delays_honour_the_delay_asked_by_the_api():
+    policy = RetryPolicy(max_attempts=5, base_delay_seconds=1, max_delay_seconds=4)
+
+    assert all(0 <= policy.delay(attempt, api_error(503)) <= min(4, 2 ** (attempt - 1)) for attempt in range(1, 5))
+    assert policy.delay(1, api_error(429, retry_after_seconds=7)) == 7
+    header_error = errors.ClientError(429, {"error": {"code": 429}},
+                                      response=httpx.Response(429, headers={"Retry-After": "3"}))
+    assert retry_after_seconds(header_error) == 3
+    assert retry_after_seconds(api_error(503)) is None
+
+
+@pytest.mark.asyncio
+async def test_the_circuit_opens_after_consecutive_failures():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=clock)
+    client = course_client(faults=[api_error(503)] * 3 + [api_error(503)])
+    ai_service = resilient_service(client, circuit_breaker=breaker)
+
+    with pytest.raises(LLMUnavailableError):
+        await extract_course(ai_service)
+    assert breaker.state == "open"
+    assert llm_circuit_open.value() == 1
+
+    # Calls fail at once, without reaching the API.
+    with pytest.raises(LLMUnavailableError) as raised:
+        await extract_course(ai_service)
+    assert len(client.models) == 3
+    assert raised.value.retry_after_seconds == 30
+
+    # A single probe is let through after the reset time, and opens the circuit again when it fails.
+    clock.now = 31
+    with pytest.raises(LLMUnavailableError):
+        await extract_course(ai_service)
+    assert len(client.models) == 4
+    assert breaker.state == "open"
+
+    clock.now = 62
+    assert (await extract_course(ai_service)).title == "Calculus"
+    assert breaker.state == "closed"
+    assert llm_circuit_open.value() == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_cut_at_the_turn_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CHAT_TURN_DEADLINE_SECONDS", 0.2)
+    client = FaultyGenAIClient(faults=[5.0])
+
+    start = time.perf_counter()
+    with pytest.raises(LLMDeadlineExceededError):
+        await resilient_service(client).send_message(instruction="Plan.", message="Hi", tools=[])
+
+    assert time.perf_counter() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_the_deadline_covers_the_tool_rounds(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CHAT_TURN_DEADLINE_SECONDS", 0.2)
+    client = FaultyGenAIClient(tool_script=[[("slow_lookup", {})]])
+
+    async def slow_lookup() -> dict:
+        await asyncio.sleep(0.3)
+        return {"found": True}
+
+    with pytest.raises(LLMDeadlineExceededError):
+        await resilient_service(client).send_message(instruction="Plan.", message="Hi", tools=[slow_lookup])
+
+    # The tool finished, and no model call was started past the deadline.
+    assert len(client.models) == 1
+
+
+@pytest.mark.asyncio
+async def test_calls_slower_than_usual_are_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGING_MIN_CALLS", 5)
+    client = FaultyGenAIClient(latency_seconds=0.01)
+    ai_service = resilient_service(client)
+    for _ in range(5):
+        await ai_service.send_message(instruction="Plan.", message="Hi", tools=[])
+    hedges = llm_hedged_requests_total.value(model=settings.LLM_FAST_MODEL, operation="chat")
+
+    client.faults = [5.0]
+    start = time.perf_counter()
+    await ai_service.send_message(instruction="Plan.", message="Hi", tools=[])
+
+    assert time.perf_counter() - start < 1
+    assert len(client.models) == 7
+    assert llm_hedged_requests_total.value(model=settings.LLM_FAST_MODEL, operation="chat") == hedges + 1
+
+
+@pytest.mark.asyncio
+async def test_streams_are_retried_until_their_first_chunk():
+    client = course_client(faults=[api_error(503)])
+
+    events = [event async for event in resilient_service(client).stream_structured_output(
+        Course, files=[(b"%PDF", "application/pdf")])]
+
+    assert events == [(None, Course(title="Calculus"))]
+    assert len(client.models) == 2
+
+
+class BrokenStreamClient(FaultyGenAIClient):
+    async def _stream(self, response):
+        async for chunk in super()._stream(response):
+            yield chunk
+            raise api_error(503)
+
+
+@pytest.mark.asyncio
+async def test_streams_that_fail_midway_are_not_retried():
+    client = BrokenStreamClient(structured_output=lambda _: '{"title": "Calculus"}', stream_chunk_chars=4)
+
+    with pytest.raises(LLMUnavailableError):
+        async for _ in resilient_service(client).stream_structured_output(
+                Course, files=[(b"%PDF", "application/pdf")]):
+            pass
+    assert len(client.models) == 1
@@ -0,0 +1,168 @@
+import pytest
+from google.genai import errors
+from pydantic import BaseModel
+
+from app.core.metrics import llm_model_degraded, llm_model_failovers_total
+from app.services import GoogleAIService
+from app.services.model_router import ModelRouter
+from benchmarks.fakes import FakeGenAIClient
+
+FULL = "full-model"
+FAST = "fast-model"
+
+
+class Course(BaseModel):
+    title: str
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_router(clock: Clock | None = None, **options) -> ModelRouter:
+    options = {"full_model": FULL, "fast_model": FAST, "fast_tools": ["get_current_utc_time"],
+               "simple_message_max_chars": 50, "health_window": 10, "health_min_calls": 5, "max_error_rate": 0.2,
+               "latency_slo_seconds": 2.0, "cooldown_seconds": 60, **options}
+    return ModelRouter(clock=clock or Clock(), **options)
+
+
+class RoutingClient(FakeGenAIClient):
+    def __init__(self, errors_by_model: dict[str, list[Exception]] | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.models: list[str] = []
+        self.errors_by_model = errors_by_model or {}
+
+    async def generate_content(self, *, model, contents, config=None):
+        self.models.append(model)
+        if self.errors_by_model.get(model):
+            raise self.errors_by_model[model].pop(0)
+        return await super().generate_content(model=model, contents=contents, config=config)
+
+
+def service_with_router(client: FakeGenAIClient, router: ModelRouter | None = None) -> GoogleAIService:
+    return GoogleAIService(api_key="", client=client, model_router=router or make_router())
+
+
+def get_current_utc_time() -> dict:
+    return {"utc_time": "2025-08-04T10:00:00+00:00"}
+
+
+async def create_course(title: str) -> dict:
+    return {"title": title}
+
+
+def server_error(code: int = 503) -> errors.ServerError:
+    return errors.ServerError(code, {"error": {"code": code, "message": "Unavailable.", "status": "UNAVAILABLE"}})
+
+
+@pytest.mark.asyncio
+async def test_simple_turns_use_the_fast_model():
+    client = RoutingClient(tool_script=[[("get_current_utc_time", {})]])
+    await service_with_router(client).send_message(instruction="Plan.", message="What time is it?",
+                                                   tools=[get_current_utc_time])
+    assert client.models == [FAST, FAST]
+
+    client = RoutingClient()
+    ai_service = service_with_router(client)
+    await ai_service.send_message(instruction="Plan.", message="Hi", tools=[], files=[(b"%PDF", "application/pdf")])
+    await ai_service.send_message(instruction="Plan.", message="Hi " * 30, tools=[])
+
+    # Messages with files or longer than the limit use the full model.
+    assert client.models == [FULL, FULL]
+
+
+@pytest.mark.asyncio
+async def test_turns_move_to_the_full_model_after_other_tools():
+    client = RoutingClient(tool_script=[[("get_current_utc_time", {})], [("create_course", {"title": "Calculus"})]])
+    ai_service = service_with_router(client)
+
+    await ai_service.send_message(instruction="Plan.", message="Add Calculus today.",
+                                  tools=[get_current_utc_time, create_course])
+
+    assert client.models == [FAST, FAST, FULL]
+
+
+@pytest.mark.asyncio
+async def test_structured_output_uses_the_full_model():
+    client = RoutingClient(structured_output=lambda _: '{"title": "Calculus"}')
+    ai_service = service_with_router(client)
+
+    course = await ai_service.generate_structured_output(Course, files=[(b"%PDF", "application/pdf")])
+
+    assert course.title == "Calculus"
+    assert client.models == [FULL]
+
+
+@pytest.mark.asyncio
+async def test_failed_chat_calls_are_retried_on_the_other_tier():
+    client = RoutingClient(errors_by_model={FULL: [server_error()]})
+    ai_service = service_with_router(client)
+    failovers = llm_model_failovers_total.value(model=FULL, to_model=FAST, reason="error")
+
+    await ai_service.send_message(instruction="Plan.", message="Hi " * 30, tools=[])
+    client.errors_by_model[FAST] = [server_error(500)]
+    await ai_service.send_message(instruction="Plan.", message="Hi", tools=[])
+
+    assert client.models == [FULL, FAST, FAST, FULL]
+    assert llm_model_failovers_total.value(model=FULL, to_model=FAST, reason="error") == failovers + 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_requests_are_not_retried_nor_degrade_the_model():
+    bad_request = errors.ClientError(400, {"error": {"code": 400, "message": "Invalid.", "status": "INVALID_ARGUMENT"}})
+    router = make_router(health_min_calls=1)
+    client = RoutingClient(errors_by_model={FAST: [bad_request]})
+    ai_service = service_with_router(client, router)
+
+    with pytest.raises(errors.ClientError):
+        await ai_service.send_message(instruction="Plan.", message="Hi", tools=[])
+
+    assert client.models == [FAST]
+    assert not router.is_degraded(FAST)
+
+
+def test_slow_models_are_degraded_until_the_cooldown_ends():
+    clock = Clock()
+    router = make_router(clock)
+    for _ in range(4):
+        router.record(FAST, 0.5, succeeded=True)
+    router.record(FAST, 5.0, succeeded=True)
+    assert router.is_degraded(FAST)
+    assert llm_model_degraded.value(model=FAST) == 1
+
+    assert router.chat_model("Hi", has_files=False, called_tools=[]) == FULL
+    clock.now = 61
+    assert router.chat_model("Hi", has_files=False, called_tools=[]) == FAST
+    assert llm_model_degraded.value(model=FAST) == 0
+
+
+def test_models_failing_too_often_are_degraded():
+    router = make_router()
+    for succeeded in (True, False, True, True, True, True, True, True):
+        router.record(FULL, 0.5, succeeded=succeeded)
+    assert not router.is_degraded(FULL)
+
+    router.record(FULL, 0.5, succeeded=False)
+
+    assert router.is_degraded(FULL)
+    assert router.chat_model("Hi " * 30, has_files=False, called_tools=[]) == FAST
+
+
+def test_degraded_models_are_kept_when_the_other_tier_is_degraded_too():
+    router = make_router(health_min_calls=1)
+    router.record(FULL, 0.5, succeeded=False)
+    router.record(FAST, 0.5, succeeded=False)
+
+    assert router.chat_model("Hi", has_files=False, called_tools=[]) == FAST
+    assert router.chat_model("Hi " * 30, has_files=False, called_tools=[]) == FULL
+
+
+def test_a_single_tier_never_retries():
+    router = make_router(fast_model=FULL)
+
+    assert router.chat_model("Hi", has_files=False, called_tools=[]) == FULL
+    assert router.retry_model(FULL) is None
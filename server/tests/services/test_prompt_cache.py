@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from google.genai.types import Content, GenerateContentConfig, Part
+
+from app.core.metrics import llm_prompt_cache_requests_total
+from app.services import GoogleAIService
+from app.services.prompt_cache import PromptCache
+from benchmarks.fakes import FakeGenAIClient
+
+INSTRUCTION = "You are a study planner. " * 20
+
+
+def history(messages: int) -> list[Content]:
+    return [Content(role="user" if i % 2 == 0 else "model", parts=[Part(text=f"Message {i}. " * 20)])
+            for i in range(messages)]
+
+
+def service_with_cache(client: FakeGenAIClient, **options) -> GoogleAIService:
+    options = {"ttl_seconds": 600, "min_tokens": 100, "max_entries": 8, "history_step": 4, **options}
+    return GoogleAIService(api_key="", client=client, prompt_cache=PromptCache(client, **options))
+
+
+class RecordingClient(FakeGenAIClient):
+    def __init__(self, **kwargs):
+        super().__init__(min_cache_tokens=10, **kwargs)
+        self.requests: list[tuple[list[Content], GenerateContentConfig]] = []
+        self.usages = []
+
+    async def generate_content(self, *, model, contents, config=None):
+        self.requests.append((contents, config))
+        response = await super().generate_content(model=model, contents=contents, config=config)
+        self.usages.append(response.usage_metadata)
+        return response
+
+
+@pytest.mark.asyncio
+async def test_long_chats_reuse_the_cached_prefix():
+    client = RecordingClient()
+    ai_service = service_with_cache(client)
+
+    await ai_service.send_message(instruction=INSTRUCTION, message="Hi", tools=[], llm_context=history(6))
+    await ai_service.send_message(instruction=INSTRUCTION, message="Again", tools=[], llm_context=history(7))
+
+    assert client.caches.created == 1
+    for contents, config in client.requests:
+        assert config.cached_content and config.system_instruction is None and config.tools is None
+        # The first four messages, a multiple of the history step, are in the cache.
+        assert contents[0].parts[0].text.startswith("Message 4.")
+    uncached_client = RecordingClient()
+    await service_with_cache(uncached_client, enabled=False).send_message(
+        instruction=INSTRUCTION, message="Hi", tools=[], llm_context=history(6))
+    # The prompt is as long, but most of it is read from the cache.
+    assert client.usages[0].prompt_token_count == pytest.approx(uncached_client.usages[0].prompt_token_count, abs=5)
+    assert client.usages[0].cached_content_token_count > client.usages[0].prompt_token_count / 2
+
+
+@pytest.mark.asyncio
+async def test_small_prefixes_are_sent_whole():
+    client = RecordingClient()
+    ai_service = service_with_cache(client, min_tokens=100_000)
+
+    await ai_service.send_message(instruction=INSTRUCTION, message="Hi", tools=[], llm_context=history(4))
+
+    contents, config = client.requests[0]
+    assert client.caches.created == 0
+    assert config.cached_content is None and config.system_instruction == INSTRUCTION and len(contents) == 5
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_caching_is_unavailable():
+    client = RecordingClient(supports_caching=False)
+    ai_service = service_with_cache(client)
+    failures = llm_prompt_cache_requests_total.value(outcome="failed")
+
+    for message in ("Hi", "Again"):
+        response, _ = await ai_service.send_message(instruction=INSTRUCTION, message=message, tools=[],
+                                                    llm_context=history(8))
+        assert response
+
+    assert all(config.cached_content is None for _, config in client.requests)
+    # Caching is disabled after the first failure, instead of being retried for every prompt.
+    assert llm_prompt_cache_requests_total.value(outcome="failed") == failures + 1
+
+
+@pytest.mark.asyncio
+async def test_a_cache_expired_early_is_recreated():
+    client = RecordingClient()
+    ai_service = service_with_cache(client)
+    await ai_service.send_message(instruction=INSTRUCTION, message="Hi", tools=[], llm_context=history(4))
+    client.caches.expire(client.requests[0][1].cached_content)
+
+    response, _ = await ai_service.send_message(instruction=INSTRUCTION, message="Again", tools=[],
+                                                llm_context=history(4))
+    await ai_service.send_message(instruction=INSTRUCTION, message="Once more", tools=[], llm_context=history(4))
+
+    assert response
+    assert client.requests[2][1].cached_content is None
+    assert client.requests[3][1].cached_content and client.caches.created == 2
+
+
+@pytest.mark.asyncio
+async def test_caches_are_refreshed_and_evicted():
+    client = FakeGenAIClient(min_cache_tokens=10)
+    now = [0.0]
+    cache = PromptCache(client, ttl_seconds=600, min_tokens=10, max_entries=1, history_step=1, clock=lambda: now[0])
+    config = GenerateContentConfig(system_instruction=INSTRUCTION)
+
+    name = await cache.get("gemini-2.5-flash", config, history(2))
+    now[0] = 400
+    assert await cache.get("gemini-2.5-flash", config, history(2)) == name
+    assert client.caches.updated == 1
+
+    other = await cache.get("gemini-2.5-flash", config, history(4))
+    await asyncio.sleep(0)
+
+    assert other != name and client.caches.deleted == 1
+    now[0] = 2000
+    assert await cache.get("gemini-2.5-flash", config, history(4)) not in (name, other)
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from app.core.config import Settings
+from app.server import available_cpus, available_memory_bytes, gunicorn_options, rate_limit_backend, worker_count
+
+GIB = 1024 ** 3
+
+
+@pytest.mark.parametrize("cpus, memory_bytes, expected", [
+    (1, 8 * GIB, 3),
+    (4, 8 * GIB, 9),
+    (4, 2 * GIB, 4),  # Four workers of 512MB fit in 2GB.
+    (0.5, 8 * GIB, 2),
+    (2, 256 * 1024 * 1024, 1),  # At least one worker, even when none fit.
+])
+def test_worker_count(cpus, memory_bytes, expected):
+    assert worker_count(cpus, memory_bytes, worker_memory_mb=512) == expected
+
+
+def test_available_resources_follow_the_cgroup_v2_limits(tmp_path: Path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    (tmp_path / "memory.max").write_text(f"{GIB}\n")
+
+    assert available_cpus(tmp_path) == min(1.5, available_cpus(tmp_path / "missing"))
+    assert available_memory_bytes(tmp_path) == GIB
+
+
+def test_available_resources_without_limits(tmp_path: Path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "memory.max").write_text("max\n")
+
+    assert available_cpus(tmp_path) >= 1
+    assert available_memory_bytes(tmp_path) > GIB // 4
+
+
+def test_gunicorn_options_come_from_settings():
+    config = Settings(PORT=9000, WEB_CONCURRENCY=None, WORKER_MAX_REQUESTS=200, WORKER_GRACEFUL_TIMEOUT_SECONDS=60)
+
+    options = gunicorn_options(config, cpus=2, memory_bytes=8 * GIB)
+
+    assert options["bind"] == "0.0.0.0:9000"
+    assert options["workers"] == 5
+    assert options["preload_app"] is True
+    assert options["max_requests"] == 200
+    assert options["graceful_timeout"] > 60
+
+    assert gunicorn_options(Settings(WEB_CONCURRENCY=3), cpus=2, memory_bytes=8 * GIB)["workers"] == 3
+
+
+def test_rate_limits_are_shared_between_workers(caplog):
+    assert rate_limit_backend(Settings(RATE_LIMIT_BACKEND=None), workers=1) == "memory"
+    assert rate_limit_backend(Settings(RATE_LIMIT_BACKEND=None), workers=4) == "database"
+    assert rate_limit_backend(Settings(RATE_LIMIT_BACKEND="database"), workers=1) == "database"
+    assert not caplog.records
+
+    assert rate_limit_backend(Settings(RATE_LIMIT_BACKEND="memory"), workers=4) == "memory"
+    assert "4 times as many requests" in caplog.text
@@ -0,0 +1,102 @@
+import io
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.utils.calendar_import import iter_ics_rows, iter_csv_rows, ics_entry, csv_entry, UNTITLED_EVENT_TITLE
+
+RECIFE = ZoneInfo("America/Recife")
+
+ICS_CONTENT = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Algorithms\\, lecture 1\r\n"
+    "DESCRIPTION:First line\\nsecond line that is folded\r\n"
+    "  across two lines\r\n"
+    "DTSTART:20250801T100000Z\r\n"
+    "DTEND:20250801T120000Z\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Floating\r\n"
+    "DTSTART;TZID=America/Sao_Paulo:20250802T080000\r\n"
+    "DURATION:PT1H30M\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Holiday\r\n"
+    "DTSTART;VALUE=DATE:20250807\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+def test_iter_ics_rows_unfolds_lines_and_yields_each_event():
+    rows = list(iter_ics_rows(io.StringIO(ICS_CONTENT)))
+
+    assert [line for line, _ in rows] == [3, 10, 15]
+    first = rows[0][1]
+    assert first["DESCRIPTION"][1] == "First line\\nsecond line that is folded across two lines"
+    assert rows[1][1]["DTSTART"] == ({"TZID": "America/Sao_Paulo"}, "20250802T080000")
+
+
+def test_iter_ics_rows_skips_the_properties_of_alarms():
+    content = (
+        "BEGIN:VEVENT\r\n"
+        "SUMMARY:Exam\r\n"
+        "BEGIN:VALARM\r\n"
+        "ACTION:DISPLAY\r\n"
+        "DESCRIPTION:Reminder\r\n"
+        "TRIGGER:-PT15M\r\n"
+        "END:VALARM\r\n"
+        "DESCRIPTION:Chapters 1 to 3\r\n"
+        "DTSTART:20250801T100000Z\r\n"
+        "END:VEVENT\r\n"
+    )
+
+    [(_, properties)] = iter_ics_rows(io.StringIO(content))
+
+    assert properties["DESCRIPTION"] == ({}, "Chapters 1 to 3")
+    assert "ACTION" not in properties and "TRIGGER" not in properties
+
+
+def test_ics_entry_converts_to_utc():
+    entries = [ics_entry(properties, RECIFE) for _, properties in iter_ics_rows(io.StringIO(ICS_CONTENT))]
+
+    assert entries[0]["title"] == "Algorithms, lecture 1"
+    assert entries[0]["description"].startswith("First line\nsecond line")
+    assert entries[0]["start_datetime"] == datetime(2025, 8, 1, 10, tzinfo=timezone.utc)
+    # 08:00 in Sao Paulo (UTC-3) is 11:00 in UTC.
+    assert entries[1]["start_datetime"] == datetime(2025, 8, 2, 11, tzinfo=timezone.utc)
+    assert entries[1]["end_datetime"] == datetime(2025, 8, 2, 12, 30, tzinfo=timezone.utc)
+    # All-day entries start at local midnight and last one day.
+    assert entries[2]["start_datetime"] == datetime(2025, 8, 7, 3, tzinfo=timezone.utc)
+    assert entries[2]["end_datetime"] == datetime(2025, 8, 8, 3, tzinfo=timezone.utc)
+
+
+def test_ics_entry_without_summary_gets_a_default_title():
+    for properties in ({}, {"SUMMARY": ({}, "  ")}):
+        entry = ics_entry({**properties, "DTSTART": ({}, "20250801T100000Z")}, RECIFE)
+        assert entry["title"] == UNTITLED_EVENT_TITLE
+
+
+def test_ics_entry_without_dtstart_is_invalid():
+    with pytest.raises(ValueError):
+        ics_entry({"SUMMARY": ({}, "No start")}, RECIFE)
+
+
+def test_csv_rows_and_entries():
+    content = (
+        "Title,Start_Datetime,End_Datetime,Summary\n"
+        "Intro,2025-08-01T10:00:00,2025-08-01T12:00:00,Welcome\n"
+        "Broken,not a date,2025-08-01T12:00:00,\n"
+    )
+    rows = list(iter_csv_rows(io.StringIO(content)))
+
+    assert [line for line, _ in rows] == [2, 3]
+    entry = csv_entry(rows[0][1], RECIFE)
+    assert entry["title"] == "Intro"
+    assert entry["description"] == "Welcome"
+    assert entry["start_datetime"] == datetime(2025, 8, 1, 13, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        csv_entry(rows[1][1], RECIFE)
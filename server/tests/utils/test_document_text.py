@@ -0,0 +1,131 @@
+import zlib
+
+import pytest
+
+from app.utils.document_text import extract_document_text
+from app.utils.pdf_text import extract_pdf_text
+from benchmarks.fakes import fake_syllabus_pdf
+
+
+def pdf_of(objects: list[bytes], root: int = 1) -> bytes:
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, root, xref)
+    return bytes(pdf)
+
+
+def one_page_objects(content: bytes, font: bytes = b"/Subtype /Type1 /BaseFont /Helvetica") -> list[bytes]:
+    stream = zlib.compress(content)
+    return [b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> "
+            b"/Contents 5 0 R >>",
+            b"<< /Type /Font %s >>" % font,
+            b"<< /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)]
+
+
+def one_page_pdf(content: bytes, font: bytes = b"/Subtype /Type1 /BaseFont /Helvetica") -> bytes:
+    return pdf_of(one_page_objects(content, font))
+
+
+def test_the_text_of_a_text_pdf_is_extracted_in_order():
+    text = extract_document_text(fake_syllabus_pdf(lectures=60, evaluations=3), "application/pdf")
+
+    assert text is not None
+    lines = text.splitlines()
+    assert lines[0] == "Benchmark Course"
+    assert lines[3] == "2025-08-04 10:00 to 12:00 Lecture 1: Topics of lecture 1."
+    assert sum(line[:4].isdigit() for line in lines) == 63
+
+
+def test_operators_strings_and_escapes_are_read():
+    content = (b"BT /F1 12 Tf 14 TL 72 720 Td (Week 1 \\(intro\\)) Tj 0 -14 Td [(Lim) 20 (its) -400 (and) ] TJ "
+               b"T* <436F6E74696E75697479> Tj (\\351t\\351\\\\) ' ET") * 3
+
+    text = extract_pdf_text(one_page_pdf(content, font=b"/Subtype /Type1 /BaseFont /Helvetica "
+                                                       b"/Encoding /WinAnsiEncoding"))
+
+    assert text.splitlines()[:4] == ["Week 1 (intro)", "Limits and", "Continuity", "été\\"]
+
+
+def test_the_text_of_composite_and_custom_encoded_fonts_is_extracted():
+    # A font of a LaTeX export, whose encoding renames some of the codes.
+    latex = one_page_pdf(b"BT /F1 12 Tf 72 720 Td (Week 1 \\001lows of the semester) Tj ET" * 10,
+                         font=b"/Subtype /Type1 /BaseFont /CMR10 /Encoding << /Type /Encoding "
+                              b"/BaseEncoding /WinAnsiEncoding /Differences [1 /f] >>")
+    # A subset font of a Google Docs export: two bytes per glyph, mapped to characters by its ToUnicode map.
+    cmap = (b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap /CMapName /Adobe-Identity-UCS def "
+            b"/CMapType 2 def 1 begincodespacerange <0000> <FFFF> endcodespacerange 1 beginbfrange <0001> <005F> "
+            b"<0020> endbfrange endcmap CMapName currentdict /CMapName exch defineresource pop end end")
+    glyphs = "".join(f"{ord(char) - 0x1F:04X}" for char in "Week 1 flows of the semester").encode()
+    google_docs = pdf_of(one_page_objects(b"BT /F1 12 Tf 72 720 Td <%s> Tj ET" % glyphs * 10, font=(
+        b"/Subtype /Type0 /BaseFont /AAAAAA+Arial /Encoding /Identity-H /DescendantFonts [6 0 R] /ToUnicode 7 0 R"))
+        + [b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /AAAAAA+Arial "
+           b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> >>",
+           b"<< /Length %d >>\nstream\n%s\nendstream" % (len(cmap), cmap)])
+
+    assert extract_pdf_text(latex).startswith("Week 1 flows of the semester")
+    assert extract_pdf_text(google_docs).startswith("Week 1 flows of the semester")
+
+
+@pytest.mark.parametrize("pdf", [
+    fake_syllabus_pdf(lectures=30, evaluations=2, scanned=True),
+    one_page_pdf(b"BT (Short) Tj ET"),
+    one_page_pdf(b"BT (" + b"x" * 200 + b") Tj ET").replace(b"/Root 1 0 R", b"/Root 1 0 R /Encrypt 9 0 R"),
+    b"%PDF-1.7\n" + bytes(range(256)) * 10,
+    b"not a PDF",
+    one_page_pdf(b"BT (" + b"x" * 200 + b") Tj ET").replace(b"/Contents 5 0 R", b"/Contents 9 0 R"),
+], ids=["scanned", "too little text", "encrypted", "garbage", "not a pdf", "missing contents"])
+def test_pdfs_whose_text_is_not_their_whole_content_are_sent_as_they_are(pdf):
+    assert extract_pdf_text(pdf) is None
+    assert extract_document_text(pdf, "application/pdf") is None
+
+
+def test_truncated_and_corrupted_pdfs_are_sent_as_they_are():
+    pdf = one_page_pdf(b"BT /F1 12 Tf 72 720 Td (" + b"x" * 200 + b") Tj ET")
+
+    assert extract_pdf_text(pdf) == "x" * 200
+    for end in range(0, len(pdf), 7):
+        # Cut or changed anywhere, in the structure or in the compressed content, the document is read as pypdf
+        # recovers it, or not at all.
+        for damaged in (pdf[:end], pdf[:end] + b"\x00\xff" + pdf[end + 2:]):
+            assert extract_pdf_text(damaged) in (None, "x" * 200)
+
+
+def test_pdfs_that_take_too_long_to_read_are_dropped():
+    compressor = zlib.compressobj(9)
+    # 64MB of content, compressed to about 130KB.
+    content = b"".join(compressor.compress(b"BT (x) Tj ET " * 80_000) for _ in range(64)) + compressor.flush()
+    objects = one_page_objects(b"")
+    objects[4] = b"<< /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+    decompression_bomb = pdf_of(objects)
+    # Every node of the page tree has the next one as its two kids: 2^30 pages in a few KB.
+    objects = one_page_objects(b"BT /F1 12 Tf 72 720 Td (" + b"x" * 200 + b") Tj ET")
+    objects[1] = b"<< /Type /Pages /Kids [6 0 R] /Count 1073741824 >>"
+    objects += [b"<< /Type /Pages /Kids [%d 0 R %d 0 R] >>" % (number + 1, number + 1) for number in range(6, 36)]
+    objects[2] = objects[2].replace(b"/Parent 2 0 R", b"/Parent 36 0 R")
+    objects.append(objects[2])
+    page_tree_bomb = pdf_of(objects)
+
+    assert extract_pdf_text(decompression_bomb) is None
+    assert extract_pdf_text(page_tree_bomb) is None
+
+
+def test_the_visible_text_of_html_is_extracted_with_its_tables():
+    html = (b"<html><head><title>Syllabus</title><style>td { color: red; }</style></head><body>"
+            b"<h1>Calculus</h1><p>Weekly   lectures.</p><table><tr><th>Week</th><th>Topic</th></tr>"
+            b"<tr><td>1</td><td>Limits</td></tr></table><script>track();</script></body></html>")
+
+    assert extract_document_text(html, "text/html") == "Calculus\nWeekly lectures.\nWeek | Topic\n1 | Limits"
+
+
+def test_other_documents_and_html_in_other_charsets_are_not_extracted():
+    assert extract_document_text(b"\x89PNG\r\n", "image/png") is None
+    assert extract_document_text("<p>Été</p>".encode("latin-1"), "text/html") is None
+    assert extract_document_text("<p>Été</p>".encode(), "text/html") == "Été"
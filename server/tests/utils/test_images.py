@@ -0,0 +1,33 @@
+import io
+
+from PIL import Image
+
+from app.utils.images import downscale_image
+from benchmarks.fakes import fake_timetable_photo
+
+
+def test_photos_are_scaled_down_upright_without_metadata():
+    photo = fake_timetable_photo(800, 600)
+
+    normalized = downscale_image(photo, max_side=256, quality=80)
+
+    with Image.open(io.BytesIO(normalized)) as image:
+        assert image.format == "WEBP"
+        # The photo was taken rotated, so is sent portrait.
+        assert image.size == (192, 256)
+        assert not image.getexif() and "exif" not in image.info and "icc_profile" not in image.info
+    assert len(normalized) < len(photo) / 10
+
+
+def test_small_and_transparent_images_keep_their_size_and_alpha():
+    output = io.BytesIO()
+    Image.new("LA", (100, 50), (128, 0)).save(output, format="PNG")
+
+    with Image.open(io.BytesIO(downscale_image(output.getvalue(), max_side=256, quality=80))) as image:
+        assert image.size == (100, 50)
+        assert image.mode == "RGBA"
+
+
+def test_unreadable_images_are_left_as_they_are():
+    assert downscale_image(b"\x00\x00\x00\x18ftypheic", max_side=256, quality=80) is None
+    assert downscale_image(fake_timetable_photo(800, 600)[:2000], max_side=256, quality=80) is None
@@ -0,0 +1,23 @@
+import json
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models import ChatMessage
+from app.schemas import ChatMessageBase
+from app.utils.json_response import ModelJSONResponse
+
+
+def test_model_json_response_renders_orm_objects_like_the_response_model():
+    history = [
+        ChatMessage(role="user", text="Olá", content=[],
+                    files='[{"filename": "a.pdf", "mimetype": "application/pdf"}]'),
+        ChatMessage(role="model", text="Hi", content=[]),
+    ]
+    adapter = TypeAdapter(list[ChatMessageBase])
+
+    response = ModelJSONResponse(adapter, history, headers={"X-Test": "1"})
+
+    assert response.media_type == "application/json"
+    assert response.headers["X-Test"] == "1"
+    assert json.loads(response.body) == jsonable_encoder(adapter.validate_python(history, from_attributes=True))
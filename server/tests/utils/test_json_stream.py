@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from app.utils.json_stream import JSONObjectStream
+
+DOCUMENT = """```json
+{"title": "Calculus \\"I\\" \\u00e9", "credits": 4, "optional": false, "semester": null,
+ "lectures": [{"title": "Limits", "tags": ["a", {"b": []}]}, {"title": "Derivatives]}"}],
+ "evaluations": [], "grading": {"exam": [0.5, 0.5]}}
+```"""
+
+
+def read_in_pieces(text: str, size: int) -> tuple[list[tuple[str, str]], JSONObjectStream]:
+    stream = JSONObjectStream(array_fields=["lectures", "evaluations"])
+    values = []
+    for start in range(0, len(text), size):
+        values.extend(stream.feed(text[start:start + size]))
+    return values, stream
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+def test_values_are_split_out_whatever_the_pieces(size):
+    values, stream = read_in_pieces(DOCUMENT, size)
+
+    stream.close()
+    assert [(field, json.loads(value)) for field, value in values] == [
+        ("title", 'Calculus "I" é'),
+        ("credits", 4),
+        ("optional", False),
+        ("semester", None),
+        ("lectures", {"title": "Limits", "tags": ["a", {"b": []}]}),
+        ("lectures", {"title": "Derivatives]}"}),
+        ("grading", {"exam": [0.5, 0.5]}),
+    ]
+
+
+def test_items_are_returned_as_soon_as_they_are_complete():
+    stream = JSONObjectStream(array_fields=["lectures"])
+
+    assert stream.feed('{"lectures": [{"title": "Lim') == []
+    assert stream.feed('its"}, {"title"') == [("lectures", '{"title": "Limits"}')]
+    # Only the item in progress is kept.
+    assert stream._buffer == '{"title"'
+    assert stream.feed(': "Series"}]') == [("lectures", '{"title": "Series"}')]
+    assert not stream.closed
+    assert stream.feed("}") == []
+    assert stream.closed
+
+
+def test_an_object_that_ends_early_is_invalid():
+    values, stream = read_in_pieces('{"title": "Calculus", "lectures": [{"title": "Limits"}', 5)
+
+    assert values == [("title", '"Calculus"'), ("lectures", '{"title": "Limits"}')]
+    with pytest.raises(ValueError):
+        stream.close()
+
+
+def test_keys_must_be_strings():
+    with pytest.raises(ValueError):
+        JSONObjectStream().feed('{title: "Calculus"}')
@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import Event
+from app.utils.pagination import decode_cursor, encode_cursor
+
+COLUMNS = [Event.start_datetime, Event.uuid]
+
+
+def tampered(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursors_decode_to_the_values_they_were_encoded_from():
+    start = datetime(2025, 8, 1, 10, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor([start, "event-1"]), COLUMNS) == [start, "event-1"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    tampered({"a": 1}),
+    tampered(["2025-08-01T10:00:00+00:00"]),
+    tampered([1, "x"]),
+    tampered([["2025-08-01"], "x"]),
+    tampered(["2025-08-01T10:00:00+00:00", None]),
+    tampered(["2025-08-01T10:00:00+00:00", True]),
+    tampered(["yesterday", "x"]),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        decode_cursor(cursor, COLUMNS)
+